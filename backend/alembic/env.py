@@ -14,12 +14,14 @@ from app.core.database import Base
 # Import all models here to make them available to Alembic
 from app.models.user import User
 from app.models.case import Case
-from app.models.document import Document
+from app.models.document import Document, StorageUsage
+from app.models.blob import DocumentBlob, DocumentText
 from app.models.task import Task
-from app.models.payment import Payment
-from app.models.notification import Notification
+from app.models.payment import Payment, PaymentReconciliation
+from app.models.notification import Notification, NotificationCounter
 from app.models.timeline import TimelineEvent
 from app.models.audit_log import AuditLog
+from app.models.job import Job, DeadJob
 
 # this is the Alembic Config object
 config = context.config
@@ -0,0 +1,27 @@
+"""Add sha256 content digest to documents
+
+Revision ID: 2025_12_01_1000
+Revises: 2025_11_30_1600
+Create Date: 2025-12-01 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2025_12_01_1000'
+down_revision = '2025_11_30_1600'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Upload sırasında artımlı hesaplanan SHA-256 (hex)
+    op.add_column('documents', sa.Column('sha256', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_documents_sha256'), 'documents', ['sha256'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_documents_sha256'), table_name='documents')
+    op.drop_column('documents', 'sha256')
@@ -0,0 +1,32 @@
+"""Add content-addressed document blobs
+
+Revision ID: 2025_12_02_1000
+Revises: 2025_12_01_1000
+Create Date: 2025-12-02 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2025_12_02_1000'
+down_revision = '2025_12_01_1000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SHA-256 ile adreslenen dosyalar; ref_count = bu blob'a işaret eden documents satırı
+    op.create_table('document_blobs',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('file_path', sa.String(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+
+
+def downgrade():
+    op.drop_table('document_blobs')
@@ -0,0 +1,80 @@
+"""Add composite and partial indexes for list query shapes
+
+Revision ID: 2025_12_03_1000
+Revises: 2025_12_02_1000
+Create Date: 2025-12-03 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2025_12_03_1000'
+down_revision = '2025_12_02_1000'
+branch_labels = None
+depends_on = None
+
+
+# (index adı, tablo, sütunlar, partial index koşulu)
+INDEXES = [
+    ('ix_notifications_user_created', 'notifications', ['user_id', 'created_at', 'id'], None),
+    ('ix_notifications_user_unread', 'notifications', ['user_id', 'created_at', 'id'], 'is_read = false'),
+    ('ix_timeline_events_case_event_date', 'timeline_events', ['case_id', 'event_date', 'id'], None),
+    ('ix_payments_created', 'payments', ['created_at', 'id'], None),
+    ('ix_payments_user_created', 'payments', ['user_id', 'created_at', 'id'], None),
+    ('ix_payments_user_status_created', 'payments', ['user_id', 'status', 'created_at', 'id'], None),
+    ('ix_documents_case_uploaded', 'documents', ['case_id', 'uploaded_at', 'id'], None),
+    ('ix_documents_case_visible', 'documents', ['case_id', 'uploaded_at', 'id'], 'is_visible_to_client = true'),
+    ('ix_documents_user_uploaded', 'documents', ['user_id', 'uploaded_at', 'id'], None),
+    ('ix_cases_created', 'cases', ['created_at', 'id'], None),
+    ('ix_cases_client_created', 'cases', ['client_id', 'created_at', 'id'], None),
+    ('ix_cases_client_status', 'cases', ['client_id', 'status'], None),
+    ('ix_audit_logs_user_created', 'audit_logs', ['user_id', 'created_at'], None),
+]
+
+
+def _existing_tables():
+    # Offline (--sql) modda veritabanı incelenemez; tüm tablolar var sayılır
+    if op.get_context().as_sql:
+        return {table for _, table, _, _ in INDEXES}
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade():
+    # audit_logs bazı kurulumlarda yalnızca create_all ile oluşturulmuştur
+    tables = _existing_tables()
+
+    # CREATE INDEX CONCURRENTLY transaction içinde çalışamaz; tablolar
+    # kilitlenmeden (yazmalar devam ederken) index oluşturulur.
+    # Yarıda kalan bir CONCURRENTLY build INVALID index bırakır; bu durumda
+    # index DROP edilip migration tekrar çalıştırılmalıdır.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            if table not in tables:
+                continue
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                sqlite_where=sa.text(where) if where else None
+            )
+
+
+def downgrade():
+    tables = _existing_tables()
+
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in reversed(INDEXES):
+            if table not in tables:
+                continue
+            op.drop_index(
+                name,
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True
+            )
@@ -0,0 +1,38 @@
+"""Add per-user unread notification counters
+
+Revision ID: 2025_12_04_1000
+Revises: 2025_12_03_1000
+Create Date: 2025-12-04 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2025_12_04_1000'
+down_revision = '2025_12_03_1000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Kullanıcı başına okunmamış bildirim sayısı (unread-count tek satır okuması)
+    op.create_table('notification_counters',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('unread_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Mevcut bildirimlerden başlangıç değerleri
+    op.execute(
+        "INSERT INTO notification_counters (user_id, unread_count) "
+        "SELECT user_id, COUNT(*) FROM notifications "
+        "WHERE is_read = false GROUP BY user_id"
+    )
+
+
+def downgrade():
+    op.drop_table('notification_counters')
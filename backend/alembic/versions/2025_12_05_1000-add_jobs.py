@@ -0,0 +1,58 @@
+"""Add background job queue and dead-letter tables
+
+Revision ID: 2025_12_05_1000
+Revises: 2025_12_04_1000
+Create Date: 2025-12-05 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2025_12_05_1000'
+down_revision = '2025_12_04_1000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Bekleyen/çalışan işler (python -m app.worker)
+    op.create_table('jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('queue', sa.String(length=50), nullable=False),
+    sa.Column('task', sa.String(length=100), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('unique_key', sa.String(length=200), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('run_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('locked_by', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_jobs_queue_run_at', 'jobs', ['queue', 'run_at', 'id'], unique=False)
+    op.create_index('ux_jobs_unique_key', 'jobs', ['unique_key'], unique=True)
+
+    # Deneme hakkı biten işler
+    op.create_table('dead_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('queue', sa.String(length=50), nullable=False),
+    sa.Column('task', sa.String(length=100), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('failed_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('dead_jobs')
+    op.drop_index('ux_jobs_unique_key', table_name='jobs')
+    op.drop_index('ix_jobs_queue_run_at', table_name='jobs')
+    op.drop_table('jobs')
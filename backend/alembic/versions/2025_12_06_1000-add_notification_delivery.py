@@ -0,0 +1,44 @@
+"""Add delivery state to notifications for email/SMS channels
+
+Revision ID: 2025_12_06_1000
+Revises: 2025_12_05_1000
+Create Date: 2025-12-06 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2025_12_06_1000'
+down_revision = '2025_12_05_1000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('notifications', sa.Column('delivery_attempts', sa.Integer(), server_default=sa.text('0'), nullable=False))
+    op.add_column('notifications', sa.Column('delivery_error', sa.Text(), nullable=True))
+    op.add_column('notifications', sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Uygulama içi bildirimler oluşturulduğu anda "gönderilmiş" sayılır;
+    # eski satırlar gönderim kuyruğuna düşmesin
+    op.execute(
+        "UPDATE notifications SET is_sent = true "
+        "WHERE is_sent = false OR is_sent IS NULL"
+    )
+
+    # Gönderim kuyruğu: yalnızca bekleyen satırlar indekslenir
+    op.create_index(
+        'ix_notifications_pending_delivery', 'notifications',
+        ['notification_type', 'id'], unique=False,
+        postgresql_where=sa.text('is_sent = false'),
+        sqlite_where=sa.text('is_sent = false')
+    )
+
+
+def downgrade():
+    op.drop_index('ix_notifications_pending_delivery', table_name='notifications')
+    op.drop_column('notifications', 'next_attempt_at')
+    op.drop_column('notifications', 'delivery_error')
+    op.drop_column('notifications', 'delivery_attempts')
@@ -0,0 +1,49 @@
+"""Add payment reconciliation runs and pending payments index
+
+Revision ID: 2025_12_07_1000
+Revises: 2025_12_06_1000
+Create Date: 2025-12-07 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2025_12_07_1000'
+down_revision = '2025_12_06_1000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('payment_reconciliations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('start_cursor', sa.Integer(), nullable=False),
+    sa.Column('next_cursor', sa.Integer(), nullable=True),
+    sa.Column('aborted', sa.Boolean(), nullable=False),
+    sa.Column('checked', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('refunded', sa.Integer(), nullable=False),
+    sa.Column('unchanged', sa.Integer(), nullable=False),
+    sa.Column('errors', sa.Integer(), nullable=False),
+    sa.Column('report', sa.JSON(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_payment_reconciliations_id'), 'payment_reconciliations', ['id'], unique=False)
+
+    # Mutabakat taraması: yalnızca bekleyen ödemeler indekslenir
+    op.create_index(
+        'ix_payments_pending', 'payments', ['id'], unique=False,
+        postgresql_where=sa.text("status = 'PENDING'"),
+        sqlite_where=sa.text("status = 'PENDING'")
+    )
+
+
+def downgrade():
+    op.drop_index('ix_payments_pending', table_name='payments')
+    op.drop_index(op.f('ix_payment_reconciliations_id'), table_name='payment_reconciliations')
+    op.drop_table('payment_reconciliations')
@@ -0,0 +1,44 @@
+"""Add per-user and per-case storage usage counters
+
+Revision ID: 2025_12_08_1000
+Revises: 2025_12_07_1000
+Create Date: 2025-12-08 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2025_12_08_1000'
+down_revision = '2025_12_07_1000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Kota kontrolü ve kullanım raporu için kapsam başına bayt / dosya sayısı
+    op.create_table('storage_usage',
+    sa.Column('scope', sa.String(length=16), nullable=False),
+    sa.Column('scope_id', sa.Integer(), nullable=False),
+    sa.Column('bytes', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+    sa.Column('files', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('scope', 'scope_id')
+    )
+
+    # Mevcut evraklardan başlangıç değerleri
+    op.execute(
+        "INSERT INTO storage_usage (scope, scope_id, bytes, files) "
+        "SELECT 'user', user_id, COALESCE(SUM(file_size), 0), COUNT(*) FROM documents "
+        "GROUP BY user_id"
+    )
+    op.execute(
+        "INSERT INTO storage_usage (scope, scope_id, bytes, files) "
+        "SELECT 'case', case_id, COALESCE(SUM(file_size), 0), COUNT(*) FROM documents "
+        "WHERE case_id IS NOT NULL GROUP BY case_id"
+    )
+
+
+def downgrade():
+    op.drop_table('storage_usage')
@@ -0,0 +1,25 @@
+"""Add preview status to document blobs
+
+Revision ID: 2025_12_09_1000
+Revises: 2025_12_08_1000
+Create Date: 2025-12-09 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2025_12_09_1000'
+down_revision = '2025_12_08_1000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Önizleme görseli durumu (görseller blob'un yanında saklanır)
+    op.add_column('document_blobs', sa.Column('preview_status', sa.String(length=16), nullable=True))
+
+
+def downgrade():
+    op.drop_column('document_blobs', 'preview_status')
@@ -0,0 +1,61 @@
+"""Add extracted document texts and full-text search index
+
+Revision ID: 2025_12_10_1000
+Revises: 2025_12_09_1000
+Create Date: 2025-12-10 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2025_12_10_1000'
+down_revision = '2025_12_09_1000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Blob başına çıkarılan düz metin (mevcut evraklar search.backfill ile işlenir)
+    op.create_table('document_texts',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('content', sa.Text(), nullable=True),
+    sa.Column('extracted_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # Türkçe kök bulma ile tsvector, içerikten otomatik türetilir
+        op.execute(
+            "ALTER TABLE document_texts ADD COLUMN search_vector tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('turkish', coalesce(content, ''))) STORED"
+        )
+        op.execute("CREATE INDEX ix_document_texts_search_vector ON document_texts USING gin (search_vector)")
+    elif dialect == 'sqlite':
+        # Yerel geliştirme: tetikleyicilerle eşitlenen FTS5 tablosu
+        op.execute(
+            "CREATE VIRTUAL TABLE document_texts_fts USING fts5("
+            "sha256 UNINDEXED, content, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "CREATE TRIGGER document_texts_fts_insert AFTER INSERT ON document_texts BEGIN "
+            "INSERT INTO document_texts_fts (sha256, content) VALUES (new.sha256, new.content); END"
+        )
+        op.execute(
+            "CREATE TRIGGER document_texts_fts_update AFTER UPDATE OF content ON document_texts BEGIN "
+            "DELETE FROM document_texts_fts WHERE sha256 = old.sha256; "
+            "INSERT INTO document_texts_fts (sha256, content) VALUES (new.sha256, new.content); END"
+        )
+        op.execute(
+            "CREATE TRIGGER document_texts_fts_delete AFTER DELETE ON document_texts BEGIN "
+            "DELETE FROM document_texts_fts WHERE sha256 = old.sha256; END"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS document_texts_fts")
+    op.drop_table('document_texts')
@@ -0,0 +1,34 @@
+"""Add single-use notification stream tickets
+
+Revision ID: 2025_12_11_1000
+Revises: 2025_12_10_1000
+Create Date: 2025-12-11 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2025_12_11_1000'
+down_revision = '2025_12_10_1000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SSE / WebSocket bağlantısı için JWT yerine URL'de taşınan bilet
+    op.create_table('stream_tickets',
+    sa.Column('digest', sa.String(length=64), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('session_expires_at', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('digest')
+    )
+    op.create_index(op.f('ix_stream_tickets_expires_at'), 'stream_tickets', ['expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_stream_tickets_expires_at'), table_name='stream_tickets')
+    op.drop_table('stream_tickets')
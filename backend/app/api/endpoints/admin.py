@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
@@ -7,7 +8,20 @@ import string
 from pydantic import BaseModel, EmailStr
 
 from app.core.database import get_db
-from app.core.security import get_password_hash
+from app.core.pagination import PageParams, paginate
+from app.core.unit_of_work import UnitOfWork, get_sync_uow
+from app.core.security import get_password_hash_async, password_executor
+from app.core.principal_cache import principal_cache
+from app.core.database import engine, async_engine
+from app.core.db_pool import pool_stats
+from app.services.notification import admin_recipients
+from app.services.audit import audit_sink
+from app.services.blob_store import dedup_report
+from app.services.delivery import delivery_stats
+from app.services.jobs import queue_stats
+from app.services.payment_gateway import iyzico_gateway
+from app.services.signed_urls import signed_url_cache
+from app.services.storage_usage import CASE_SCOPE, USER_SCOPE, top_consumers
 from app.models.user import User, UserType
 from app.models.case import Case, CaseStatus, CaseType
 from app.models.document import Document
@@ -28,8 +42,8 @@ router = APIRouter()
 
 @router.get("/clients", response_model=List[UserResponse])
 async def get_all_clients(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    page: PageParams = Depends(),
     search: Optional[str] = None,
     user_type: Optional[UserType] = None,
     current_user: User = Depends(get_current_user),
@@ -45,17 +59,17 @@ async def get_all_clients(
     if not can_view_all_clients(current_user):
         raise PermissionDenied("Only admins and lawyers can view all clients")
     
-    query = db.query(User).filter(
+    query = select(User).where(
         User.user_type.in_([UserType.INDIVIDUAL, UserType.CORPORATE])
     )
     
     # Filtreleme
     if user_type:
-        query = query.filter(User.user_type == user_type)
+        query = query.where(User.user_type == user_type)
     
     if search:
         search_filter = f"%{search}%"
-        query = query.filter(
+        query = query.where(
             (User.full_name.ilike(search_filter)) |
             (User.email.ilike(search_filter)) |
             (User.tc_kimlik.ilike(search_filter)) |
@@ -63,7 +77,7 @@ async def get_all_clients(
             (User.company_name.ilike(search_filter))
         )
     
-    clients = query.offset(skip).limit(limit).all()
+    clients, _ = await paginate(db, query, page, response, keys=(User.created_at, User.id))
     
     # Audit log
     await log_audit(
@@ -109,12 +123,64 @@ async def get_client_detail(
     
     return client
 
+class UserStatusUpdate(BaseModel):
+    is_active: bool
+
+@router.put("/users/{user_id}/status", response_model=UserResponse)
+async def update_user_status(
+    user_id: int,
+    status_update: UserStatusUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    uow: UnitOfWork = Depends(get_sync_uow),
+    request: Request = None
+):
+    """Kullanıcıyı aktif/pasif yap (Sadece Admin)"""
+    if current_user.user_type != UserType.ADMIN:
+        raise PermissionDenied("Only admins can change user status")
+    
+    if user_id == current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You cannot change your own status"
+        )
+    
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    old_value = user.is_active
+    user.is_active = status_update.is_active
+    
+    # Audit log (güncellemeyle aynı transaction'da)
+    await log_audit(
+        db=db,
+        user=current_user,
+        action="UPDATE",
+        resource_type="USER",
+        resource_id=user.id,
+        description=f"{'Activated' if user.is_active else 'Deactivated'} user {user.full_name}",
+        changes={"old": {"is_active": old_value}, "new": {"is_active": user.is_active}},
+        request=request,
+        uow=uow
+    )
+    await uow.commit()
+    
+    # Pasife alınan kullanıcının önbellekteki oturumları hemen geçersiz olmalı
+    principal_cache.invalidate_user(user.id)
+    admin_recipients.invalidate()
+    
+    return user
+
 # ============ DOSYA YÖNETİMİ ============
 
 @router.get("/cases", response_model=List[CaseResponse])
 async def get_all_cases(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    page: PageParams = Depends(),
     client_id: Optional[int] = None,
     status: Optional[CaseStatus] = None,
     case_type: Optional[CaseType] = None,
@@ -132,17 +198,17 @@ async def get_all_cases(
     if not is_admin_or_lawyer(current_user):
         raise PermissionDenied()
     
-    query = db.query(Case)
+    query = select(Case)
     
     # Filtreler
     if client_id:
-        query = query.filter(Case.client_id == client_id)
+        query = query.where(Case.client_id == client_id)
     if status:
-        query = query.filter(Case.status == status)
+        query = query.where(Case.status == status)
     if case_type:
-        query = query.filter(Case.case_type == case_type)
+        query = query.where(Case.case_type == case_type)
     
-    cases = query.offset(skip).limit(limit).all()
+    cases, _ = await paginate(db, query, page, response, keys=(Case.created_at, Case.id))
     
     # Audit log
     await log_audit(
@@ -162,6 +228,7 @@ async def create_case_for_client(
     client_id: int = Query(..., description="Müvekkil ID"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
+    uow: UnitOfWork = Depends(get_sync_uow),
     request: Request = None
 ):
     """
@@ -192,9 +259,8 @@ async def create_case_for_client(
         client_id=client_id
     )
     
-    db.add(db_case)
-    db.commit()
-    db.refresh(db_case)
+    uow.add(db_case)
+    await uow.flush()
     
     # Audit log
     await log_audit(
@@ -205,8 +271,10 @@ async def create_case_for_client(
         resource_id=db_case.id,
         description=f"Created case {db_case.case_number} for client {client.full_name}",
         changes=case_data.model_dump(),
-        request=request
+        request=request,
+        uow=uow
     )
+    await uow.commit()
     
     return db_case
 
@@ -216,6 +284,7 @@ async def update_case(
     case_update: CaseUpdate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
+    uow: UnitOfWork = Depends(get_sync_uow),
     request: Request = None
 ):
     """Dosya bilgilerini güncelle (Admin/Avukat)"""
@@ -241,10 +310,7 @@ async def update_case(
     for field, value in update_data.items():
         setattr(case, field, value)
     
-    db.commit()
-    db.refresh(case)
-    
-    # Audit log
+    # Audit log (güncellemeyle aynı transaction'da)
     await log_audit(
         db=db,
         user=current_user,
@@ -253,8 +319,10 @@ async def update_case(
         resource_id=case_id,
         description=f"Updated case {case.case_number}",
         changes={"old": old_values, "new": update_data},
-        request=request
+        request=request,
+        uow=uow
     )
+    await uow.commit()
     
     return case
 
@@ -263,6 +331,7 @@ async def delete_case(
     case_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
+    uow: UnitOfWork = Depends(get_sync_uow),
     request: Request = None
 ):
     """Dosyayı sil (Sadece Admin)"""
@@ -278,10 +347,9 @@ async def delete_case(
     
     case_number = case.case_number
     
-    db.delete(case)
-    db.commit()
+    await uow.delete(case)
     
-    # Audit log
+    # Audit log (silmeyle aynı transaction'da)
     await log_audit(
         db=db,
         user=current_user,
@@ -289,8 +357,10 @@ async def delete_case(
         resource_type="CASE",
         resource_id=case_id,
         description=f"Deleted case {case_number}",
-        request=request
+        request=request,
+        uow=uow
     )
+    await uow.commit()
     
     return None
 
@@ -330,6 +400,75 @@ async def get_statistics(
         "pending_payments": pending_payments
     }
 
+@router.get("/metrics")
+async def get_metrics(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Süreç içi performans metrikleri (Admin/Avukat için)
+    
+    - principal_cache: get_current_user önbelleği isabet/ıska sayaçları
+    - password_executor: bcrypt kuyruk derinliği, bekleme süreleri ve reddedilen istekler
+    - db_pool: bağlantı havuzu doluluğu, overflow, bekleme histogramı ve timeout'lar
+    - audit_sink: audit kuyruğu, yazılan/diske taşan kayıt sayıları
+    - jobs: kuyruk başına hazır/çalışan/ileri tarihli iş ve dead letter sayıları
+    - delivery: email/SMS kanalı başına bekleyen ve başarısız bildirim sayıları
+    - payment_gateway: İyzico devre durumu, eşzamanlı istek, zaman aşımı ve hata sayıları
+    - signed_url_cache: imzalı indirme URL'i önbelleği isabet/ıska sayaçları
+    """
+    if not is_admin_or_lawyer(current_user):
+        raise PermissionDenied()
+    
+    return {
+        "principal_cache": principal_cache.stats(),
+        "password_executor": password_executor.stats(),
+        "db_pool": {
+            "sync": pool_stats(engine.pool),
+            "async": pool_stats(async_engine.pool if async_engine is not None else None)
+        },
+        "audit_sink": audit_sink.stats(),
+        "jobs": queue_stats(db),
+        "delivery": delivery_stats(db),
+        "payment_gateway": iyzico_gateway.stats(),
+        "signed_url_cache": signed_url_cache.stats()
+    }
+
+@router.get("/storage/dedup")
+async def get_storage_dedup(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Evrak deduplikasyon raporu (Sadece Admin)
+    
+    Paylaşılan blob sayısı ve aynı içeriğin tek kopya tutulmasıyla
+    kazanılan disk alanı (byte)
+    """
+    if current_user.user_type != UserType.ADMIN:
+        raise PermissionDenied()
+    
+    return dedup_report(db)
+
+@router.get("/storage/usage")
+async def get_storage_usage(
+    scope: str = Query(USER_SCOPE, pattern=f"^({USER_SCOPE}|{CASE_SCOPE})$"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    En çok depolama kullanan kullanıcılar veya davalar (Sadece Admin)
+    
+    storage_usage sayaçlarından okunur (evrak boyutları toplamı, byte);
+    quota_used ilgili kotanın (STORAGE_CLIENT_QUOTA_MB / STORAGE_CASE_QUOTA_MB)
+    doluluk oranıdır.
+    """
+    if current_user.user_type != UserType.ADMIN:
+        raise PermissionDenied()
+    
+    return top_consumers(db, scope, limit)
+
 class ClientCreateRequest(BaseModel):
     full_name: str
     email: Optional[EmailStr] = None
@@ -346,6 +485,7 @@ async def create_client(
     client_in: ClientCreateRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
+    uow: UnitOfWork = Depends(get_sync_uow),
     request: Request = None
 ):
     """
@@ -391,7 +531,7 @@ async def create_client(
     # Generate temporary password (8 chars: letters + digits)
     alphabet = string.ascii_letters + string.digits
     temp_password = ''.join(secrets.choice(alphabet) for i in range(8))
-    hashed_password = get_password_hash(temp_password)
+    hashed_password = await get_password_hash_async(temp_password)
     
     user_data = client_in.model_dump()
     user = User(
@@ -402,9 +542,8 @@ async def create_client(
         must_change_password=True  # İlk girişte şifre değiştirmek zorunda
     )
     
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    uow.add(user)
+    await uow.flush()
     
     # Audit log
     await log_audit(
@@ -414,8 +553,13 @@ async def create_client(
         resource_type="CLIENT",
         resource_id=user.id,
         description=f"Created client {user.full_name}",
-        request=request
+        request=request,
+        uow=uow
     )
+    await uow.commit()
+    
+    if user.user_type in (UserType.ADMIN, UserType.LAWYER):
+        admin_recipients.invalidate()
     
     return {
         "user": user,
@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Form
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import timedelta
 from typing import Annotated, Optional
@@ -8,46 +10,78 @@ import qrcode
 import io
 import base64
 
-from app.core.database import get_db
-from app.core.security import verify_password, get_password_hash, create_access_token, decode_access_token
+from app.core.database import get_async_db, get_db
+from app.core.security import verify_password_async, get_password_hash_async, create_access_token, decode_access_token
 from app.core.config import settings
-from app.models.user import User
+from app.core.principal_cache import principal_cache
+from app.services.notification import admin_recipients
+from app.models.user import User, UserType
 from app.schemas.user import UserCreate, UserResponse, LoginResponse, Token, UserUpdate
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
-def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user"""
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+def _token_subject(token: str) -> str:
     payload = decode_access_token(token)
-    if payload is None:
-        raise credentials_exception
-    
-    email: str = payload.get("sub")
-    if email is None:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
-        raise credentials_exception
-    
+    if payload is None or payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload["sub"]
+
+def _require_active(user: User) -> User:
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Inactive user"
         )
-    
     return user
 
+def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Session = Depends(get_db)
+) -> User:
+    """Get current authenticated user (senkron Session kullanan router'lar için)"""
+    email = _token_subject(token)
+    
+    user = principal_cache.get(token, db)
+    if user is None:
+        user = db.query(User).filter(User.email == email).first()
+        if user is None:
+            raise _credentials_exception()
+        principal_cache.put(token, user)
+    
+    return _require_active(user)
+
+async def get_current_user_async(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """
+    get_current_user'ın async router'lar için sürümü
+
+    Endpoint'in kendi get_async_db session'ını kullanır (FastAPI aynı
+    istekte dependency'yi bir kez çözer); önbellek ıskasında istek ikinci
+    bir havuz bağlantısı tutmaz.
+    """
+    email = _token_subject(token)
+    
+    snapshot = principal_cache.lookup(token)
+    if snapshot is not None:
+        user = await db.merge(snapshot, load=False)
+    else:
+        user = await db.scalar(select(User).where(User.email == email))
+        if user is None:
+            raise _credentials_exception()
+        principal_cache.put(token, user)
+    
+    return _require_active(user)
+
 @router.post("/login", response_model=LoginResponse)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
@@ -72,7 +106,7 @@ async def login(
             (User.tc_kimlik == form_data.username) | (User.tax_number == form_data.username)
         ).first()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Kullanıcı adı veya şifre hatalı",
@@ -157,6 +191,7 @@ async def update_me(
     
     db.commit()
     db.refresh(current_user)
+    principal_cache.invalidate_user(current_user.id)
     return current_user
 
 @router.post("/logout")
@@ -180,17 +215,18 @@ async def change_password(
     - Kullanıcı istediği zaman şifresini değiştirebilir
     """
     # Mevcut şifreyi doğrula
-    if not verify_password(password_data.current_password, current_user.hashed_password):
+    if not await verify_password_async(password_data.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Mevcut şifre hatalı"
         )
     
     # Yeni şifreyi ayarla
-    current_user.hashed_password = get_password_hash(password_data.new_password)
+    current_user.hashed_password = await get_password_hash_async(password_data.new_password)
     current_user.must_change_password = False  # Artık değiştirmek zorunda değil
     
     db.commit()
+    principal_cache.invalidate_user(current_user.id)
     
     return {"message": "Şifre başarıyla değiştirildi"}
 
@@ -240,7 +276,7 @@ async def create_user(
             )
     
     # Yeni kullanıcı oluştur
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     db_user = User(
         email=user_data.email,
         hashed_password=hashed_password,
@@ -257,6 +293,9 @@ async def create_user(
     db.commit()
     db.refresh(db_user)
     
+    if db_user.user_type in (UserType.ADMIN, UserType.LAWYER):
+        admin_recipients.invalidate()
+    
     return db_user
 
 @router.post("/2fa/setup")
@@ -269,6 +308,7 @@ async def setup_2fa(current_user: User = Depends(get_current_user), db: Session
     if not current_user.totp_secret:
         current_user.totp_secret = pyotp.random_base32()
         db.commit()
+        principal_cache.invalidate_user(current_user.id)
     
     # Generate QR code
     totp = pyotp.TOTP(current_user.totp_secret)
@@ -303,6 +343,7 @@ async def verify_2fa_setup(
     if totp.verify(code):
         current_user.is_2fa_enabled = True
         db.commit()
+        principal_cache.invalidate_user(current_user.id)
         return {"message": "2FA enabled successfully"}
     else:
         raise HTTPException(status_code=400, detail="Invalid code")
@@ -322,6 +363,7 @@ async def disable_2fa(
         current_user.is_2fa_enabled = False
         current_user.totp_secret = None # Optional: clear secret
         db.commit()
+        principal_cache.invalidate_user(current_user.id)
         return {"message": "2FA disabled successfully"}
     else:
         raise HTTPException(status_code=400, detail="Invalid code")
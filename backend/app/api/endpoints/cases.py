@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.pagination import PageParams, paginate
+from app.core.unit_of_work import UnitOfWork, get_uow
+from app.core.permissions import is_admin
 from app.models.user import User
 from app.models.case import Case
 from app.models.timeline import TimelineEvent
 from app.schemas.case import CaseCreate, CaseUpdate, CaseResponse, CaseListResponse
 from app.schemas.timeline import TimelineEventResponse, TimelineEventCreate
-from app.api.endpoints.auth import get_current_user
+from app.api.endpoints.auth import get_current_user_async
 from app.services.notification import create_notification, notify_admins
 from app.models.notification import NotificationType, NotificationPriority
 from app.utils.case_stages import get_default_stages
@@ -18,13 +22,16 @@ router = APIRouter()
 @router.post("/", response_model=CaseResponse, status_code=status.HTTP_201_CREATED)
 async def create_case(
     case_data: CaseCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+    uow: UnitOfWork = Depends(get_uow)
 ):
-    """Yeni dosya/dava oluştur"""
+    """Yeni dosya/dava oluştur (dosya + bildirimler tek commit)"""
     
     # Check if case number already exists
-    existing_case = db.query(Case).filter(Case.case_number == case_data.case_number).first()
+    existing_case = await db.scalar(
+        select(Case).where(Case.case_number == case_data.case_number)
+    )
     if existing_case:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -36,7 +43,7 @@ async def create_case(
     if current_user.user_type in ["admin", "lawyer"]:
         if case_data.client_id:
             # Verify client exists
-            client = db.query(User).filter(User.id == case_data.client_id).first()
+            client = await db.get(User, case_data.client_id)
             if not client:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -50,7 +57,7 @@ async def create_case(
             pass
 
     # Create new case
-    case_dict = case_data.model_dump(exclude={"client_id"})
+    case_dict = case_data.model_dump(exclude={"client_id", "stages"})
     
     # Set default stages based on case type
     stages = get_default_stages(case_data.case_type)
@@ -61,69 +68,75 @@ async def create_case(
         stages=stages
     )
     
-    db.add(db_case)
-    db.commit()
-    db.refresh(db_case)
+    uow.add(db_case)
+    # INSERT ... RETURNING: bildirim linkleri için id gerekli
+    await uow.flush()
 
     # Bildirim oluştur
     if db_case.client_id:
-        await create_notification(
-            db=db,
+        create_notification(
+            uow=uow,
             user_id=db_case.client_id,
             title="Yeni Dava Dosyası Açıldı",
             message=f"{db_case.case_number} numaralı dava dosyanız oluşturuldu.",
-            type=NotificationType.CASE_UPDATE,
+            notification_type=NotificationType.CASE_UPDATE,
             priority=NotificationPriority.HIGH,
             related_entity_type="case",
             related_entity_id=db_case.id
         )
     
     # Adminlere de bildirim gönder (oluşturan kişi admin değilse)
-    if not current_user.is_admin:
+    if not is_admin(current_user):
         await notify_admins(
-            db=db,
+            uow=uow,
             title="Yeni Dava Başvurusu",
             message=f"{current_user.full_name} yeni bir dava dosyası oluşturdu: {db_case.case_number}",
-            type=NotificationType.CASE_UPDATE,
+            notification_type=NotificationType.CASE_UPDATE,
             priority=NotificationPriority.MEDIUM,
             related_entity_type="case",
             related_entity_id=db_case.id
         )
 
+    await uow.commit()
+
     return db_case
 
 @router.get("/", response_model=CaseListResponse)
 async def get_cases(
-    skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Kullanıcının dosyalarını listele"""
+    """Kullanıcının dosyalarını listele (en yeni önce, cursor ile sayfalı)"""
     
-    query = db.query(Case)
+    query = select(Case)
     
     # Admins and lawyers can see all cases
     if current_user.user_type not in ["admin", "lawyer"]:
-        query = query.filter(Case.client_id == current_user.id)
+        query = query.where(Case.client_id == current_user.id)
     
-    total = query.count()
-    cases = query.offset(skip).limit(limit).all()
+    # Toplam sayı sayfa gezinirken tekrar hesaplanmaz
+    total = None
+    if not page.cursor:
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    cases, next_cursor = await paginate(db, query, page, response, keys=(Case.created_at, Case.id))
     
     return {
         "cases": cases,
-        "total": total
+        "total": total,
+        "next_cursor": next_cursor
     }
 
 @router.get("/{case_id}", response_model=CaseResponse)
 async def get_case(
     case_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Dosya detayını getir"""
     
-    case = db.query(Case).filter(Case.id == case_id).first()
+    case = await db.get(Case, case_id)
     
     if not case:
         raise HTTPException(
@@ -144,12 +157,12 @@ async def get_case(
 async def update_case(
     case_id: int,
     case_update: CaseUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Dosya bilgilerini güncelle"""
     
-    case = db.query(Case).filter(Case.id == case_id).first()
+    case = await db.get(Case, case_id)
     
     if not case:
         raise HTTPException(
@@ -169,20 +182,20 @@ async def update_case(
     for field, value in update_data.items():
         setattr(case, field, value)
     
-    db.commit()
-    db.refresh(case)
+    # updated_at UPDATE ... RETURNING ile gelir
+    await db.commit()
     
     return case
 
 @router.delete("/{case_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_case(
     case_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Dosyayı sil"""
     
-    case = db.query(Case).filter(Case.id == case_id).first()
+    case = await db.get(Case, case_id)
     
     if not case:
         raise HTTPException(
@@ -197,45 +210,53 @@ async def delete_case(
             detail="Not authorized to delete cases"
         )
     
-    db.delete(case)
-    db.commit()
+    await db.delete(case)
+    await db.commit()
     
     return None
 
 @router.get("/{case_id}/timeline", response_model=List[TimelineEventResponse])
 async def get_case_timeline(
     case_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Dosya zaman çizelgesini getir"""
-    case = db.query(Case).filter(Case.id == case_id).first()
+    case = await db.get(Case, case_id)
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
         
     if current_user.user_type not in ["admin", "lawyer"] and case.client_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
         
-    return db.query(TimelineEvent).filter(TimelineEvent.case_id == case_id).order_by(TimelineEvent.event_date.desc()).all()
+    events, _ = await paginate(
+        db,
+        select(TimelineEvent).where(TimelineEvent.case_id == case_id),
+        page,
+        response,
+        keys=(TimelineEvent.event_date, TimelineEvent.id)
+    )
+    return events
 
 @router.post("/{case_id}/timeline", response_model=TimelineEventResponse)
 async def create_timeline_event(
     case_id: int,
     event_data: TimelineEventCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Dosyaya yeni olay ekle (Sadece Admin/Avukat)"""
     if current_user.user_type not in ["admin", "lawyer"]:
         raise HTTPException(status_code=403, detail="Not authorized")
         
-    case = db.query(Case).filter(Case.id == case_id).first()
+    case = await db.get(Case, case_id)
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
         
     db_event = TimelineEvent(**event_data.model_dump())
     db.add(db_event)
-    db.commit()
-    db.refresh(db_event)
+    await db.commit()
     
     return db_event
@@ -1,15 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File, Request, Response
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List, Optional
-import io
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.pagination import PageParams, paginate
+from app.core.unit_of_work import UnitOfWork, get_uow
 from app.models.user import User
 from app.models.document import Document, DocumentType
+from app.models.blob import DocumentBlob
 from app.models.case import Case
-from app.api.endpoints.auth import get_current_user
+from app.api.endpoints.auth import get_current_user_async
 from app.services.notification import create_notification, notify_admins
+from app.services.upload import stream_upload_to_temp, UploadTooLarge
+from app.services import blob_store, search_index, storage_usage, thumbnails
+from app.services.storage_usage import StorageQuotaExceeded
+from app.services.storage import get_storage_service, stream_response
+from app.services.signed_urls import get_download_url, signed_url_cache
 from app.models.notification import NotificationType, NotificationPriority
 from app.core.permissions import (
     can_access_document,
@@ -24,6 +35,59 @@ router = APIRouter()
 ALLOWED_EXTENSIONS = {'.pdf', '.doc', '.docx', '.jpg', '.jpeg', '.png', '.xlsx', '.xls', '.txt'}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
 
+# Önizlemeler içerik adreslidir ve değişmez
+THUMBNAIL_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+def document_filters(
+    current_user: User,
+    case_id: Optional[int] = None,
+    document_type: Optional[DocumentType] = None
+) -> list:
+    """Listeleme ve aramada kullanıcının görebildiği evrakların WHERE koşulları"""
+    conditions = []
+    
+    # Admin/Lawyer tüm evrakları görebilir
+    # Client sadece kendine görünür evrakları görebilir
+    if not is_admin_or_lawyer(current_user):
+        conditions.append(
+            (Document.user_id == current_user.id) |
+            (
+                (Document.case_id.in_(
+                    select(Case.id).where(Case.client_id == current_user.id)
+                )) &
+                (Document.is_visible_to_client == True)
+            )
+        )
+    
+    # Filtreler
+    if case_id:
+        conditions.append(Document.case_id == case_id)
+    if document_type:
+        conditions.append(Document.document_type == document_type)
+    return conditions
+
+
+def document_summary(doc: Document) -> dict:
+    return {
+        "id": doc.id,
+        "filename": doc.original_filename,
+        "file_size": doc.file_size,
+        "document_type": doc.document_type.value,
+        "description": doc.description,
+        "case_id": doc.case_id,
+        "uploaded_at": doc.uploaded_at.isoformat() if doc.uploaded_at else None,
+        "is_visible_to_client": doc.is_visible_to_client
+    }
+
+
+def quota_exceeded(error: StorageQuotaExceeded) -> HTTPException:
+    scope = "Client" if error.scope == storage_usage.USER_SCOPE else "Case"
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"{scope} storage quota exceeded ({error.limit / 1024 / 1024:.0f} MB)"
+    )
+
 @router.post("/upload", status_code=status.HTTP_201_CREATED)
 async def upload_document(
     file: UploadFile = File(...),
@@ -31,8 +95,9 @@ async def upload_document(
     document_type: DocumentType = DocumentType.OTHER,
     description: Optional[str] = None,
     is_visible_to_client: bool = True,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+    uow: UnitOfWork = Depends(get_uow),
     request: Request = None
 ):
     """
@@ -56,17 +121,9 @@ async def upload_document(
             detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
         )
     
-    # Dosya boyutu kontrolü
-    file_content = await file.read()
-    if len(file_content) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large. Max size: {MAX_FILE_SIZE / 1024 / 1024} MB"
-        )
-    
-    # Case kontrolü
+    # Case kontrolü (dosya yazılmadan önce)
     if case_id:
-        case = db.query(Case).filter(Case.id == case_id).first()
+        case = await db.get(Case, case_id)
         if not case:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -80,23 +137,61 @@ async def upload_document(
                 detail="You can only upload documents to your own cases"
             )
     
-    # Basit dosya depolama (local storage)
-    # Production'da MinIO/S3 kullanılacak
-    import uuid
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    upload_dir = "./uploads/documents"
-    os.makedirs(upload_dir, exist_ok=True)
+    # Kota kontrolü gövde okunmadan önce; okuma kalan kota ile sınırlanır
+    quota_limits = storage_usage.upload_limits(current_user.id, case_id, not is_admin_or_lawyer(current_user))
+    try:
+        remaining = await storage_usage.remaining_bytes(db, quota_limits)
+    except StorageQuotaExceeded as e:
+        raise quota_exceeded(e)
+    max_size = MAX_FILE_SIZE if remaining is None else min(MAX_FILE_SIZE, remaining)
     
-    file_path = os.path.join(upload_dir, unique_filename)
-    with open(file_path, "wb") as f:
-        f.write(file_content)
+    # Dosya parça parça geçici dosyaya yazılır; boyut limiti aşıldığı anda
+    # okuma kesilir. Depoya (STORAGE_PROVIDER) blob_store yerleştirir.
+    try:
+        stored = await stream_upload_to_temp(
+            file,
+            tmp_dir=blob_store.TMP_DIR,
+            max_size=max_size
+        )
+    except UploadTooLarge:
+        if max_size < MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Storage quota exceeded. Remaining: {max_size / 1024 / 1024:.1f} MB"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File too large. Max size: {MAX_FILE_SIZE / 1024 / 1024} MB"
+        )
+    
+    # Kullanım sayaçları kota koşuluyla artırılır (eşzamanlı yüklemeler
+    # birlikte kotayı aşamaz); reddedilen dosya depoya yazılmaz.
+    # İçerik adresli depolama: aynı içerik depoda tek kopya tutulur
+    try:
+        await storage_usage.charge(
+            db,
+            storage_usage.document_scopes(current_user.id, case_id),
+            stored["size"],
+            quota_limits
+        )
+        file_path = await blob_store.acquire_blob(
+            db, stored["sha256"], stored["size"], stored["tmp_path"]
+        )
+    except StorageQuotaExceeded as e:
+        blob_store.discard_temp(stored["tmp_path"])
+        await uow.rollback()
+        raise quota_exceeded(e)
+    except BaseException:
+        blob_store.discard_temp(stored["tmp_path"])
+        raise
     
     # Database kaydı
     document = Document(
-        filename=unique_filename,
+        filename=f"{stored['sha256']}{file_ext}",
         original_filename=file.filename,
-        file_path=f"documents/{unique_filename}",
-        file_size=len(file_content),
+        file_path=file_path,
+        file_size=stored["size"],
+        sha256=stored["sha256"],
         mime_type=file.content_type or "application/octet-stream",
         document_type=document_type,
         description=description,
@@ -105,23 +200,26 @@ async def upload_document(
         case_id=case_id
     )
     
-    db.add(document)
-    db.commit()
-    db.refresh(document)
+    # Evrak, bildirimler ve audit kaydı tek transaction'da yazılır
+    uow.add(document)
+    await uow.flush()
+    
+    # Önizleme ve arama metni worker'ın süreç havuzunda üretilir (istek süresine eklenmez)
+    await thumbnails.schedule(uow, stored["sha256"], file_ext)
+    await search_index.schedule(uow, stored["sha256"], file_ext)
     
     # Bildirim oluştur
     if case_id:
-        # Eğer bir davaya yüklendiyse
-        case = db.query(Case).filter(Case.id == case_id).first()
+        # Eğer bir davaya yüklendiyse (case yukarıda kontrol edildi; commit sonrası expire edilmez)
         if case:
             # Yükleyen admin/avukat ise müvekkile bildirim gönder
             if is_admin_or_lawyer(current_user) and case.client_id and is_visible_to_client:
-                await create_notification(
-                    db=db,
+                create_notification(
+                    uow=uow,
                     user_id=case.client_id,
                     title="Yeni Evrak Yüklendi",
                     message=f"{case.case_number} numaralı dosyanıza yeni bir evrak yüklendi: {file.filename}",
-                    type=NotificationType.DOCUMENT_UPLOAD,
+                    notification_type=NotificationType.DOCUMENT_UPLOAD,
                     priority=NotificationPriority.MEDIUM,
                     related_entity_type="document",
                     related_entity_id=document.id,
@@ -131,10 +229,10 @@ async def upload_document(
             # Yükleyen müvekkil ise adminlere bildirim gönder
             elif not is_admin_or_lawyer(current_user):
                 await notify_admins(
-                    db=db,
+                    uow=uow,
                     title="Müvekkil Evrak Yükledi",
                     message=f"{current_user.full_name}, {case.case_number} numaralı dosyaya evrak yükledi: {file.filename}",
-                    type=NotificationType.DOCUMENT_UPLOAD,
+                    notification_type=NotificationType.DOCUMENT_UPLOAD,
                     priority=NotificationPriority.MEDIUM,
                     related_entity_type="document",
                     related_entity_id=document.id,
@@ -144,10 +242,10 @@ async def upload_document(
         # Dava dışı evrak yüklendiyse ve yükleyen client ise adminlere bildir
         if not is_admin_or_lawyer(current_user):
             await notify_admins(
-                db=db,
+                uow=uow,
                 title="Müvekkil Evrak Yükledi",
                 message=f"{current_user.full_name} sisteme yeni bir evrak yükledi: {file.filename}",
-                type=NotificationType.DOCUMENT_UPLOAD,
+                notification_type=NotificationType.DOCUMENT_UPLOAD,
                 priority=NotificationPriority.MEDIUM,
                 related_entity_type="document",
                 related_entity_id=document.id
@@ -161,70 +259,80 @@ async def upload_document(
         resource_type="DOCUMENT",
         resource_id=document.id,
         description=f"Uploaded document: {file.filename} (Case: {case_id or 'N/A'})",
-        request=request
+        request=request,
+        uow=uow
     )
+    await uow.commit()
     
     return {
         "id": document.id,
         "filename": document.original_filename,
         "file_size": document.file_size,
+        "sha256": document.sha256,
         "document_type": document.document_type,
         "message": "Document uploaded successfully"
     }
 
 @router.get("/", response_model=List[dict])
 async def get_documents(
+    response: Response,
+    page: PageParams = Depends(),
     case_id: Optional[int] = None,
     document_type: Optional[DocumentType] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Evrakları listele"""
-    query = db.query(Document)
+    query = select(Document).where(*document_filters(current_user, case_id, document_type))
     
-    # Admin/Lawyer tüm evrakları görebilir
-    # Client sadece kendine görünür evrakları görebilir
-    if not is_admin_or_lawyer(current_user):
-        query = query.filter(
-            (Document.user_id == current_user.id) |
-            (
-                (Document.case_id.in_(
-                    db.query(Case.id).filter(Case.client_id == current_user.id)
-                )) &
-                (Document.is_visible_to_client == True)
-            )
-        )
+    documents, _ = await paginate(
+        db, query, page, response, keys=(Document.uploaded_at, Document.id)
+    )
     
-    # Filtreler
-    if case_id:
-        query = query.filter(Document.case_id == case_id)
-    if document_type:
-        query = query.filter(Document.document_type == document_type)
+    return [document_summary(doc) for doc in documents]
+
+@router.get("/search")
+async def search_documents(
+    q: str = Query(..., min_length=2, max_length=200, description="Aranacak kelimeler"),
+    case_id: Optional[int] = None,
+    document_type: Optional[DocumentType] = None,
+    limit: int = Query(20, ge=1, le=settings.SEARCH_MAX_RESULTS),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Evrak içeriğinde tam metin arama
     
-    documents = query.all()
+    Sonuçlar alaka sırasıyladır. highlight: eşleşmelerin <mark> ile
+    işaretlendiği, geri kalanı HTML kaçışlı metin parçası. Metni henüz
+    çıkarılmamış evraklar sonuçlarda yer almaz.
+    """
+    hits = await search_index.search_documents(
+        db, q, document_filters(current_user, case_id, document_type), limit
+    )
     
     return [
         {
-            "id": doc.id,
-            "filename": doc.original_filename,
-            "file_size": doc.file_size,
-            "document_type": doc.document_type.value,
-            "description": doc.description,
-            "case_id": doc.case_id,
-            "uploaded_at": doc.uploaded_at.isoformat() if doc.uploaded_at else None,
-            "is_visible_to_client": doc.is_visible_to_client
+            **document_summary(doc),
+            "rank": round(float(rank), 6),
+            "highlight": search_index.render_highlight(snippet)
         }
-        for doc in documents
+        for doc, rank, snippet in hits
     ]
 
 @router.get("/{document_id}")
 async def get_document_detail(
     document_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Evrak detayı"""
-    document = db.query(Document).filter(Document.id == document_id).first()
+    # can_access_document document.case'e baktığı için birlikte yüklenir
+    document = await db.scalar(
+        select(Document)
+        .options(selectinload(Document.case))
+        .where(Document.id == document_id)
+    )
     
     if not document:
         raise HTTPException(
@@ -254,12 +362,17 @@ async def get_document_detail(
 @router.get("/download/{document_id}")
 async def download_document(
     document_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """Evrak indir"""
-    document = db.query(Document).filter(Document.id == document_id).first()
+    # can_access_document document.case'e baktığı için birlikte yüklenir
+    document = await db.scalar(
+        select(Document)
+        .options(selectinload(Document.case))
+        .where(Document.id == document_id)
+    )
     
     if not document:
         raise HTTPException(
@@ -274,43 +387,158 @@ async def download_document(
             detail="You don't have permission to download this document"
         )
     
-    # Dosyayı oku
+    storage = get_storage_service()
+    file_path = storage.local_path(document.file_path)
+    
+    # Uzak depoda varlık, nesne açılırken kontrol edilir (ek HEAD isteği yok)
     import os
-    file_path = os.path.join("./uploads", document.file_path)
+    if file_path is not None and not os.path.exists(file_path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found on server"
+        )
     
-    if not os.path.exists(file_path):
+    # PDF görüntüleyiciler aynı evrak için çok sayıda Range isteği atar;
+    # audit kaydı yalnızca tam indirmede / ilk parçada tutulur
+    range_header = request.headers.get("range") if request else None
+    if not range_header or range_header.replace(" ", "").startswith("bytes=0-"):
+        await log_audit(
+            db=db,
+            user=current_user,
+            action="DOWNLOAD",
+            resource_type="DOCUMENT",
+            resource_id=document.id,
+            description=f"Downloaded document: {document.original_filename}",
+            request=request
+        )
+    
+    # İmzalı URL: gövde doğrudan nesne deposundan iner, API yalnızca
+    # yönlendirir (Range istekleri de yönlendirmeyi izleyip depoya gider)
+    if settings.STORAGE_PRESIGNED_DOWNLOADS and file_path is None:
+        try:
+            url = await get_download_url(storage, document, current_user.id)
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="File not found on server"
+            )
+        if url is not None:
+            # URL taşıyıcı yetki içerir: tarayıcı / proxy önbelleğine yazılmasın
+            return RedirectResponse(url, status_code=status.HTTP_302_FOUND, headers={"Cache-Control": "no-store"})
+    
+    # FileResponse dosyayı parça parça gönderir (sunucu destekliyorsa sendfile),
+    # Range/If-Range için 206 döner; Content-Length ve Last-Modified ekler
+    headers = {}
+    if document.sha256:
+        headers["ETag"] = f'"{document.sha256}"'
+    
+    if file_path is not None:
+        return FileResponse(
+            file_path,
+            media_type=document.mime_type,
+            filename=document.original_filename,
+            headers=headers
+        )
+    
+    # Nesne deposu: gövde depodan okundukça aktarılır (Range -> ranged GET)
+    try:
+        return await run_in_threadpool(
+            stream_response,
+            storage,
+            document.file_path,
+            size=document.file_size,
+            media_type=document.mime_type,
+            filename=document.original_filename,
+            range_header=range_header,
+            if_range=request.headers.get("if-range") if request else None,
+            etag=headers.get("ETag")
+        )
+    except FileNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="File not found on server"
         )
+
+@router.get("/{document_id}/thumbnail")
+async def get_document_thumbnail(
+    document_id: int,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+    uow: UnitOfWork = Depends(get_uow),
+    request: Request = None
+):
+    """
+    Evrak önizleme görseli (tarayıcı destekliyorsa WebP, değilse PNG)
     
-    # Audit log
-    await log_audit(
-        db=db,
-        user=current_user,
-        action="DOWNLOAD",
-        resource_type="DOCUMENT",
-        resource_id=document.id,
-        description=f"Downloaded document: {document.original_filename}",
-        request=request
+    PDF'lerde ilk sayfa, görsellerde küçültülmüş hali. Henüz üretilmediyse
+    veya dosya türü desteklenmiyorsa 404. Liste sayfası her evrak için
+    istediğinden audit kaydı tutulmaz.
+    """
+    import os
+    
+    document = await db.scalar(
+        select(Document)
+        .options(selectinload(Document.case))
+        .where(Document.id == document_id)
     )
     
-    with open(file_path, "rb") as f:
-        file_content = f.read()
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
     
-    return StreamingResponse(
-        io.BytesIO(file_content),
-        media_type=document.mime_type,
-        headers={
-            "Content-Disposition": f'attachment; filename="{document.original_filename}"'
-        }
+    if not can_access_document(current_user, document):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to view this document"
+        )
+    
+    not_available = HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Thumbnail not available",
+        headers={"Cache-Control": "no-store"}
     )
+    if not document.sha256 or not blob_store.is_blob_path(document.file_path):
+        raise not_available
+    
+    preview_status = await db.scalar(
+        select(DocumentBlob.preview_status).where(DocumentBlob.sha256 == document.sha256)
+    )
+    if preview_status != thumbnails.READY:
+        if preview_status is None:
+            # Önizlemeler eklenmeden önce yüklenmiş evrak: ilk istekte kuyruğa alınır
+            file_ext = os.path.splitext(document.original_filename)[1]
+            if await thumbnails.schedule(uow, document.sha256, file_ext):
+                await uow.commit()
+        raise not_available
+    
+    fmt = thumbnails.negotiate_format(request.headers.get("accept") if request else None)
+    etag = f'"{document.sha256}.{fmt}"'
+    headers = {"Cache-Control": THUMBNAIL_CACHE_CONTROL, "ETag": etag, "Vary": "Accept"}
+    if request and request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    storage = get_storage_service()
+    key = blob_store.thumbnail_path(document.sha256, fmt)
+    file_path = storage.local_path(key)
+    if file_path is not None:
+        if not os.path.exists(file_path):
+            raise not_available
+        return FileResponse(file_path, media_type=thumbnails.media_type(fmt), headers=headers)
+    
+    try:
+        body = await run_in_threadpool(storage.open_range, key)
+    except FileNotFoundError:
+        raise not_available
+    return StreamingResponse(body, media_type=thumbnails.media_type(fmt), headers=headers)
 
 @router.delete("/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_document(
     document_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+    uow: UnitOfWork = Depends(get_uow),
     request: Request = None
 ):
     """Evrak sil (Sadece Admin/Lawyer)"""
@@ -320,7 +548,7 @@ async def delete_document(
             detail="Only admins and lawyers can delete documents"
         )
     
-    document = db.query(Document).filter(Document.id == document_id).first()
+    document = await db.get(Document, document_id)
     
     if not document:
         raise HTTPException(
@@ -328,19 +556,23 @@ async def delete_document(
             detail="Document not found"
         )
     
-    # Dosyayı diskten sil
-    import os
-    file_path = os.path.join("./uploads", document.file_path)
-    if os.path.exists(file_path):
-        os.remove(file_path)
-    
     filename = document.original_filename
     
-    # Database'den sil
-    db.delete(document)
-    db.commit()
+    # Paylaşılan blob yalnızca son referans silindiğinde depodan kaldırılır
+    tombstone = None
+    if blob_store.is_blob_path(document.file_path):
+        tombstone = await blob_store.release_blob(db, document.sha256)
+    else:
+        # Blob katmanından önce yüklenmiş evrak
+        await run_in_threadpool(get_storage_service().delete, document.file_path)
+    await storage_usage.release(
+        db,
+        storage_usage.document_scopes(document.user_id, document.case_id),
+        document.file_size or 0
+    )
     
-    # Audit log
+    # Database'den sil (audit kaydıyla aynı transaction'da)
+    await uow.delete(document)
     await log_audit(
         db=db,
         user=current_user,
@@ -348,7 +580,16 @@ async def delete_document(
         resource_type="DOCUMENT",
         resource_id=document_id,
         description=f"Deleted document: {filename}",
-        request=request
+        request=request,
+        uow=uow
     )
+    try:
+        await uow.commit()
+    except Exception:
+        await uow.rollback()
+        await blob_store.restore_release(tombstone)
+        raise
+    await blob_store.finalize_release(tombstone)
+    signed_url_cache.invalidate_document(document_id)
     
     return None
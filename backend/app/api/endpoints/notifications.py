@@ -1,33 +1,223 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, WebSocket, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from starlette.websockets import WebSocketDisconnect
+from typing import List, Optional, Tuple
 from datetime import datetime
+import asyncio
+import json
+import time
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.security import decode_access_token
+from app.core.database import SessionLocal, get_async_db
+from app.core.pagination import PageParams, paginate
+from app.core.query_stats import untracked
+from app.core.unit_of_work import UnitOfWork, get_uow
 from app.models.user import User
 from app.models.notification import Notification
-from app.api.endpoints.auth import get_current_user
+from app.api.endpoints.auth import get_current_user, get_current_user_async, oauth2_scheme
+from app.services.notification_counters import remove_unread, unread_count_query
+from app.services.notification_hub import Subscription, notification_hub, unread_event
+from app.services.stream_tickets import consume_ticket, issue_ticket
 
 router = APIRouter()
 
+def _stream_unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _authenticate_stream(ticket: Optional[str], token: Optional[str]) -> Tuple[int, int, int]:
+    """
+    Uzun süreli bağlantılar için kimlik doğrulama (thread havuzunda)
+
+    Tarayıcı istemcileri tek kullanımlık bilet (ticket), header
+    gönderebilen istemciler Authorization: Bearer kullanır. Bağlantı
+    boyunca bir veritabanı session'ı açık tutulmaz; kullanıcı ve başlangıç
+    okunmamış sayısı kısa ömürlü bir session ile okunur.
+
+    Returns:
+        (kullanıcı id, erişim token'ının bitişi (unix zamanı), okunmamış bildirim sayısı)
+    """
+    db = SessionLocal()
+    try:
+        if ticket:
+            consumed = consume_ticket(db, ticket)
+            if consumed is None:
+                raise _stream_unauthorized("Invalid or expired stream ticket")
+            user_id, expires_at = consumed
+            if not db.scalar(select(User.is_active).where(User.id == user_id)):
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+        elif token:
+            user = get_current_user(token, db)
+            user_id, expires_at = user.id, decode_access_token(token)["exp"]
+        else:
+            raise _stream_unauthorized("Not authenticated")
+        return user_id, expires_at, db.scalar(unread_count_query(user_id)) or 0
+    finally:
+        db.close()
+
+def _user_is_active(user_id: int) -> bool:
+    # Heartbeat sorguları akış isteğinin SQL sayacına girmez
+    with untracked():
+        db = SessionLocal()
+        try:
+            return bool(db.scalar(select(User.is_active).where(User.id == user_id)))
+        finally:
+            db.close()
+
+async def _still_authorized(user_id: int, expires_at: int) -> bool:
+    """Heartbeat kontrolü: erişim token'ı dolmadı ve kullanıcı hâlâ aktif"""
+    if time.time() >= expires_at:
+        return False
+    return await run_in_threadpool(_user_is_active, user_id)
+
+def _bearer_token(request: Request) -> Optional[str]:
+    authorization = request.headers.get("Authorization", "")
+    if authorization.lower().startswith("bearer "):
+        return authorization[7:]
+    return None
+
+def _sse(event: dict) -> str:
+    data = json.dumps(event, ensure_ascii=False, separators=(",", ":"))
+    return f"event: {event['type']}\ndata: {data}\n\n"
+
+@router.post("/stream-ticket")
+async def create_stream_ticket(
+    token: str = Depends(oauth2_scheme),
+    current_user: User = Depends(get_current_user_async),
+    uow: UnitOfWork = Depends(get_uow)
+):
+    """
+    Akış bağlantısı için tek kullanımlık bilet
+
+    EventSource ve tarayıcı WebSocket'i header gönderemez; JWT yerine bu
+    kısa ömürlü bilet URL'de taşınır (?ticket=). Her bağlantı (yeniden
+    bağlanma dahil) yeni bilet ister.
+    """
+    ticket = await issue_ticket(uow, current_user.id, decode_access_token(token)["exp"])
+    await uow.commit()
+    return {"ticket": ticket, "expires_in": settings.NOTIFICATION_STREAM_TICKET_TTL_SECONDS}
+
+@router.get("/stream")
+async def stream_notifications(request: Request, ticket: Optional[str] = None):
+    """
+    Bildirim akışı (Server-Sent Events)
+
+    İlk olay "ready" (mevcut okunmamış sayısı); sonrasında "notification",
+    "unread" ve "resync" olayları gelir. Bağlantı açıkken polling gerekmez.
+    Erişim token'ı dolduğunda veya kullanıcı pasife alındığında akış
+    kapatılır.
+    """
+    user_id, expires_at, unread = await run_in_threadpool(
+        _authenticate_stream, ticket, _bearer_token(request)
+    )
+    subscription = notification_hub.subscribe(user_id)
+    heartbeat = settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS
+
+    async def events():
+        try:
+            yield "retry: 5000\n\n"
+            yield _sse({"type": "ready", "unread_count": unread})
+            next_check = time.monotonic() + heartbeat
+            while True:
+                event = await subscription.get(timeout=heartbeat)
+                if event is not None:
+                    yield _sse(event)
+                    if time.monotonic() < next_check:
+                        continue
+                if not await _still_authorized(user_id, expires_at):
+                    return
+                next_check = time.monotonic() + heartbeat
+                if event is None:
+                    # Yorum satırı: proxy'lerin boşta bağlantıyı kapatmasını önler
+                    yield ": ping\n\n"
+        finally:
+            notification_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _forward_events(websocket: WebSocket, subscription: Subscription, expires_at: int) -> None:
+    heartbeat = settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS
+    next_check = time.monotonic() + heartbeat
+    while True:
+        event = await subscription.get(timeout=heartbeat)
+        if event is not None:
+            await websocket.send_json(event)
+            if time.monotonic() < next_check:
+                continue
+        if not await _still_authorized(subscription.user_id, expires_at):
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        next_check = time.monotonic() + heartbeat
+        if event is None:
+            await websocket.send_json({"type": "ping"})
+
+async def _wait_disconnect(websocket: WebSocket) -> None:
+    # İstemci mesajları yok sayılır; yalnızca kapanış beklenir
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+@router.websocket("/ws")
+async def notifications_websocket(websocket: WebSocket, ticket: Optional[str] = None):
+    """Bildirim akışı (WebSocket) - SSE ile aynı olaylar, JSON mesajları olarak"""
+    try:
+        user_id, expires_at, unread = await run_in_threadpool(
+            _authenticate_stream, ticket, _bearer_token(websocket)
+        )
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscription = notification_hub.subscribe(user_id)
+    tasks = [
+        asyncio.create_task(_forward_events(websocket, subscription, expires_at)),
+        asyncio.create_task(_wait_disconnect(websocket)),
+    ]
+    try:
+        await websocket.send_json({"type": "ready", "unread_count": unread})
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if not task.cancelled() and task.exception() is not None and \
+                    not isinstance(task.exception(), WebSocketDisconnect):
+                raise task.exception()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        notification_hub.unsubscribe(subscription)
+
 @router.get("/", response_model=List[dict])
 async def get_notifications(
-    skip: int = 0,
-    limit: int = 50,
+    response: Response,
+    page: PageParams = Depends(),
     unread_only: bool = False,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Kullanıcının bildirimlerini listele"""
-    query = db.query(Notification).filter(Notification.user_id == current_user.id)
+    query = select(Notification).where(Notification.user_id == current_user.id)
     
     if unread_only:
-        query = query.filter(Notification.is_read == False)
+        query = query.where(Notification.is_read == False)
         
     # En yeniden eskiye sırala
-    query = query.order_by(Notification.created_at.desc())
-    
-    notifications = query.offset(skip).limit(limit).all()
+    notifications, _ = await paginate(
+        db, query, page, response, keys=(Notification.created_at, Notification.id)
+    )
     
     return [
         {
@@ -46,58 +236,81 @@ async def get_notifications(
 
 @router.get("/unread-count")
 async def get_unread_count(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Okunmamış bildirim sayısını getir"""
-    count = db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.is_read == False
-    ).count()
+    """Okunmamış bildirim sayısını getir (sayaç tablosundan tek satır)"""
+    count = await db.scalar(unread_count_query(current_user.id))
     
-    return {"count": count}
+    return {"count": count or 0}
 
 @router.put("/{notification_id}/read")
 async def mark_as_read(
     notification_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+    uow: UnitOfWork = Depends(get_uow)
 ):
     """Bildirimi okundu olarak işaretle"""
-    notification = db.query(Notification).filter(
-        Notification.id == notification_id,
-        Notification.user_id == current_user.id
-    ).first()
+    # Tek UPDATE ... RETURNING: ayrı SELECT gerekmez. Yalnızca okunmamış
+    # satır güncellenir, böylece sayaç değişimi (delta) kesin bilinir.
+    updated_id = await db.scalar(
+        update(Notification)
+        .where(
+            Notification.id == notification_id,
+            Notification.user_id == current_user.id,
+            Notification.is_read == False
+        )
+        .values(is_read=True, read_at=datetime.now())
+        .returning(Notification.id)
+        .execution_options(synchronize_session=False)
+    )
     
-    if not notification:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Notification not found"
+    if updated_id is None:
+        # Zaten okunmuş mu, yoksa hiç yok mu?
+        exists = await db.scalar(
+            select(Notification.id).where(
+                Notification.id == notification_id,
+                Notification.user_id == current_user.id
+            )
         )
+        if exists is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Notification not found"
+            )
+        return {"message": "Marked as read"}
     
-    notification.is_read = True
-    notification.read_at = datetime.now()
-    db.commit()
+    unread = await remove_unread(uow, current_user.id, 1)
+    uow.events.append(unread_event(current_user.id, delta=-1, count=unread))
+    await uow.commit()
     
     return {"message": "Marked as read"}
 
 @router.put("/read-all")
 async def mark_all_as_read(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+    uow: UnitOfWork = Depends(get_uow)
 ):
     """Tüm bildirimleri okundu olarak işaretle"""
-    db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.is_read == False
-    ).update(
-        {
-            "is_read": True,
-            "read_at": datetime.now()
-        },
-        synchronize_session=False
+    result = await db.execute(
+        update(Notification)
+        .where(
+            Notification.user_id == current_user.id,
+            Notification.is_read == False
+        )
+        .values(
+            is_read=True,
+            read_at=datetime.now()
+        )
+        .execution_options(synchronize_session=False)
     )
     
-    db.commit()
+    # Sayaç 0'a yazılmaz, güncellenen satır sayısı kadar azaltılır: bu
+    # sırada eklenen (henüz görünmeyen) bildirimlerin artışı korunur
+    unread = await remove_unread(uow, current_user.id, result.rowcount)
+    uow.events.append(unread_event(current_user.id, delta=-result.rowcount, count=unread))
+    await uow.commit()
     
     return {"message": "All marked as read"}
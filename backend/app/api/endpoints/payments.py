@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
 
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.pagination import PageParams, paginate
+from app.core.unit_of_work import UnitOfWork, get_uow
 from app.models.user import User
-from app.models.payment import Payment, PaymentStatus, PaymentMethod
+from app.models.payment import Payment, PaymentStatus, PaymentMethod, PaymentReconciliation
 from app.models.case import Case
-from app.api.endpoints.auth import get_current_user
+from app.api.endpoints.auth import get_current_user_async
 from app.services.notification import create_notification
 from app.models.notification import NotificationType, NotificationPriority
 from app.core.permissions import (
@@ -39,8 +42,9 @@ class PaymentUpdate(BaseModel):
 @router.post("/create", status_code=status.HTTP_201_CREATED)
 async def create_payment_request(
     payment_data: PaymentCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+    uow: UnitOfWork = Depends(get_uow),
     request: Request = None
 ):
     """
@@ -58,7 +62,7 @@ async def create_payment_request(
         )
     
     # Client kontrolü
-    client = db.query(User).filter(User.id == payment_data.client_id).first()
+    client = await db.get(User, payment_data.client_id)
     if not client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -67,7 +71,7 @@ async def create_payment_request(
     
     # Case kontrolü (opsiyonel)
     if payment_data.case_id:
-        case = db.query(Case).filter(Case.id == payment_data.case_id).first()
+        case = await db.get(Case, payment_data.case_id)
         if not case:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -97,17 +101,17 @@ async def create_payment_request(
         case_id=payment_data.case_id
     )
     
-    db.add(payment)
-    db.commit()
-    db.refresh(payment)
+    # Ödeme, bildirim ve audit kaydı tek transaction'da yazılır
+    uow.add(payment)
+    await uow.flush()
     
     # Bildirim oluştur
-    await create_notification(
-        db=db,
+    create_notification(
+        uow=uow,
         user_id=payment.user_id,
         title="Yeni Ödeme Talebi",
         message=f"Sizin için {payment.amount} {payment.currency} tutarında yeni bir ödeme talebi oluşturuldu: {payment.description}",
-        type=NotificationType.PAYMENT_UPDATE,
+        notification_type=NotificationType.PAYMENT_UPDATE,
         priority=NotificationPriority.HIGH,
         related_entity_type="payment",
         related_entity_id=payment.id,
@@ -123,8 +127,10 @@ async def create_payment_request(
         resource_id=payment.id,
         description=f"Created payment request: {payment.payment_id} for client {client.full_name} - {payment.description}",
         changes=payment_data.model_dump(),
-        request=request
+        request=request,
+        uow=uow
     )
+    await uow.commit()
     
     return {
         "id": payment.id,
@@ -142,8 +148,9 @@ async def create_payment_request(
 async def update_payment(
     payment_id: int,
     payment_update: PaymentUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+    uow: UnitOfWork = Depends(get_uow),
     request: Request = None
 ):
     """Ödeme bilgilerini güncelle (Admin/Lawyer)"""
@@ -153,7 +160,7 @@ async def update_payment(
             detail="Only admins and lawyers can update payments"
         )
     
-    payment = db.query(Payment).filter(Payment.id == payment_id).first()
+    payment = await db.get(Payment, payment_id)
     
     if not payment:
         raise HTTPException(
@@ -177,10 +184,7 @@ async def update_payment(
     if payment_update.status == PaymentStatus.COMPLETED and not payment.completed_at:
         payment.completed_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(payment)
-    
-    # Audit log
+    # Audit log (güncellemeyle aynı transaction'da)
     await log_audit(
         db=db,
         user=current_user,
@@ -189,8 +193,10 @@ async def update_payment(
         resource_id=payment_id,
         description=f"Updated payment: {payment.payment_id}",
         changes={"old": old_values, "new": update_data},
-        request=request
+        request=request,
+        uow=uow
     )
+    await uow.commit()
     
     return {
         "id": payment.id,
@@ -203,8 +209,9 @@ async def update_payment(
 @router.delete("/{payment_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_payment(
     payment_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+    uow: UnitOfWork = Depends(get_uow),
     request: Request = None
 ):
     """Ödeme talebi sil (Sadece Admin)"""
@@ -214,7 +221,7 @@ async def delete_payment(
             detail="Only admins can delete payments"
         )
     
-    payment = db.query(Payment).filter(Payment.id == payment_id).first()
+    payment = await db.get(Payment, payment_id)
     
     if not payment:
         raise HTTPException(
@@ -224,10 +231,9 @@ async def delete_payment(
     
     payment_ref = payment.payment_id
     
-    db.delete(payment)
-    db.commit()
+    await uow.delete(payment)
     
-    # Audit log
+    # Audit log (silmeyle aynı transaction'da)
     await log_audit(
         db=db,
         user=current_user,
@@ -235,17 +241,21 @@ async def delete_payment(
         resource_type="PAYMENT",
         resource_id=payment_id,
         description=f"Deleted payment: {payment_ref}",
-        request=request
+        request=request,
+        uow=uow
     )
+    await uow.commit()
     
     return None
 
 @router.get("/all", response_model=List[dict])
 async def get_all_payments(
+    response: Response,
+    page: PageParams = Depends(),
     client_id: Optional[int] = None,
-    status: Optional[PaymentStatus] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    payment_status: Optional[PaymentStatus] = Query(None, alias="status"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Tüm ödemeleri listele (Admin/Lawyer)"""
     if not is_admin_or_lawyer(current_user):
@@ -254,14 +264,14 @@ async def get_all_payments(
             detail="Only admins and lawyers can view all payments"
         )
     
-    query = db.query(Payment)
+    query = select(Payment)
     
     if client_id:
-        query = query.filter(Payment.user_id == client_id)
-    if status:
-        query = query.filter(Payment.status == status)
+        query = query.where(Payment.user_id == client_id)
+    if payment_status:
+        query = query.where(Payment.status == payment_status)
     
-    payments = query.order_by(Payment.created_at.desc()).all()
+    payments, _ = await paginate(db, query, page, response, keys=(Payment.created_at, Payment.id))
     
     return [
         {
@@ -280,21 +290,61 @@ async def get_all_payments(
         for p in payments
     ]
 
+@router.get("/reconciliations", response_model=List[dict])
+async def get_reconciliations(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Son ödeme mutabakatı çalışmaları ve raporları (Admin/Lawyer)"""
+    if not is_admin_or_lawyer(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins and lawyers can view payment reconciliations"
+        )
+    
+    runs = (await db.scalars(
+        select(PaymentReconciliation)
+        .order_by(PaymentReconciliation.id.desc())
+        .limit(limit)
+    )).all()
+    
+    return [
+        {
+            "id": r.id,
+            "started_at": r.started_at.isoformat() if r.started_at else None,
+            "finished_at": r.finished_at.isoformat() if r.finished_at else None,
+            "start_cursor": r.start_cursor,
+            "next_cursor": r.next_cursor,
+            "aborted": r.aborted,
+            "checked": r.checked,
+            "completed": r.completed,
+            "failed": r.failed,
+            "refunded": r.refunded,
+            "unchanged": r.unchanged,
+            "errors": r.errors,
+            "report": r.report
+        }
+        for r in runs
+    ]
+
 # ============ CLIENT ENDPOINTS ============
 
 @router.get("/my-payments", response_model=List[dict])
 async def get_my_payments(
-    status: Optional[PaymentStatus] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    page: PageParams = Depends(),
+    payment_status: Optional[PaymentStatus] = Query(None, alias="status"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Müvekkilin kendi ödemelerini görüntüle"""
-    query = db.query(Payment).filter(Payment.user_id == current_user.id)
+    query = select(Payment).where(Payment.user_id == current_user.id)
     
-    if status:
-        query = query.filter(Payment.status == status)
+    if payment_status:
+        query = query.where(Payment.status == payment_status)
     
-    payments = query.order_by(Payment.created_at.desc()).all()
+    payments, _ = await paginate(db, query, page, response, keys=(Payment.created_at, Payment.id))
     
     return [
         {
@@ -314,11 +364,11 @@ async def get_my_payments(
 @router.get("/{payment_id}/details")
 async def get_payment_details(
     payment_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Ödeme detayı"""
-    payment = db.query(Payment).filter(Payment.id == payment_id).first()
+    payment = await db.get(Payment, payment_id)
     
     if not payment:
         raise HTTPException(
@@ -0,0 +1,71 @@
+"""
+Body Size Limit - Yükleme endpoint'lerinde gövde boyutu sınırı
+
+Starlette multipart gövdeyi endpoint çalışmadan önce (File(...)
+parametresi çözülürken) okuyup geçici dosyaya yazar; endpoint içindeki
+boyut kontrolü çok büyük bir gövdenin tamamı alındıktan sonra devreye
+girer. Bu ASGI middleware'i sınırı gövde okunmadan uygular:
+
+- Content-Length sınırı aşıyorsa istek gövde okunmadan 413 ile reddedilir
+- Content-Length yoksa (chunked) okunan baytlar sayılır, sınır aşıldığı
+  anda okuma 413 ile kesilir
+
+Sınır dosya limiti + MULTIPART_OVERHEAD'dir (boundary'ler, parça
+header'ları); dosyanın kendi limiti endpoint'te ayrıca kontrol edilir.
+"""
+from typing import Dict
+
+from fastapi import HTTPException, status
+from starlette.responses import JSONResponse
+
+# Multipart zarfı için pay (boundary satırları, Content-Disposition vb.)
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+def _detail(limit: int) -> str:
+    return f"Request body too large. Max size: {limit / 1024 / 1024:.1f} MB"
+
+
+class BodySizeLimitMiddleware:
+    """Yol bazlı istek gövdesi sınırı (pure ASGI, gövde akışını tamponlamaz)"""
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = None
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                content_length = int(value) if value.isdigit() else None
+                break
+        if content_length is not None and content_length > limit:
+            response = JSONResponse(
+                {"detail": _detail(limit)},
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                headers={"Connection": "close"}
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Form ayrıştırıcısı HTTPException'ı 400'e çevirmeden iletir
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=_detail(limit)
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,97 @@
+"""
+Circuit Breaker - Harici servis kesintilerinde hızlı başarısızlık
+
+    breaker = CircuitBreaker("iyzico", failure_threshold=5, reset_seconds=30)
+
+    breaker.before_call()      # açıksa CircuitOpenError
+    try:
+        result = await call()
+    except ProviderDown:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+
+Durumlar:
+- closed: çağrılar geçer; art arda failure_threshold hata devreyi açar
+- open: çağrılar sağlayıcıya gitmeden reddedilir (istek worker'ı
+  timeout süresince beklemez); reset_seconds sonra half_open
+- half_open: tek bir deneme çağrısına izin verilir; başarılıysa closed,
+  başarısızsa tekrar open
+
+Süreç içidir (worker başına ayrı durum); tek event loop üzerinde kullanılır.
+"""
+import time
+
+
+class CircuitOpenError(Exception):
+    """Devre açık: çağrı sağlayıcıya gönderilmedi"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit is open; retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_seconds = reset_seconds
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def before_call(self) -> None:
+        """Çağrıya izin yoksa CircuitOpenError fırlat"""
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+        self.rejected += 1
+        retry_after = max(self.reset_seconds - (time.monotonic() - self._opened_at), 1.0)
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self) -> None:
+        self._state = self.CLOSED
+        self._failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._trial_in_flight = False
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._open()
+
+    def release(self) -> None:
+        """Sonucu bilinmeyen çağrı (iptal): half_open deneme hakkını geri ver"""
+        self._trial_in_flight = False
+
+    def _open(self) -> None:
+        if self._state != self.OPEN:
+            self.opened += 1
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
@@ -1,7 +1,17 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 import os
 
+def parse_job_queues(value: str) -> Dict[str, int]:
+    """"default=4,maintenance=1" -> {"default": 4, "maintenance": 1}"""
+    queues = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, _, concurrency = item.partition("=")
+        queues[name.strip()] = int(concurrency or 1)
+    return queues
+
 class Settings(BaseSettings):
     # App
     APP_NAME: str = "Koptay Müvekkil Paneli"
@@ -18,6 +28,28 @@ class Settings(BaseSettings):
             return url.replace("postgres://", "postgresql://", 1)
         return url
     
+    # Connection pool
+    # DB_POOL_PROFILE: "default" (QueuePool) veya "pgbouncer" (transaction mode, NullPool)
+    DB_POOL_PROFILE: str = "default"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800  # saniye, -1 ile kapatılır
+    DB_POOL_PRE_PING: bool = True
+    
+    # asyncpg tabanlı AsyncEngine (cases, documents, notifications, payments router'ları)
+    DATABASE_ASYNC: bool = False
+    
+    @property
+    def async_database_url(self) -> str:
+        """database_url'in async sürücülü karşılığı (postgresql+asyncpg://)"""
+        url = self.database_url
+        if url.startswith("postgresql://"):
+            return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+        if url.startswith("sqlite://"):
+            return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+        return url
+    
     # Supabase (for free deployment)
     SUPABASE_URL: str = ""
     SUPABASE_ANON_KEY: str = ""
@@ -31,16 +63,113 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Principal cache (get_current_user) - 0 ile devre dışı bırakılır
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 1024
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0
+    
+    # notify_admins alıcı listesi önbelleği
+    ADMIN_RECIPIENT_CACHE_TTL_SECONDS: float = 300.0
+    
+    # Anlık bildirim (SSE / WebSocket)
+    # NOTIFICATION_PUSH_BACKEND: "auto" (Postgres ise LISTEN/NOTIFY), "postgres" veya "local"
+    NOTIFICATION_PUSH_BACKEND: str = "auto"
+    # LISTEN bağlantısı için doğrudan URL (pgbouncer transaction mode LISTEN desteklemez)
+    NOTIFICATION_PUSH_LISTEN_URL: str = ""
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS: float = 25.0
+    NOTIFICATION_STREAM_QUEUE_SIZE: int = 100
+    # Akış bileti (?ticket=) geçerlilik süresi; bilet tek kullanımlıktır
+    NOTIFICATION_STREAM_TICKET_TTL_SECONDS: int = 30
+    # LISTEN bağlantısının canlılık kontrolü (SELECT 1) aralığı ve zaman aşımı
+    NOTIFICATION_PUSH_KEEPALIVE_SECONDS: float = 30.0
+    NOTIFICATION_PUSH_KEEPALIVE_TIMEOUT_SECONDS: float = 10.0
+    # Okunmamış sayaçlarının gerçek değerlerle karşılaştırılma aralığı
+    # (app.worker periyodik görevi, 0: kapalı)
+    NOTIFICATION_COUNTER_RECONCILE_SECONDS: float = 3600.0
+    
+    # Audit log sink (tamponlu toplu yazım)
+    AUDIT_QUEUE_MAX_SIZE: int = 10000
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_FLUSH_BATCH_SIZE: int = 500
+    AUDIT_SPILL_PATH: str = "./audit_spill.jsonl"
+    # Geri yüklenemeyen (hatalı) satırlar; elle incelenir
+    AUDIT_DEAD_LETTER_PATH: str = "./audit_dead_letter.jsonl"
+    
+    # Liste endpoint'leri (keyset pagination)
+    PAGINATION_DEFAULT_LIMIT: int = 50
+    PAGINATION_MAX_LIMIT: int = 200
+    
+    # İstek başına SQL sayacı (Server-Timing + log)
+    QUERY_STATS_ENABLED: bool = True
+    # Geliştirme: bütçe aşılınca / aynı ifade tekrarlanınca hata fırlat
+    QUERY_BUDGET_ENFORCE: bool = False
+    QUERY_BUDGET_MAX_STATEMENTS: int = 30
+    QUERY_BUDGET_MAX_REPEATS: int = 5
+    
+    # Arka plan iş kuyruğu (python -m app.worker)
+    # JOB_QUEUES: "kuyruk=eşzamanlılık" çiftleri, virgülle ayrılmış
+    JOB_QUEUES: str = "default=4,notifications=2,maintenance=1,previews=2,search=1"
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_LEASE_SECONDS: int = 600
+    JOB_TIMEOUT_SECONDS: float = 300.0
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: float = 10.0
+    JOB_RETRY_MAX_SECONDS: float = 3600.0
+    
+    @property
+    def job_queue_concurrency(self) -> Dict[str, int]:
+        """JOB_QUEUES değerini {kuyruk: eşzamanlılık} sözlüğüne çevir"""
+        return parse_job_queues(self.JOB_QUEUES)
+    
+    # Password hashing (bcrypt) executor
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 2
+    
     # MinIO/S3 (for paid deployment)
     MINIO_ENDPOINT: str = ""
     MINIO_ACCESS_KEY: str = ""
     MINIO_SECRET_KEY: str = ""
     MINIO_BUCKET_NAME: str = "muvekkil-documents"
     MINIO_SECURE: bool = False
+    MINIO_REGION: str = ""  # boş: bucket konumu sunucudan sorgulanır
+    MINIO_PUBLIC_ENDPOINT: str = ""  # imzalı URL'lerdeki adres (boş: MINIO_ENDPOINT)
     
     # Storage Provider Selection
-    STORAGE_PROVIDER: str = "supabase"  # "supabase" or "minio"
+    STORAGE_PROVIDER: str = "local"  # "local", "minio" or "supabase"
     SUPABASE_BUCKET_NAME: str = "documents"
+    UPLOAD_DIR: str = "./uploads"  # local depolama kökü ve yükleme geçici dizini
+    # Multipart upload parça boyutu (S3 alt sınırı 5 MB) ve paralel parça sayısı
+    STORAGE_PART_SIZE_MB: int = 5
+    STORAGE_UPLOAD_CONCURRENCY: int = 4
+    STORAGE_TIMEOUT_SECONDS: float = 30.0
+    # İndirmeleri nesne deposunun imzalı URL'ine 302 ile yönlendir (local'de etkisiz)
+    STORAGE_PRESIGNED_DOWNLOADS: bool = False
+    STORAGE_PRESIGNED_URL_TTL_SECONDS: int = 300
+    # Önbellekteki URL en az bu kadar süresi kalmışken yeniden kullanılır
+    STORAGE_PRESIGNED_URL_MIN_REMAINING_SECONDS: int = 60
+    STORAGE_PRESIGNED_URL_CACHE_SIZE: int = 10000
+    # Kotalar (MB, 0: sınırsız): müvekkilin yüklediği evraklar ve dava başına
+    STORAGE_CLIENT_QUOTA_MB: int = 0
+    STORAGE_CASE_QUOTA_MB: int = 0
+    # Sayaç / depo mutabakatı: sayfa başına nesne, sahipsiz nesne silme gecikmesi
+    STORAGE_RECONCILE_INTERVAL_SECONDS: float = 86400.0
+    STORAGE_RECONCILE_PAGE_SIZE: int = 1000
+    STORAGE_ORPHAN_GRACE_SECONDS: float = 86400.0
+    
+    # Evrak işleme süreç havuzu (worker'da önizleme ve metin çıkarma)
+    DOCUMENT_PROCESS_WORKERS: int = 2
+    DOCUMENT_PROCESS_MAX_TASKS_PER_CHILD: int = 100
+    # İş başına süre sınırı; aşılınca alt süreçler sonlandırılır (JOB_TIMEOUT_SECONDS'tan kısa olmalı)
+    DOCUMENT_PROCESS_TIMEOUT_SECONDS: float = 120.0
+    
+    # Evrak önizlemeleri (en uzun kenar piksel)
+    THUMBNAIL_MAX_SIZE: int = 512
+    
+    # Evrak içeriğinde tam metin arama
+    SEARCH_MAX_TEXT_CHARS: int = 300000  # evrak başına indekslenen metin
+    SEARCH_MAX_RESULTS: int = 50
+    SEARCH_BACKFILL_INTERVAL_SECONDS: int = 3600
+    SEARCH_BACKFILL_BATCH_SIZE: int = 500
     
     # Email (optional for free tier)
     SMTP_HOST: str = ""
@@ -48,16 +177,51 @@ class Settings(BaseSettings):
     SMTP_USER: str = ""
     SMTP_PASSWORD: str = ""
     SMTP_FROM: str = ""
+    # SMTP_SECURITY: "starttls" (587), "ssl" (465) veya "none" (yerel sink)
+    SMTP_SECURITY: str = "starttls"
+    SMTP_POOL_SIZE: int = 2
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+    SMTP_TIMEOUT_SECONDS: float = 10.0
+    # Sağlayıcı başına gönderim hızı (worker süreci başına, 0: sınırsız)
+    EMAIL_RATE_LIMIT_PER_SECOND: float = 5.0
+    EMAIL_BATCH_SIZE: int = 100
+    EMAIL_MAX_ATTEMPTS: int = 5
+    
+    # Harici kanal (email/SMS) bekleyen bildirim taraması ve yeniden deneme aralığı
+    NOTIFICATION_DELIVERY_INTERVAL_SECONDS: float = 60.0
     
     # SMS (optional for free tier)
+    # SMS_PROVIDER: "netgsm" veya "log" (göndermez, loglar)
     SMS_PROVIDER: str = "netgsm"
     NETGSM_USERNAME: str = ""
     NETGSM_PASSWORD: str = ""
+    # Onaylı gönderici başlığı (msgheader)
+    NETGSM_HEADER: str = ""
+    NETGSM_API_URL: str = "https://api.netgsm.com.tr"
+    # Bulk istek başına mesaj, paralel istek (= keep-alive bağlantı) sayısı
+    SMS_BULK_SIZE: int = 100
+    SMS_CONCURRENCY: int = 4
+    # Sağlayıcıya saniyede bulk istek sınırı (worker süreci başına, 0: sınırsız)
+    SMS_RATE_LIMIT_PER_SECOND: float = 5.0
+    SMS_TIMEOUT_SECONDS: float = 15.0
+    SMS_MAX_ATTEMPTS: int = 5
     
     # Payment (İyzico - test mode for free)
     IYZICO_API_KEY: str = ""
     IYZICO_SECRET_KEY: str = ""
     IYZICO_BASE_URL: str = "https://sandbox-api.iyzipay.com"  # Test environment
+    # İstek başına toplam süre; bağlantı kurma ve havuzda bekleme sınırı
+    IYZICO_TIMEOUT_SECONDS: float = 10.0
+    IYZICO_CONNECT_TIMEOUT_SECONDS: float = 3.0
+    IYZICO_MAX_CONNECTIONS: int = 20
+    # Art arda bu kadar sağlayıcı hatasında devre açılır, süre sonunda tek deneme yapılır
+    IYZICO_BREAKER_FAILURE_THRESHOLD: int = 5
+    IYZICO_BREAKER_RESET_SECONDS: float = 30.0
+    # Bekleyen ödemelerin mutabakatı (payments.reconcile görevi)
+    PAYMENT_RECONCILE_INTERVAL_SECONDS: float = 900.0
+    PAYMENT_RECONCILE_BATCH_SIZE: int = 500
+    PAYMENT_RECONCILE_CONCURRENCY: int = 10
+    PAYMENT_RECONCILE_MIN_AGE_SECONDS: float = 300.0
     
     # Firebase (optional)
     FIREBASE_CREDENTIALS_PATH: str = ""
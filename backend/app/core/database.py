@@ -1,12 +1,35 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
+from app.core.db_pool import engine_options
 
-engine = create_engine(settings.database_url)
+engine = create_engine(settings.database_url, **engine_options())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
+# Opsiyonel asyncpg motoru (DATABASE_ASYNC=true)
+async_engine = None
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    async_engine = create_async_engine(
+        settings.async_database_url,
+        **engine_options(async_mode=True)
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+class _ModelBase:
+    # Sunucu tarafı varsayılanlar (created_at, updated_at) INSERT/UPDATE
+    # ... RETURNING ile alınır; commit sonrası refresh sorgusu gerekmez
+    __mapper_args__ = {"eager_defaults": True}
+
+Base = declarative_base(cls=_ModelBase)
 
 def get_db():
     db = SessionLocal()
@@ -14,3 +37,79 @@ def get_db():
         yield db
     finally:
         db.close()
+
+class SyncSessionAdapter:
+    """
+    Senkron Session'ı AsyncSession arayüzüyle sunar
+
+    DATABASE_ASYNC kapalıyken get_async_db bunu döner; böylece async
+    router'lar tek bir kod yoluyla çalışır. Veritabanı çağrıları event
+    loop yerine thread havuzunda yapılır.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    @property
+    def bind(self):
+        return self.sync_session.bind
+
+    def add(self, instance) -> None:
+        self.sync_session.add(instance)
+
+    def add_all(self, instances) -> None:
+        self.sync_session.add_all(instances)
+
+    def expunge(self, instance) -> None:
+        self.sync_session.expunge(instance)
+
+    async def execute(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, *args, **kwargs)
+
+    async def scalars(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, statement, *args, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def merge(self, instance, **kwargs):
+        return await run_in_threadpool(self.sync_session.merge, instance, **kwargs)
+
+    async def delete(self, instance) -> None:
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self) -> None:
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def refresh(self, instance, attribute_names=None) -> None:
+        await run_in_threadpool(self.sync_session.refresh, instance, attribute_names)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+async def get_async_db():
+    """
+    Async router'lar için session dependency'si
+
+    - DATABASE_ASYNC=true: asyncpg üzerinde gerçek AsyncSession
+    - Aksi halde: senkron Session'ı saran SyncSessionAdapter
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as session:
+            yield session
+    else:
+        # AsyncSession ile aynı davranış için commit sonrası nesneler expire edilmez
+        db = SyncSessionAdapter(SessionLocal(expire_on_commit=False))
+        try:
+            yield db
+        finally:
+            await db.close()
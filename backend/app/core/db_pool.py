@@ -0,0 +1,145 @@
+"""
+Veritabanı bağlantı havuzu ayarları ve metrikleri
+
+Havuz boyutu, overflow, timeout, recycle ve pre-ping Settings üzerinden
+yönetilir. DB_POOL_PROFILE=pgbouncer seçildiğinde havuzlama PgBouncer'a
+(transaction mode) bırakılır: uygulama tarafında NullPool kullanılır ve
+asyncpg'nin prepared statement önbellekleri kapatılır.
+
+Havuz sınıfları bağlantı bekleme süresini ve checkout timeout'larını
+ölçer; anlık değerler /api/admin/metrics altında sunulur.
+"""
+from bisect import bisect_left
+from typing import Optional
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.core.config import settings
+
+# Bekleme süresi histogramı sınırları (milisaniye)
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    """Checkout bekleme süresi histogramı ve timeout sayacı"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.bucket_counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def observe(self, wait_ms: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self.bucket_counts[bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            histogram = {
+                f"le_{bound}ms": count
+                for bound, count in zip(WAIT_BUCKETS_MS, self.bucket_counts)
+            }
+            histogram["gt_%dms" % WAIT_BUCKETS_MS[-1]] = self.bucket_counts[-1]
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_ms, 3),
+                "wait_histogram": histogram,
+            }
+
+
+class _InstrumentedPoolMixin:
+    """_do_get çevresinde bekleme süresini ölçer"""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.observe((time.perf_counter() - started) * 1000, timed_out=True)
+            raise
+        self.metrics.observe((time.perf_counter() - started) * 1000)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() sonrası sayaçlar korunur
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+
+class InstrumentedNullPool(_InstrumentedPoolMixin, NullPool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+
+def engine_options(async_mode: bool = False) -> dict:
+    """create_engine / create_async_engine için havuz parametreleri"""
+    if settings.DB_POOL_PROFILE == "pgbouncer":
+        options = {"poolclass": InstrumentedNullPool}
+        if async_mode and settings.async_database_url.startswith("postgresql+asyncpg"):
+            # PgBouncer transaction mode'da prepared statement'lar bağlantılar arasında taşınamaz
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+            }
+        return options
+
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if async_mode else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def pool_stats(pool) -> Optional[dict]:
+    """Havuzun anlık durumu + birikmiş metrikler"""
+    if pool is None:
+        return None
+
+    stats = {
+        "profile": settings.DB_POOL_PROFILE,
+        "pool_class": type(pool).__name__,
+    }
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+        })
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(metrics.snapshot())
+    return stats
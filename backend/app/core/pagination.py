@@ -0,0 +1,161 @@
+"""
+Keyset (cursor) pagination
+
+Liste endpoint'leri offset/limit yerine (created_at, id) gibi sıralama
+anahtarları üzerinden sayfalanır: sonraki sayfa "son görülen satırdan
+daha eski olanlar" koşuluyla okunur, bu yüzden sayfa derinliği sorgu
+maliyetini artırmaz.
+
+İmleç (cursor) son satırın anahtar değerlerinin base64url kodlanmış
+JSON halidir ve istemci için opaktır. Bir sonraki sayfanın imleci
+X-Next-Cursor response header'ında döner; son sayfada header yoktur.
+
+Kullanım:
+    @router.get("/")
+    async def list_items(
+        response: Response,
+        page: PageParams = Depends(),
+        db: AsyncSession = Depends(get_async_db)
+    ):
+        items, _ = await paginate(db, select(Item), page, response,
+                                  keys=(Item.created_at, Item.id))
+"""
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import DateTime, func, literal, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(HTTPException):
+    """Çözülemeyen veya bu listeye ait olmayan imleç"""
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+class PageParams:
+    """cursor + limit query parametreleri (Depends ile kullanılır)"""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="Önceki yanıtın X-Next-Cursor değeri"),
+        limit: int = Query(
+            settings.PAGINATION_DEFAULT_LIMIT,
+            ge=1,
+            le=settings.PAGINATION_MAX_LIMIT
+        )
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(keys):
+            raise ValueError("cursor arity mismatch")
+        values = []
+        for key, value in zip(keys, payload):
+            if isinstance(key.type, DateTime):
+                values.append(datetime.fromisoformat(value))
+            else:
+                values.append(key.type.python_type(value))
+        return values
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise InvalidCursor()
+
+
+def _sqlite_time(db, key) -> bool:
+    """
+    SQLite DateTime değerlerini metin olarak saklar ve server_default
+    (CURRENT_TIMESTAMP) ile Python tarafı değerler farklı biçimde yazılır;
+    metin karşılaştırması eşit zamanları farklı sayar. SQLite'ta (geliştirme
+    ortamı) zaman anahtarları julianday() ile sayıya çevrilerek karşılaştırılır.
+    """
+    return db.bind.dialect.name == "sqlite" and isinstance(key.type, DateTime)
+
+
+def _sort_expression(db, key):
+    return func.julianday(key) if _sqlite_time(db, key) else key
+
+
+def _cursor_expression(db, key, value):
+    # Parametre sütunun tipiyle bağlanır (timestamptz karşılaştırması için)
+    value = literal(value, key.type)
+    return func.julianday(value) if _sqlite_time(db, key) else value
+
+
+def keyset_query(db, stmt, page: PageParams, keys: Sequence):
+    """
+    select() ifadesine imleç koşulunu, ORDER BY ve LIMIT (limit + 1) ekle
+
+    Bir fazla satır okunarak sonraki sayfanın varlığı anlaşılır.
+    """
+    columns = [_sort_expression(db, key) for key in keys]
+
+    if page.cursor:
+        values = decode_cursor(page.cursor, keys)
+        stmt = stmt.where(
+            tuple_(*columns) < tuple_(*(
+                _cursor_expression(db, key, value) for key, value in zip(keys, values)
+            ))
+        )
+
+    return stmt.order_by(*(column.desc() for column in columns)).limit(page.limit + 1)
+
+
+async def paginate(
+    db,
+    stmt,
+    page: PageParams,
+    response: Optional[Response],
+    keys: Sequence
+) -> Tuple[list, Optional[str]]:
+    """
+    select() ifadesini anahtarlara göre azalan sırada (en yeni önce) sayfala
+
+    Args:
+        db: Session, AsyncSession veya SyncSessionAdapter
+        stmt: Filtreleri uygulanmış, ORDER BY/LIMIT içermeyen select()
+        page: PageParams
+        response: X-Next-Cursor header'ının yazılacağı Response
+        keys: Benzersiz sıralama anahtarı; son eleman birincil anahtar olmalı
+
+    Returns:
+        (satırlar, sonraki imleç veya None)
+    """
+    stmt = keyset_query(db, stmt, page, keys)
+
+    if isinstance(db, Session):
+        rows = db.scalars(stmt).all()
+    else:
+        rows = (await db.scalars(stmt)).all()
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, key.key) for key in keys])
+
+    if response is not None and next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    return rows, next_cursor
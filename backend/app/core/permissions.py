@@ -2,7 +2,7 @@ from functools import wraps
 from fastapi import HTTPException, status, Request
 from typing import List, Callable
 from app.models.user import User, UserType
-from app.models.audit_log import AuditLog
+from app.services.audit import audit_sink, audit_row
 from sqlalchemy.orm import Session
 
 class PermissionDenied(HTTPException):
@@ -132,13 +132,19 @@ async def log_audit(
     resource_id: int = None,
     description: str = None,
     changes: dict = None,
-    request: Request = None
+    request: Request = None,
+    uow=None
 ):
     """
     Audit log kaydı oluştur
     
+    uow verilirse (mutasyonlar) kayıt domain yazımıyla aynı transaction'da
+    uow.commit() ile yazılır. Aksi halde (okuma/indirme kayıtları) istek
+    içinde commit edilmez; audit_sink kuyruğuna bırakılır ve arka planda
+    toplu olarak yazılır.
+    
     Args:
-        db: Database session
+        db: Database session (geriye dönük uyumluluk için, kullanılmıyor)
         user: İşlemi yapan kullanıcı
         action: İşlem tipi (CREATE, UPDATE, DELETE, VIEW, DOWNLOAD, UPLOAD)
         resource_type: Kaynak tipi (CASE, DOCUMENT, PAYMENT, USER)
@@ -146,8 +152,9 @@ async def log_audit(
         description: İnsan okunabilir açıklama
         changes: Yapılan değişikliklerin detayı
         request: FastAPI Request objesi (IP ve user-agent için)
+        uow: UnitOfWork (kaydı aynı transaction'a ekler)
     """
-    audit_log = AuditLog(
+    row = audit_row(
         user_id=user.id,
         action=action,
         resource_type=resource_type,
@@ -157,8 +164,7 @@ async def log_audit(
         ip_address=request.client.host if request else None,
         user_agent=request.headers.get("user-agent") if request else None
     )
-    
-    db.add(audit_log)
-    db.commit()
-    
-    return audit_log
+    if uow is not None:
+        uow.audit_rows.append(row)
+    else:
+        await audit_sink.submit(row)
@@ -0,0 +1,154 @@
+"""
+Principal Cache - get_current_user için token bazlı kullanıcı önbelleği
+
+Her kimlik doğrulamalı istek JWT'yi çözdükten sonra users tablosuna
+SELECT atıyordu. Bu modül, token özetine (SHA-256) göre anahtarlanmış,
+boyutu sınırlı (LRU) ve süreli (TTL) bir süreç içi önbellek sağlar.
+
+Kullanıcı verisi değiştiğinde (profil güncelleme, şifre, 2FA, pasife alma)
+invalidate_user() çağrılarak o kullanıcıya ait tüm girişler silinir.
+"""
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+import hashlib
+import threading
+import time
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.models.user import User
+
+
+def token_digest(token: str) -> str:
+    """Token'ın kendisini bellekte anahtar olarak tutmamak için SHA-256 özeti"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class PrincipalCache:
+    """LRU + TTL kullanıcı önbelleği (thread-safe)"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+        self._by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, token: str, db: Session) -> Optional[User]:
+        """
+        Önbellekteki kullanıcıyı verilen session'a SELECT atmadan bağla
+
+        Returns:
+            User: Session'a bağlı kullanıcı, yoksa None
+        """
+        snapshot = self.lookup(token)
+        if snapshot is None:
+            return None
+        # load=False: snapshot'taki değerler kullanılır, veritabanına gidilmez
+        return db.merge(snapshot, load=False)
+
+    def lookup(self, token: str) -> Optional[User]:
+        """
+        Önbellekteki bağımsız (detached) kopya; doğrudan değiştirilmemeli,
+        çağıran kendi session'ına merge(load=False) ile bağlar
+        """
+        if not self.enabled:
+            return None
+
+        key = token_digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, snapshot = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return snapshot
+
+    def put(self, token: str, user: User) -> None:
+        """Kullanıcının kolon değerlerinin bağımsız bir kopyasını sakla"""
+        if not self.enabled:
+            return
+
+        snapshot = User(**{
+            attr.key: getattr(user, attr.key)
+            for attr in inspect(User).column_attrs
+        })
+        make_transient_to_detached(snapshot)
+
+        key = token_digest(token)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._by_user.setdefault(user.id, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Kullanıcıya ait tüm token girişlerini sil"""
+        with self._lock:
+            keys = self._by_user.pop(user_id, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            if keys:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key: str) -> None:
+        """Kilit altında çağrılmalı"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_id = entry[1].id
+        keys = self._by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[user_id]
+
+
+principal_cache = PrincipalCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,177 @@
+"""
+İstek başına SQL sayacı ve N+1 dedektörü
+
+Engine seviyesindeki before/after_cursor_execute event'leri, aktif isteğin
+QueryStats nesnesine (contextvar) ifade sayısını, toplam veritabanı
+süresini ve ifade biçimi (parametresiz SQL metni) tekrarlarını yazar.
+Senkron Session'lar thread havuzunda çalışsa da contextvar kopyalandığı
+için aynı nesneye yazılır.
+
+QueryStatsMiddleware sonuçları Server-Timing header'ına ve JSON log
+satırına ekler. QUERY_BUDGET_ENFORCE=true (geliştirme) iken istek
+QUERY_BUDGET_MAX_STATEMENTS ifadeyi aşarsa veya aynı ifade biçimini
+QUERY_BUDGET_MAX_REPEATS kereden fazla tekrarlarsa QueryBudgetExceeded fırlatılır.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+import json
+import logging
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """İstek, ifade bütçesini veya tekrar limitini aştı (geliştirme modu)"""
+
+
+class QueryStats:
+    """Tek bir isteğin SQL istatistikleri"""
+
+    def __init__(self, enforce: bool, max_statements: int, max_repeats: int):
+        self.enforce = enforce
+        self.max_statements = max_statements
+        self.max_repeats = max_repeats
+        self._lock = threading.Lock()
+        self.statements = 0
+        self.db_ms = 0.0
+        self.shapes = Counter()
+
+    def record_start(self, statement: str) -> None:
+        with self._lock:
+            self.statements += 1
+            self.shapes[statement] += 1
+            statements = self.statements
+            repeats = self.shapes[statement]
+
+        if not self.enforce:
+            return
+        if statements > self.max_statements:
+            raise QueryBudgetExceeded(
+                f"Request exceeded statement budget ({self.max_statements})"
+            )
+        if repeats > self.max_repeats:
+            raise QueryBudgetExceeded(
+                f"Statement repeated {repeats} times (possible N+1): {statement[:200]}"
+            )
+
+    def record_end(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self.db_ms += elapsed_ms
+
+    @property
+    def duplicates(self) -> int:
+        """İlk çalıştırma dışındaki tekrarlar"""
+        return sum(count - 1 for count in self.shapes.values() if count > 1)
+
+    def top_repeats(self, limit: int = 3) -> list:
+        return [
+            {"count": count, "statement": statement[:200]}
+            for statement, count in self.shapes.most_common(limit)
+            if count > 1
+        ]
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.db_ms:.1f};desc="{self.statements} statements", '
+            f'db-dup;desc="{self.duplicates} repeated"'
+        )
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+@contextmanager
+def untracked():
+    """
+    Bloktaki SQL ifadeleri isteğin istatistiklerine sayılmaz
+
+    Uzun süreli yanıtların (SSE) periyodik kontrolleri için: aksi halde her
+    heartbeat aynı ifadeyi tekrarlar, bütçe uygulanırken akış
+    QueryBudgetExceeded ile kesilir ve isteğin log satırı şişer.
+    """
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+    try:
+        stats.record_start(statement)
+    except QueryBudgetExceeded:
+        conn.info["query_started"].pop()
+        raise
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = conn.info.get("query_started")
+    if stats is None or not started:
+        return
+    stats.record_end((time.perf_counter() - started.pop()) * 1000)
+
+
+class QueryStatsMiddleware:
+    """Her HTTP isteği için QueryStats açar; Server-Timing ve log yazar"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(
+            enforce=settings.QUERY_BUDGET_ENFORCE,
+            max_statements=settings.QUERY_BUDGET_MAX_STATEMENTS,
+            max_repeats=settings.QUERY_BUDGET_MAX_REPEATS
+        )
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status_code = None
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            logger.info(json.dumps({
+                "event": "request_sql",
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                "statements": stats.statements,
+                "db_ms": round(stats.db_ms, 1),
+                "duplicates": stats.duplicates,
+                "top_repeats": stats.top_repeats(),
+            }, ensure_ascii=False))
@@ -0,0 +1,78 @@
+"""
+Rate Limit - Harici sağlayıcılara giden istekler için token bucket
+
+Sağlayıcı (SMTP sunucusu, SMS API'si) başına tek bir kova süreç içinde
+paylaşılır; aynı sağlayıcıyı kullanan tüm thread'ler aynı hız sınırına
+tabidir:
+
+    limiter = get_rate_limiter("smtp:smtp.gmail.com", rate=5, burst=10)
+    limiter.acquire()          # gerekirse token gelene kadar bekler
+
+Sınır süreç başınadır; N worker süreci toplamda N kat hıza çıkabilir.
+"""
+from typing import Dict, Optional
+import threading
+import time
+
+
+class TokenBucket:
+    """Saniyede rate token üreten, en fazla burst token biriktiren kova"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = max(burst or rate, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """
+        Token almayı dene
+
+        Returns:
+            float: 0 ise alındı; aksi halde beklenmesi gereken süre (saniye)
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        Token alınana kadar bekle (thread'i bloklar)
+
+        Returns:
+            bool: timeout içinde alınamazsa False
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(key: str, rate: float, burst: Optional[float] = None) -> TokenBucket:
+    """Sağlayıcı anahtarı başına tek kova (ilk çağrının ayarlarıyla oluşturulur)"""
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = TokenBucket(rate, burst)
+        return limiter
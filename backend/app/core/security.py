@@ -1,9 +1,17 @@
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional, TypeVar
+import asyncio
+import threading
+import time
+
+from fastapi import HTTPException, status
 from jose import JWTError, jwt
 import bcrypt
 from app.core.config import settings
 
+T = TypeVar("T")
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
@@ -14,6 +22,108 @@ def get_password_hash(password: str) -> str:
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
+class PasswordHasherBusy(HTTPException):
+    """Şifre işlem kuyruğu dolu exception"""
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Sunucu şu anda yoğun, lütfen kısa süre sonra tekrar deneyin",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+class PasswordExecutor:
+    """
+    bcrypt işlemlerini event loop dışında, sınırlı bir thread havuzunda çalıştırır
+
+    bcrypt hesaplama sırasında GIL'i bıraktığı için thread havuzu yeterlidir.
+    Çalışan + bekleyen iş sayısı workers + max_queue'ya ulaştığında yeni
+    istekler beklemeye alınmaz, PasswordHasherBusy (503) ile reddedilir.
+    """
+
+    def __init__(self, workers: int, max_queue: int, retry_after: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise PasswordHasherBusy(self.retry_after)
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="password-hash"
+                )
+            executor = self._executor
+
+        submitted_at = time.monotonic()
+
+        def task():
+            waited = time.monotonic() - submitted_at
+            with self._lock:
+                self.total_wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            return func(*args)
+
+        try:
+            future = executor.submit(task)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        # Slot iş bitince (veya kuyruktayken iptal edilince) boşalır; istek
+        # iptal edilse de çalışan bcrypt sürdükçe kapasiteden düşülmez
+        future.add_done_callback(self._finished)
+        return await asyncio.wrap_future(future)
+
+    def _finished(self, future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+            if not future.cancelled() and future.exception() is None:
+                self.completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": min(self._pending, self.workers),
+                "queue_depth": max(self._pending - self.workers, 0),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.total_wait_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+password_executor = PasswordExecutor(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER_SECONDS
+)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password'ün event loop'u bloklamayan versiyonu"""
+    return await password_executor.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash'in event loop'u bloklamayan versiyonu"""
+    return await password_executor.run(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
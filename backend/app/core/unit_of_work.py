@@ -0,0 +1,133 @@
+"""
+Unit of Work - İstek başına tek transaction
+
+Mutasyon yapan endpoint'lerde domain nesnesi, bildirimler ve audit
+kayıtları aynı transaction içinde yazılır ve tek commit yapılır:
+
+    uow.add(case)
+    await uow.flush()                      # INSERT ... RETURNING id, created_at
+    create_notification(uow, user_id=...)  # satır bekletilir
+    await log_audit(..., uow=uow)          # satır bekletilir
+    await uow.commit()                     # çok satırlı INSERT'ler + COMMIT
+
+Sunucu tarafı değerler (id, created_at, updated_at) Base üzerindeki
+eager_defaults sayesinde INSERT/UPDATE ... RETURNING ile gelir; commit
+sonrası db.refresh gerekmez. Session senkron (admin, auth) veya async
+olabilir.
+
+Eklenen bildirimler okunmamış sayaçlarını (notification_counters) aynı
+transaction'da artırır. Email/SMS bildirimleri için kanalın gönderim
+görevi de aynı transaction'da kuyruğa alınır (bkz. app.services.delivery).
+
+Eklenen bildirimler ve uow.events'e eklenen olaylar notification_hub
+üzerinden açık SSE/WebSocket bağlantılarına iletilir: Postgres'te
+pg_notify aynı transaction'da çalışır (yalnızca commit edilirse
+gönderilir), aksi halde commit sonrası süreç içinde dağıtılır.
+"""
+from collections import Counter
+from typing import List
+import inspect
+
+from fastapi import Depends
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.database import get_async_db, get_db
+from app.models.audit_log import AuditLog
+from app.models.notification import Notification
+from app.services.delivery import wake_statements
+from app.services.notification_counters import add_unread
+from app.services.notification_hub import notification_event, notification_hub
+
+_PUSH_COLUMNS = (
+    Notification.id,
+    Notification.user_id,
+    Notification.title,
+    Notification.message,
+    Notification.notification_type,
+    Notification.priority,
+    Notification.link,
+    Notification.case_id,
+    Notification.created_at,
+)
+
+
+class UnitOfWork:
+    """Domain yazımı + bildirim + audit satırları için tek commit"""
+
+    def __init__(self, db):
+        self.db = db
+        self.notifications: List[dict] = []
+        self.audit_rows: List[dict] = []
+        # Bildirim dışı anlık olaylar (ör. okunmamış sayacı değişimi)
+        self.events: List[dict] = []
+
+    async def _call(self, method: str, *args):
+        result = getattr(self.db, method)(*args)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    def add(self, instance) -> None:
+        self.db.add(instance)
+
+    async def execute(self, statement):
+        return await self._call("execute", statement)
+
+    async def delete(self, instance) -> None:
+        await self._call("delete", instance)
+
+    async def flush(self) -> None:
+        """Bekleyen ORM değişikliklerini gönder (id'ler RETURNING ile gelir)"""
+        await self._call("flush")
+
+    async def commit(self) -> None:
+        events = list(self.events)
+        try:
+            await self._call("flush")
+            if self.notifications:
+                result = await self._call(
+                    "execute",
+                    insert(Notification).values(self.notifications).returning(*_PUSH_COLUMNS)
+                )
+                created = [notification_event(row) for row in result.mappings()]
+                unread = await add_unread(self, Counter(row["user_id"] for row in self.notifications))
+                for event in created:
+                    event["unread_count"] = unread.get(event["user_id"])
+                events.extend(created)
+                for stmt in wake_statements(
+                    self.db.bind.dialect.name,
+                    {row["notification_type"] for row in self.notifications}
+                ):
+                    await self._call("execute", stmt)
+            if self.audit_rows:
+                await self._call("execute", insert(AuditLog).values(self.audit_rows))
+            notify = notification_hub.notify_statement(events)
+            if notify is not None:
+                await self._call("execute", notify)
+            await self._call("commit")
+        finally:
+            self._clear()
+        notification_hub.dispatch_committed(events)
+
+    async def rollback(self) -> None:
+        self._clear()
+        await self._call("rollback")
+
+    def _clear(self) -> None:
+        self.notifications = []
+        self.audit_rows = []
+        self.events = []
+
+
+async def get_uow(db=Depends(get_async_db)) -> UnitOfWork:
+    """Async router'lar için (endpoint'teki db ile aynı session)"""
+    return UnitOfWork(db)
+
+
+def get_sync_uow(db: Session = Depends(get_db)) -> UnitOfWork:
+    """Senkron Session kullanan router'lar için (admin)"""
+    # Yanıt commit sonrası nesneden üretilir; expire edilirse her nesne
+    # için yeniden SELECT atılır (get_async_db ile aynı davranış)
+    db.expire_on_commit = False
+    return UnitOfWork(db)
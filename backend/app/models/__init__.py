@@ -1,18 +1,28 @@
 # Models package
 from app.models.user import User
 from app.models.case import Case
-from app.models.document import Document
+from app.models.document import Document, StorageUsage
+from app.models.blob import DocumentBlob, DocumentText
 from app.models.task import Task
-from app.models.payment import Payment
-from app.models.notification import Notification
+from app.models.payment import Payment, PaymentReconciliation
+from app.models.notification import Notification, NotificationCounter, StreamTicket
 from app.models.timeline import TimelineEvent
+from app.models.job import Job, DeadJob
 
 __all__ = [
     "User",
     "Case",
     "Document",
+    "StorageUsage",
+    "DocumentBlob",
+    "DocumentText",
     "Task",
     "Payment",
+    "PaymentReconciliation",
     "Notification",
+    "NotificationCounter",
+    "StreamTicket",
     "TimelineEvent",
+    "Job",
+    "DeadJob",
 ]
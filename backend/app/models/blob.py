@@ -0,0 +1,76 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, DDL, event
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+# PostgreSQL metin arama yapılandırması (Türkçe kök bulma ve durdurma kelimeleri)
+SEARCH_CONFIG = "turkish"
+
+class DocumentBlob(Base):
+    """
+    İçerik adresli evrak dosyası (SHA-256)
+
+    Aynı içerik birden fazla Document tarafından paylaşılır; ref_count
+    bu blob'a işaret eden Document sayısıdır.
+    """
+    __tablename__ = "document_blobs"
+    
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)  # bytes
+    file_path = Column(String, nullable=False)  # depolama anahtarı (bkz. app.services.storage)
+    ref_count = Column(Integer, nullable=False, default=1)
+    # Önizleme görseli: None (henüz üretilmedi), ready, failed, unsupported
+    preview_status = Column(String(16), nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<DocumentBlob {self.sha256[:12]} refs={self.ref_count}>"
+
+
+class DocumentText(Base):
+    """
+    Blob'dan çıkarılan düz metin (tam metin arama)
+
+    Satırı olmayan blob henüz işlenmemiştir. Arama indeksi veritabanına
+    özel DDL ile eklenir: PostgreSQL'de content'ten türetilen
+    search_vector (tsvector) kolonu ve GIN indeksi, SQLite'ta (yerel
+    geliştirme) tetikleyicilerle eşitlenen document_texts_fts (FTS5) tablosu.
+    """
+    __tablename__ = "document_texts"
+    
+    sha256 = Column(String(64), primary_key=True)
+    status = Column(String(16), nullable=False)  # ready, empty, failed, unsupported
+    content = Column(Text, nullable=True)
+    
+    extracted_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<DocumentText {self.sha256[:12]} {self.status}>"
+
+
+# create_all ile kurulan veritabanları için (migration: 2025_12_10_1000)
+for statement in (
+    "ALTER TABLE document_texts ADD COLUMN search_vector tsvector "
+    f"GENERATED ALWAYS AS (to_tsvector('{SEARCH_CONFIG}', coalesce(content, ''))) STORED",
+    "CREATE INDEX ix_document_texts_search_vector ON document_texts USING gin (search_vector)",
+):
+    event.listen(DocumentText.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+for statement in (
+    "CREATE VIRTUAL TABLE document_texts_fts USING fts5("
+    "sha256 UNINDEXED, content, tokenize = 'unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER document_texts_fts_insert AFTER INSERT ON document_texts BEGIN "
+    "INSERT INTO document_texts_fts (sha256, content) VALUES (new.sha256, new.content); END",
+    "CREATE TRIGGER document_texts_fts_update AFTER UPDATE OF content ON document_texts BEGIN "
+    "DELETE FROM document_texts_fts WHERE sha256 = old.sha256; "
+    "INSERT INTO document_texts_fts (sha256, content) VALUES (new.sha256, new.content); END",
+    "CREATE TRIGGER document_texts_fts_delete AFTER DELETE ON document_texts BEGIN "
+    "DELETE FROM document_texts_fts WHERE sha256 = old.sha256; END",
+):
+    event.listen(DocumentText.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+event.listen(
+    DocumentText.__table__,
+    "after_drop",
+    DDL("DROP TABLE IF EXISTS document_texts_fts").execute_if(dialect="sqlite")
+)
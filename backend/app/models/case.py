@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum as SQLEnum, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum as SQLEnum, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -22,6 +22,11 @@ class CaseType(str, enum.Enum):
 
 class Case(Base):
     __tablename__ = "cases"
+    __table_args__ = (
+        Index("ix_cases_created", "created_at", "id"),
+        Index("ix_cases_client_created", "client_id", "created_at", "id"),
+        Index("ix_cases_client_status", "client_id", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     case_number = Column(String, unique=True, index=True, nullable=False)
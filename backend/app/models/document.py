@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Enum as SQLEnum
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, Boolean, Enum as SQLEnum, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -15,12 +15,23 @@ class DocumentType(str, enum.Enum):
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        Index("ix_documents_case_uploaded", "case_id", "uploaded_at", "id"),
+        # Müvekkil görünümü: yalnızca is_visible_to_client evraklar
+        Index(
+            "ix_documents_case_visible", "case_id", "uploaded_at", "id",
+            postgresql_where=text("is_visible_to_client = true"),
+            sqlite_where=text("is_visible_to_client = true")
+        ),
+        Index("ix_documents_user_uploaded", "user_id", "uploaded_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String, nullable=False)
     original_filename = Column(String, nullable=False)
     file_path = Column(String, nullable=False)  # MinIO path
     file_size = Column(Integer)  # bytes
+    sha256 = Column(String(64), nullable=True, index=True)  # İçerik özeti (hex)
     mime_type = Column(String)
     
     document_type = Column(SQLEnum(DocumentType), default=DocumentType.OTHER)
@@ -41,3 +52,26 @@ class Document(Base):
     
     def __repr__(self):
         return f"<Document {self.original_filename}>"
+
+
+class StorageUsage(Base):
+    """
+    Kullanıcı / dava başına evrak depolama sayacı
+
+    Evrak yükleme ve silme ile aynı transaction'da artırılıp azaltılır;
+    kota kontrolü ve kullanım raporu documents tablosunu taramadan tek
+    satır okur. Baytlar evrak boyutlarının toplamıdır (aynı içerik
+    deduplikasyonla tek kopya saklansa da her evrak sayılır). Satırı
+    olmayan kapsamın kullanımı 0'dır.
+    """
+    __tablename__ = "storage_usage"
+    
+    scope = Column(String(16), primary_key=True)  # "user" (yükleyen) veya "case"
+    scope_id = Column(Integer, primary_key=True)
+    bytes = Column(BigInteger, nullable=False, default=0, server_default=text("0"))
+    files = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<StorageUsage {self.scope}:{self.scope_id} {self.bytes}B/{self.files}>"
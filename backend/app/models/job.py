@@ -0,0 +1,56 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class Job(Base):
+    """
+    Arka plan işi (python -m app.worker tarafından çalıştırılır)
+
+    Tablo yalnızca bekleyen ve çalışan işleri tutar; tamamlanan iş silinir,
+    deneme hakkı biten iş dead_jobs tablosuna taşınır. locked_until süresi
+    dolmuş bir iş (worker çöktü) başka bir worker tarafından yeniden alınır.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Dequeue: kuyruk + çalışma zamanı sırası
+        Index("ix_jobs_queue_run_at", "queue", "run_at", "id"),
+        # Periyodik işlerin tek kopyası (NULL değerler çakışmaz)
+        Index("ux_jobs_unique_key", "unique_key", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    queue = Column(String(50), nullable=False, default="default")
+    task = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    unique_key = Column(String(200), nullable=True)
+    
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    last_error = Column(Text, nullable=True)
+    
+    run_at = Column(DateTime(timezone=True), nullable=False)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    locked_by = Column(String(100), nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<Job {self.id} {self.queue}/{self.task}>"
+
+class DeadJob(Base):
+    """Deneme hakkı biten (veya bilinmeyen görevli) iş; elle incelenir/yeniden kuyruğa alınır"""
+    __tablename__ = "dead_jobs"
+    
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, nullable=False)
+    queue = Column(String(50), nullable=False)
+    task = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False)
+    attempts = Column(Integer, nullable=False)
+    last_error = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), nullable=True)  # İşin ilk kuyruğa alındığı zaman
+    failed_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<DeadJob {self.job_id} {self.queue}/{self.task}>"
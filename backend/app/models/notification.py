@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Enum as SQLEnum, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -21,6 +21,22 @@ class NotificationPriority(str, enum.Enum):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Bildirim listesi: user_id + (created_at, id) keyset
+        Index("ix_notifications_user_created", "user_id", "created_at", "id"),
+        # unread_only listesi ve unread-count
+        Index(
+            "ix_notifications_user_unread", "user_id", "created_at", "id",
+            postgresql_where=text("is_read = false"),
+            sqlite_where=text("is_read = false")
+        ),
+        # Harici kanal (email/SMS) gönderim kuyruğu: bekleyen satırlar
+        Index(
+            "ix_notifications_pending_delivery", "notification_type", "id",
+            postgresql_where=text("is_sent = false"),
+            sqlite_where=text("is_sent = false")
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -32,6 +48,13 @@ class Notification(Base):
     is_read = Column(Boolean, default=False)
     is_sent = Column(Boolean, default=False)
     
+    # Harici kanal teslimatı (email/SMS): deneme sayısı, son hata ve en
+    # erken sonraki deneme zamanı (gönderim sürerken kira, hatadan sonra
+    # geri çekilme)
+    delivery_attempts = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    delivery_error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)
+    
     # Foreign Keys
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     case_id = Column(Integer, ForeignKey("cases.id"), nullable=True)
@@ -48,3 +71,43 @@ class Notification(Base):
     
     def __repr__(self):
         return f"<Notification {self.title}>"
+
+class NotificationCounter(Base):
+    """
+    Kullanıcı başına okunmamış bildirim sayacı
+
+    Bildirim ekleme ve okundu işaretleme ile aynı transaction'da artırılıp
+    azaltılır; unread-count endpoint'i COUNT(*) yerine tek satır okur.
+    Satırı olmayan kullanıcının sayacı 0'dır.
+    """
+    __tablename__ = "notification_counters"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<NotificationCounter user={self.user_id} unread={self.unread_count}>"
+
+class StreamTicket(Base):
+    """
+    Bildirim akışı (SSE / WebSocket) için kısa ömürlü, tek kullanımlık bilet
+
+    EventSource ve tarayıcı WebSocket'i header gönderemez; JWT'yi URL'e
+    (ve dolayısıyla proxy/erişim loglarına) koymamak için istemci önce
+    bilet alır, akışı ?ticket= ile açar. Bilet ilk kullanımda silinir;
+    tablo tüm süreçler arasında paylaşıldığından hangi süreç açarsa açsın
+    ikinci kullanım reddedilir. Bilet değeri saklanmaz, SHA-256 özeti tutulur.
+    """
+    __tablename__ = "stream_tickets"
+    
+    digest = Column(String(64), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    # Bileti alan erişim token'ının bitişi (JWT exp, unix zamanı): akış bu
+    # andan sonra kapatılır
+    session_expires_at = Column(Integer, nullable=False)
+    
+    def __repr__(self):
+        return f"<StreamTicket user={self.user_id}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float, Boolean, JSON, Enum as SQLEnum, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -17,6 +17,17 @@ class PaymentMethod(str, enum.Enum):
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        Index("ix_payments_created", "created_at", "id"),
+        Index("ix_payments_user_created", "user_id", "created_at", "id"),
+        Index("ix_payments_user_status_created", "user_id", "status", "created_at", "id"),
+        # Mutabakat görevi: bekleyen ödemeler üzerinde id keyset taraması
+        Index(
+            "ix_payments_pending", "id",
+            postgresql_where=text("status = 'PENDING'"),
+            sqlite_where=text("status = 'PENDING'")
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     payment_id = Column(String, unique=True, index=True)  # External payment ID (İyzico, etc.)
@@ -43,3 +54,37 @@ class Payment(Base):
     
     def __repr__(self):
         return f"<Payment {self.payment_id}>"
+
+
+class PaymentReconciliation(Base):
+    """
+    Ödeme mutabakatı çalışması ve raporu
+
+    Bekleyen ödemeler id sırasıyla taranır; süre dolduğunda yarım kalan
+    çalışma next_cursor'a kadar ilerlemiş olur ve bir sonraki çalışma
+    oradan devam eder.
+    """
+    __tablename__ = "payment_reconciliations"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Taramanın başladığı / kaldığı payments.id (tamamlandıysa next_cursor NULL)
+    start_cursor = Column(Integer, nullable=False, default=0)
+    next_cursor = Column(Integer, nullable=True)
+    aborted = Column(Boolean, nullable=False, default=False)
+    
+    checked = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    refunded = Column(Integer, nullable=False, default=0)
+    unchanged = Column(Integer, nullable=False, default=0)
+    errors = Column(Integer, nullable=False, default=0)
+    
+    # Sayaçlar dışındaki ayrıntılar (sağlayıcı durum dağılımı, örnek hatalar, geçişler)
+    report = Column(JSON, nullable=True)
+    
+    def __repr__(self):
+        return f"<PaymentReconciliation {self.id} checked={self.checked}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -15,6 +15,9 @@ class TimelineEventType(str, enum.Enum):
 class TimelineEvent(Base):
     """Dava sürecindeki olayların kronolojik takibi için"""
     __tablename__ = "timeline_events"
+    __table_args__ = (
+        Index("ix_timeline_events_case_event_date", "case_id", "event_date", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
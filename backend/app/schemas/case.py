@@ -49,4 +49,5 @@ class CaseResponse(CaseBase):
 
 class CaseListResponse(BaseModel):
     cases: List[CaseResponse]
-    total: int
+    total: Optional[int] = None  # Yalnızca ilk sayfada hesaplanır
+    next_cursor: Optional[str] = None
@@ -0,0 +1,375 @@
+"""
+Audit Sink - Audit log kayıtlarının tamponlanarak toplu yazılması
+
+log_audit artık her çağrıda commit etmez; kaydı sınırlı bir kuyruğa
+bırakır. Arka plan görevi kuyruğu AUDIT_FLUSH_INTERVAL_SECONDS aralıklarla
+veya AUDIT_FLUSH_BATCH_SIZE dolduğunda tek bir çok satırlı INSERT ile
+boşaltır. Veritabanına yazılamayan (veya kuyruk dolduğunda gelen) kayıtlar
+AUDIT_SPILL_PATH dosyasına JSON satırı olarak eklenir ve veritabanı
+tekrar erişilebilir olduğunda geri yüklenir.
+
+Toplu INSERT başarısız olursa parti satır satır denenir: veritabanı
+erişilemiyorsa kalan satırlar spill dosyasına, satırın kendisi hatalıysa
+(ör. silinmiş kullanıcı, bozuk JSON satırı) yalnızca o satır
+AUDIT_DEAD_LETTER_PATH dosyasına yazılır; tek bir bozuk satır geri
+yüklemeyi sonsuza kadar durdurmaz.
+
+Spill dosyası aynı sunucudaki tüm uvicorn süreçlerince paylaşılır:
+eklemeler fcntl dosya kilidi altında yapılır; geri yükleme dosyayı kilit
+altında kendi adına yeniden adlandırarak devralır, böylece aynı kayıtları
+iki süreç birden yüklemez.
+"""
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+import asyncio
+import glob
+import json
+import logging
+import os
+import threading
+
+from sqlalchemy import insert
+from sqlalchemy.exc import InterfaceError, OperationalError, TimeoutError as PoolTimeoutError
+from starlette.concurrency import run_in_threadpool
+
+# Süreçler arası dosya kilidi için (Windows'ta yalnızca süreç içi kilit)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.audit_log import AuditLog
+
+logger = logging.getLogger(__name__)
+
+# Arka plan görevine durma sinyali
+_STOP = object()
+
+
+def _db_unavailable(error: Exception) -> bool:
+    """Hata veritabanına erişilememesinden mi (satırın kendisinden değil)"""
+    return (
+        isinstance(error, (OperationalError, InterfaceError, PoolTimeoutError))
+        or getattr(error, "connection_invalidated", False)
+    )
+
+
+def _encode(row: dict) -> str:
+    return json.dumps({**row, "created_at": row["created_at"].isoformat()}, default=str) + "\n"
+
+
+def _same_file(f, path: str) -> bool:
+    """Açık dosya hâlâ path'teki dosya mı (başka süreç yeniden adlandırmamış)"""
+    try:
+        return os.path.samestat(os.fstat(f.fileno()), os.stat(path))
+    except FileNotFoundError:
+        return False
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class AuditSink:
+    """Audit kayıtları için tamponlu, toplu yazıcı"""
+
+    def __init__(
+        self,
+        max_queue_size: int,
+        flush_interval: float,
+        batch_size: int,
+        spill_path: str,
+        dead_letter_path: str
+    ):
+        self.max_queue_size = max_queue_size
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.spill_path = spill_path
+        self.dead_letter_path = dead_letter_path
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._spill_lock = threading.Lock()
+        self._replay_lock = threading.Lock()
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.dead_lettered = 0
+        self.failures = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        await run_in_threadpool(self._replay_spill)
+        self._task = asyncio.create_task(self._run(), name="audit-sink")
+
+    async def stop(self) -> None:
+        """Kapanışta kuyruktaki tüm kayıtları yaz"""
+        if self.running:
+            await self._queue.put(_STOP)
+            await self._task
+        self._task = None
+
+        if self._queue is not None:
+            while not self._queue.empty():
+                await run_in_threadpool(self._flush, self._drain(self.batch_size))
+
+    async def submit(self, row: dict) -> None:
+        """Kaydı kuyruğa ekle; görev çalışmıyorsa doğrudan yaz"""
+        self.enqueued += 1
+
+        if not self.running:
+            await run_in_threadpool(self._flush, [row])
+            return
+
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            # Kuyruk doluysa istek bekletilmez, kayıt diske yazılır
+            await run_in_threadpool(self._spill, [row])
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._queue.get()
+            if first is _STOP:
+                return
+
+            batch = [first]
+            stopping = False
+            deadline = loop.time() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is _STOP:
+                    stopping = True
+                    break
+                batch.append(row)
+
+            await run_in_threadpool(self._flush, batch)
+            if stopping:
+                return
+
+    def _drain(self, limit: int) -> List[dict]:
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            row = self._queue.get_nowait()
+            if row is not _STOP:
+                batch.append(row)
+        return batch
+
+    def _flush(self, rows: List[dict]) -> None:
+        if not rows:
+            return
+        written, remaining = self._write(rows)
+        self.written += written
+        if remaining:
+            self.failures += 1
+            logger.error(f"Audit flush failed, spilling {len(remaining)} rows")
+            self._spill(remaining)
+            return
+
+        self.batches += 1
+        if os.path.exists(self.spill_path):
+            self._replay_spill()
+
+    def _insert(self, rows: List[dict]) -> None:
+        db = SessionLocal()
+        try:
+            db.execute(insert(AuditLog).values(rows))
+            db.commit()
+        finally:
+            db.close()
+
+    def _write(self, rows: List[dict]) -> Tuple[int, List[dict]]:
+        """
+        Satırları batch_size'lık partilerle yaz
+
+        Başarısız parti satır satır denenir; hatalı satırlar dead-letter
+        dosyasına gider. Veritabanı erişilemez olduğunda durulur.
+
+        Returns:
+            (yazılan satır sayısı, veritabanı erişilemediği için yazılamayanlar)
+        """
+        written = 0
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            try:
+                self._insert(batch)
+                written += len(batch)
+                continue
+            except Exception as e:
+                if _db_unavailable(e):
+                    logger.error(f"Audit insert failed: {str(e)}")
+                    return written, rows[start:]
+
+            for index, row in enumerate(batch):
+                try:
+                    self._insert([row])
+                    written += 1
+                except Exception as e:
+                    if _db_unavailable(e):
+                        logger.error(f"Audit insert failed: {str(e)}")
+                        return written, rows[start + index:]
+                    self._dead_letter(_encode(row), e)
+        return written, []
+
+    def _append(self, path: str, lines: List[str]) -> None:
+        """Satırları dosyaya süreçler arası kilit altında ekle ve diske yaz"""
+        with self._spill_lock:
+            while True:
+                with open(path, "a", encoding="utf-8") as f:
+                    if fcntl is not None:
+                        fcntl.flock(f, fcntl.LOCK_EX)
+                        # Kilidi beklerken dosya geri yükleme için devralındıysa
+                        # yeni dosyaya yaz
+                        if not _same_file(f, path):
+                            continue
+                    f.writelines(lines)
+                    f.flush()
+                    os.fsync(f.fileno())
+                    return
+
+    def _spill(self, rows: List[dict]) -> None:
+        self._append(self.spill_path, [_encode(row) for row in rows])
+        self.spilled += len(rows)
+
+    def _dead_letter(self, line: str, error: Exception) -> None:
+        logger.error(f"Audit row moved to dead letter file: {type(error).__name__}: {str(error)}")
+        record = {"error": f"{type(error).__name__}: {str(error)}"[:1000], "row": line.rstrip("\n")}
+        self._append(self.dead_letter_path, [json.dumps(record, ensure_ascii=False) + "\n"])
+        self.dead_lettered += 1
+
+    def _claim_spill(self) -> List[str]:
+        """
+        Geri yüklenecek dosyaları bu süreç adına devral
+
+        Spill dosyası kilit altında <spill>.<pid>.replay olarak yeniden
+        adlandırılır; geri yükleme sırasında çökmüş süreçlerin devraldığı
+        dosyalar da toplanır.
+        """
+        claimed = []
+        for path in glob.glob(glob.escape(self.spill_path) + ".*.replay"):
+            pid = path[len(self.spill_path) + 1:-len(".replay")]
+            if pid.isdigit() and int(pid) != os.getpid() and not _process_alive(int(pid)):
+                claimed.append(path)
+
+        target = f"{self.spill_path}.{os.getpid()}.replay"
+        if os.path.exists(target):
+            claimed.append(target)
+        else:
+            try:
+                with open(self.spill_path, "rb") as f:
+                    if fcntl is not None:
+                        fcntl.flock(f, fcntl.LOCK_EX)
+                    if _same_file(f, self.spill_path):
+                        os.rename(self.spill_path, target)
+                        claimed.append(target)
+            except FileNotFoundError:
+                pass
+        return claimed
+
+    def _replay_spill(self) -> None:
+        """Spill dosyasındaki kayıtları partiler halinde geri yükle"""
+        # Süreç içinde tek geri yükleme; sürmekteyse diğer thread beklemez
+        if not self._replay_lock.acquire(blocking=False):
+            return
+        try:
+            self._replay_claimed()
+        finally:
+            self._replay_lock.release()
+
+    def _replay_claimed(self) -> None:
+        for path in self._claim_spill():
+            rows = []
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        row = json.loads(line)
+                        row["created_at"] = datetime.fromisoformat(row["created_at"])
+                    except (ValueError, KeyError, TypeError) as e:
+                        self._dead_letter(line, e)
+                        continue
+                    rows.append(row)
+
+            written, remaining = self._write(rows)
+            if remaining:
+                # Veritabanı yine erişilemez: kalanlar spill dosyasına geri döner
+                self._append(self.spill_path, [_encode(row) for row in remaining])
+            os.remove(path)
+            self.replayed += written
+            if written:
+                logger.info(f"Replayed {written} spilled audit rows")
+            if remaining:
+                logger.error(f"Audit spill replay stopped, {len(remaining)} rows remain spilled")
+                return
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_size": self.max_queue_size,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "dead_lettered": self.dead_lettered,
+            "failures": self.failures,
+        }
+
+
+def audit_row(
+    user_id: int,
+    action: str,
+    resource_type: str,
+    resource_id: int = None,
+    description: str = None,
+    changes: dict = None,
+    ip_address: str = None,
+    user_agent: str = None
+) -> dict:
+    """AuditLog INSERT satırı (zaman damgası olay anında alınır)"""
+    return {
+        "user_id": user_id,
+        "action": action,
+        "resource_type": resource_type,
+        "resource_id": resource_id,
+        "description": description,
+        # JSON sütununa yazılabilir olsun (datetime, Enum, Decimal)
+        "changes": json.loads(json.dumps(changes, default=str)) if changes is not None else None,
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+audit_sink = AuditSink(
+    max_queue_size=settings.AUDIT_QUEUE_MAX_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    batch_size=settings.AUDIT_FLUSH_BATCH_SIZE,
+    spill_path=settings.AUDIT_SPILL_PATH,
+    dead_letter_path=settings.AUDIT_DEAD_LETTER_PATH
+)
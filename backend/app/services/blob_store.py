@@ -0,0 +1,230 @@
+"""
+Blob Store - İçerik adresli (SHA-256) evrak depolama
+
+Aynı içerik kaç kez yüklenirse yüklensin depoda tek kopya tutulur:
+blobs/<ilk 2 hane>/<sha256> anahtarı (depolama arka ucu STORAGE_PROVIDER,
+bkz. app.services.storage). Her Document satırı bir blob referansıdır;
+document_blobs.ref_count bu referansları sayar ve dosya yalnızca son
+referans silindiğinde depodan kaldırılır.
+
+Eşzamanlılık: referans sayacı satır kilidiyle (upsert / SELECT ... FOR
+UPDATE) değiştirilir. Silme sırasında dosya commit'ten önce geçici bir
+anahtara (tombstone) taşınır, commit başarılı olursa silinir, başarısız
+olursa geri alınır. Böylece aynı içeriği o anda yükleyen bir istek,
+silinmek üzere olan dosyaya referans vermez.
+
+Önizleme görselleri blob'un yanında <blob anahtarı>.thumb.<biçim>
+anahtarlarıyla saklanır (bkz. app.services.thumbnails) ve blob ile
+birlikte silinir; arama için çıkarılan metin (document_texts) de son
+referansla birlikte silinir.
+"""
+from typing import Optional
+import logging
+import os
+import uuid
+
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.dialects import postgresql, sqlite
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.models.blob import DocumentBlob, DocumentText
+from app.services.storage import get_storage_service
+from app.services.thumbnail_render import OUTPUT_FORMATS
+
+logger = logging.getLogger(__name__)
+
+BLOB_PREFIX = "blobs"
+# Yüklemeler önce buraya yazılır (local depolamada hedefle aynı dosya sistemi)
+TMP_DIR = os.path.join(settings.UPLOAD_DIR, BLOB_PREFIX, "tmp")
+# Önizleme anahtarı: <blob anahtarı>.thumb.<biçim>
+THUMBNAIL_MARKER = ".thumb."
+
+
+def blob_relative_path(sha256: str) -> str:
+    """Document.file_path olarak saklanan yol (uploads/ altına göre)"""
+    return f"{BLOB_PREFIX}/{sha256[:2]}/{sha256}"
+
+
+def thumbnail_path(sha256: str, fmt: str) -> str:
+    """Blob'un önizleme görselinin depolama anahtarı"""
+    return f"{blob_relative_path(sha256)}{THUMBNAIL_MARKER}{fmt}"
+
+
+def is_blob_path(file_path: str) -> bool:
+    return file_path.startswith(f"{BLOB_PREFIX}/")
+
+
+def _place_file(tmp_path: str, file_path: str) -> None:
+    """Geçici dosyayı blob anahtarına yaz; içerik zaten varsa geçiciyi sil"""
+    storage = get_storage_service()
+    if storage.exists(file_path):
+        os.remove(tmp_path)
+        return
+    # Aynı içerik aynı anahtara yazıldığı için yarış durumunda üzerine yazmak zararsızdır
+    storage.store_file(file_path, tmp_path)
+
+
+def _upsert_statement(dialect_name: str, sha256: str, size: int, file_path: str):
+    values = {"sha256": sha256, "size": size, "file_path": file_path, "ref_count": 1}
+    if dialect_name == "postgresql":
+        stmt = postgresql.insert(DocumentBlob).values(**values)
+    elif dialect_name == "sqlite":
+        stmt = sqlite.insert(DocumentBlob).values(**values)
+    else:
+        return None
+    return stmt.on_conflict_do_update(
+        index_elements=[DocumentBlob.sha256],
+        set_={"ref_count": DocumentBlob.ref_count + 1}
+    )
+
+
+async def acquire_blob(db, sha256: str, size: int, tmp_path: str) -> str:
+    """
+    Blob referansını bir artır ve geçici dosyayı içerik adresine yerleştir
+
+    Commit çağırana aittir (Document satırıyla aynı transaction'da).
+    Commit başarısız olursa diskte kalan blob dosyası zararsızdır; aynı
+    içerik tekrar yüklendiğinde yeniden kullanılır.
+
+    Returns:
+        str: Document.file_path değeri
+    """
+    file_path = blob_relative_path(sha256)
+    stmt = _upsert_statement(db.bind.dialect.name, sha256, size, file_path)
+
+    if stmt is not None:
+        await db.execute(stmt)
+    else:
+        blob = await db.scalar(
+            select(DocumentBlob).where(DocumentBlob.sha256 == sha256).with_for_update()
+        )
+        if blob:
+            blob.ref_count += 1
+        else:
+            db.add(DocumentBlob(sha256=sha256, size=size, file_path=file_path, ref_count=1))
+        await db.flush()
+
+    # Satır kilidi alındıktan sonra dosya yerleştirilir (bkz. release_blob)
+    await run_in_threadpool(_place_file, tmp_path, file_path)
+    return file_path
+
+
+async def release_blob(db, sha256: str) -> Optional[str]:
+    """
+    Blob referansını bir azalt; son referanssa satırı sil
+
+    Commit çağırana aittir. Son referans silindiyse dosya tombstone
+    anahtarına taşınır ve bu anahtar döner; commit sonrası finalize_release,
+    hata durumunda restore_release çağrılmalıdır.
+
+    Returns:
+        Optional[str]: Tombstone anahtarı (dosya silinecekse)
+    """
+    blob = await db.scalar(
+        select(DocumentBlob).where(DocumentBlob.sha256 == sha256).with_for_update()
+    )
+    if blob is None:
+        logger.warning(f"Blob row missing for {sha256}")
+        return None
+
+    if blob.ref_count > 1:
+        await db.execute(
+            update(DocumentBlob)
+            .where(DocumentBlob.sha256 == sha256)
+            .values(ref_count=DocumentBlob.ref_count - 1)
+        )
+        return None
+
+    await db.execute(delete(DocumentBlob).where(DocumentBlob.sha256 == sha256))
+    await db.execute(delete(DocumentText).where(DocumentText.sha256 == sha256))
+
+    tombstone = f"{blob.file_path}.{uuid.uuid4().hex}.deleting"
+    try:
+        await run_in_threadpool(get_storage_service().move, blob.file_path, tombstone)
+    except FileNotFoundError:
+        return None
+    return tombstone
+
+
+def _original_path(tombstone: str) -> str:
+    return tombstone.rsplit(".", 2)[0]
+
+
+async def finalize_release(tombstone: Optional[str]) -> None:
+    """Commit başarılı: tombstone dosyasını ve önizleme görsellerini sil"""
+    if not tombstone:
+        return
+    sha256 = _original_path(tombstone).rsplit("/", 1)[-1]
+    for key in [tombstone, *(thumbnail_path(sha256, fmt) for fmt in OUTPUT_FORMATS)]:
+        try:
+            await run_in_threadpool(get_storage_service().delete, key)
+        except Exception as e:
+            # Silme zaten commit edildi; kalan dosyaları storage.reconcile temizler
+            logger.error(f"Blob cleanup failed for {key}: {str(e)}")
+
+
+async def restore_release(tombstone: Optional[str]) -> None:
+    """Commit başarısız: dosyayı eski adına geri taşı"""
+    if not tombstone:
+        return
+    try:
+        await run_in_threadpool(get_storage_service().move, tombstone, _original_path(tombstone))
+    except Exception as e:
+        logger.error(f"Blob restore failed for {tombstone}: {str(e)}")
+
+
+def discard_temp(tmp_path: str) -> None:
+    try:
+        os.remove(tmp_path)
+    except FileNotFoundError:
+        pass
+
+
+def download_to_temp(file_path: str) -> str:
+    """
+    Uzak depodaki blob'u işlemek için TMP_DIR'e indir (senkron)
+
+    Geçici dosyayı silmek (discard_temp) çağırana aittir.
+
+    Raises:
+        FileNotFoundError: Nesne depoda yok
+    """
+    os.makedirs(TMP_DIR, exist_ok=True)
+    tmp_path = os.path.join(TMP_DIR, f"{uuid.uuid4().hex}.source")
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in get_storage_service().open_range(file_path):
+                f.write(chunk)
+    except BaseException:
+        discard_temp(tmp_path)
+        raise
+    return tmp_path
+
+
+def dedup_report(db) -> dict:
+    """
+    Deduplikasyon raporu (senkron Session)
+
+    logical_bytes: Her Document ayrı dosya olsaydı kullanılacak alan
+    physical_bytes: Depoda gerçekten kullanılan alan
+    """
+    blobs, shared, references, logical, physical = db.execute(
+        select(
+            func.count(DocumentBlob.sha256),
+            func.count(DocumentBlob.sha256).filter(DocumentBlob.ref_count > 1),
+            func.coalesce(func.sum(DocumentBlob.ref_count), 0),
+            func.coalesce(func.sum(DocumentBlob.size * DocumentBlob.ref_count), 0),
+            func.coalesce(func.sum(DocumentBlob.size), 0),
+        )
+    ).one()
+
+    return {
+        "blobs": blobs,
+        "shared_blobs": shared,
+        "references": references,
+        "logical_bytes": logical,
+        "physical_bytes": physical,
+        "saved_bytes": logical - physical,
+        "dedup_ratio": round(logical / physical, 3) if physical else 1.0,
+    }
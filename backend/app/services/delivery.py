@@ -0,0 +1,282 @@
+"""
+Delivery - Harici kanallardan (email, SMS) bildirim gönderimi
+
+Harici kanal tipindeki bildirimler is_sent=False olarak oluşturulur.
+Aynı transaction'da (UnitOfWork.commit) kanalın gönderim görevi tekil
+anahtarla kuyruğa alınır; görev bekleyen satırları partiler halinde
+gönderir. Periyodik kopyası (NOTIFICATION_DELIVERY_INTERVAL_SECONDS)
+geri çekilme süresi dolan geçici hataları yeniden dener.
+
+Satırlar gönderim süresince kilitli tutulmaz: UPDATE ... WHERE id IN
+(SELECT ... FOR UPDATE SKIP LOCKED) RETURNING ile next_attempt_at
+ileri alınarak kiralanır (jobs tablosuyla aynı yöntem), kısa
+transaction commit edilir. Böylece gönderim sırasında okundu işaretleme
+beklemez; eşzamanlı çalışan görevler aynı satırı iki kez almaz.
+
+Sonuç:
+- gönderildi: is_sent=True, sent_at mesajın sağlayıcıya kabul edildiği an
+- geçici hata (bağlantı, 4xx): delivery_error, next_attempt_at = geri çekilme
+- kalıcı hata (5xx, geçersiz alıcı) veya deneme hakkı bitti:
+  delivery_attempts = max, satır bir daha denenmez
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence
+import logging
+import time
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.notification import Notification, NotificationType
+from app.models.user import User
+from app.services.jobs import retry_delay, unique_job_statement, utcnow
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_QUEUE = "notifications"
+
+# Kanal tipi -> gönderim görevi (app.tasks.notifications)
+CHANNEL_TASKS: Dict[NotificationType, str] = {
+    NotificationType.EMAIL: "notifications.deliver_email",
+    NotificationType.SMS: "notifications.deliver_sms",
+}
+
+
+class TransientDeliveryError(Exception):
+    """Yeniden denenebilir gönderim hatası (bağlantı, zaman aşımı, sağlayıcı limiti)"""
+
+
+class PermanentDeliveryError(Exception):
+    """Yeniden denenmemesi gereken gönderim hatası (geçersiz alıcı, reddedilen içerik)"""
+
+
+def requires_delivery(notification_type) -> bool:
+    """Bildirim harici bir kanaldan gönderilecekse True (is_sent=False oluşturulur)"""
+    return notification_type in CHANNEL_TASKS
+
+
+class DeliveryResult:
+    """Tek bildirimin gönderim sonucu"""
+
+    __slots__ = ("notification_id", "sent_at", "error", "permanent")
+
+    def __init__(
+        self,
+        notification_id: int,
+        sent_at: Optional[datetime] = None,
+        error: Optional[str] = None,
+        permanent: bool = False
+    ):
+        self.notification_id = notification_id
+        self.sent_at = sent_at
+        self.error = error
+        self.permanent = permanent
+
+    @classmethod
+    def sent(cls, notification_id: int, sent_at: Optional[datetime] = None) -> "DeliveryResult":
+        return cls(notification_id, sent_at=sent_at or utcnow())
+
+    @classmethod
+    def failed(cls, notification_id: int, error: str, permanent: bool = False) -> "DeliveryResult":
+        return cls(notification_id, error=error, permanent=permanent)
+
+
+class DeliveryChannel:
+    """
+    Harici kanal arayüzü
+
+    Alt sınıflar notification_type, recipient_field (User alan adı) ve
+    send_batch'i tanımlar. send_batch her satır için bir DeliveryResult
+    döndürür ve hata fırlatmaz.
+    """
+
+    notification_type: NotificationType
+    recipient_field: str
+    batch_size: int = 100
+    max_attempts: int = 5
+
+    @property
+    def enabled(self) -> bool:
+        return True
+
+    def send_batch(self, rows: Sequence[dict]) -> List[DeliveryResult]:
+        raise NotImplementedError
+
+
+def wake_statements(dialect_name: str, notification_types: Iterable) -> list:
+    """
+    Bekletilen bildirimlerin kanal görevlerini tekil anahtarla kuyruğa alan
+    ifadeler (bildirimlerle aynı transaction'da çalıştırılır)
+
+    Görev zaten bekliyorsa veya çalışıyorsa ifade etkisizdir; çalışan görev
+    yeni satırları da alır, kaçırılanları periyodik kopya toplar.
+    """
+    statements = []
+    for job_task in sorted({CHANNEL_TASKS[t] for t in notification_types if t in CHANNEL_TASKS}):
+        stmt = unique_job_statement(
+            dialect_name, job_task, f"wake:{job_task}", queue=DELIVERY_QUEUE
+        )
+        if stmt is not None:
+            statements.append(stmt)
+    return statements
+
+
+def _pending(channel: DeliveryChannel, now: datetime):
+    return (
+        Notification.notification_type == channel.notification_type,
+        Notification.is_sent == False,
+        Notification.delivery_attempts < channel.max_attempts,
+        or_(Notification.next_attempt_at.is_(None), Notification.next_attempt_at <= now),
+    )
+
+
+def claim_pending(db: Session, channel: DeliveryChannel) -> List[dict]:
+    """
+    Bekleyen en fazla batch_size bildirimi kirala (commit edilir)
+
+    Returns:
+        List[dict]: id, user_id, title, message, link, delivery_attempts,
+        full_name, recipient
+    """
+    now = utcnow()
+    ready = (
+        select(Notification.id)
+        .where(*_pending(channel, now))
+        .order_by(Notification.id)
+        .limit(channel.batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    rows = db.execute(
+        update(Notification)
+        .where(Notification.id.in_(ready.scalar_subquery()))
+        .values(
+            delivery_attempts=Notification.delivery_attempts + 1,
+            next_attempt_at=now + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+        )
+        .returning(
+            Notification.id, Notification.user_id, Notification.title,
+            Notification.message, Notification.link, Notification.delivery_attempts
+        )
+        .execution_options(synchronize_session=False)
+    ).mappings().all()
+    db.commit()
+    if not rows:
+        return []
+
+    users = {
+        user_id: (full_name, recipient)
+        for user_id, full_name, recipient in db.execute(
+            select(User.id, User.full_name, getattr(User, channel.recipient_field))
+            .where(User.id.in_({row["user_id"] for row in rows}))
+        ).all()
+    }
+    db.rollback()
+
+    claimed = []
+    for row in sorted(rows, key=lambda row: row["id"]):
+        full_name, recipient = users.get(row["user_id"], (None, None))
+        claimed.append({**row, "full_name": full_name, "recipient": recipient})
+    return claimed
+
+
+def record_results(
+    db: Session,
+    channel: DeliveryChannel,
+    rows: Sequence[dict],
+    results: Sequence[DeliveryResult]
+) -> Dict[str, int]:
+    """Sonuçları birincil anahtarla toplu UPDATE olarak yaz ve commit et"""
+    attempts = {row["id"]: row["delivery_attempts"] for row in rows}
+    counts = {"sent": 0, "retry": 0, "failed": 0}
+    updates = []
+    for result in results:
+        if result.sent_at is not None:
+            counts["sent"] += 1
+            updates.append({
+                "id": result.notification_id,
+                "is_sent": True,
+                "sent_at": result.sent_at,
+                "delivery_error": None,
+                "next_attempt_at": None,
+            })
+            continue
+
+        attempt = attempts[result.notification_id]
+        error = (result.error or "unknown error")[:1000]
+        if result.permanent or attempt >= channel.max_attempts:
+            counts["failed"] += 1
+            updates.append({
+                "id": result.notification_id,
+                "delivery_attempts": channel.max_attempts,
+                "delivery_error": error,
+                "next_attempt_at": None,
+            })
+        else:
+            counts["retry"] += 1
+            updates.append({
+                "id": result.notification_id,
+                "delivery_error": error,
+                "next_attempt_at": utcnow() + timedelta(seconds=retry_delay(attempt)),
+            })
+
+    if updates:
+        db.execute(update(Notification), updates)
+        db.commit()
+    return counts
+
+
+def deliver_pending(db: Session, channel: DeliveryChannel, deadline: Optional[float] = None) -> dict:
+    """
+    Kanalın bekleyen bildirimlerini kuyruk boşalana veya deadline'a
+    (time.monotonic) kadar partiler halinde gönder
+
+    Returns:
+        dict: sent, retry, failed, batches, more (deadline doldu, satır kaldı)
+    """
+    report = {"sent": 0, "retry": 0, "failed": 0, "batches": 0, "more": False}
+    if not channel.enabled:
+        logger.warning(f"{channel.notification_type.value} channel is not configured; skipping delivery")
+        return report
+
+    while True:
+        if deadline is not None and time.monotonic() >= deadline:
+            report["more"] = True
+            break
+
+        rows = claim_pending(db, channel)
+        if not rows:
+            break
+
+        results = channel.send_batch(rows)
+        for key, value in record_results(db, channel, rows, results).items():
+            report[key] += value
+        report["batches"] += 1
+
+        if len(rows) < channel.batch_size:
+            break
+
+    return report
+
+
+def delivery_stats(db: Session) -> dict:
+    """Kanal başına bekleyen (yeniden denenecekler dahil) ve kalıcı olarak başarısız bildirim sayıları"""
+    failed = (Notification.delivery_error.is_not(None), Notification.next_attempt_at.is_(None))
+    rows = db.execute(
+        select(
+            Notification.notification_type,
+            func.count(Notification.id).filter(
+                or_(Notification.delivery_error.is_(None), Notification.next_attempt_at.is_not(None))
+            ),
+            func.count(Notification.id).filter(*failed),
+        )
+        .where(
+            Notification.is_sent == False,
+            Notification.notification_type.in_(list(CHANNEL_TASKS))
+        )
+        .group_by(Notification.notification_type)
+    ).all()
+    return {
+        notification_type.value: {"pending": pending, "failed": failed_count}
+        for notification_type, pending, failed_count in rows
+    }
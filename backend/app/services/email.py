@@ -0,0 +1,289 @@
+"""
+Email - SMTP ile bildirim gönderimi
+
+NotificationType.EMAIL bildirimleri app.tasks.notifications.deliver_email
+görevi tarafından partiler halinde gönderilir (bkz. app.services.delivery).
+
+- Bağlantı havuzu: SMTP_POOL_SIZE adet uzun ömürlü bağlantı yeniden
+  kullanılır (her mesaj için TCP + TLS + AUTH yapılmaz). Bir süre boşta
+  kalan bağlantı NOOP ile yoklanır; SMTP_MAX_MESSAGES_PER_CONNECTION
+  mesajdan sonra kapatılıp yenisi açılır.
+- Hız sınırı: sağlayıcı (SMTP sunucusu) başına token bucket
+  (EMAIL_RATE_LIMIT_PER_SECOND).
+- Hata sınıflandırması: bağlantı kopması, zaman aşımı ve 4xx yanıtlar
+  geçicidir (geri çekilmeyle yeniden denenir); 5xx yanıtlar ve geçersiz
+  alıcı kalıcıdır.
+
+Yük testi için ağ gerektirmeyen yerel sunucu: backend/smtp_sink.py
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from email.message import EmailMessage
+from email.utils import formataddr, make_msgid
+from typing import List, Optional, Sequence
+import logging
+import queue
+import smtplib
+import ssl
+import threading
+import time
+
+from app.core.config import settings
+from app.core.rate_limit import get_rate_limiter
+from app.models.notification import NotificationType
+from app.services.delivery import (
+    DeliveryChannel,
+    DeliveryResult,
+    PermanentDeliveryError,
+    TransientDeliveryError,
+)
+from app.services.jobs import utcnow
+
+logger = logging.getLogger(__name__)
+
+# Yer tutucu adresler (admin panelinden e-postasız oluşturulan müvekkiller)
+UNDELIVERABLE_DOMAINS = ("@noemail.koptay.av.tr",)
+# Bu süreden uzun boşta kalan bağlantı kullanılmadan önce NOOP ile yoklanır
+IDLE_CHECK_SECONDS = 30.0
+
+
+class _PooledConnection:
+    def __init__(self, client: smtplib.SMTP):
+        self.client = client
+        self.messages = 0
+        self.last_used = time.monotonic()
+
+    def close(self) -> None:
+        try:
+            self.client.quit()
+        except Exception:
+            try:
+                self.client.close()
+            except Exception:
+                pass
+
+
+class SMTPConnectionPool:
+    """Thread'ler arasında paylaşılan, boyutu sınırlı SMTP bağlantı havuzu"""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str = "",
+        password: str = "",
+        security: str = "starttls",
+        size: int = 2,
+        max_messages: int = 100,
+        timeout: float = 10.0
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.security = security
+        self.size = max(size, 1)
+        self.max_messages = max_messages
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[_PooledConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.discarded = 0
+
+    def _connect(self) -> _PooledConnection:
+        if self.security == "ssl":
+            client = smtplib.SMTP_SSL(
+                self.host, self.port, timeout=self.timeout,
+                context=ssl.create_default_context()
+            )
+        else:
+            client = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.security == "starttls":
+                client.starttls(context=ssl.create_default_context())
+        if self.username:
+            client.login(self.username, self.password)
+        with self._lock:
+            self.opened += 1
+        return _PooledConnection(client)
+
+    def _checkout(self) -> _PooledConnection:
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if time.monotonic() - connection.last_used < IDLE_CHECK_SECONDS:
+                return connection
+            try:
+                if connection.client.noop()[0] == 250:
+                    return connection
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._discard(connection)
+
+    def _discard(self, connection: _PooledConnection) -> None:
+        connection.close()
+        with self._lock:
+            self.discarded += 1
+
+    @contextmanager
+    def connection(self):
+        """
+        Havuzdan bağlantı al (havuz doluysa boşalana kadar bekler)
+
+        Blok bağlantı/protokol hatası fırlatırsa bağlantı kapatılır (oturum
+        durumu belirsizdir).
+        """
+        self._slots.acquire()
+        try:
+            connection = self._checkout()
+            try:
+                yield connection.client
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError):
+                # Sunucu mesajı reddetti; smtplib oturumu RSET ile sıfırladı
+                self._release(connection)
+                raise
+            except BaseException:
+                self._discard(connection)
+                raise
+            self._release(connection)
+        finally:
+            self._slots.release()
+
+    def _release(self, connection: _PooledConnection) -> None:
+        connection.messages += 1
+        connection.last_used = time.monotonic()
+        if connection.messages >= self.max_messages:
+            self._discard(connection)
+        else:
+            self._idle.put(connection)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def classify_smtp_error(error: Exception) -> Exception:
+    """smtplib hatasını geçici / kalıcı gönderim hatasına çevir"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        message = f"Recipient refused: {error.recipients}"
+        if codes and all(code >= 500 for code in codes):
+            return PermanentDeliveryError(message)
+        return TransientDeliveryError(message)
+    if isinstance(error, smtplib.SMTPResponseException):
+        message = f"SMTP {error.smtp_code}: {error.smtp_error!r}"
+        if error.smtp_code >= 500:
+            return PermanentDeliveryError(message)
+        return TransientDeliveryError(message)
+    if isinstance(error, (smtplib.SMTPServerDisconnected, OSError)):
+        return TransientDeliveryError(f"Connection error: {error}")
+    if isinstance(error, smtplib.SMTPException):
+        return TransientDeliveryError(str(error))
+    return PermanentDeliveryError(f"{type(error).__name__}: {error}")
+
+
+def build_message(row: dict, sender: str) -> EmailMessage:
+    """Bildirim satırından düz metin e-posta"""
+    message = EmailMessage()
+    message["Subject"] = row["title"]
+    message["From"] = formataddr((settings.APP_NAME, sender))
+    message["To"] = formataddr((row.get("full_name") or "", row["recipient"]))
+    message["Message-ID"] = make_msgid(domain=sender.rpartition("@")[2] or None)
+
+    body = f"Sayın {row['full_name']},\n\n{row['message']}\n" if row.get("full_name") else f"{row['message']}\n"
+    if row.get("link"):
+        body += f"\nDetay: {row['link']}\n"
+    message.set_content(body)
+    return message
+
+
+class EmailChannel(DeliveryChannel):
+    """SMTP üzerinden NotificationType.EMAIL gönderimi"""
+
+    notification_type = NotificationType.EMAIL
+    recipient_field = "email"
+
+    def __init__(self):
+        self._pool: Optional[SMTPConnectionPool] = None
+        self._pool_lock = threading.Lock()
+
+    @property
+    def batch_size(self) -> int:
+        return settings.EMAIL_BATCH_SIZE
+
+    @property
+    def max_attempts(self) -> int:
+        return settings.EMAIL_MAX_ATTEMPTS
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.SMTP_HOST)
+
+    @property
+    def pool(self) -> SMTPConnectionPool:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = SMTPConnectionPool(
+                    host=settings.SMTP_HOST,
+                    port=settings.SMTP_PORT,
+                    username=settings.SMTP_USER,
+                    password=settings.SMTP_PASSWORD,
+                    security=settings.SMTP_SECURITY,
+                    size=settings.SMTP_POOL_SIZE,
+                    max_messages=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+                    timeout=settings.SMTP_TIMEOUT_SECONDS
+                )
+            return self._pool
+
+    def close(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
+
+    def _send(self, message: EmailMessage) -> None:
+        get_rate_limiter(
+            f"smtp:{settings.SMTP_HOST}", settings.EMAIL_RATE_LIMIT_PER_SECOND
+        ).acquire()
+        try:
+            # Havuzdaki bağlantı sunucu tarafında kapatılmış olabilir: bir kez yeni bağlantıyla dene
+            for attempt in range(2):
+                try:
+                    with self.pool.connection() as client:
+                        client.send_message(message)
+                    return
+                except smtplib.SMTPServerDisconnected:
+                    if attempt:
+                        raise
+        except Exception as e:
+            raise classify_smtp_error(e) from e
+
+    def send_one(self, row: dict) -> DeliveryResult:
+        recipient = row.get("recipient")
+        if not recipient or "@" not in recipient or recipient.endswith(UNDELIVERABLE_DOMAINS):
+            return DeliveryResult.failed(row["id"], f"No deliverable address: {recipient!r}", permanent=True)
+
+        try:
+            self._send(build_message(row, settings.SMTP_FROM or settings.SMTP_USER))
+        except TransientDeliveryError as e:
+            return DeliveryResult.failed(row["id"], str(e))
+        except PermanentDeliveryError as e:
+            return DeliveryResult.failed(row["id"], str(e), permanent=True)
+        # Sunucu mesajı kabul ettiği an
+        return DeliveryResult.sent(row["id"], utcnow())
+
+    def send_batch(self, rows: Sequence[dict]) -> List[DeliveryResult]:
+        with ThreadPoolExecutor(max_workers=self.pool.size, thread_name_prefix="smtp") as executor:
+            results = list(executor.map(self.send_one, rows))
+        failed = sum(1 for result in results if result.sent_at is None)
+        if failed:
+            logger.warning(f"Email batch: {len(results) - failed} sent, {failed} failed")
+        return results
+
+
+email_channel = EmailChannel()
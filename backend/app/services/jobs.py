@@ -0,0 +1,306 @@
+"""
+Jobs - Veritabanı tabanlı arka plan iş kuyruğu
+
+İşler jobs tablosuna istek transaction'ı içinde eklenir (commit edilmezse
+iş de oluşmaz) ve python -m app.worker tarafından çalıştırılır:
+
+    from app.services.jobs import enqueue
+    from app.tasks.notifications import reconcile_counters
+
+    enqueue(uow, reconcile_counters, {}, delay_seconds=60)
+    await uow.commit()
+
+Dequeue, Postgres'te UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP
+LOCKED LIMIT n) RETURNING ile yapılır: aynı kuyruğu okuyan worker'lar
+birbirinin kilitlediği satırları atlar, beklemez. SQLite'ta (yerel test)
+FOR UPDATE yoktur; yazma işlemleri zaten sıralı olduğundan aynı ifade tek
+worker için doğru çalışır.
+
+Alınan iş locked_until'e kadar kiralanır (lease). Worker çökerse süre
+dolunca iş yeniden alınır. Başarısız iş üstel geri çekilmeyle (backoff)
+yeniden planlanır; max_attempts dolunca dead_jobs tablosuna taşınır.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Union
+import random
+
+from sqlalchemy import delete, func, insert, literal, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.job import DeadJob, Job
+
+
+class TaskSpec:
+    """Kayıtlı görev: işleyici fonksiyon + kuyruk/deneme/zaman aşımı ayarları"""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        queue: str,
+        max_attempts: int,
+        timeout_seconds: float,
+        every_seconds: Optional[float]
+    ):
+        self.name = name
+        self.func = func
+        self.queue = queue
+        self.max_attempts = max_attempts
+        self.timeout_seconds = timeout_seconds
+        self.every_seconds = every_seconds
+
+
+TASKS: Dict[str, TaskSpec] = {}
+
+
+def task(
+    name: str,
+    queue: str = "default",
+    max_attempts: Optional[int] = None,
+    timeout_seconds: Optional[float] = None,
+    every_seconds: Optional[float] = None
+):
+    """
+    Görev kaydı (decorator)
+
+    İşleyici payload dict'ini alır; async veya senkron olabilir (senkron
+    işleyiciler thread havuzunda çalışır). every_seconds verilirse görev
+    worker tarafından o aralıkla periyodik olarak kuyruğa alınır (0 veya
+    None: periyodik değil).
+    """
+    def decorator(func: Callable) -> Callable:
+        func.task_spec = TaskSpec(
+            name=name,
+            func=func,
+            queue=queue,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            # Kira süresi dolmadan iş zaman aşımına uğramalı
+            timeout_seconds=min(
+                timeout_seconds or settings.JOB_TIMEOUT_SECONDS,
+                settings.JOB_LEASE_SECONDS - 30
+            ),
+            every_seconds=every_seconds or None
+        )
+        TASKS[name] = func.task_spec
+        return func
+    return decorator
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _resolve(job_task: Union[Callable, str, TaskSpec]):
+    if isinstance(job_task, TaskSpec):
+        return job_task, job_task.name
+    spec = getattr(job_task, "task_spec", None) or TASKS.get(job_task)
+    return spec, (spec.name if spec else job_task)
+
+
+def enqueue(
+    db,
+    job_task: Union[Callable, str],
+    payload: Optional[dict] = None,
+    delay_seconds: float = 0,
+    queue: Optional[str] = None,
+    max_attempts: Optional[int] = None
+) -> Job:
+    """
+    İşi çağıranın transaction'ına ekle (commit çağırana aittir)
+
+    Args:
+        db: Session, AsyncSession, SyncSessionAdapter veya UnitOfWork
+        job_task: @task ile kaydedilmiş fonksiyon veya görev adı
+        payload: JSON'a çevrilebilir argümanlar
+        delay_seconds: En erken çalışma zamanı (şimdiden itibaren)
+    """
+    spec, name = _resolve(job_task)
+
+    job = Job(
+        queue=queue or (spec.queue if spec else "default"),
+        task=name,
+        payload=payload or {},
+        attempts=0,
+        max_attempts=max_attempts or (spec.max_attempts if spec else settings.JOB_MAX_ATTEMPTS),
+        run_at=utcnow() + timedelta(seconds=delay_seconds)
+    )
+    db.add(job)
+    return job
+
+
+def claim_jobs(db: Session, queue: str, limit: int, worker_id: str) -> List[dict]:
+    """
+    Kuyruktan en fazla limit kadar hazır işi kirala ve commit et
+
+    Returns:
+        List[dict]: id, task, payload, attempts, max_attempts
+    """
+    now = utcnow()
+    ready = (
+        select(Job.id)
+        .where(
+            Job.queue == queue,
+            Job.run_at <= now,
+            or_(Job.locked_until.is_(None), Job.locked_until < now)
+        )
+        .order_by(Job.run_at, Job.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    rows = db.execute(
+        update(Job)
+        .where(Job.id.in_(ready.scalar_subquery()))
+        .values(
+            locked_until=now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+            locked_by=worker_id,
+            attempts=Job.attempts + 1
+        )
+        .returning(Job.id, Job.task, Job.payload, Job.attempts, Job.max_attempts)
+        .execution_options(synchronize_session=False)
+    ).mappings().all()
+    db.commit()
+    return [dict(row) for row in rows]
+
+
+def complete_job(db: Session, job_id: int, worker_id: str) -> None:
+    """Başarılı iş silinir (kira başka worker'a geçtiyse dokunulmaz)"""
+    db.execute(delete(Job).where(Job.id == job_id, Job.locked_by == worker_id))
+    db.commit()
+
+
+def retry_delay(attempts: int) -> float:
+    """Üstel geri çekilme + rastgele sapma (aynı anda düşen işler yığılmasın)"""
+    base = settings.JOB_RETRY_BASE_SECONDS
+    delay = min(base * 2 ** (attempts - 1), settings.JOB_RETRY_MAX_SECONDS)
+    return delay + random.uniform(0, base)
+
+
+def fail_job(db: Session, job: dict, worker_id: str, error: str, permanent: bool = False) -> bool:
+    """
+    Başarısız işi yeniden planla veya dead_jobs'a taşı
+
+    Returns:
+        bool: İş dead_jobs'a taşındıysa True
+    """
+    owned = (Job.id == job["id"], Job.locked_by == worker_id)
+    error = error[:4000]
+
+    if permanent or job["attempts"] >= job["max_attempts"]:
+        db.execute(
+            insert(DeadJob).from_select(
+                ["job_id", "queue", "task", "payload", "attempts", "last_error", "created_at"],
+                select(
+                    Job.id, Job.queue, Job.task, Job.payload, Job.attempts,
+                    literal(error), Job.created_at
+                ).where(*owned)
+            )
+        )
+        db.execute(delete(Job).where(*owned))
+        db.commit()
+        return True
+
+    db.execute(
+        update(Job)
+        .where(*owned)
+        .values(
+            run_at=utcnow() + timedelta(seconds=retry_delay(job["attempts"])),
+            locked_until=None,
+            locked_by=None,
+            last_error=error
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return False
+
+
+def unique_job_statement(
+    dialect_name: str,
+    job_task: Union[Callable, str],
+    unique_key: str,
+    delay_seconds: float = 0,
+    payload: Optional[dict] = None,
+    queue: Optional[str] = None
+):
+    """
+    unique_key ile tekil iş ekleyen INSERT ... ON CONFLICT DO NOTHING
+
+    Aynı anahtarlı iş kuyrukta (bekliyor veya çalışıyor) varsa ifade hiçbir
+    şey yapmaz. Upsert desteklemeyen veritabanlarında None döner.
+    """
+    spec, name = _resolve(job_task)
+    values = {
+        "queue": queue or (spec.queue if spec else "default"),
+        "task": name,
+        "payload": payload or {},
+        "unique_key": unique_key,
+        "attempts": 0,
+        "max_attempts": spec.max_attempts if spec else settings.JOB_MAX_ATTEMPTS,
+        "run_at": utcnow() + timedelta(seconds=delay_seconds),
+    }
+    if dialect_name == "postgresql":
+        stmt = postgresql.insert(Job).values(**values)
+    elif dialect_name == "sqlite":
+        stmt = sqlite.insert(Job).values(**values)
+    else:
+        return None
+    return stmt.on_conflict_do_nothing(index_elements=[Job.unique_key])
+
+
+def schedule_periodic(db: Session, spec: TaskSpec) -> bool:
+    """
+    Periyodik görevin bir sonraki çalışmasını planla
+
+    unique_key sayesinde görevin kuyrukta tek kopyası olur; birden fazla
+    worker aynı anda çağırsa da yalnızca biri ekler. Çalışma bitince (iş
+    silinince) bir sonraki kopya every_seconds sonrasına planlanır.
+
+    Returns:
+        bool: Yeni iş eklendiyse True
+    """
+    unique_key = f"periodic:{spec.name}"
+    stmt = unique_job_statement(db.bind.dialect.name, spec.name, unique_key, spec.every_seconds)
+    if stmt is None:
+        if db.scalar(select(Job.id).where(Job.unique_key == unique_key)):
+            return False
+        job = enqueue(db, spec.name, delay_seconds=spec.every_seconds)
+        job.unique_key = unique_key
+        db.commit()
+        return True
+
+    result = db.execute(stmt)
+    db.commit()
+    return result.rowcount > 0
+
+
+def queue_stats(db: Session) -> dict:
+    """Kuyruk başına hazır / çalışan / ileri tarihli iş sayıları ve dead letter sayısı"""
+    now = utcnow()
+    idle = or_(Job.locked_until.is_(None), Job.locked_until < now)
+    rows = db.execute(
+        select(
+            Job.queue,
+            func.count(Job.id).filter(Job.run_at <= now, idle),
+            func.count(Job.id).filter(Job.locked_until >= now),
+            func.count(Job.id).filter(Job.run_at > now, idle),
+            func.min(Job.run_at).filter(Job.run_at <= now, idle),
+        ).group_by(Job.queue)
+    ).all()
+    dead = dict(db.execute(select(DeadJob.queue, func.count(DeadJob.id)).group_by(DeadJob.queue)).all())
+
+    queues = {
+        queue: {"ready": 0, "running": 0, "scheduled": 0, "oldest_ready_at": None, "dead": count}
+        for queue, count in dead.items()
+    }
+    for queue, ready, running, scheduled, oldest in rows:
+        queues[queue] = {
+            "ready": ready,
+            "running": running,
+            "scheduled": scheduled,
+            # Hazır bekleyen en eski iş: kuyruk gecikmesinin göstergesi
+            "oldest_ready_at": oldest.isoformat() if oldest else None,
+            "dead": dead.get(queue, 0),
+        }
+    return {"queues": queues, "dead_total": sum(dead.values())}
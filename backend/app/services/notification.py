@@ -1,9 +1,32 @@
-from sqlalchemy.orm import Session
-from app.models.notification import Notification, NotificationType, NotificationPriority
-from app.models.user import User
+from typing import List, Optional, Sequence
+import time
 
-async def create_notification(
-    db: Session,
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.unit_of_work import UnitOfWork
+from app.models.notification import NotificationType, NotificationPriority
+from app.models.user import User, UserType
+from app.services.delivery import requires_delivery
+
+def _build_link(
+    link: Optional[str],
+    related_entity_type: Optional[str],
+    related_entity_id: Optional[int],
+    case_id: Optional[int]
+) -> Optional[str]:
+    """Link otomatik oluşturma (eğer verilmediyse)"""
+    if not link and related_entity_type and related_entity_id:
+        if related_entity_type == "case":
+            link = f"/cases/{related_entity_id}"
+        elif related_entity_type == "document":
+            link = f"/documents?case_id={case_id}" if case_id else "/documents"
+        elif related_entity_type == "payment":
+            link = f"/payments"
+    return link
+
+def create_notification(
+    uow: UnitOfWork,
     user_id: int,
     title: str,
     message: str,
@@ -13,39 +36,106 @@ async def create_notification(
     link: str = None,
     related_entity_type: str = None,
     related_entity_id: int = None
-):
+) -> None:
     """
     Yeni bir bildirim oluşturur
-    """
-    # Link otomatik oluşturma (eğer verilmediyse)
-    if not link and related_entity_type and related_entity_id:
-        if related_entity_type == "case":
-            link = f"/cases/{related_entity_id}"
-        elif related_entity_type == "document":
-            link = f"/documents?case_id={case_id}" if case_id else "/documents"
-        elif related_entity_type == "payment":
-            link = f"/payments"
 
-    notification = Notification(
-        user_id=user_id,
+    Satır uow.commit() içinde domain yazımıyla aynı transaction'da eklenir.
+    """
+    create_notifications_bulk(
+        uow=uow,
+        user_ids=[user_id],
         title=title,
         message=message,
         notification_type=notification_type,
         priority=priority,
         case_id=case_id,
         link=link,
-        is_read=False,
-        is_sent=True # In-app notifications are "sent" immediately
+        related_entity_type=related_entity_type,
+        related_entity_id=related_entity_id
     )
-    
-    db.add(notification)
-    db.commit()
-    db.refresh(notification)
-    
-    return notification
+
+def create_notifications_bulk(
+    uow: UnitOfWork,
+    user_ids: Sequence[int],
+    title: str,
+    message: str,
+    notification_type: NotificationType = NotificationType.IN_APP,
+    priority: NotificationPriority = NotificationPriority.MEDIUM,
+    case_id: int = None,
+    link: str = None,
+    related_entity_type: str = None,
+    related_entity_id: int = None
+) -> int:
+    """
+    Aynı bildirimi birden fazla kullanıcı için bekletir; uow.commit()
+    tümünü tek bir çok satırlı INSERT ile yazar
+
+    Returns:
+        int: Bekletilen bildirim sayısı
+    """
+    link = _build_link(link, related_entity_type, related_entity_id, case_id)
+    # Uygulama içi bildirimler hemen "gönderilmiş" sayılır; email/SMS
+    # bildirimleri gönderim görevi tarafından işaretlenir
+    is_sent = not requires_delivery(notification_type)
+
+    uow.notifications.extend(
+        {
+            "user_id": user_id,
+            "title": title,
+            "message": message,
+            "notification_type": notification_type,
+            "priority": priority,
+            "case_id": case_id,
+            "link": link,
+            "is_read": False,
+            "is_sent": is_sent
+        }
+        for user_id in user_ids
+    )
+
+    return len(user_ids)
+
+class AdminRecipientCache:
+    """
+    notify_admins alıcıları (aktif admin ve avukat id'leri)
+
+    Rol veya aktiflik değiştiğinde invalidate() çağrılır. Diğer worker
+    süreçlerindeki kopyalar TTL dolunca yenilenir.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._user_ids: Optional[List[int]] = None
+        self._expires_at = 0.0
+        self._generation = 0
+
+    async def get(self, db: AsyncSession) -> List[int]:
+        if self._user_ids is not None and time.monotonic() < self._expires_at:
+            return self._user_ids
+
+        generation = self._generation
+        user_ids = list((await db.scalars(
+            select(User.id).where(
+                User.user_type.in_([UserType.ADMIN, UserType.LAWYER]),
+                User.is_active == True
+            )
+        )).all())
+
+        # Sorgu sırasında invalidate edildiyse eski sonucu saklama
+        if generation == self._generation:
+            self._user_ids = user_ids
+            self._expires_at = time.monotonic() + self.ttl_seconds
+        return user_ids
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._user_ids = None
+
+admin_recipients = AdminRecipientCache(ttl_seconds=settings.ADMIN_RECIPIENT_CACHE_TTL_SECONDS)
 
 async def notify_admins(
-    db: Session,
+    uow: UnitOfWork,
     title: str,
     message: str,
     notification_type: NotificationType = NotificationType.IN_APP,
@@ -54,22 +144,21 @@ async def notify_admins(
     link: str = None,
     related_entity_type: str = None,
     related_entity_id: int = None
-):
+) -> int:
     """
     Tüm admin ve avukatlara bildirim gönderir
     """
-    admins = db.query(User).filter(User.user_type.in_(["admin", "lawyer"])).all()
-    
-    for admin in admins:
-        await create_notification(
-            db=db,
-            user_id=admin.id,
-            title=title,
-            message=message,
-            notification_type=notification_type,
-            priority=priority,
-            case_id=case_id,
-            link=link,
-            related_entity_type=related_entity_type,
-            related_entity_id=related_entity_id
-        )
+    admin_ids = await admin_recipients.get(uow.db)
+
+    return create_notifications_bulk(
+        uow=uow,
+        user_ids=admin_ids,
+        title=title,
+        message=message,
+        notification_type=notification_type,
+        priority=priority,
+        case_id=case_id,
+        link=link,
+        related_entity_type=related_entity_type,
+        related_entity_id=related_entity_id
+    )
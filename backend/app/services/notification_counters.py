@@ -0,0 +1,168 @@
+"""
+Notification Counters - Kullanıcı başına okunmamış bildirim sayacı
+
+notification_counters.unread_count, bildirim ekleme (UnitOfWork.commit)
+ve okundu işaretleme (mark_as_read, mark_all_as_read) ile aynı
+transaction içinde atomik olarak artırılır/azaltılır. Güncellemeler
+mutlak değer yazmaz, fark (delta) uygular; eşzamanlı istekler birbirinin
+değişikliğini ezmez.
+
+Sapma (ör. elle yapılan SQL değişiklikleri) app.worker'ın periyodik
+notifications.reconcile_unread_counters görevi tarafından
+NOTIFICATION_COUNTER_RECONCILE_SECONDS aralıklarla düzeltilir.
+"""
+from typing import Dict, Mapping, Optional
+import logging
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.notification import Notification, NotificationCounter
+
+logger = logging.getLogger(__name__)
+
+
+def _upsert_statement(dialect_name: str, counts: Mapping[int, int]):
+    # Satırlar user_id sırasıyla kilitlenir (eşzamanlı toplu eklemelerde deadlock olmaz)
+    rows = [
+        {"user_id": user_id, "unread_count": count}
+        for user_id, count in sorted(counts.items())
+    ]
+    if dialect_name == "postgresql":
+        stmt = postgresql.insert(NotificationCounter).values(rows)
+    elif dialect_name == "sqlite":
+        stmt = sqlite.insert(NotificationCounter).values(rows)
+    else:
+        return None
+    return stmt.on_conflict_do_update(
+        index_elements=[NotificationCounter.user_id],
+        set_={
+            "unread_count": NotificationCounter.unread_count + stmt.excluded.unread_count,
+            "updated_at": func.now()
+        }
+    )
+
+
+async def add_unread(uow, counts: Mapping[int, int]) -> Dict[int, int]:
+    """
+    Kullanıcıların sayaçlarını artır (satır yoksa oluştur)
+
+    Commit çağırana aittir.
+
+    Args:
+        uow: UnitOfWork
+        counts: {user_id: eklenen okunmamış bildirim sayısı}
+
+    Returns:
+        Dict[int, int]: {user_id: yeni sayaç değeri} (upsert desteklenmiyorsa boş)
+    """
+    if not counts:
+        return {}
+
+    stmt = _upsert_statement(uow.db.bind.dialect.name, counts)
+    if stmt is not None:
+        result = await uow.execute(
+            stmt.returning(NotificationCounter.user_id, NotificationCounter.unread_count)
+        )
+        return dict(result.all())
+
+    for user_id, count in sorted(counts.items()):
+        result = await uow.execute(
+            update(NotificationCounter)
+            .where(NotificationCounter.user_id == user_id)
+            .values(unread_count=NotificationCounter.unread_count + count)
+        )
+        if result.rowcount == 0:
+            uow.add(NotificationCounter(user_id=user_id, unread_count=count))
+    await uow.flush()
+    return {}
+
+
+async def remove_unread(uow, user_id: int, count: int) -> Optional[int]:
+    """
+    Kullanıcının sayacını azalt (0'ın altına inmez). Commit çağırana aittir.
+
+    Returns:
+        Optional[int]: Yeni sayaç değeri (satır yoksa None)
+    """
+    result = await uow.execute(
+        update(NotificationCounter)
+        .where(NotificationCounter.user_id == user_id)
+        .values(
+            unread_count=case(
+                (NotificationCounter.unread_count > count, NotificationCounter.unread_count - count),
+                else_=0
+            )
+        )
+        .returning(NotificationCounter.unread_count)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar()
+
+
+def unread_count_query(user_id: int):
+    """Tek satır (birincil anahtar) okuması; satır yoksa sonuç None'dır (0)"""
+    return select(NotificationCounter.unread_count).where(NotificationCounter.user_id == user_id)
+
+
+def reconcile_unread_counters(db: Session) -> dict:
+    """
+    Sayaçları gerçek okunmamış bildirim sayılarıyla karşılaştır ve düzelt
+
+    Sapan her kullanıcı için sayaç satırı kilitlenir (SELECT ... FOR
+    UPDATE) ve sayım kilit altında tekrarlanır. Aynı anda bildirim ekleyen
+    bir istek sayacı bu kilidi bekledikten sonra artırır; artış kaybolmaz.
+    Kullanıcı başına kısa bir transaction kullanılır.
+    """
+    actual = dict(db.execute(
+        select(Notification.user_id, func.count(Notification.id))
+        .where(Notification.is_read == False)
+        .group_by(Notification.user_id)
+    ).all())
+    stored = dict(db.execute(
+        select(NotificationCounter.user_id, NotificationCounter.unread_count)
+    ).all())
+    db.rollback()
+
+    drifted = sorted(
+        user_id for user_id in actual.keys() | stored.keys()
+        if actual.get(user_id, 0) != stored.get(user_id, 0)
+    )
+
+    repaired = 0
+    dialect_name = db.bind.dialect.name
+    for user_id in drifted:
+        try:
+            if user_id not in stored:
+                # Önce boş satır: kilit alınabilecek bir satır olsun
+                stmt = _upsert_statement(dialect_name, {user_id: 0})
+                if stmt is not None:
+                    db.execute(stmt)
+                else:
+                    db.add(NotificationCounter(user_id=user_id, unread_count=0))
+                db.commit()
+
+            counter = db.scalar(
+                select(NotificationCounter)
+                .where(NotificationCounter.user_id == user_id)
+                .with_for_update()
+            )
+            count = db.scalar(
+                select(func.count(Notification.id)).where(
+                    Notification.user_id == user_id,
+                    Notification.is_read == False
+                )
+            )
+            if counter is not None and counter.unread_count != count:
+                logger.warning(
+                    f"Unread counter drift for user {user_id}: {counter.unread_count} -> {count}"
+                )
+                counter.unread_count = count
+                repaired += 1
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Unread counter repair failed for user {user_id}: {str(e)}")
+
+    return {"checked": len(actual.keys() | stored.keys()), "drifted": len(drifted), "repaired": repaired}
@@ -0,0 +1,268 @@
+"""
+Notification Hub - Bildirimlerin anlık iletimi (SSE / WebSocket)
+
+Her süreç kendi abonelerini (açık SSE/WebSocket bağlantıları) kullanıcı
+id'sine göre tutar ve olayları onların kuyruklarına dağıtır (fan-out).
+
+Backend:
+- postgres: Olaylar isteğin kendi transaction'ı içinde pg_notify ile
+  yayınlanır; Postgres bunları yalnızca COMMIT sonrası ve tüm worker
+  süreçlerine iletir (rollback olursa hiç gönderilmez). Her süreç tek bir
+  asyncpg bağlantısıyla LISTEN yapar ve gelen olayları yerel abonelere
+  dağıtır. Düzgün kapanmayan bağlantılar (ağ kesintisi, NAT zaman aşımı,
+  failover) kapanış olayı üretmez; bağlantı periyodik SELECT 1 ile
+  yoklanır, cevap gelmezse yeniden kurulur.
+- local: Tek süreç (SQLite / geliştirme). Olaylar commit sonrası
+  doğrudan yerel abonelere dağıtılır.
+
+Olay tipleri (istemciye user_id olmadan gönderilir):
+    notification  {"notification": {...}, "unread_delta": 1, "unread_count": n}
+    unread        {"unread_delta": -1, "unread_count": n}
+                  (unread_count sayaç tablosundaki yeni değerdir; yoksa
+                  istemci delta'yı uygular)
+    resync        Olay kaçırılmış olabilir (kuyruk doldu / LISTEN koptu);
+                  istemci listeyi ve sayacı yeniden okumalı
+"""
+from typing import Dict, Iterable, List, Optional, Set
+import asyncio
+import json
+import logging
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "notification_events"
+# pg_notify payload sınırı 8000 bayttır
+MAX_PAYLOAD_BYTES = 7000
+MESSAGE_PREVIEW_CHARS = 500
+RECONNECT_MAX_SECONDS = 30.0
+
+
+def _value(value):
+    return getattr(value, "value", value)
+
+
+def notification_event(row) -> dict:
+    """
+    Yeni Notification satırı için olay
+
+    row: Notification nesnesi veya aynı alanları içeren mapping
+    """
+    get = row.get if isinstance(row, dict) else lambda key: getattr(row, key)
+    created_at = get("created_at")
+    message = get("message") or ""
+    return {
+        "type": "notification",
+        "user_id": get("user_id"),
+        "unread_delta": 1,
+        "notification": {
+            "id": get("id"),
+            "title": get("title"),
+            # Uzun mesajlar kısaltılır; tam metin liste endpoint'inden okunur
+            "message": message[:MESSAGE_PREVIEW_CHARS],
+            "type": _value(get("notification_type")),
+            "priority": _value(get("priority")),
+            "is_read": False,
+            "link": get("link"),
+            "created_at": created_at.isoformat() if created_at else None,
+            "case_id": get("case_id"),
+        },
+    }
+
+
+def unread_event(user_id: int, delta: int, count: Optional[int] = None) -> dict:
+    """Okunmamış sayacı değişimi (delta) ve biliniyorsa yeni mutlak değer (count)"""
+    event = {"type": "unread", "user_id": user_id, "unread_delta": delta}
+    if count is not None:
+        event["unread_count"] = count
+    return event
+
+
+class Subscription:
+    """Tek bir SSE/WebSocket bağlantısının olay kuyruğu"""
+
+    def __init__(self, user_id: int, max_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+
+    def push(self, event: dict) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Yavaş istemci: bekleyen olayları at, yeniden senkronize etsin
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        """Sıradaki olay; timeout dolarsa None (heartbeat zamanı)"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class NotificationHub:
+    """Süreç içi fan-out + (opsiyonel) Postgres LISTEN/NOTIFY köprüsü"""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._listener_task: Optional[asyncio.Task] = None
+        self.delivered = 0
+
+    @property
+    def uses_postgres(self) -> bool:
+        backend = settings.NOTIFICATION_PUSH_BACKEND
+        if backend == "auto":
+            return settings.database_url.startswith("postgresql")
+        return backend == "postgres"
+
+    @property
+    def connections(self) -> int:
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    # --- Abonelik ---
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(user_id, self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subs = self._subscribers.get(subscription.user_id)
+        if subs is None:
+            return
+        subs.discard(subscription)
+        if not subs:
+            del self._subscribers[subscription.user_id]
+
+    # --- Yayınlama ---
+
+    def notify_statement(self, events: List[dict]):
+        """
+        Commit'ten önce aynı transaction'da çalıştırılacak ifade
+
+        postgres backend'inde olayları MAX_PAYLOAD_BYTES'lık parçalar
+        halinde tek bir SELECT pg_notify(...), pg_notify(...) ifadesine
+        toplar; local backend'inde None döner.
+        """
+        if not events or not self.uses_postgres:
+            return None
+        return select(*(
+            func.pg_notify(CHANNEL, payload) for payload in self._payloads(events)
+        ))
+
+    def dispatch_committed(self, events: List[dict]) -> None:
+        """Commit sonrası: local backend'inde olayları doğrudan dağıt"""
+        if events and not self.uses_postgres:
+            self.dispatch(events)
+
+    def dispatch(self, events: Iterable[dict]) -> None:
+        """Olayları bu süreçteki abonelere dağıt"""
+        for event in events:
+            subs = self._subscribers.get(event.get("user_id"))
+            if not subs:
+                continue
+            payload = {key: value for key, value in event.items() if key != "user_id"}
+            for subscription in list(subs):
+                subscription.push(payload)
+                self.delivered += 1
+
+    def _broadcast_resync(self) -> None:
+        for subs in self._subscribers.values():
+            for subscription in subs:
+                subscription.push({"type": "resync"})
+
+    @staticmethod
+    def _payloads(events: List[dict]) -> List[str]:
+        payloads, batch, size = [], [], 2
+        for event in events:
+            encoded = json.dumps(event, ensure_ascii=False, separators=(",", ":"))
+            length = len(encoded.encode("utf-8")) + 1
+            if batch and size + length > MAX_PAYLOAD_BYTES:
+                payloads.append("[" + ",".join(batch) + "]")
+                batch, size = [], 2
+            batch.append(encoded)
+            size += length
+        if batch:
+            payloads.append("[" + ",".join(batch) + "]")
+        return payloads
+
+    # --- Postgres LISTEN ---
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            self.dispatch(json.loads(payload))
+        except (ValueError, TypeError) as e:
+            logger.error(f"Invalid notification payload: {str(e)}")
+
+    async def _listen_forever(self) -> None:
+        import asyncpg
+
+        dsn = settings.NOTIFICATION_PUSH_LISTEN_URL or settings.database_url
+        delay = 1.0
+        first = True
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(CHANNEL, self._on_notify)
+                logger.info(f"Listening on {CHANNEL}")
+                if not first:
+                    # Bağlantı koptuğu sırada gelen olaylar kaçırılmış olabilir
+                    self._broadcast_resync()
+                first = False
+                delay = 1.0
+                await self._keepalive(connection, closed)
+                logger.warning("Notification listener connection closed")
+            except asyncio.CancelledError:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+                raise
+            except Exception as e:
+                logger.error(f"Notification listener error: {type(e).__name__}: {str(e)}")
+                if connection is not None and not connection.is_closed():
+                    # Cevap vermeyen bağlantı: kapanış el sıkışması beklenmez
+                    connection.terminate()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+
+    @staticmethod
+    async def _keepalive(connection, closed: asyncio.Event) -> None:
+        """
+        Bağlantı kapanana kadar bekle; aralıklarla SELECT 1 ile yokla
+
+        Raises:
+            asyncio.TimeoutError: Sunucu zamanında cevap vermedi
+        """
+        interval = settings.NOTIFICATION_PUSH_KEEPALIVE_SECONDS
+        timeout = settings.NOTIFICATION_PUSH_KEEPALIVE_TIMEOUT_SECONDS
+        while True:
+            try:
+                await asyncio.wait_for(closed.wait(), interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            await connection.fetchval("SELECT 1", timeout=timeout)
+
+    async def start(self) -> None:
+        if self.uses_postgres and self._listener_task is None:
+            self._listener_task = asyncio.create_task(self._listen_forever())
+
+    async def stop(self) -> None:
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+
+
+notification_hub = NotificationHub(queue_size=settings.NOTIFICATION_STREAM_QUEUE_SIZE)
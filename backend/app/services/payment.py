@@ -1,24 +1,66 @@
 """
 İyzico Payment Service
 Ücretsiz test ortamında ödeme işlemleri
+
+Çağrılar async İyzico istemcisi üzerinden yapılır (bkz.
+app.services.payment_gateway): bağlantı havuzu, katı zaman aşımı ve
+circuit breaker. Sağlayıcıya ulaşılamazsa sonuç success=False döner.
+Ödeme/iade çağrılarında retryable=True yalnızca istek sağlayıcıya hiç
+gönderilmediğinde (devre açık, bağlantı havuzu dolu) verilir; diğer
+hatalarda işlem sağlayıcıda gerçekleşmiş olabilir, tekrar denemek çift
+çekim/iade yapabilir. Zaman aşımında sonuç bilinmez (status='unknown'),
+conversation_id ile sonradan sorgulanmalıdır (bkz. payment_reconciliation).
 """
-import iyzipay
+from app.core.circuit_breaker import CircuitOpenError
 from app.core.config import settings
-from typing import Dict, Any
+from app.services.payment_gateway import (
+    IyzicoGateway,
+    PaymentGatewayBusy,
+    PaymentGatewayError,
+    PaymentGatewayTimeout,
+    iyzico_gateway,
+)
+from typing import Dict, Any, Optional
 import logging
 import uuid
 
 logger = logging.getLogger(__name__)
 
+# İyzico sabitleri (iyzipay.Locale.TR, Currency.TRY, ...)
+LOCALE_TR = 'tr'
+CURRENCY_TRY = 'TRY'
+PAYMENT_CHANNEL_WEB = 'WEB'
+PAYMENT_GROUP_PRODUCT = 'PRODUCT'
+BASKET_ITEM_VIRTUAL = 'VIRTUAL'
+
+def _unavailable(error: Exception, write: bool = False) -> Dict[str, Any]:
+    """
+    Sağlayıcıya ulaşılamadığında dönen sonuç alanları
+
+    Args:
+        write: Çağrı sağlayıcıda işlem yapıyor mu (ödeme, iade)
+    """
+    # Devre açık / havuz dolu: istek hiç gönderilmedi, tekrar denemek güvenli
+    not_sent = isinstance(error, (CircuitOpenError, PaymentGatewayBusy))
+    result = {
+        'success': False,
+        'retryable': not_sent or not write,
+        'error_message': 'Ödeme sağlayıcısına şu anda ulaşılamıyor, lütfen daha sonra tekrar deneyin'
+    }
+    if isinstance(error, CircuitOpenError):
+        result['retry_after'] = int(error.retry_after)
+    if write and not not_sent:
+        result['error_message'] = 'İşlemin sonucu doğrulanamadı, lütfen tekrar denemeyin; durum kontrol edilecek'
+    if write and isinstance(error, PaymentGatewayTimeout):
+        # İşlem sağlayıcıda gerçekleşmiş olabilir
+        result['status'] = 'unknown'
+    return result
+
 class PaymentService:
     """İyzico ile ödeme işlemleri"""
     
-    def __init__(self):
-        self.options = {
-            'api_key': settings.IYZICO_API_KEY,
-            'secret_key': settings.IYZICO_SECRET_KEY,
-            'base_url': settings.IYZICO_BASE_URL  # Test: sandbox-api.iyzipay.com
-        }
+    def __init__(self, gateway: Optional[IyzicoGateway] = None):
+        self.gateway = gateway or iyzico_gateway
         
         # Test environment kontrolü
         self.is_test = "sandbox" in settings.IYZICO_BASE_URL
@@ -26,11 +68,12 @@ class PaymentService:
         if self.is_test:
             logger.info("İyzico TEST modunda çalışıyor")
     
-    def create_payment(self, 
+    async def create_payment(self, 
                       amount: float,
                       case_id: str,
                       user_data: Dict[str, Any],
-                      card_data: Dict[str, str]) -> Dict[str, Any]:
+                      card_data: Dict[str, str],
+                      conversation_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Ödeme işlemi başlat
         
@@ -39,23 +82,25 @@ class PaymentService:
             case_id: Dava ID'si
             user_data: Kullanıcı bilgileri
             card_data: Kart bilgileri
+            conversation_id: İyzico conversationId; ödeme kaydı varsa
+                Payment.payment_id verilmeli (mutabakat bu değerle sorgular)
         
         Returns:
             dict: Ödeme sonucu
         """
+        conversation_id = conversation_id or f"case_{case_id}_{uuid.uuid4().hex[:8]}"
         try:
-            conversation_id = f"case_{case_id}_{uuid.uuid4().hex[:8]}"
             
             request = {
-                'locale': iyzipay.Locale.TR.value,
+                'locale': LOCALE_TR,
                 'conversationId': conversation_id,
                 'price': str(amount),
                 'paidPrice': str(amount),
-                'currency': iyzipay.Currency.TRY.value,
+                'currency': CURRENCY_TRY,
                 'installment': '1',
                 'basketId': f'B{case_id}',
-                'paymentChannel': iyzipay.PaymentChannel.WEB.value,
-                'paymentGroup': iyzipay.PaymentGroup.PRODUCT.value,
+                'paymentChannel': PAYMENT_CHANNEL_WEB,
+                'paymentGroup': PAYMENT_GROUP_PRODUCT,
                 'paymentCard': {
                     'cardHolderName': card_data['card_holder'],
                     'cardNumber': card_data['card_number'].replace(' ', ''),
@@ -99,7 +144,7 @@ class PaymentService:
                         'name': 'Hukuki Danışmanlık Hizmeti',
                         'category1': 'Hukuk',
                         'category2': 'Danışmanlık',
-                        'itemType': iyzipay.BasketItemType.VIRTUAL.value,
+                        'itemType': BASKET_ITEM_VIRTUAL,
                         'price': str(amount)
                     }
                 ]
@@ -110,27 +155,35 @@ class PaymentService:
                 request['buyer']['identityNumber'] = '11111111111'
                 request['buyer']['gsmNumber'] = '+905555555555'
             
-            payment = iyzipay.Payment().create(request, self.options)
+            payment = await self.gateway.post('/payment/auth', request)
             
             response = {
-                'success': payment.status == 'success',
-                'payment_id': payment.payment_id if hasattr(payment, 'payment_id') else None,
+                'success': payment.get('status') == 'success',
+                'payment_id': payment.get('paymentId'),
                 'conversation_id': conversation_id,
-                'status': payment.status,
-                'error_message': payment.error_message if hasattr(payment, 'error_message') else None,
-                'fraud_status': payment.fraud_status if hasattr(payment, 'fraud_status') else None,
+                'status': payment.get('status'),
+                'error_message': payment.get('errorMessage'),
+                'fraud_status': payment.get('fraudStatus'),
                 'amount': amount,
                 'currency': 'TRY',
                 'is_test': self.is_test
             }
             
-            if payment.status == 'success':
-                logger.info(f"Payment successful: {payment.payment_id}")
+            if response['success']:
+                logger.info(f"Payment successful: {response['payment_id']}")
             else:
-                logger.error(f"Payment failed: {payment.error_message}")
+                logger.error(f"Payment failed: {response['error_message']}")
             
             return response
             
+        except (CircuitOpenError, PaymentGatewayError) as e:
+            logger.error(f"Payment provider unavailable ({conversation_id}): {str(e)}")
+            return {
+                **_unavailable(e, write=True),
+                'conversation_id': conversation_id,
+                'amount': amount,
+                'is_test': self.is_test
+            }
         except Exception as e:
             logger.error(f"Payment error: {str(e)}")
             return {
@@ -139,32 +192,42 @@ class PaymentService:
                 'is_test': self.is_test
             }
     
-    def get_payment_status(self, payment_id: str) -> Dict[str, Any]:
+    async def get_payment_status(self,
+                                 payment_id: Optional[str] = None,
+                                 conversation_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Ödeme durumunu sorgula
         
         Args:
             payment_id: İyzico payment ID
+            conversation_id: Ödeme başlatılırken verilen conversationId
+                (payment_id bilinmiyorsa, örn. zaman aşımına uğramış ödeme)
             
         Returns:
             dict: Ödeme durumu
         """
         try:
-            request = {
-                'paymentId': payment_id,
-                'locale': iyzipay.Locale.TR.value
-            }
+            request = {'locale': LOCALE_TR}
+            if payment_id:
+                request['paymentId'] = payment_id
+            else:
+                request['paymentConversationId'] = conversation_id
             
-            payment = iyzipay.Payment().retrieve(request, self.options)
+            payment = await self.gateway.post('/payment/detail', request)
             
             return {
                 'success': True,
-                'status': payment.status if hasattr(payment, 'status') else 'unknown',
-                'amount': payment.price if hasattr(payment, 'price') else None,
-                'currency': payment.currency if hasattr(payment, 'currency') else None,
-                'payment_id': payment_id
+                'status': payment.get('status', 'unknown'),
+                'payment_status': payment.get('paymentStatus'),
+                'amount': payment.get('price'),
+                'currency': payment.get('currency'),
+                'payment_id': payment.get('paymentId') or payment_id,
+                'error_message': payment.get('errorMessage')
             }
             
+        except (CircuitOpenError, PaymentGatewayError) as e:
+            logger.error(f"Payment status query failed: {str(e)}")
+            return {**_unavailable(e), 'payment_id': payment_id, 'conversation_id': conversation_id}
         except Exception as e:
             logger.error(f"Payment status query error: {str(e)}")
             return {
@@ -172,7 +235,7 @@ class PaymentService:
                 'error_message': str(e)
             }
     
-    def refund_payment(self, payment_transaction_id: str, amount: float, reason: str = "") -> Dict[str, Any]:
+    async def refund_payment(self, payment_transaction_id: str, amount: float, reason: str = "") -> Dict[str, Any]:
         """
         Ödeme iadesi (test modunda)
         
@@ -188,23 +251,26 @@ class PaymentService:
             request = {
                 'paymentTransactionId': payment_transaction_id,
                 'price': str(amount),
-                'currency': iyzipay.Currency.TRY.value,
+                'currency': CURRENCY_TRY,
                 'reason': reason or 'Kullanıcı talebi',
                 'description': f'Müvekkil paneli iade - {reason}',
-                'locale': iyzipay.Locale.TR.value
+                'locale': LOCALE_TR
             }
             
-            refund = iyzipay.Refund().create(request, self.options)
+            refund = await self.gateway.post('/payment/refund', request)
             
             return {
-                'success': refund.status == 'success',
-                'refund_id': refund.payment_id if hasattr(refund, 'payment_id') else None,
-                'status': refund.status,
-                'error_message': refund.error_message if hasattr(refund, 'error_message') else None,
+                'success': refund.get('status') == 'success',
+                'refund_id': refund.get('paymentId'),
+                'status': refund.get('status'),
+                'error_message': refund.get('errorMessage'),
                 'amount': amount,
                 'is_test': self.is_test
             }
             
+        except (CircuitOpenError, PaymentGatewayError) as e:
+            logger.error(f"Refund failed ({payment_transaction_id}): {str(e)}")
+            return {**_unavailable(e, write=True), 'amount': amount, 'is_test': self.is_test}
         except Exception as e:
             logger.error(f"Refund error: {str(e)}")
             return {
@@ -0,0 +1,193 @@
+"""
+Payment Gateway - İyzico REST API için async istemci
+
+iyzipay SDK'sı her çağrıda yeni bir bağlantı açar, zaman aşımı yoktur ve
+senkron çalışır: İyzico yavaşladığında çağrıyı yapan API worker'ı
+donardı. Bu istemci aynı API'yi doğrudan konuşur:
+
+- Tek httpx.AsyncClient: bağlantılar yeniden kullanılır (keep-alive),
+  aynı anda en fazla IYZICO_MAX_CONNECTIONS istek; havuzda yer yoksa
+  IYZICO_CONNECT_TIMEOUT_SECONDS beklenir, sonra PaymentGatewayBusy
+- Katı zaman aşımı: istek toplamda IYZICO_TIMEOUT_SECONDS'ı aşamaz
+- Circuit breaker: art arda IYZICO_BREAKER_FAILURE_THRESHOLD bağlantı
+  hatası / zaman aşımı / 5xx sonrası çağrılar IYZICO_BREAKER_RESET_SECONDS
+  boyunca sağlayıcıya gitmeden reddedilir (CircuitOpenError)
+
+İş kuralı hataları (kart reddi vb.) HTTP 200 + status=failure döner;
+sağlayıcı hatası sayılmaz.
+
+Kimlik doğrulama IYZWSv2: HMAC-SHA256(secret, randomKey + uriPath + body).
+Yük testi için yerel sahte sunucu: backend/fake_iyzico.py
+"""
+from typing import Optional
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+import time
+
+import httpx
+
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PaymentGatewayError(Exception):
+    """Sağlayıcıya ulaşılamadı veya geçersiz yanıt (breaker hatası sayılır)"""
+
+
+class PaymentGatewayTimeout(PaymentGatewayError):
+    """
+    Sağlayıcı zamanında yanıt vermedi
+
+    Yazma çağrılarında (ödeme, iade) işlemin sağlayıcıda gerçekleşip
+    gerçekleşmediği bilinmez; conversationId ile sonradan sorgulanmalıdır.
+    """
+
+
+class PaymentGatewayBusy(PaymentGatewayError):
+    """Bağlantı havuzu dolu (yerel doygunluk, breaker hatası sayılmaz)"""
+
+
+def iyzws_v2_authorization(api_key: str, secret_key: str, random_key: str, path: str, body: str) -> str:
+    signature = hmac.new(
+        secret_key.encode("utf-8"),
+        (random_key + path + body).encode("utf-8"),
+        hashlib.sha256
+    ).hexdigest()
+    token = f"apiKey:{api_key}&randomKey:{random_key}&signature:{signature}"
+    return "IYZWSv2 " + base64.b64encode(token.encode("utf-8")).decode("ascii")
+
+
+class IyzicoGateway:
+    """Bağlantı havuzlu, zaman aşımlı ve circuit breaker'lı İyzico istemcisi"""
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        secret_key: str,
+        timeout: float,
+        connect_timeout: float,
+        max_connections: int,
+        breaker: CircuitBreaker
+    ):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        self.breaker = breaker
+        self._client: Optional[httpx.AsyncClient] = None
+        self.in_flight = 0
+        self.requests = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout, pool=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self._client
+
+    def _headers(self, path: str, body: str) -> dict:
+        random_key = f"{int(time.time() * 1000)}{secrets.token_hex(4)}"
+        return {
+            "Authorization": iyzws_v2_authorization(self.api_key, self.secret_key, random_key, path, body),
+            "x-iyzi-rnd": random_key,
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+        }
+
+    def _failed(self, error: PaymentGatewayError) -> PaymentGatewayError:
+        self.breaker.record_failure()
+        if isinstance(error, PaymentGatewayTimeout):
+            self.timeouts += 1
+        else:
+            self.errors += 1
+        return error
+
+    async def post(self, path: str, payload: dict) -> dict:
+        """
+        İmzalı POST isteği
+
+        Raises:
+            CircuitOpenError: Devre açık, istek gönderilmedi
+            PaymentGatewayBusy: Bağlantı havuzunda yer açılmadı
+            PaymentGatewayTimeout: Toplam süre IYZICO_TIMEOUT_SECONDS'ı aştı
+            PaymentGatewayError: Bağlantı hatası, 5xx veya geçersiz yanıt
+        """
+        self.breaker.before_call()
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+        self.in_flight += 1
+        self.requests += 1
+        try:
+            response = await asyncio.wait_for(
+                self.client.post(path, content=body.encode("utf-8"), headers=self._headers(path, body)),
+                self.timeout
+            )
+        except httpx.PoolTimeout:
+            self.breaker.release()
+            raise PaymentGatewayBusy("Payment provider connection pool is exhausted")
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            raise self._failed(PaymentGatewayTimeout(f"İyzico {path} timed out after {self.timeout}s"))
+        except httpx.HTTPError as e:
+            raise self._failed(PaymentGatewayError(f"İyzico {path} failed: {type(e).__name__}: {e}"))
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        finally:
+            self.in_flight -= 1
+
+        if response.status_code >= 500:
+            raise self._failed(PaymentGatewayError(f"İyzico {path} HTTP {response.status_code}"))
+        try:
+            data = response.json()
+        except ValueError:
+            raise self._failed(PaymentGatewayError(f"İyzico {path} returned invalid JSON"))
+
+        self.breaker.record_success()
+        return data
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict:
+        return {
+            "circuit": self.breaker.stats(),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+        }
+
+
+iyzico_gateway = IyzicoGateway(
+    base_url=settings.IYZICO_BASE_URL,
+    api_key=settings.IYZICO_API_KEY,
+    secret_key=settings.IYZICO_SECRET_KEY,
+    timeout=settings.IYZICO_TIMEOUT_SECONDS,
+    connect_timeout=settings.IYZICO_CONNECT_TIMEOUT_SECONDS,
+    max_connections=settings.IYZICO_MAX_CONNECTIONS,
+    breaker=CircuitBreaker(
+        "iyzico",
+        failure_threshold=settings.IYZICO_BREAKER_FAILURE_THRESHOLD,
+        reset_seconds=settings.IYZICO_BREAKER_RESET_SECONDS
+    )
+)
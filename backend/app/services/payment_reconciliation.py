@@ -0,0 +1,243 @@
+"""
+Payment Reconciliation - Bekleyen ödemelerin sağlayıcı ile mutabakatı
+
+Ödeme sonucu kayda yazılamadan bağlantı koptuğunda veya İyzico zaman
+aşımına düştüğünde (status='unknown') ödeme PENDING kalır. Periyodik
+payments.reconcile görevi bu kayıtları İyzico'ya conversationId
+(= Payment.payment_id) ile sorar ve durumlarını günceller:
+
+- SUCCESS  -> COMPLETED (completed_at = sorgu anı)
+- FAILURE  -> FAILED
+- REFUNDED -> REFUNDED
+- sağlayıcıda bulunamadı veya başka durum -> PENDING kalır (henüz ödenmedi)
+- tutar uyuşmazlığı -> PENDING kalır, raporda listelenir
+
+Bellek kullanımı ödeme sayısından bağımsızdır: kayıtlar id sırasıyla
+PAYMENT_RECONCILE_BATCH_SIZE'lık keyset partileriyle okunur
+(ix_payments_pending), parti içinde sağlayıcı en fazla
+PAYMENT_RECONCILE_CONCURRENCY paralel istekle sorgulanır, sonuçlar parti
+başına tek bir toplu UPDATE ile yazılır. UPDATE yalnızca hâlâ PENDING olan
+satırlara uygulanır; tarama sırasında elle güncellenen ödemenin üzerine
+yazılmaz.
+
+Her çalışma payment_reconciliations tablosuna rapor yazar. Süre dolduğunda
+veya devre açıldığında (İyzico erişilemez) çalışma yarıda kesilir ve
+next_cursor'a kaldığı yeri yazar; sonraki çalışma oradan devam eder.
+"""
+from collections import Counter
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+import asyncio
+import json
+import logging
+import time
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.payment import Payment, PaymentMethod, PaymentReconciliation, PaymentStatus
+from app.services.jobs import utcnow
+from app.services.payment import PaymentService, get_payment_service
+
+logger = logging.getLogger(__name__)
+
+# İyzico paymentStatus -> yerel durum
+PROVIDER_STATUSES: Dict[str, PaymentStatus] = {
+    "SUCCESS": PaymentStatus.COMPLETED,
+    "FAILURE": PaymentStatus.FAILED,
+    "REFUNDED": PaymentStatus.REFUNDED,
+}
+
+# Rapora yazılan örnek sayısı (uyuşmazlık / hata)
+REPORT_SAMPLE_SIZE = 20
+
+
+def _in_session(session_factory: Callable[[], Session], func: Callable, *args):
+    db = session_factory()
+    try:
+        return func(db, *args)
+    finally:
+        db.close()
+
+
+def resume_cursor(db: Session) -> int:
+    """Son çalışma yarıda kaldıysa kaldığı payments.id, değilse 0"""
+    last = db.execute(
+        select(PaymentReconciliation.next_cursor)
+        .order_by(PaymentReconciliation.id.desc())
+        .limit(1)
+    ).scalar()
+    return last or 0
+
+
+def fetch_batch(db: Session, after_id: int, limit: int, created_before) -> List[dict]:
+    """
+    Sağlayıcıya sorulacak bir sonraki bekleyen ödeme partisi
+
+    Kart ödemeleri (veya yöntemi henüz belli olmayanlar) ve en az
+    PAYMENT_RECONCILE_MIN_AGE_SECONDS önce oluşturulmuşlar; yeni ödemeler
+    hâlâ istemci akışında olabilir.
+    """
+    rows = db.execute(
+        select(Payment.id, Payment.payment_id, Payment.amount)
+        .where(
+            Payment.status == PaymentStatus.PENDING,
+            Payment.id > after_id,
+            Payment.payment_id.is_not(None),
+            or_(Payment.method == PaymentMethod.CREDIT_CARD, Payment.method.is_(None)),
+            Payment.created_at <= created_before
+        )
+        .order_by(Payment.id)
+        .limit(limit)
+    ).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def apply_transitions(db: Session, updates: List[dict]) -> None:
+    """Durum geçişlerini birincil anahtarla toplu UPDATE olarak yaz (yalnızca hâlâ PENDING olanlar)"""
+    if not updates:
+        return
+    db.execute(
+        update(Payment)
+        .where(Payment.status == PaymentStatus.PENDING)
+        .execution_options(synchronize_session=None),
+        updates
+    )
+    db.commit()
+
+
+def save_run(db: Session, values: dict) -> int:
+    run = PaymentReconciliation(**values)
+    db.add(run)
+    db.commit()
+    return run.id
+
+
+def _provider_response(result: dict, checked_at) -> str:
+    return json.dumps({
+        "payment_id": result.get("payment_id"),
+        "payment_status": result.get("payment_status"),
+        "amount": result.get("amount"),
+        "currency": result.get("currency"),
+        "reconciled_at": checked_at.isoformat(),
+    }, ensure_ascii=False)
+
+
+async def reconcile_payments(
+    service: Optional[PaymentService] = None,
+    deadline: Optional[float] = None,
+    session_factory: Callable[[], Session] = SessionLocal
+) -> dict:
+    """
+    Bekleyen ödemeleri partiler halinde sağlayıcıyla karşılaştır
+
+    Args:
+        service: Sorgularda kullanılacak PaymentService (varsayılan: singleton)
+        deadline: time.monotonic() sınırı; dolunca çalışma kaldığı yeri kaydeder
+
+    Returns:
+        dict: Çalışma raporu (sayaçlar, next_cursor, aborted, ayrıntılar)
+    """
+    service = service or get_payment_service()
+    batch_size = max(settings.PAYMENT_RECONCILE_BATCH_SIZE, 1)
+    semaphore = asyncio.Semaphore(max(settings.PAYMENT_RECONCILE_CONCURRENCY, 1))
+
+    started_at = utcnow()
+    started = time.monotonic()
+    created_before = started_at - timedelta(seconds=settings.PAYMENT_RECONCILE_MIN_AGE_SECONDS)
+    start_cursor = await run_in_threadpool(_in_session, session_factory, resume_cursor)
+
+    counts = dict.fromkeys(("checked", "completed", "failed", "refunded", "unchanged", "errors"), 0)
+    provider_statuses: Counter = Counter()
+    mismatches: List[dict] = []
+    errors: List[dict] = []
+    batches = 0
+    cursor = start_cursor
+    next_cursor: Optional[int] = None
+    aborted = False
+
+    async def check(row: dict):
+        async with semaphore:
+            return row, await service.get_payment_status(conversation_id=row["payment_id"])
+
+    while True:
+        if deadline is not None and time.monotonic() >= deadline:
+            next_cursor = cursor
+            break
+
+        rows = await run_in_threadpool(
+            _in_session, session_factory, fetch_batch, cursor, batch_size, created_before
+        )
+        if not rows:
+            break
+
+        checked_at = utcnow()
+        updates = []
+        circuit_open = False
+        for row, result in await asyncio.gather(*(check(row) for row in rows)):
+            counts["checked"] += 1
+            if not result.get("success"):
+                # Sağlayıcıya ulaşılamadı: ödeme bir sonraki taramada tekrar sorulur
+                counts["errors"] += 1
+                circuit_open = circuit_open or "retry_after" in result
+                if len(errors) < REPORT_SAMPLE_SIZE:
+                    errors.append({"payment_id": row["payment_id"], "error": result.get("error_message")})
+                continue
+
+            provider_status = result.get("payment_status") if result.get("status") == "success" else None
+            provider_statuses[provider_status or "NOT_FOUND"] += 1
+            target = PROVIDER_STATUSES.get(provider_status)
+            if target is None:
+                counts["unchanged"] += 1
+                continue
+
+            amount = result.get("amount")
+            if target == PaymentStatus.COMPLETED and amount is not None and abs(float(amount) - row["amount"]) > 0.005:
+                counts["unchanged"] += 1
+                if len(mismatches) < REPORT_SAMPLE_SIZE:
+                    mismatches.append({"payment_id": row["payment_id"], "amount": row["amount"], "provider_amount": amount})
+                continue
+
+            values = {
+                "id": row["id"],
+                "status": target,
+                "provider_response": _provider_response(result, checked_at),
+            }
+            if target == PaymentStatus.COMPLETED:
+                values["completed_at"] = checked_at
+            updates.append(values)
+            counts[target.value] += 1
+
+        await run_in_threadpool(_in_session, session_factory, apply_transitions, updates)
+        batches += 1
+
+        if circuit_open:
+            # İyzico erişilemez: partinin başından sonraki çalışmada devam et
+            aborted = True
+            next_cursor = cursor
+            break
+
+        cursor = rows[-1]["id"]
+        if len(rows) < batch_size:
+            break
+
+    report = {
+        "started_at": started_at,
+        "finished_at": utcnow(),
+        "start_cursor": start_cursor,
+        "next_cursor": next_cursor,
+        "aborted": aborted,
+        **counts,
+        "report": {
+            "batches": batches,
+            "duration_seconds": round(time.monotonic() - started, 3),
+            "provider_statuses": dict(provider_statuses),
+            "amount_mismatches": mismatches,
+            "error_samples": errors,
+        },
+    }
+    report["id"] = await run_in_threadpool(_in_session, session_factory, save_run, dict(report))
+    return report
@@ -0,0 +1,169 @@
+"""
+Process Pool - Evrak işleme için worker süreç havuzu
+
+Önizleme üretimi (app.services.thumbnails) ve metin çıkarma
+(app.services.search_index) CPU yoğundur ve üçüncü parti çözücüler
+(Pillow, pdfium) bozuk dosyada süreci çökertebilir. Bu işler worker'da
+DOCUMENT_PROCESS_WORKERS boyutlu tek bir spawn süreç havuzunda çalışır:
+worker'ın olay döngüsü bloklanmaz ve kuyruklar CPU'yu birlikte paylaşır.
+Alt süreçler DOCUMENT_PROCESS_MAX_TASKS_PER_CHILD işten sonra yenilenir
+(kütüphanelerdeki bellek sızıntıları birikmez); çöken alt süreç havuzu
+bozar, havuz bir sonraki işte yeniden kurulur. Bozulan havuzdaki işlerin
+hangisinin çökmeye yol açtığı bilinmez: her biri bir kez tek başına, kendi
+alt sürecinde yeniden denenir. Orada da çöken iş BrokenProcessPool alır
+(dosya gerçekten bozuktur); diğer işler etkilenmez.
+
+Her iş DOCUMENT_PROCESS_TIMEOUT_SECONDS süre sınırıyla çalışır. Çalışan
+bir işi tek başına durdurmanın yolu olmadığından süre aşımında (veya
+çağıran iptal ettiğinde, ör. iş zaman aşımı) havuz yenilenir: alt
+süreçler sonlandırılır, yeni işler yeni havuzda başlar. Aynı havuzda
+çalışmakta olan diğer işler yukarıdaki gibi tek başına yeniden denenir.
+
+Havuzda çalışan fonksiyonlar uygulama modüllerini import etmeyen hafif
+modüllerde durur (thumbnail_render, text_extract); alt süreç hızlı başlar.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+import asyncio
+import logging
+import multiprocessing
+import threading
+import weakref
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentProcessTimeout(TimeoutError):
+    """İş süre sınırını aştı; alt süreçleri sonlandırılan havuz yenilendi"""
+
+
+class DocumentProcessPool:
+    """Tembel kurulan, çökünce yeniden kurulan süreç havuzu"""
+
+    def __init__(self, workers: int = 2, max_tasks_per_child: int = 100, timeout: float = 120.0):
+        self.workers = max(workers, 1)
+        self.max_tasks_per_child = max_tasks_per_child or None
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Spawn ile temiz alt süreç (thread'li süreçte fork güvenli değil)
+        self._mp_context = multiprocessing.get_context("spawn")
+        # Süre aşımı nedeniyle bilerek sonlandırılan havuzlar
+        self._recycled: "weakref.WeakSet[ProcessPoolExecutor]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.crashed = 0
+        self.timed_out = 0
+        self.recycles = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=self._mp_context,
+                    max_tasks_per_child=self.max_tasks_per_child
+                )
+            return self._executor
+
+    def _isolated_pool(self) -> ProcessPoolExecutor:
+        """Tek iş için tek süreçli havuz (çökerse yalnızca o işi etkiler)"""
+        return ProcessPoolExecutor(max_workers=1, mp_context=self._mp_context)
+
+    def _reset(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _recycle(self, executor: ProcessPoolExecutor) -> None:
+        """Havuzu alt süreçlerini öldürerek bırak (bekleyen işler BrokenProcessPool alır)"""
+        with self._lock:
+            if executor in self._recycled:
+                return
+            self._recycled.add(executor)
+            if self._executor is executor:
+                self._executor = None
+        self.recycles += 1
+        # ProcessPoolExecutor çalışan işi durduracak bir API sunmaz
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.kill()
+        executor.shutdown(wait=False)
+
+    async def run(self, func: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """
+        func(*args)'ı alt süreçte çalıştır
+
+        Args:
+            timeout: Süre sınırı (varsayılan DOCUMENT_PROCESS_TIMEOUT_SECONDS);
+                çağıranın iş zaman aşımından kısa olmalı
+
+        Raises:
+            DocumentProcessTimeout: Süre aşıldı (havuz yenilendi)
+            BrokenProcessPool: func tek başına çalıştığı alt süreci de çökertti
+            Exception: func'ın alt süreçteki hatası
+        """
+        timeout = timeout or self.timeout
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            isolated = attempt > 0
+            executor = self._isolated_pool() if isolated else self._pool()
+            self.in_flight += 1
+            try:
+                result = await asyncio.wait_for(
+                    loop.run_in_executor(executor, func, *args), timeout
+                )
+            except asyncio.TimeoutError:
+                self.timed_out += 1
+                logger.warning(f"{func.__name__} exceeded {timeout:g}s, recycling process pool")
+                self._recycle(executor)
+                raise DocumentProcessTimeout(f"{func.__name__} exceeded {timeout:g}s") from None
+            except asyncio.CancelledError:
+                # Çağıran vazgeçti: alt süreç de boşuna çalışmaya devam etmesin
+                self._recycle(executor)
+                raise
+            except BrokenProcessPool:
+                if not isolated:
+                    # Havuzu başka bir iş (çökme, süre aşımı) bozmuş olabilir
+                    self._reset(executor)
+                    continue
+                self.crashed += 1
+                raise
+            except Exception:
+                self.failed += 1
+                raise
+            finally:
+                self.in_flight -= 1
+                if isolated:
+                    executor.shutdown(wait=False)
+            self.completed += 1
+            return result
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "started": self._executor is not None,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "crashed": self.crashed,
+            "timed_out": self.timed_out,
+            "recycles": self.recycles,
+        }
+
+
+document_pool = DocumentProcessPool(
+    workers=settings.DOCUMENT_PROCESS_WORKERS,
+    max_tasks_per_child=settings.DOCUMENT_PROCESS_MAX_TASKS_PER_CHILD,
+    timeout=settings.DOCUMENT_PROCESS_TIMEOUT_SECONDS
+)
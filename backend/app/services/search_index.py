@@ -0,0 +1,318 @@
+"""
+Search Index - Evrak içeriğinde tam metin arama
+
+PDF, DOCX, XLSX ve TXT evrakların düz metni blob başına bir kez çıkarılır
+(document_texts) ve veritabanının kendi metin indeksine girer:
+
+- PostgreSQL: content'ten türetilen search_vector (tsvector, turkish
+  yapılandırması: Türkçe kök bulma ve durdurma kelimeleri) ve GIN indeksi;
+  sorgu websearch_to_tsquery ile ("tırnaklı ifade", -hariç, OR), sıralama
+  ts_rank_cd, vurgulu parça ts_headline
+- SQLite (yerel geliştirme): FTS5 (unicode61, aksanlar yok sayılır);
+  kök bulma olmadığından terimler önek olarak aranır, sıralama bm25
+
+Yükleme, documents.extract_text işini yükleme transaction'ında search
+kuyruğuna ekler (içerik başına tekil iş); çıkarma evrak süreç havuzunda
+yapılır (app.services.process_pool). Bu özellikten önce yüklenmiş
+evraklar periyodik search.backfill göreviyle kuyruğa alınır.
+
+Görünürlük (müvekkil yalnızca kendi ve davasının görünür evraklarını
+görür) arama sorgusunun WHERE koşuludur: sıralama ve LIMIT yalnızca
+kullanıcının görebildiği evraklar üzerinde yapılır.
+"""
+from typing import List, Optional, Tuple
+import html
+import logging
+import os
+import re
+
+from sqlalchemy import column, delete, func, literal_column, select, table
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.blob import SEARCH_CONFIG, DocumentBlob, DocumentText
+from app.models.document import Document
+from app.services import blob_store
+from app.services.jobs import enqueue, unique_job_statement
+from app.services.process_pool import document_pool
+from app.services.storage import get_storage_service
+from app.services.text_extract import SOURCE_KINDS, extract_text, supported
+
+logger = logging.getLogger(__name__)
+
+EXTRACT_TASK = "documents.extract_text"
+SEARCH_QUEUE = "search"
+
+READY = "ready"
+EMPTY = "empty"  # metin katmanı olmayan (taranmış) PDF gibi
+FAILED = "failed"
+UNSUPPORTED = "unsupported"
+
+# Vurgu sınırları: içerikte bulunmayan özel kullanım alanı karakterleri,
+# parça HTML olarak kaçışlandıktan sonra <mark> ile değiştirilir
+HIGHLIGHT_START = "\ue000"
+HIGHLIGHT_STOP = "\ue001"
+HEADLINE_OPTIONS = (
+    f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, "
+    'MaxWords=30, MinWords=12, MaxFragments=2, FragmentDelimiter=" … "'
+)
+SNIPPET_TOKENS = 24
+
+# Sorgudaki terim sınırı (SQLite FTS5)
+MAX_QUERY_TERMS = 10
+
+_WORD = re.compile(r"\w+")
+
+FTS_TABLE = "document_texts_fts"
+fts = table(FTS_TABLE, column("sha256"), column("content"))
+
+
+def text_kind(file_ext: str) -> Optional[str]:
+    """Metni çıkarılabilen uzantının kaynak türü"""
+    kind = SOURCE_KINDS.get(file_ext.lower())
+    return kind if kind and supported(kind) else None
+
+
+def _extract_job_statement(dialect_name: str, sha256: str, kind: str):
+    return unique_job_statement(
+        dialect_name,
+        EXTRACT_TASK,
+        f"text:{sha256}",
+        payload={"sha256": sha256, "kind": kind},
+        queue=SEARCH_QUEUE
+    )
+
+
+async def schedule(uow, sha256: str, file_ext: str) -> bool:
+    """
+    İçeriğin metin çıkarma işini çağıranın transaction'ına ekle
+
+    Returns:
+        bool: Uzantı destekleniyorsa True
+    """
+    kind = text_kind(file_ext)
+    if kind is None:
+        return False
+    stmt = _extract_job_statement(uow.db.bind.dialect.name, sha256, kind)
+    if stmt is not None:
+        await uow.execute(stmt)
+    else:
+        enqueue(uow, EXTRACT_TASK, {"sha256": sha256, "kind": kind}, queue=SEARCH_QUEUE)
+    return True
+
+
+def _upsert_statement(dialect_name: str, sha256: str, status: str, content: Optional[str]):
+    values = {"sha256": sha256, "status": status, "content": content}
+    if dialect_name == "postgresql":
+        stmt = postgresql.insert(DocumentText).values(**values)
+    elif dialect_name == "sqlite":
+        stmt = sqlite.insert(DocumentText).values(**values)
+    else:
+        return None
+    return stmt.on_conflict_do_update(
+        index_elements=[DocumentText.sha256],
+        set_={"status": stmt.excluded.status, "content": stmt.excluded.content, "extracted_at": func.now()}
+    )
+
+
+def _blob_state(sha256: str):
+    db = SessionLocal()
+    try:
+        return db.execute(
+            select(DocumentBlob.file_path, DocumentText.status)
+            .outerjoin(DocumentText, DocumentText.sha256 == DocumentBlob.sha256)
+            .where(DocumentBlob.sha256 == sha256)
+        ).first()
+    finally:
+        db.close()
+
+
+def _store_text(sha256: str, status: str, content: Optional[str] = None) -> bool:
+    """Blob hâlâ varsa metni yaz (silinmişse False)"""
+    db = SessionLocal()
+    try:
+        if db.get(DocumentBlob, sha256) is None:
+            return False
+        stmt = _upsert_statement(db.bind.dialect.name, sha256, status, content)
+        if stmt is not None:
+            db.execute(stmt)
+        else:
+            db.merge(DocumentText(sha256=sha256, status=status, content=content))
+        db.commit()
+        return True
+    finally:
+        db.close()
+
+
+async def index_blob_text(sha256: str, kind: str) -> dict:
+    """
+    Blob'un metnini çıkar ve indekse yaz (documents.extract_text)
+
+    Çözülemeyen dosya tekrar denenmez (failed); depo hataları işin yeniden
+    denenmesi için yükseltilir.
+    """
+    state = await run_in_threadpool(_blob_state, sha256)
+    if state is None:
+        return {"status": "deleted"}
+    file_path, text_status = state
+    if text_status is not None:
+        return {"status": text_status, "skipped": True}
+    if not supported(kind):
+        await run_in_threadpool(_store_text, sha256, UNSUPPORTED)
+        return {"status": UNSUPPORTED}
+
+    source = get_storage_service().local_path(file_path)
+    downloaded = None
+    if source is None:
+        try:
+            downloaded = source = await run_in_threadpool(blob_store.download_to_temp, file_path)
+        except FileNotFoundError:
+            return {"status": "missing"}
+
+    try:
+        text = await document_pool.run(extract_text, source, kind, settings.SEARCH_MAX_TEXT_CHARS)
+    except Exception as e:
+        logger.warning(f"Text extraction failed for {sha256[:12]}: {type(e).__name__}: {e}")
+        await run_in_threadpool(_store_text, sha256, FAILED)
+        return {"status": FAILED}
+    finally:
+        if downloaded:
+            blob_store.discard_temp(downloaded)
+
+    text = text.replace(HIGHLIGHT_START, "").replace(HIGHLIGHT_STOP, "")
+    status = READY if text else EMPTY
+    await run_in_threadpool(_store_text, sha256, status, text or None)
+    return {"status": status, "chars": len(text)}
+
+
+def backfill(db: Session, batch_size: int = 500) -> dict:
+    """
+    Metni çıkarılmamış blob'ları kuyruğa al, blob'u silinmiş metinleri temizle
+
+    Blob uzantı tutmadığından tür, blob'a işaret eden evrağın dosya
+    adından belirlenir. Desteklenmeyen türler doğrudan unsupported yazılır.
+    """
+    dialect_name = db.bind.dialect.name
+    rows = db.execute(
+        select(DocumentBlob.sha256, func.min(Document.original_filename))
+        .join(Document, Document.sha256 == DocumentBlob.sha256)
+        .outerjoin(DocumentText, DocumentText.sha256 == DocumentBlob.sha256)
+        .where(DocumentText.sha256.is_(None))
+        .group_by(DocumentBlob.sha256)
+        .limit(batch_size)
+    ).all()
+
+    queued = unsupported = 0
+    for sha256, filename in rows:
+        kind = text_kind(os.path.splitext(filename)[1])
+        if kind is None:
+            db.add(DocumentText(sha256=sha256, status=UNSUPPORTED))
+            unsupported += 1
+            continue
+        stmt = _extract_job_statement(dialect_name, sha256, kind)
+        if stmt is not None:
+            db.execute(stmt)
+        else:
+            enqueue(db, EXTRACT_TASK, {"sha256": sha256, "kind": kind}, queue=SEARCH_QUEUE)
+        queued += 1
+
+    # Silme sırasında çıkarılmakta olan metinden kalanlar
+    removed = db.execute(
+        delete(DocumentText).where(~DocumentText.sha256.in_(select(DocumentBlob.sha256)))
+    ).rowcount
+    db.commit()
+    return {"queued": queued, "unsupported": unsupported, "removed": removed}
+
+
+def fts5_query(text: str) -> Optional[str]:
+    """Kullanıcı sorgusunu FTS5 sözdizimine çevir (her terim önek, hepsi zorunlu)"""
+    terms = _WORD.findall(text)[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _postgresql_search(text: str, conditions: list, limit: int):
+    config = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+    tsquery = func.websearch_to_tsquery(config, text)
+    vector = literal_column("document_texts.search_vector")
+    rank = func.ts_rank_cd(vector, tsquery)
+
+    # ts_headline metni yeniden işler: yalnızca sayfaya giren sonuçlar için
+    hits = (
+        select(Document.id.label("document_id"), rank.label("rank"))
+        .join(DocumentText, DocumentText.sha256 == Document.sha256)
+        .where(vector.op("@@")(tsquery), *conditions)
+        .order_by(rank.desc(), Document.id.desc())
+        .limit(limit)
+        .subquery()
+    )
+    return (
+        select(
+            Document,
+            hits.c.rank,
+            func.ts_headline(config, DocumentText.content, tsquery, HEADLINE_OPTIONS)
+        )
+        .join(hits, hits.c.document_id == Document.id)
+        .join(DocumentText, DocumentText.sha256 == Document.sha256)
+        .order_by(hits.c.rank.desc(), Document.id.desc())
+    )
+
+
+def _sqlite_search(text: str, conditions: list, limit: int):
+    match = fts5_query(text)
+    if match is None:
+        return None
+    fts_ref = literal_column(FTS_TABLE)
+    # bm25 küçük olan daha alakalı
+    rank = -func.bm25(fts_ref)
+    return (
+        select(
+            Document,
+            rank,
+            func.snippet(fts_ref, 1, HIGHLIGHT_START, HIGHLIGHT_STOP, "…", SNIPPET_TOKENS)
+        )
+        .join(fts, fts.c.sha256 == Document.sha256)
+        .where(fts_ref.op("MATCH")(match), *conditions)
+        .order_by(rank.desc(), Document.id.desc())
+        .limit(limit)
+    )
+
+
+async def search_documents(db, text: str, conditions: list, limit: int) -> List[Tuple[Document, float, str]]:
+    """
+    Sorguyla eşleşen evraklar, alaka sırasıyla
+
+    Args:
+        conditions: Document üzerinde ek WHERE koşulları (görünürlük, filtreler)
+
+    Returns:
+        List[Tuple[Document, float, str]]: (evrak, alaka puanı, işaretli parça);
+        parça render_highlight ile gösterime hazırlanır
+    """
+    if not _WORD.search(text):
+        return []
+    dialect_name = db.bind.dialect.name
+    if dialect_name == "postgresql":
+        stmt = _postgresql_search(text, conditions, limit)
+    elif dialect_name == "sqlite":
+        stmt = _sqlite_search(text, conditions, limit)
+    else:
+        raise NotImplementedError(f"Full-text search is not supported on {dialect_name}")
+    if stmt is None:
+        return []
+    return [tuple(row) for row in (await db.execute(stmt)).all()]
+
+
+def render_highlight(snippet: Optional[str]) -> str:
+    """İşaretli parçayı HTML'e çevir: evrak metni kaçışlanır, eşleşmeler <mark>"""
+    if not snippet:
+        return ""
+    return (
+        html.escape(snippet)
+        .replace(HIGHLIGHT_START, "<mark>")
+        .replace(HIGHLIGHT_STOP, "</mark>")
+    )
@@ -0,0 +1,168 @@
+"""
+Signed URLs - İmzalı indirme URL'leri için (evrak, kullanıcı) önbelleği
+
+STORAGE_PRESIGNED_DOWNLOADS açıkken indirme isteği, erişim kontrolü ve
+audit kaydından sonra nesne deposunun süreli imzalı URL'ine 302 ile
+yönlendirilir. PDF görüntüleyiciler ve tekrar tıklamalar aynı evrakı kısa
+aralıklarla ister; her seferinde imzalama yapmamak (Supabase'de ayrı bir
+API isteği) için üretilen URL, süresinin bitmesine
+STORAGE_PRESIGNED_URL_MIN_REMAINING_SECONDS kalana kadar yeniden kullanılır.
+Böylece tarayıcıya verilen URL yönlendirme izlenirken hâlâ geçerlidir.
+
+Önbellek boyutu sınırlı (LRU) ve süreç içidir. Evrak silindiğinde
+invalidate_document() çağrılır.
+"""
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+import threading
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.models.document import Document
+from app.services.storage import StorageBackend
+
+CacheKey = Tuple[int, int]
+
+
+class SignedURLCache:
+    """(evrak, kullanıcı) bazlı LRU imzalı URL önbelleği (thread-safe)"""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: int = 300, min_remaining_seconds: int = 60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.min_remaining_seconds = min_remaining_seconds
+        # anahtar -> (yeniden kullanım sınırı, nesne anahtarı, URL)
+        self._entries: "OrderedDict[CacheKey, Tuple[float, str, str]]" = OrderedDict()
+        self._by_document: Dict[int, Set[CacheKey]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > self.min_remaining_seconds
+
+    def get(self, document_id: int, user_id: int, object_key: str) -> Optional[str]:
+        """
+        Hâlâ yeterince geçerli önbellekteki URL
+
+        Evrağın nesne anahtarı değiştiyse eski URL kullanılmaz.
+        """
+        if not self.enabled:
+            return None
+
+        key = (document_id, user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            reuse_until, cached_object_key, url = entry
+            if reuse_until <= time.monotonic() or cached_object_key != object_key:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return url
+
+    def put(self, document_id: int, user_id: int, object_key: str, url: str, issued_at: float) -> None:
+        """
+        issued_at anında (time.monotonic) ttl_seconds için imzalanmış URL'i sakla
+        """
+        if not self.enabled:
+            return
+
+        key = (document_id, user_id)
+        reuse_until = issued_at + self.ttl_seconds - self.min_remaining_seconds
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (reuse_until, object_key, url)
+            self._by_document.setdefault(document_id, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def invalidate_document(self, document_id: int) -> None:
+        """Evrağa ait tüm kullanıcıların girişlerini sil"""
+        with self._lock:
+            keys = self._by_document.pop(document_id, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            if keys:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_document.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "min_remaining_seconds": self.min_remaining_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key: CacheKey) -> None:
+        """Kilit altında çağrılmalı"""
+        if self._entries.pop(key, None) is None:
+            return
+        keys = self._by_document.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_document[key[0]]
+
+
+signed_url_cache = SignedURLCache(
+    max_entries=settings.STORAGE_PRESIGNED_URL_CACHE_SIZE,
+    ttl_seconds=settings.STORAGE_PRESIGNED_URL_TTL_SECONDS,
+    min_remaining_seconds=settings.STORAGE_PRESIGNED_URL_MIN_REMAINING_SECONDS,
+)
+
+
+async def get_download_url(storage: StorageBackend, document: Document, user_id: int) -> Optional[str]:
+    """
+    Evrak için imzalı indirme URL'i (önbellekten veya yeni imzalanmış)
+
+    Returns:
+        Optional[str]: Arka uç imzalı URL desteklemiyorsa None
+
+    Raises:
+        FileNotFoundError: Depo, olmayan nesne için imzalamayı reddetti
+    """
+    url = signed_url_cache.get(document.id, user_id, document.file_path)
+    if url is not None:
+        return url
+
+    issued_at = time.monotonic()
+    url = await run_in_threadpool(
+        storage.presigned_url,
+        document.file_path,
+        settings.STORAGE_PRESIGNED_URL_TTL_SECONDS,
+        filename=document.original_filename,
+        content_type=document.mime_type
+    )
+    if url is not None:
+        signed_url_cache.put(document.id, user_id, document.file_path, url, issued_at)
+    return url
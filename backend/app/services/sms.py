@@ -0,0 +1,294 @@
+"""
+SMS - Sağlayıcı bulk API'si ile bildirim gönderimi
+
+NotificationType.SMS bildirimleri app.tasks.notifications.deliver_sms
+görevi tarafından gönderilir (bkz. app.services.delivery). Alınan parti
+SMS_BULK_SIZE'lık gruplara bölünür; her grup sağlayıcıya tek HTTP isteği
+olarak gider (yüzlerce duruşma hatırlatması için yüzlerce istek yerine
+birkaç istek). Gruplar keep-alive bağlantı havuzlu tek bir HTTP istemcisi
+üzerinden en fazla SMS_CONCURRENCY paralel istekle gönderilir; istekler
+sağlayıcı başına token bucket ile sınırlanır (SMS_RATE_LIMIT_PER_SECOND).
+
+Sağlayıcı grubu bütün olarak reddeder: kalıcı hata (ör. tek mesajdaki
+metin hatası) alan grup ikiye bölünüp yeniden gönderilir, yalnızca hatalı
+mesajlar kalıcı başarısız sayılır. Geçici hatada grup bütün olarak
+yeniden denenir.
+
+Sağlayıcılar (SMS_PROVIDER):
+- netgsm: NetGSM REST v2 toplu gönderim (n:n, her numaraya ayrı metin)
+- log: Göndermez, yalnızca loglar (geliştirme)
+
+Yeni sağlayıcı: SMSProvider alt sınıfı + SMS_PROVIDERS kaydı.
+Yük testi için yerel sahte NetGSM sunucusu: backend/fake_netgsm.py
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+import logging
+import re
+import threading
+
+import httpx
+
+from app.core.config import settings
+from app.core.rate_limit import get_rate_limiter
+from app.models.notification import NotificationType
+from app.services.delivery import (
+    DeliveryChannel,
+    DeliveryResult,
+    PermanentDeliveryError,
+    TransientDeliveryError,
+)
+from app.services.jobs import utcnow
+
+logger = logging.getLogger(__name__)
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """
+    Türkiye cep telefonu numarasını 905XXXXXXXXX biçimine çevir
+
+    Returns:
+        Optional[str]: Geçersiz veya desteklenmeyen numarada None
+    """
+    if not phone:
+        return None
+    digits = _NON_DIGITS.sub("", phone)
+    if digits.startswith("00"):
+        digits = digits[2:]
+    if len(digits) == 11 and digits.startswith("0"):
+        digits = "90" + digits[1:]
+    elif len(digits) == 10:
+        digits = "90" + digits
+    if len(digits) == 12 and digits.startswith("905"):
+        return digits
+    return None
+
+
+class SMSMessage:
+    __slots__ = ("notification_id", "phone", "text")
+
+    def __init__(self, notification_id: int, phone: str, text: str):
+        self.notification_id = notification_id
+        self.phone = phone
+        self.text = text
+
+
+class SMSProvider:
+    """
+    Sağlayıcı arayüzü
+
+    send_bulk mesajları tek istekte gönderir; başarısızlıkta
+    TransientDeliveryError veya PermanentDeliveryError fırlatır (grup
+    bütün olarak kabul veya reddedilir).
+    """
+
+    name: str = ""
+
+    @property
+    def configured(self) -> bool:
+        return True
+
+    def send_bulk(self, messages: Sequence[SMSMessage]) -> Optional[str]:
+        """Returns: sağlayıcının iş/gönderim kimliği (varsa)"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class LogSMSProvider(SMSProvider):
+    """Mesajları göndermeden loglar"""
+
+    name = "log"
+
+    def send_bulk(self, messages: Sequence[SMSMessage]) -> Optional[str]:
+        for message in messages:
+            logger.info(f"SMS to {message.phone}: {message.text}")
+        return None
+
+
+class NetGSMProvider(SMSProvider):
+    """
+    NetGSM REST v2 (/sms/rest/v2/send)
+
+    Yanıt kodları: 00 kabul edildi; 20 metin hatası, 70 hatalı parametre
+    (kalıcı); 30 kimlik/IP yetkisi, 40 tanımsız başlık (yapılandırma,
+    düzeltilince yeniden denenir); 80/85 gönderim limiti (geçici).
+    """
+
+    name = "netgsm"
+    PATH = "/sms/rest/v2/send"
+    PERMANENT_CODES = {"20", "70"}
+
+    def __init__(
+        self,
+        base_url: str,
+        username: str,
+        password: str,
+        header: str,
+        timeout: float = 10.0,
+        max_connections: int = 4
+    ):
+        self.username = username
+        self.header = header
+        # Tek istemci: bağlantılar istekler arasında açık tutulur (keep-alive)
+        self.client = httpx.Client(
+            base_url=base_url,
+            auth=(username, password),
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            headers={"Content-Type": "application/json"}
+        )
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.username and self.header)
+
+    def send_bulk(self, messages: Sequence[SMSMessage]) -> Optional[str]:
+        body = {
+            "msgheader": self.header,
+            "encoding": "TR",
+            "messages": [{"msg": message.text, "no": message.phone} for message in messages],
+        }
+        try:
+            response = self.client.post(self.PATH, json=body)
+        except httpx.HTTPError as e:
+            raise TransientDeliveryError(f"NetGSM request failed: {type(e).__name__}: {e}") from e
+
+        if response.status_code >= 500 or response.status_code == 429:
+            raise TransientDeliveryError(f"NetGSM HTTP {response.status_code}")
+        if response.status_code in (401, 403):
+            raise TransientDeliveryError(f"NetGSM authentication failed (HTTP {response.status_code})")
+        if response.status_code >= 400:
+            raise PermanentDeliveryError(f"NetGSM HTTP {response.status_code}: {response.text[:200]}")
+
+        try:
+            data = response.json()
+        except ValueError:
+            raise TransientDeliveryError(f"NetGSM invalid response: {response.text[:200]}")
+
+        code = str(data.get("code", ""))
+        if code == "00":
+            return data.get("jobid")
+        error = f"NetGSM code {code}: {data.get('description', '')}"
+        if code in self.PERMANENT_CODES:
+            raise PermanentDeliveryError(error)
+        raise TransientDeliveryError(error)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def _netgsm_from_settings() -> NetGSMProvider:
+    return NetGSMProvider(
+        base_url=settings.NETGSM_API_URL,
+        username=settings.NETGSM_USERNAME,
+        password=settings.NETGSM_PASSWORD,
+        header=settings.NETGSM_HEADER,
+        timeout=settings.SMS_TIMEOUT_SECONDS,
+        max_connections=settings.SMS_CONCURRENCY
+    )
+
+
+SMS_PROVIDERS: Dict[str, Callable[[], SMSProvider]] = {
+    "netgsm": _netgsm_from_settings,
+    "log": LogSMSProvider,
+}
+
+
+def sms_text(row: dict) -> str:
+    return f"{row['title']}: {row['message']}"
+
+
+class SMSChannel(DeliveryChannel):
+    """Sağlayıcının bulk API'si üzerinden NotificationType.SMS gönderimi"""
+
+    notification_type = NotificationType.SMS
+    recipient_field = "phone"
+
+    def __init__(self):
+        self._provider: Optional[SMSProvider] = None
+        self._provider_lock = threading.Lock()
+
+    @property
+    def batch_size(self) -> int:
+        # Bir parti tüm paralel isteklere yetecek kadar mesaj içerir
+        return settings.SMS_BULK_SIZE * settings.SMS_CONCURRENCY
+
+    @property
+    def max_attempts(self) -> int:
+        return settings.SMS_MAX_ATTEMPTS
+
+    @property
+    def provider(self) -> SMSProvider:
+        with self._provider_lock:
+            if self._provider is None:
+                factory = SMS_PROVIDERS.get(settings.SMS_PROVIDER)
+                if factory is None:
+                    raise ValueError(f"Unknown SMS provider: {settings.SMS_PROVIDER}")
+                self._provider = factory()
+            return self._provider
+
+    @property
+    def enabled(self) -> bool:
+        return settings.SMS_PROVIDER in SMS_PROVIDERS and self.provider.configured
+
+    def close(self) -> None:
+        with self._provider_lock:
+            if self._provider is not None:
+                self._provider.close()
+                self._provider = None
+
+    def _send_group(self, messages: List[SMSMessage]) -> List[DeliveryResult]:
+        get_rate_limiter(
+            f"sms:{self.provider.name}", settings.SMS_RATE_LIMIT_PER_SECOND
+        ).acquire()
+        try:
+            self.provider.send_bulk(messages)
+        except PermanentDeliveryError as e:
+            if len(messages) > 1:
+                # Red gruptaki bir mesajdan kaynaklanıyor olabilir: yarılarını ayrı gönder
+                logger.warning(f"SMS bulk request of {len(messages)} rejected, splitting: {str(e)}")
+                middle = len(messages) // 2
+                return self._send_group(messages[:middle]) + self._send_group(messages[middle:])
+            logger.warning(f"SMS to notification {messages[0].notification_id} rejected: {str(e)}")
+            return [DeliveryResult.failed(messages[0].notification_id, str(e), permanent=True)]
+        except TransientDeliveryError as e:
+            logger.warning(f"SMS bulk request of {len(messages)} failed: {str(e)}")
+            return [
+                DeliveryResult.failed(message.notification_id, str(e), permanent=False)
+                for message in messages
+            ]
+        # Sağlayıcı grubu kabul ettiği an
+        sent_at = utcnow()
+        return [DeliveryResult.sent(message.notification_id, sent_at) for message in messages]
+
+    def send_batch(self, rows: Sequence[dict]) -> List[DeliveryResult]:
+        results: List[DeliveryResult] = []
+        messages: List[SMSMessage] = []
+        for row in rows:
+            phone = normalize_phone(row.get("recipient"))
+            if phone is None:
+                results.append(DeliveryResult.failed(
+                    row["id"], f"No deliverable phone number: {row.get('recipient')!r}", permanent=True
+                ))
+            else:
+                messages.append(SMSMessage(row["id"], phone, sms_text(row)))
+
+        size = settings.SMS_BULK_SIZE
+        groups = [messages[i:i + size] for i in range(0, len(messages), size)]
+        if len(groups) == 1:
+            results.extend(self._send_group(groups[0]))
+        elif groups:
+            with ThreadPoolExecutor(max_workers=settings.SMS_CONCURRENCY, thread_name_prefix="sms") as executor:
+                for group_results in executor.map(self._send_group, groups):
+                    results.extend(group_results)
+        return results
+
+
+sms_channel = SMSChannel()
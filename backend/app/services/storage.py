@@ -1,209 +1,711 @@
 """
-Storage Service - Dosya yükleme/indirme/silme işlemleri
-MinIO veya Supabase Storage kullanır
+Storage Service - Evrak dosyaları için tak-çıkar depolama katmanı
+
+Evraklar içerik adresli anahtarlarla saklanır (bkz. app.services.blob_store);
+anahtar Document.file_path değeridir ve tüm arka uçlarda aynıdır. Arka uç
+STORAGE_PROVIDER ile seçilir:
+
+- local: UPLOAD_DIR altında yerel disk (tek sunucu; indirme sendfile ile)
+- minio: MinIO / S3 uyumlu nesne deposu. Yüklemeler STORAGE_PART_SIZE_MB'lık
+  parçalarla en fazla STORAGE_UPLOAD_CONCURRENCY paralel multipart upload
+  olarak gider; indirme Range destekli akıştır (dosya belleğe okunmaz).
+  Birden fazla API kopyası aynı evrakları paylaşır.
+- supabase: Supabase Storage REST API'si (keep-alive httpx istemcisi)
+
+Nesne depoları süreli imzalı (presigned) indirme URL'i de üretir;
+STORAGE_PRESIGNED_DOWNLOADS açıkken indirme isteği bu URL'e 302 ile
+yönlendirilir ve dosya gövdesi API'den hiç geçmez (bkz.
+app.services.signed_urls).
+
+Arayüz senkrondur; async kod run_in_threadpool ile çağırır. Yeni arka uç:
+StorageBackend alt sınıfı + STORAGE_BACKENDS kaydı.
+Yerel test için S3 taklidi: backend/fake_s3.py
 """
-from supabase import create_client, Client
-from app.core.config import settings
-import uuid
-import mimetypes
-from typing import Optional, BinaryIO
 from datetime import datetime, timedelta
+from email.utils import formatdate
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote
 import logging
 import os
+import re
+import threading
+
+import httpx
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 # MinIO için
 try:
+    import urllib3
     from minio import Minio
+    from minio.commonconfig import CopySource
     from minio.error import S3Error
     MINIO_AVAILABLE = True
 except ImportError:
     MINIO_AVAILABLE = False
 
-class SupabaseStorageService:
-    """Supabase Storage ile dosya yönetimi"""
-    
-    def __init__(self):
-        if not settings.SUPABASE_URL or not settings.SUPABASE_SERVICE_KEY:
-            raise ValueError("Supabase credentials not configured")
-            
-        self.supabase: Client = create_client(
-            settings.SUPABASE_URL,
-            settings.SUPABASE_SERVICE_KEY
-        )
-        self.bucket_name = settings.SUPABASE_BUCKET_NAME
-    
-    def upload_document(self, 
-                       file_content: bytes, 
-                       filename: str, 
-                       case_id: str,
-                       user_id: str) -> dict:
+CHUNK_SIZE = 256 * 1024
+
+# Nesne bulunamadı anlamına gelen S3 hata kodları
+S3_MISSING_CODES = {"NoSuchKey", "NoSuchObject", "ResourceNotFound"}
+
+# Supabase list isteği başına kayıt sayısı
+SUPABASE_LIST_LIMIT = 1000
+
+
+class StoredObject:
+    """Depodaki nesnenin üst verisi"""
+
+    __slots__ = ("size", "etag", "last_modified")
+
+    def __init__(self, size: int, etag: Optional[str] = None, last_modified: Optional[float] = None):
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified  # epoch saniye
+
+
+class StorageBackend:
+    """
+    Depolama arayüzü
+
+    Olmayan nesne: stat None döner, move / open_range FileNotFoundError
+    fırlatır, delete sessizce geçer.
+    """
+
+    name: str = ""
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Nesne yerel diskteyse tam yolu (sendfile için), değilse None"""
+        return None
+
+    def store_file(self, key: str, source_path: str, content_type: Optional[str] = None) -> None:
+        """Yerel dosyayı anahtara yaz; kaynak dosya taşınır veya silinir"""
+        raise NotImplementedError
+
+    def stat(self, key: str) -> Optional[StoredObject]:
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        return self.stat(key) is not None
+
+    def move(self, source: str, destination: str) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def open_range(self, key: str, offset: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
         """
-        Dosyayı Supabase Storage'a yükle
-        
-        Args:
-            file_content: Dosya içeriği (bytes)
-            filename: Orijinal dosya adı
-            case_id: Dava ID'si
-            user_id: Yükleyen kullanıcı ID'si
-        
-        Returns:
-            dict: {file_path, filename, size, mime_type}
+        Nesnenin [offset, offset+length) aralığını parça parça okuyan iterator
+
+        İstek hemen gönderilir (nesne yoksa FileNotFoundError burada
+        fırlar); gövde iterator tüketildikçe okunur.
         """
-        try:
-            # Güvenli dosya adı oluştur
-            file_extension = filename.split('.')[-1] if '.' in filename else ''
-            safe_filename = f"{uuid.uuid4()}.{file_extension}" if file_extension else str(uuid.uuid4())
-            
-            # Klasör yapısı: cases/{case_id}/{user_id}/{filename}
-            file_path = f"cases/{case_id}/{user_id}/{safe_filename}"
-            
-            # MIME type belirle
-            mime_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
-            
-            # Dosyayı yükle
-            result = self.supabase.storage.from_(self.bucket_name).upload(
-                path=file_path,
-                file=file_content,
-                file_options={
-                    "content-type": mime_type,
-                    "upsert": False  # Aynı isimde dosya varsa hata ver
-                }
-            )
-            
-            if hasattr(result, 'error') and result.error:
-                logger.error(f"Supabase upload error: {result.error}")
-                raise Exception(f"Upload failed: {result.error}")
-            
-            return {
-                "file_path": file_path,
-                "filename": safe_filename,
-                "original_filename": filename,
-                "size": len(file_content),
-                "mime_type": mime_type
-            }
-            
-        except Exception as e:
-            logger.error(f"Document upload error: {str(e)}")
-            raise Exception(f"Dosya yükleme hatası: {str(e)}")
-    
-    def get_download_url(self, file_path: str, expires_in: int = 3600) -> str:
+        raise NotImplementedError
+
+    def list_objects(
+        self,
+        prefix: str,
+        start_after: Optional[str] = None,
+        limit: int = 1000
+    ) -> List[Tuple[str, StoredObject]]:
         """
-        Dosya için güvenli indirme URL'i oluştur
-        
-        Args:
-            file_path: Supabase'deki dosya yolu
-            expires_in: URL geçerlilik süresi (saniye)
-        
-        Returns:
-            str: İndirme URL'i
+        prefix dizini altındaki (alt dizinler dahil) nesnelerin bir sayfası
+
+        Anahtar sırasıyla, start_after'dan sonraki en fazla limit nesne;
+        sonraki sayfa için son anahtar start_after olarak verilir.
         """
-        try:
-            result = self.supabase.storage.from_(self.bucket_name).create_signed_url(
-                path=file_path,
-                expires_in=expires_in
-            )
-            
-            if hasattr(result, 'error') and result.error:
-                logger.error(f"Signed URL error: {result.error}")
-                raise Exception(f"URL creation failed: {result.error}")
-                
-            return result.get('signedURL') or result.get('signed_url')
-            
-        except Exception as e:
-            logger.error(f"Download URL error: {str(e)}")
-            raise Exception(f"İndirme URL'i oluşturulamadı: {str(e)}")
-    
-    def delete_document(self, file_path: str) -> bool:
+        raise NotImplementedError
+
+    def presigned_url(
+        self,
+        key: str,
+        expires_in: int,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None
+    ) -> Optional[str]:
         """
-        Dosyayı sil
-        
-        Args:
-            file_path: Silinecek dosya yolu
-            
-        Returns:
-            bool: Silme işlemi başarılı mı
+        Nesneyi kimlik doğrulamasız indiren, expires_in saniye geçerli URL
+
+        filename verilirse depo yanıtı bu adla attachment olarak döner.
+        Arka uç imzalı URL desteklemiyorsa None (yerel disk).
         """
+        return None
+
+    def close(self) -> None:
+        pass
+
+
+def _before_page(directory_key: str, start_after: Optional[str]) -> bool:
+    """Dizindeki tüm anahtarlar start_after'dan önce mi (alt ağaç atlanır)"""
+    if not start_after:
+        return False
+    prefix = directory_key + "/"
+    return prefix < start_after and not start_after.startswith(prefix)
+
+
+class LocalStorage(StorageBackend):
+    """UPLOAD_DIR altında yerel disk"""
+
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def local_path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def store_file(self, key: str, source_path: str, content_type: Optional[str] = None) -> None:
+        target = self.local_path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Kaynak aynı dosya sisteminde (UPLOAD_DIR/blobs/tmp): atomik taşıma
+        os.replace(source_path, target)
+
+    def stat(self, key: str) -> Optional[StoredObject]:
         try:
-            result = self.supabase.storage.from_(self.bucket_name).remove([file_path])
-            
-            if hasattr(result, 'error') and result.error:
-                logger.error(f"Delete error: {result.error}")
-                return False
-                
-            return True
-            
-        except Exception as e:
-            logger.error(f"Document deletion error: {str(e)}")
-            return False
-    
-    def list_documents(self, case_id: str, user_id: str) -> list:
-        """
-        Kullanıcının belirli bir davadaki dosyalarını listele
-        
-        Args:
-            case_id: Dava ID'si
-            user_id: Kullanıcı ID'si
-            
-        Returns:
-            list: Dosya listesi
-        """
+            st = os.stat(self.local_path(key))
+        except FileNotFoundError:
+            return None
+        return StoredObject(st.st_size, last_modified=st.st_mtime)
+
+    def move(self, source: str, destination: str) -> None:
+        target = self.local_path(destination)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(self.local_path(source), target)
+
+    def delete(self, key: str) -> None:
         try:
-            folder_path = f"cases/{case_id}/{user_id}"
-            result = self.supabase.storage.from_(self.bucket_name).list(folder_path)
-            
-            if hasattr(result, 'error') and result.error:
-                logger.error(f"List error: {result.error}")
-                return []
-                
-            return result or []
-            
-        except Exception as e:
-            logger.error(f"Document listing error: {str(e)}")
-            return []
-    
-    def get_storage_usage(self, user_id: str) -> dict:
-        """
-        Kullanıcının storage kullanımını hesapla
-        
-        Args:
-            user_id: Kullanıcı ID'si
-            
-        Returns:
-            dict: {total_size, file_count}
-        """
+            os.remove(self.local_path(key))
+        except FileNotFoundError:
+            pass
+
+    def list_objects(
+        self,
+        prefix: str,
+        start_after: Optional[str] = None,
+        limit: int = 1000
+    ) -> List[Tuple[str, StoredObject]]:
+        page = []
+        for key in islice(self._walk(prefix.rstrip("/"), start_after), limit):
+            stored = self.stat(key)
+            if stored is not None:
+                page.append((key, stored))
+        return page
+
+    def _walk(self, directory_key: str, start_after: Optional[str]) -> Iterator[str]:
+        try:
+            names = sorted(os.listdir(self.local_path(directory_key)))
+        except FileNotFoundError:
+            return
+        for name in names:
+            key = f"{directory_key}/{name}"
+            if os.path.isdir(self.local_path(key)):
+                if not _before_page(key, start_after):
+                    yield from self._walk(key, start_after)
+            elif not start_after or key > start_after:
+                yield key
+
+    def open_range(self, key: str, offset: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+        f = open(self.local_path(key), "rb")
+        f.seek(offset)
+        return self._read(f, length)
+
+    @staticmethod
+    def _read(f, length: Optional[int]) -> Iterator[bytes]:
+        with f:
+            remaining = length
+            while remaining is None or remaining > 0:
+                chunk = f.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+
+class S3Storage(StorageBackend):
+    """
+    MinIO / S3 uyumlu nesne deposu (minio SDK)
+
+    Büyük dosyalar part_size'lık parçalara bölünüp upload_concurrency
+    paralel istekle multipart upload olarak yüklenir (tek parçalık dosya
+    tek PUT). Bağlantılar urllib3 havuzunda tutulur; 5xx yanıtlar kısa
+    geri çekilmeyle yeniden denenir.
+    """
+
+    name = "minio"
+
+    def __init__(
+        self,
+        endpoint: str,
+        access_key: str,
+        secret_key: str,
+        bucket: str,
+        secure: bool = False,
+        region: Optional[str] = None,
+        public_endpoint: Optional[str] = None,
+        part_size: int = 5 * 1024 * 1024,
+        upload_concurrency: int = 4,
+        timeout: float = 30.0
+    ):
+        self.bucket = bucket
+        self.part_size = part_size
+        self.upload_concurrency = max(upload_concurrency, 1)
+        self.client = Minio(
+            endpoint,
+            access_key=access_key,
+            secret_key=secret_key,
+            secure=secure,
+            region=region or None,
+            http_client=urllib3.PoolManager(
+                # Paralel parça yüklemeleri + eşzamanlı indirmeler
+                maxsize=max(self.upload_concurrency * 2, 10),
+                block=False,
+                timeout=urllib3.Timeout(connect=min(timeout, 5.0), read=timeout),
+                retries=urllib3.Retry(total=3, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504])
+            )
+        )
+        # İmzalı URL'ler tarayıcının erişeceği adresle imzalanır (host imzaya
+        # dahildir); iç adres (ör. docker ağı) dışarıdan erişilemeyebilir.
+        # İmzalama ağ isteği yapmaz, yalnızca bölge bilinmelidir.
+        self.signer = self.client
+        if public_endpoint and public_endpoint != endpoint:
+            self.signer = Minio(
+                public_endpoint,
+                access_key=access_key,
+                secret_key=secret_key,
+                secure=secure,
+                region=region or "us-east-1"
+            )
+        self._bucket_ready = False
+        self._bucket_lock = threading.Lock()
+
+    def _ensure_bucket(self) -> None:
+        if self._bucket_ready:
+            return
+        with self._bucket_lock:
+            if not self._bucket_ready:
+                if not self.client.bucket_exists(self.bucket):
+                    self.client.make_bucket(self.bucket)
+                    logger.info(f"Created bucket {self.bucket}")
+                self._bucket_ready = True
+
+    def store_file(self, key: str, source_path: str, content_type: Optional[str] = None) -> None:
+        self._ensure_bucket()
+        self.client.fput_object(
+            self.bucket,
+            key,
+            source_path,
+            content_type=content_type or "application/octet-stream",
+            part_size=self.part_size,
+            num_parallel_uploads=self.upload_concurrency
+        )
+        os.remove(source_path)
+
+    def stat(self, key: str) -> Optional[StoredObject]:
+        self._ensure_bucket()
+        try:
+            obj = self.client.stat_object(self.bucket, key)
+        except S3Error as e:
+            if e.code in S3_MISSING_CODES:
+                return None
+            raise
+        return StoredObject(
+            obj.size,
+            etag=obj.etag,
+            last_modified=obj.last_modified.timestamp() if obj.last_modified else None
+        )
+
+    def move(self, source: str, destination: str) -> None:
+        # S3'te yeniden adlandırma yok: sunucu tarafı kopya + silme
+        self._ensure_bucket()
+        try:
+            self.client.copy_object(self.bucket, destination, CopySource(self.bucket, source))
+        except S3Error as e:
+            if e.code in S3_MISSING_CODES:
+                raise FileNotFoundError(source) from e
+            raise
+        self.client.remove_object(self.bucket, source)
+
+    def delete(self, key: str) -> None:
+        self._ensure_bucket()
+        self.client.remove_object(self.bucket, key)
+
+    def open_range(self, key: str, offset: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+        self._ensure_bucket()
         try:
-            # Tüm dosyaları listele (user_id pattern'i ile)
-            result = self.supabase.storage.from_(self.bucket_name).list("cases")
-            
-            total_size = 0
-            file_count = 0
-            
-            # Bu basit bir implementasyon, production'da daha optimize edilmeli
-            # Gerçek uygulamada bu bilgiyi database'de tutmak daha iyi
-            
-            return {
-                "total_size": total_size,
-                "file_count": file_count,
-                "limit_gb": 1  # Supabase free tier limit
+            response = self.client.get_object(self.bucket, key, offset=offset, length=length or 0)
+        except S3Error as e:
+            if e.code in S3_MISSING_CODES:
+                raise FileNotFoundError(key) from e
+            raise
+        return self._read(response)
+
+    def list_objects(
+        self,
+        prefix: str,
+        start_after: Optional[str] = None,
+        limit: int = 1000
+    ) -> List[Tuple[str, StoredObject]]:
+        self._ensure_bucket()
+        objects = self.client.list_objects(
+            self.bucket,
+            prefix=prefix.rstrip("/") + "/",
+            recursive=True,
+            start_after=start_after
+        )
+        return [
+            (obj.object_name, StoredObject(
+                obj.size,
+                etag=obj.etag,
+                last_modified=obj.last_modified.timestamp() if obj.last_modified else None
+            ))
+            for obj in islice(objects, limit)
+        ]
+
+    def presigned_url(
+        self,
+        key: str,
+        expires_in: int,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None
+    ) -> str:
+        response_headers = {}
+        if filename:
+            response_headers["response-content-disposition"] = content_disposition(filename)
+        if content_type:
+            response_headers["response-content-type"] = content_type
+        return self.signer.presigned_get_object(
+            self.bucket,
+            key,
+            expires=timedelta(seconds=expires_in),
+            response_headers=response_headers or None
+        )
+
+    @staticmethod
+    def _read(response) -> Iterator[bytes]:
+        try:
+            yield from response.stream(CHUNK_SIZE)
+        finally:
+            response.close()
+            response.release_conn()
+
+
+class SupabaseStorage(StorageBackend):
+    """Supabase Storage REST API (service key ile)"""
+
+    name = "supabase"
+
+    def __init__(self, url: str, service_key: str, bucket: str, timeout: float = 30.0, max_connections: int = 10):
+        if not url or not service_key:
+            raise ValueError("Supabase credentials not configured")
+        self.bucket = bucket
+        self.base_url = f"{url.rstrip('/')}/storage/v1"
+        self.client = httpx.Client(
+            base_url=self.base_url,
+            headers={"Authorization": f"Bearer {service_key}", "apikey": service_key},
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+
+    def _object_url(self, key: str) -> str:
+        return f"/object/{self.bucket}/{quote(key)}"
+
+    @staticmethod
+    def _missing(response: httpx.Response) -> bool:
+        # Storage API olmayan nesne için 404 veya 400 döner
+        return response.status_code in (400, 404)
+
+    def store_file(self, key: str, source_path: str, content_type: Optional[str] = None) -> None:
+        def chunks():
+            with open(source_path, "rb") as f:
+                while chunk := f.read(CHUNK_SIZE):
+                    yield chunk
+
+        response = self.client.post(
+            self._object_url(key),
+            content=chunks(),
+            headers={
+                "Content-Type": content_type or "application/octet-stream",
+                "Content-Length": str(os.path.getsize(source_path)),
+                # İçerik adresli anahtar: aynı anahtar her zaman aynı içerik
+                "x-upsert": "true",
             }
-            
-        except Exception as e:
-            logger.error(f"Storage usage calculation error: {str(e)}")
-            return {"total_size": 0, "file_count": 0, "limit_gb": 1}
+        )
+        response.raise_for_status()
+        os.remove(source_path)
+
+    def stat(self, key: str) -> Optional[StoredObject]:
+        response = self.client.head(self._object_url(key))
+        if self._missing(response):
+            return None
+        response.raise_for_status()
+        return StoredObject(int(response.headers.get("content-length", 0)), etag=response.headers.get("etag"))
+
+    def move(self, source: str, destination: str) -> None:
+        response = self.client.post(
+            "/object/move",
+            json={"bucketId": self.bucket, "sourceKey": source, "destinationKey": destination}
+        )
+        if self._missing(response):
+            raise FileNotFoundError(source)
+        response.raise_for_status()
+
+    def delete(self, key: str) -> None:
+        response = self.client.request("DELETE", f"/object/{self.bucket}", json={"prefixes": [key]})
+        response.raise_for_status()
+
+    def open_range(self, key: str, offset: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+        headers = {}
+        if offset or length is not None:
+            end = "" if length is None else str(offset + length - 1)
+            headers["Range"] = f"bytes={offset}-{end}"
+        response = self.client.send(
+            self.client.build_request("GET", self._object_url(key), headers=headers),
+            stream=True
+        )
+        if self._missing(response):
+            response.close()
+            raise FileNotFoundError(key)
+        if response.status_code >= 400:
+            response.close()
+            response.raise_for_status()
+        return self._read(response)
+
+    def list_objects(
+        self,
+        prefix: str,
+        start_after: Optional[str] = None,
+        limit: int = 1000
+    ) -> List[Tuple[str, StoredObject]]:
+        page = []
+        for key, metadata in islice(self._walk(prefix.rstrip("/"), start_after), limit):
+            modified = metadata.get("lastModified")
+            page.append((key, StoredObject(
+                int(metadata.get("size") or 0),
+                etag=metadata.get("eTag"),
+                last_modified=datetime.fromisoformat(modified.replace("Z", "+00:00")).timestamp() if modified else None
+            )))
+        return page
+
+    def _walk(self, folder: str, start_after: Optional[str]) -> Iterator[Tuple[str, dict]]:
+        # Storage API klasörleri tek seviye listeler (klasör kayıtlarında id yoktur)
+        offset = 0
+        while True:
+            response = self.client.post(
+                f"/object/list/{self.bucket}",
+                json={
+                    "prefix": folder,
+                    "limit": SUPABASE_LIST_LIMIT,
+                    "offset": offset,
+                    "sortBy": {"column": "name", "order": "asc"},
+                }
+            )
+            response.raise_for_status()
+            entries = response.json()
+            for entry in entries:
+                key = f"{folder}/{entry['name']}"
+                if entry.get("id") is None:
+                    if not _before_page(key, start_after):
+                        yield from self._walk(key, start_after)
+                elif not start_after or key > start_after:
+                    yield key, entry.get("metadata") or {}
+            if len(entries) < SUPABASE_LIST_LIMIT:
+                return
+            offset += len(entries)
+
+    def presigned_url(
+        self,
+        key: str,
+        expires_in: int,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None
+    ) -> str:
+        # Storage API içerik türünü nesnenin kendi üst verisinden verir
+        response = self.client.post(f"/object/sign/{self.bucket}/{quote(key)}", json={"expiresIn": expires_in})
+        if self._missing(response):
+            raise FileNotFoundError(key)
+        response.raise_for_status()
+        url = self.base_url + response.json()["signedURL"]
+        if filename:
+            url += ("&" if "?" in url else "?") + "download=" + quote(filename)
+        return url
+
+    @staticmethod
+    def _read(response: httpx.Response) -> Iterator[bytes]:
+        try:
+            yield from response.iter_bytes(CHUNK_SIZE)
+        finally:
+            response.close()
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def _minio_from_settings() -> S3Storage:
+    if not MINIO_AVAILABLE:
+        raise RuntimeError("STORAGE_PROVIDER=minio requires the minio package")
+    return S3Storage(
+        endpoint=settings.MINIO_ENDPOINT,
+        access_key=settings.MINIO_ACCESS_KEY,
+        secret_key=settings.MINIO_SECRET_KEY,
+        bucket=settings.MINIO_BUCKET_NAME,
+        secure=settings.MINIO_SECURE,
+        region=settings.MINIO_REGION,
+        public_endpoint=settings.MINIO_PUBLIC_ENDPOINT,
+        part_size=settings.STORAGE_PART_SIZE_MB * 1024 * 1024,
+        upload_concurrency=settings.STORAGE_UPLOAD_CONCURRENCY,
+        timeout=settings.STORAGE_TIMEOUT_SECONDS
+    )
+
+
+def _supabase_from_settings() -> SupabaseStorage:
+    return SupabaseStorage(
+        url=settings.SUPABASE_URL,
+        service_key=settings.SUPABASE_SERVICE_KEY,
+        bucket=settings.SUPABASE_BUCKET_NAME,
+        timeout=settings.STORAGE_TIMEOUT_SECONDS
+    )
+
+
+STORAGE_BACKENDS: Dict[str, Callable[[], StorageBackend]] = {
+    "local": lambda: LocalStorage(settings.UPLOAD_DIR),
+    "minio": _minio_from_settings,
+    "supabase": _supabase_from_settings,
+}
 
 
 # Singleton instance
-storage_service = None
+storage_service: Optional[StorageBackend] = None
+_storage_lock = threading.Lock()
 
-def get_storage_service() -> SupabaseStorageService:
-    """Storage service singleton"""
+def get_storage_service() -> StorageBackend:
+    """Storage service singleton (STORAGE_PROVIDER)"""
     global storage_service
     if storage_service is None:
-        if settings.STORAGE_PROVIDER == "supabase":
-            storage_service = SupabaseStorageService()
-        else:
-            # Gelecekte MinIO service burada olabilir
-            raise NotImplementedError("Only Supabase storage is implemented")
-    return storage_service
\ No newline at end of file
+        with _storage_lock:
+            if storage_service is None:
+                factory = STORAGE_BACKENDS.get(settings.STORAGE_PROVIDER)
+                if factory is None:
+                    raise ValueError(f"Unknown storage provider: {settings.STORAGE_PROVIDER}")
+                storage_service = factory()
+    return storage_service
+
+
+def close_storage_service() -> None:
+    global storage_service
+    with _storage_lock:
+        if storage_service is not None:
+            storage_service.close()
+            storage_service = None
+
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(ValueError):
+    """İstenen bayt aralığı nesnenin dışında"""
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Tek aralıklı Range başlığını (başlangıç, uzunluk) olarak çöz
+
+    Returns:
+        Optional[Tuple[int, int]]: Başlık yoksa / çoklu veya tanınmayan
+        aralıkta None (tam içerik gönderilir)
+
+    Raises:
+        RangeNotSatisfiable: Aralık nesnenin dışında (416)
+    """
+    if not header:
+        return None
+    match = _RANGE.match(header.replace(" ", ""))
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Son N bayt
+        length = min(int(last), size)
+        if length == 0:
+            raise RangeNotSatisfiable(header)
+        return size - length, length
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise RangeNotSatisfiable(header)
+    return start, end - start + 1
+
+
+def content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def stream_response(
+    storage: StorageBackend,
+    key: str,
+    size: Optional[int],
+    media_type: str,
+    filename: str,
+    range_header: Optional[str] = None,
+    if_range: Optional[str] = None,
+    etag: Optional[str] = None,
+    last_modified: Optional[float] = None
+) -> StreamingResponse:
+    """
+    Nesneyi parça parça gönderen yanıt (Range -> 206, geçersiz aralık -> 416)
+
+    Nesne gövdesi depodan okundukça istemciye aktarılır; API sürecinde
+    yalnızca bir parça (CHUNK_SIZE) bellekte tutulur. open_range ağ isteği
+    yaptığı için thread havuzunda çağrılmalıdır.
+
+    Raises:
+        FileNotFoundError: Nesne depoda yok
+    """
+    if size is None:
+        stored = storage.stat(key)
+        if stored is None:
+            raise FileNotFoundError(key)
+        size = stored.size
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": content_disposition(filename),
+    }
+    if etag:
+        headers["ETag"] = etag
+    if last_modified:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+
+    # If-Range eşleşmiyorsa (dosya değişmiş) tam içerik gönderilir
+    if if_range and if_range != etag:
+        range_header = None
+
+    try:
+        byte_range = parse_range(range_header, size)
+    except RangeNotSatisfiable:
+        headers["Content-Range"] = f"bytes */{size}"
+        return StreamingResponse(iter(()), status_code=416, headers=headers)
+
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(storage.open_range(key), media_type=media_type, headers=headers)
+
+    start, length = byte_range
+    headers["Content-Length"] = str(length)
+    headers["Content-Range"] = f"bytes {start}-{start + length - 1}/{size}"
+    return StreamingResponse(
+        storage.open_range(key, start, length),
+        status_code=206,
+        media_type=media_type,
+        headers=headers
+    )
@@ -0,0 +1,453 @@
+"""
+Storage Usage - Kullanıcı / dava başına depolama sayaçları ve kotalar
+
+storage_usage satırları evrak yükleme ve silme ile aynı transaction içinde
+fark (delta) uygulanarak güncellenir: yükleyen kullanıcı ("user") ve
+evrağın davası ("case") için bayt ve dosya sayısı. Kotalar:
+
+- STORAGE_CLIENT_QUOTA_MB: müvekkilin yüklediği evrakların toplamı
+  (admin/avukat yüklemelerine uygulanmaz)
+- STORAGE_CASE_QUOTA_MB: dava başına toplam
+
+Kota yükleme gövdesi okunmadan önce kontrol edilir, okuma kalan kota ile
+sınırlanır; sayaç artışı kota koşullu tek bir upsert'tür (satır kilidi),
+eşzamanlı yüklemeler birlikte kotayı aşamaz. Reddedilen yükleme depoya
+hiç yazılmaz.
+
+Sapma periyodik storage.reconcile görevi ile düzeltilir: sayaçlar
+documents tablosundan yeniden hesaplanır, depo STORAGE_RECONCILE_PAGE_SIZE
+nesnelik sayfalarla taranıp document_blobs ile karşılaştırılır. Kaydı
+olmayan (commit edilmemiş yüklemeden kalan) nesneler ve silinmeden kalan
+tombstone'lar STORAGE_ORPHAN_GRACE_SECONDS'tan eskiyse silinir; kaydı
+olup depoda bulunmayan nesneler raporlanır.
+"""
+from typing import Dict, List, Optional, Tuple
+import logging
+import time
+
+from sqlalchemy import and_, case, delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.blob import DocumentBlob
+from app.models.case import Case
+from app.models.document import Document, StorageUsage
+from app.models.user import User
+from app.services.blob_store import BLOB_PREFIX, THUMBNAIL_MARKER, blob_relative_path
+from app.services.storage import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+USER_SCOPE = "user"
+CASE_SCOPE = "case"
+SCOPE_COLUMNS = {USER_SCOPE: Document.user_id, CASE_SCOPE: Document.case_id}
+
+Scope = Tuple[str, int]
+
+# Rapora yazılan örnek sayısı (eksik nesne / boyut uyuşmazlığı)
+REPORT_SAMPLE_SIZE = 20
+
+MB = 1024 * 1024
+
+
+class StorageQuotaExceeded(Exception):
+    """Yükleme kullanıcı veya dava kotasını aşıyor"""
+
+    def __init__(self, scope: str, scope_id: int, limit: int, used: int):
+        super().__init__(f"Storage quota exceeded for {scope} {scope_id}: {used}/{limit} bytes")
+        self.scope = scope
+        self.scope_id = scope_id
+        self.limit = limit
+        self.used = used
+
+
+def document_scopes(user_id: int, case_id: Optional[int]) -> List[Scope]:
+    """Evrağın sayıldığı kapsamlar (kilit sırasıyla)"""
+    scopes = [(USER_SCOPE, user_id)]
+    if case_id:
+        scopes.append((CASE_SCOPE, case_id))
+    return sorted(scopes)
+
+
+def upload_limits(user_id: int, case_id: Optional[int], client_upload: bool) -> Dict[Scope, int]:
+    """Yüklemeye uygulanan kotalar (bayt)"""
+    limits = {}
+    if client_upload and settings.STORAGE_CLIENT_QUOTA_MB > 0:
+        limits[(USER_SCOPE, user_id)] = settings.STORAGE_CLIENT_QUOTA_MB * MB
+    if case_id and settings.STORAGE_CASE_QUOTA_MB > 0:
+        limits[(CASE_SCOPE, case_id)] = settings.STORAGE_CASE_QUOTA_MB * MB
+    return limits
+
+
+def _where(scope: str, scope_id: int):
+    return and_(StorageUsage.scope == scope, StorageUsage.scope_id == scope_id)
+
+
+async def remaining_bytes(db, limits: Dict[Scope, int]) -> Optional[int]:
+    """
+    En dar kotada kalan bayt (yükleme gövdesi okunmadan önce)
+
+    Returns:
+        Optional[int]: Kota yoksa None
+
+    Raises:
+        StorageQuotaExceeded: Kotalardan biri dolu
+    """
+    remaining = None
+    for (scope, scope_id), limit in sorted(limits.items()):
+        used = await db.scalar(select(StorageUsage.bytes).where(_where(scope, scope_id))) or 0
+        if used >= limit:
+            raise StorageQuotaExceeded(scope, scope_id, limit, used)
+        remaining = limit - used if remaining is None else min(remaining, limit - used)
+    return remaining
+
+
+def _insert(dialect_name: str):
+    if dialect_name == "postgresql":
+        return postgresql.insert(StorageUsage)
+    if dialect_name == "sqlite":
+        return sqlite.insert(StorageUsage)
+    return None
+
+
+def _charge_statement(dialect_name: str, scope: str, scope_id: int, size: int, limit: Optional[int]):
+    stmt = _insert(dialect_name)
+    if stmt is None:
+        return None
+    stmt = stmt.values(scope=scope, scope_id=scope_id, bytes=size, files=1)
+    return stmt.on_conflict_do_update(
+        index_elements=[StorageUsage.scope, StorageUsage.scope_id],
+        set_={
+            "bytes": StorageUsage.bytes + stmt.excluded.bytes,
+            "files": StorageUsage.files + stmt.excluded.files,
+            "updated_at": func.now()
+        },
+        # Koşul sağlanmazsa satır güncellenmez ve RETURNING boş döner
+        where=(StorageUsage.bytes + stmt.excluded.bytes <= limit) if limit is not None else None
+    ).returning(StorageUsage.bytes)
+
+
+async def charge(db, scopes: List[Scope], size: int, limits: Dict[Scope, int]) -> None:
+    """
+    Kapsamların sayaçlarını size bayt ve bir dosya artır
+
+    Commit çağırana aittir; hata durumunda transaction geri alınmalıdır.
+
+    Raises:
+        StorageQuotaExceeded: Artış bir kotayı aşıyor
+    """
+    dialect_name = db.bind.dialect.name
+    for scope, scope_id in sorted(scopes):
+        limit = limits.get((scope, scope_id))
+        if limit is not None and size > limit:
+            raise StorageQuotaExceeded(scope, scope_id, limit, 0)
+
+        stmt = _charge_statement(dialect_name, scope, scope_id, size, limit)
+        if stmt is not None:
+            applied = (await db.execute(stmt)).first() is not None
+        else:
+            usage = await db.scalar(
+                select(StorageUsage).where(_where(scope, scope_id)).with_for_update()
+            )
+            applied = usage is None or limit is None or usage.bytes + size <= limit
+            if usage is None:
+                db.add(StorageUsage(scope=scope, scope_id=scope_id, bytes=size, files=1))
+            elif applied:
+                usage.bytes += size
+                usage.files += 1
+            await db.flush()
+
+        if not applied:
+            used = await db.scalar(select(StorageUsage.bytes).where(_where(scope, scope_id)))
+            raise StorageQuotaExceeded(scope, scope_id, limit, used or 0)
+
+
+async def release(db, scopes: List[Scope], size: int) -> None:
+    """Kapsamların sayaçlarını azalt (0'ın altına inmez). Commit çağırana aittir."""
+    for scope, scope_id in sorted(scopes):
+        await db.execute(
+            update(StorageUsage)
+            .where(_where(scope, scope_id))
+            .values(
+                bytes=case((StorageUsage.bytes > size, StorageUsage.bytes - size), else_=0),
+                files=case((StorageUsage.files > 0, StorageUsage.files - 1), else_=0),
+                updated_at=func.now()
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+
+def quota_for(scope: str) -> int:
+    """Kapsam türünün kotası (bayt, 0: sınırsız)"""
+    quota_mb = settings.STORAGE_CLIENT_QUOTA_MB if scope == USER_SCOPE else settings.STORAGE_CASE_QUOTA_MB
+    return max(quota_mb, 0) * MB
+
+
+def top_consumers(db: Session, scope: str, limit: int) -> dict:
+    """En çok alan kullanan kullanıcılar / davalar (senkron Session)"""
+    if scope == USER_SCOPE:
+        label = func.coalesce(User.full_name, User.email)
+        owner = select(StorageUsage, label).outerjoin(User, User.id == StorageUsage.scope_id)
+    else:
+        label = Case.case_number
+        owner = select(StorageUsage, label).outerjoin(Case, Case.id == StorageUsage.scope_id)
+
+    rows = db.execute(
+        owner.where(StorageUsage.scope == scope, StorageUsage.files > 0)
+        .order_by(StorageUsage.bytes.desc(), StorageUsage.scope_id)
+        .limit(limit)
+    ).all()
+    total_bytes, total_files, scopes = db.execute(
+        select(
+            func.coalesce(func.sum(StorageUsage.bytes), 0),
+            func.coalesce(func.sum(StorageUsage.files), 0),
+            func.count().filter(StorageUsage.files > 0)
+        ).where(StorageUsage.scope == scope)
+    ).one()
+
+    quota = quota_for(scope)
+    return {
+        "scope": scope,
+        "quota_bytes": quota or None,
+        "total_bytes": total_bytes,
+        "total_files": total_files,
+        "scopes": scopes,
+        "top": [
+            {
+                "id": usage.scope_id,
+                "name": name,
+                "bytes": usage.bytes,
+                "files": usage.files,
+                "quota_used": round(usage.bytes / quota, 4) if quota else None,
+                "updated_at": usage.updated_at,
+            }
+            for usage, name in rows
+        ],
+    }
+
+
+def _actual_usage(scope: str, scope_id: Optional[int] = None):
+    column = SCOPE_COLUMNS[scope]
+    stmt = select(column, func.coalesce(func.sum(Document.file_size), 0), func.count(Document.id))
+    if scope_id is None:
+        stmt = stmt.where(column.is_not(None))
+    else:
+        stmt = stmt.where(column == scope_id)
+    return stmt.group_by(column)
+
+
+def reconcile_usage_counters(db: Session) -> dict:
+    """
+    Sayaçları documents tablosundaki gerçek değerlerle karşılaştır ve düzelt
+
+    Sapan her kapsamın satırı kilitlenir ve sayım kilit altında
+    tekrarlanır; aynı anda yükleme yapan istek kilidi bekledikten sonra
+    sayacı artırır. Kapsam başına kısa bir transaction kullanılır.
+    """
+    actual: Dict[Scope, Tuple[int, int]] = {}
+    for scope in (USER_SCOPE, CASE_SCOPE):
+        for scope_id, size, files in db.execute(_actual_usage(scope)).all():
+            actual[(scope, scope_id)] = (size, files)
+    stored = {
+        (scope, scope_id): (size, files)
+        for scope, scope_id, size, files in db.execute(
+            select(StorageUsage.scope, StorageUsage.scope_id, StorageUsage.bytes, StorageUsage.files)
+        ).all()
+    }
+    db.rollback()
+
+    drifted = sorted(
+        key for key in actual.keys() | stored.keys()
+        if actual.get(key, (0, 0)) != stored.get(key, (0, 0))
+    )
+
+    repaired = 0
+    dialect_name = db.bind.dialect.name
+    for scope, scope_id in drifted:
+        try:
+            if (scope, scope_id) not in stored:
+                # Önce boş satır: kilit alınabilecek bir satır olsun
+                stmt = _insert(dialect_name)
+                if stmt is not None:
+                    db.execute(
+                        stmt.values(scope=scope, scope_id=scope_id, bytes=0, files=0)
+                        .on_conflict_do_nothing(index_elements=[StorageUsage.scope, StorageUsage.scope_id])
+                    )
+                else:
+                    db.add(StorageUsage(scope=scope, scope_id=scope_id, bytes=0, files=0))
+                db.commit()
+
+            usage = db.scalar(
+                select(StorageUsage).where(_where(scope, scope_id)).with_for_update()
+            )
+            row = db.execute(_actual_usage(scope, scope_id)).first()
+            size, files = (row[1], row[2]) if row else (0, 0)
+            if usage is not None and (usage.bytes, usage.files) != (size, files):
+                logger.warning(
+                    f"Storage usage drift for {scope} {scope_id}: "
+                    f"{usage.bytes}B/{usage.files} -> {size}B/{files}"
+                )
+                usage.bytes = size
+                usage.files = files
+                repaired += 1
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Storage usage repair failed for {scope} {scope_id}: {str(e)}")
+
+    return {"checked": len(actual.keys() | stored.keys()), "drifted": len(drifted), "repaired": repaired}
+
+
+def _claim_statement(dialect_name: str, sha256: str, key: str, size: int):
+    values = {"sha256": sha256, "size": size, "file_path": key, "ref_count": 0}
+    if dialect_name == "postgresql":
+        stmt = postgresql.insert(DocumentBlob).values(**values)
+    elif dialect_name == "sqlite":
+        stmt = sqlite.insert(DocumentBlob).values(**values)
+    else:
+        return None
+    return stmt.on_conflict_do_nothing(index_elements=[DocumentBlob.sha256]).returning(DocumentBlob.sha256)
+
+
+def _remove_orphan(db: Session, storage: StorageBackend, key: str, sha256: str, size: int) -> bool:
+    """
+    Kaydı olmayan blob nesnesini sil
+
+    Silmeden önce blob satırı ref_count=0 ile eklenir: aynı içeriği o anda
+    yükleyen istek satırın kilidini bekler, satır silinip commit edildikten
+    sonra dosyayı yeniden yerleştirir.
+
+    Returns:
+        bool: Nesne silindiyse True (arada bir yükleme satırı sahiplendiyse False)
+    """
+    stmt = _claim_statement(db.bind.dialect.name, sha256, key, size)
+    if stmt is None:
+        return False
+    try:
+        if db.execute(stmt).first() is None:
+            db.rollback()
+            return False
+        storage.delete(key)
+        db.execute(delete(DocumentBlob).where(DocumentBlob.sha256 == sha256))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return True
+
+
+def reconcile_storage_objects(
+    db: Session,
+    storage: StorageBackend,
+    page_size: int = 1000,
+    grace_seconds: float = 86400.0,
+    deadline: Optional[float] = None
+) -> dict:
+    """
+    Depodaki blob nesnelerini sayfa sayfa document_blobs ile karşılaştır
+
+    Depo anahtar sırasıyla listelenir; her sayfa için yalnızca o anahtar
+    aralığındaki blob satırları okunur, bellek kullanımı nesne sayısından
+    bağımsızdır. Önizleme görselleri (<blob>.thumb.<biçim>) ayrı sayılır;
+    blob'u silinmiş olanlar (silme sırasında üretimi süren önizleme gibi)
+    kaldırılır.
+
+    Args:
+        deadline: time.monotonic() sınırı; dolunca tarama yarıda bırakılır
+    """
+    tmp_prefix = f"{BLOB_PREFIX}/tmp/"
+    cutoff = time.time() - grace_seconds
+    counts = dict.fromkeys(
+        (
+            "pages", "objects", "bytes", "orphans", "orphan_bytes", "removed", "missing", "size_mismatches",
+            "thumbnails", "thumbnail_bytes"
+        ),
+        0
+    )
+    missing: List[str] = []
+    mismatches: List[dict] = []
+    cursor: Optional[str] = None
+    complete = False
+
+    while deadline is None or time.monotonic() < deadline:
+        page = storage.list_objects(BLOB_PREFIX, start_after=cursor, limit=page_size)
+        last_page = len(page) < page_size
+        counts["pages"] += 1
+
+        # Bu sayfanın anahtar aralığındaki kayıtlar (son sayfada kalanların tümü)
+        stmt = select(DocumentBlob.file_path, DocumentBlob.sha256, DocumentBlob.size)
+        if cursor is not None:
+            stmt = stmt.where(DocumentBlob.file_path > cursor)
+        if not last_page:
+            stmt = stmt.where(DocumentBlob.file_path <= page[-1][0])
+        expected = {path: (sha256, size) for path, sha256, size in db.execute(stmt).all()}
+        # Önizlemelerin blob'u sayfa sınırının öncesinde kalmış olabilir
+        thumbnail_shas = {key.rsplit("/", 1)[-1].split(".", 1)[0] for key, _ in page if THUMBNAIL_MARKER in key}
+        known_shas = set()
+        if thumbnail_shas:
+            known_shas = set(db.scalars(
+                select(DocumentBlob.sha256).where(DocumentBlob.sha256.in_(thumbnail_shas))
+            ).all())
+        db.rollback()
+
+        for key, stored in page:
+            if key.startswith(tmp_prefix):
+                continue
+            old = stored.last_modified is not None and stored.last_modified < cutoff
+            if key.endswith(".deleting"):
+                # Commit sonrası silinemeyen tombstone (yenisi geri alınıyor olabilir)
+                if old:
+                    storage.delete(key)
+                    counts["removed"] += 1
+                continue
+            if THUMBNAIL_MARKER in key:
+                counts["thumbnails"] += 1
+                counts["thumbnail_bytes"] += stored.size
+                if old and key.rsplit("/", 1)[-1].split(".", 1)[0] not in known_shas:
+                    storage.delete(key)
+                    counts["removed"] += 1
+                continue
+
+            counts["objects"] += 1
+            counts["bytes"] += stored.size
+            row = expected.pop(key, None)
+            if row is None:
+                counts["orphans"] += 1
+                counts["orphan_bytes"] += stored.size
+                sha256 = key.rsplit("/", 1)[-1]
+                # Blob anahtarı biçiminde olmayan nesnelere dokunulmaz
+                if old and blob_relative_path(sha256) == key:
+                    if _remove_orphan(db, storage, key, sha256, stored.size):
+                        counts["removed"] += 1
+            elif row[1] != stored.size:
+                counts["size_mismatches"] += 1
+                if len(mismatches) < REPORT_SAMPLE_SIZE:
+                    mismatches.append({"key": key, "size": row[1], "stored_size": stored.size})
+
+        # Kaydı olup depoda bulunmayanlar
+        counts["missing"] += len(expected)
+        missing.extend(sorted(expected)[:REPORT_SAMPLE_SIZE - len(missing)])
+
+        if last_page:
+            complete = True
+            break
+        cursor = page[-1][0]
+
+    if missing:
+        logger.warning(f"{counts['missing']} blobs missing from storage, e.g. {missing[:3]}")
+    return {**counts, "complete": complete, "missing_samples": missing, "size_mismatch_samples": mismatches}
+
+
+def reconcile_storage(db: Session, storage: StorageBackend, deadline: Optional[float] = None) -> dict:
+    """Sayaç ve depo mutabakatı (storage.reconcile görevi)"""
+    return {
+        "counters": reconcile_usage_counters(db),
+        "objects": reconcile_storage_objects(
+            db,
+            storage,
+            page_size=max(settings.STORAGE_RECONCILE_PAGE_SIZE, 1),
+            grace_seconds=settings.STORAGE_ORPHAN_GRACE_SECONDS,
+            deadline=deadline
+        ),
+    }
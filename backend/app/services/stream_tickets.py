@@ -0,0 +1,60 @@
+"""
+Stream Tickets - Bildirim akışı için tek kullanımlık biletler
+
+İstemci Authorization header'ıyla POST /notifications/stream-ticket
+çağırır ve dönen bileti /notifications/stream?ticket= (veya /ws) URL'inde
+kullanır. Bilet NOTIFICATION_STREAM_TICKET_TTL_SECONDS sonra geçersizdir
+ve tek bir DELETE ... RETURNING ile tüketilir: aynı bilet iki bağlantı
+açamaz. Bilet, alındığı erişim token'ının bitiş zamanını taşır; akış o
+anda kapatılır (yeniden bağlanan istemci yeni bilet alır).
+
+Süresi dolmuş satırlar yeni bilet verilirken silinir.
+"""
+from datetime import timedelta
+from typing import Optional, Tuple
+import secrets
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.principal_cache import token_digest
+from app.models.notification import StreamTicket
+from app.services.jobs import utcnow
+
+
+async def issue_ticket(uow, user_id: int, session_expires_at: int) -> str:
+    """
+    Kullanıcı için bilet üret ve çağıranın transaction'ına ekle
+
+    Args:
+        session_expires_at: Erişim token'ının bitişi (JWT exp)
+    """
+    now = utcnow()
+    await uow.execute(delete(StreamTicket).where(StreamTicket.expires_at <= now))
+    ticket = secrets.token_urlsafe(32)
+    uow.add(StreamTicket(
+        digest=token_digest(ticket),
+        user_id=user_id,
+        expires_at=now + timedelta(seconds=settings.NOTIFICATION_STREAM_TICKET_TTL_SECONDS),
+        session_expires_at=session_expires_at
+    ))
+    return ticket
+
+
+def consume_ticket(db: Session, ticket: str) -> Optional[Tuple[int, int]]:
+    """
+    Bileti tüket (commit eder)
+
+    Returns:
+        (kullanıcı id, erişim token'ının bitişi); bilet yok, kullanılmış
+        veya süresi dolmuşsa None
+    """
+    row = db.execute(
+        delete(StreamTicket)
+        .where(StreamTicket.digest == token_digest(ticket), StreamTicket.expires_at > utcnow())
+        .returning(StreamTicket.user_id, StreamTicket.session_expires_at)
+        .execution_options(synchronize_session=False)
+    ).first()
+    db.commit()
+    return tuple(row) if row is not None else None
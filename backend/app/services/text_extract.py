@@ -0,0 +1,140 @@
+"""
+Text Extract - Evrak dosyasından düz metin çıkarma (süreç havuzunda çalışır)
+
+Bu modül evrak süreç havuzunun (app.services.process_pool) alt
+süreçlerinde import edilir; hızlı başlaması için uygulama modüllerini
+import etmez. DOCX ve XLSX, ek bağımlılık olmadan ZIP içindeki XML'den
+akışla okunur; metin max_chars'a ulaşınca okuma durur, büyük dosyalar
+belleğe alınmaz. Eski ikili biçimler (.doc, .xls) desteklenmez.
+"""
+from typing import Iterator, List
+from xml.etree import ElementTree
+import re
+import zipfile
+
+# PDF metni için
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
+
+PDF = "pdf"
+DOCX = "docx"
+XLSX = "xlsx"
+TEXT = "text"
+
+# Dosya uzantısı -> kaynak türü
+SOURCE_KINDS = {
+    ".pdf": PDF,
+    ".docx": DOCX,
+    ".xlsx": XLSX,
+    ".txt": TEXT,
+}
+
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+SHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+_SPACES = re.compile(r"[^\S\n]+")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+
+
+def supported(kind: str) -> bool:
+    if kind == PDF:
+        return PDFIUM_AVAILABLE
+    return kind in (DOCX, XLSX, TEXT)
+
+
+def _pdf_pages(source_path: str) -> Iterator[str]:
+    pdf = pdfium.PdfDocument(source_path)
+    try:
+        for index in range(len(pdf)):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            try:
+                yield textpage.get_text_bounded()
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        pdf.close()
+
+
+def _docx_parts(source_path: str) -> Iterator[str]:
+    with zipfile.ZipFile(source_path) as archive:
+        with archive.open("word/document.xml") as xml:
+            for _, element in ElementTree.iterparse(xml):
+                if element.tag == f"{WORD_NS}t":
+                    yield element.text or ""
+                elif element.tag == f"{WORD_NS}tab":
+                    yield "\t"
+                elif element.tag == f"{WORD_NS}p":
+                    yield "\n"
+                    element.clear()
+
+
+def _xlsx_parts(source_path: str) -> Iterator[str]:
+    # Metin hücreleri paylaşılan dizgilerdedir (tekrarlar bir kez); sayılar atlanır
+    with zipfile.ZipFile(source_path) as archive:
+        names = archive.namelist()
+        if "xl/sharedStrings.xml" in names:
+            with archive.open("xl/sharedStrings.xml") as xml:
+                for _, element in ElementTree.iterparse(xml):
+                    if element.tag == f"{SHEET_NS}si":
+                        yield "".join(element.itertext()) + "\n"
+                        element.clear()
+        for name in sorted(n for n in names if n.startswith("xl/worksheets/") and n.endswith(".xml")):
+            with archive.open(name) as xml:
+                for _, element in ElementTree.iterparse(xml):
+                    if element.tag == f"{SHEET_NS}is":
+                        yield "".join(element.itertext()) + "\n"
+                    elif element.tag == f"{SHEET_NS}row":
+                        element.clear()
+
+
+def _text_file(source_path: str, max_chars: int) -> Iterator[str]:
+    # UTF-8 değilse Windows Türkçe kod sayfası (eski Not Defteri dosyaları)
+    limit = max_chars * 4
+    with open(source_path, "rb") as f:
+        raw = f.read(limit)
+    try:
+        yield raw.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        if len(raw) == limit and e.start >= limit - 3:
+            # Okuma sınırında bölünen çok baytlı karakter
+            yield raw[:e.start].decode("utf-8-sig")
+        else:
+            yield raw.decode("cp1254", errors="replace")
+
+
+def extract_text(source_path: str, kind: str, max_chars: int) -> str:
+    """
+    Kaynağın düz metni (en fazla max_chars karakter, boşluklar sadeleştirilmiş)
+
+    Raises:
+        Exception: Dosya çözülemedi
+    """
+    if kind == PDF:
+        parts = _pdf_pages(source_path)
+    elif kind == DOCX:
+        parts = _docx_parts(source_path)
+    elif kind == XLSX:
+        parts = _xlsx_parts(source_path)
+    else:
+        parts = _text_file(source_path, max_chars)
+
+    chunks: List[str] = []
+    length = 0
+    try:
+        for part in parts:
+            chunks.append(part)
+            length += len(part)
+            if length >= max_chars:
+                break
+    finally:
+        parts.close()
+
+    # PostgreSQL metin kolonları NUL karakteri kabul etmez
+    text = "".join(chunks).replace("\x00", " ")
+    text = _BLANK_LINES.sub("\n\n", _SPACES.sub(" ", text))
+    return text.strip()[:max_chars]
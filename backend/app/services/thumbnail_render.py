@@ -0,0 +1,102 @@
+"""
+Thumbnail Render - Önizleme görselinin üretimi (süreç havuzunda çalışır)
+
+Bu modül ThumbnailRenderer'ın alt süreçlerinde import edilir; hızlı
+başlaması için uygulama modüllerini (ayarlar, veritabanı) import etmez.
+CPU yoğun çözme / ölçekleme API ve worker süreçlerinin GIL'ini tutmaz;
+bozuk veya kötü niyetli bir dosya en fazla alt süreci çökertir.
+"""
+from typing import Dict
+import os
+
+# Görseller için
+try:
+    from PIL import Image, ImageOps
+    Image.MAX_IMAGE_PIXELS = 50_000_000  # sıkıştırma bombası sınırı (aşılırsa hata)
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# PDF ilk sayfa için
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
+
+PDF = "pdf"
+IMAGE = "image"
+
+# Dosya uzantısı -> kaynak türü
+SOURCE_KINDS = {
+    ".pdf": PDF,
+    ".jpg": IMAGE,
+    ".jpeg": IMAGE,
+    ".png": IMAGE,
+}
+
+# Çıktı biçimi -> (Pillow biçimi, kaydetme seçenekleri)
+OUTPUT_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "png": ("PNG", {"optimize": True}),
+}
+
+# Çok küçük PDF sayfalarında aşırı büyütme olmasın
+MAX_PDF_SCALE = 4.0
+
+
+def supported(kind: str) -> bool:
+    if kind == PDF:
+        return PIL_AVAILABLE and PDFIUM_AVAILABLE
+    return kind == IMAGE and PIL_AVAILABLE
+
+
+def _open_image(source_path: str, max_size: int) -> "Image.Image":
+    image = Image.open(source_path)
+    # JPEG: çözücü doğrudan küçültülmüş boyutta açar (tam çözünürlük belleğe alınmaz)
+    image.draft("RGB", (max_size, max_size))
+    return ImageOps.exif_transpose(image)
+
+
+def _render_pdf_page(source_path: str, max_size: int) -> "Image.Image":
+    pdf = pdfium.PdfDocument(source_path)
+    try:
+        page = pdf[0]
+        width, height = page.get_size()
+        scale = min(max_size / max(width, height, 1), MAX_PDF_SCALE)
+        return page.render(scale=scale).to_pil()
+    finally:
+        pdf.close()
+
+
+def render_thumbnail(source_path: str, kind: str, max_size: int, output_prefix: str) -> Dict[str, str]:
+    """
+    Kaynağın en uzun kenarı max_size olan önizlemesini her çıktı biçiminde yaz
+
+    Args:
+        output_prefix: Çıktı dosyaları <output_prefix>.<biçim> olarak yazılır
+
+    Returns:
+        Dict[str, str]: {biçim: dosya yolu}
+    """
+    if kind == PDF:
+        image = _render_pdf_page(source_path, max_size)
+    else:
+        image = _open_image(source_path, max_size)
+
+    image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+
+    outputs = {}
+    try:
+        for fmt, (pil_format, options) in OUTPUT_FORMATS.items():
+            path = f"{output_prefix}.{fmt}"
+            outputs[fmt] = path
+            image.save(path, format=pil_format, **options)
+    except BaseException:
+        for path in outputs.values():
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    return outputs
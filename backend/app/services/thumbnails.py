@@ -0,0 +1,164 @@
+"""
+Thumbnails - Evrak önizleme görselleri
+
+PDF'lerin ilk sayfası ve görseller, en uzun kenarı THUMBNAIL_MAX_SIZE
+piksel olan WebP ve PNG önizlemelere dönüştürülür ve blob'un yanında
+saklanır (blob_store.thumbnail_path). Aynı içerik tek kez işlenir;
+durum document_blobs.preview_status'ta tutulur.
+
+Yükleme, documents.render_thumbnail işini yükleme transaction'ında
+previews kuyruğuna ekler (içerik başına tekil iş). Worker işi alır,
+kaynağı depodan okur ve çözme / ölçeklemeyi evrak süreç havuzunda yapar
+(app.services.process_pool): API istekleri bu işten hiç etkilenmez,
+worker'ın olay döngüsü de CPU yoğun işle bloklanmaz. Çözülemeyen veya
+alt süreci çökerten dosya failed olarak işaretlenir.
+"""
+from typing import Optional
+import logging
+import os
+import uuid
+
+from sqlalchemy import select, update
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.blob import DocumentBlob
+from app.services import blob_store
+from app.services.jobs import enqueue, unique_job_statement
+from app.services.process_pool import document_pool
+from app.services.storage import get_storage_service
+from app.services.thumbnail_render import SOURCE_KINDS, render_thumbnail, supported
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_TASK = "documents.render_thumbnail"
+THUMBNAIL_QUEUE = "previews"
+
+READY = "ready"
+FAILED = "failed"
+UNSUPPORTED = "unsupported"
+
+
+def preview_kind(file_ext: str) -> Optional[str]:
+    """Önizlemesi üretilebilen uzantının kaynak türü (pdf / image)"""
+    kind = SOURCE_KINDS.get(file_ext.lower())
+    return kind if kind and supported(kind) else None
+
+
+async def schedule(uow, sha256: str, file_ext: str) -> bool:
+    """
+    İçeriğin önizleme işini çağıranın transaction'ına ekle
+
+    Aynı içerik için kuyrukta iş varsa yenisi eklenmez.
+
+    Returns:
+        bool: Uzantı destekleniyorsa True
+    """
+    kind = preview_kind(file_ext)
+    if kind is None:
+        return False
+    payload = {"sha256": sha256, "kind": kind}
+    stmt = unique_job_statement(
+        uow.db.bind.dialect.name,
+        THUMBNAIL_TASK,
+        f"thumbnail:{sha256}",
+        payload=payload,
+        queue=THUMBNAIL_QUEUE
+    )
+    if stmt is not None:
+        await uow.execute(stmt)
+    else:
+        enqueue(uow, THUMBNAIL_TASK, payload, queue=THUMBNAIL_QUEUE)
+    return True
+
+
+def _blob_state(sha256: str):
+    db = SessionLocal()
+    try:
+        return db.execute(
+            select(DocumentBlob.file_path, DocumentBlob.preview_status)
+            .where(DocumentBlob.sha256 == sha256)
+        ).first()
+    finally:
+        db.close()
+
+
+def _set_status(sha256: str, preview_status: str) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(DocumentBlob)
+            .where(DocumentBlob.sha256 == sha256)
+            .values(preview_status=preview_status)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _discard(*paths: str) -> None:
+    for path in paths:
+        blob_store.discard_temp(path)
+
+
+async def generate_thumbnails(sha256: str, kind: str) -> dict:
+    """
+    Blob'un önizlemelerini üret ve depoya yaz (documents.render_thumbnail)
+
+    Çözülemeyen dosya tekrar denenmez (failed); depo hataları işin yeniden
+    denenmesi için yükseltilir.
+    """
+    state = await run_in_threadpool(_blob_state, sha256)
+    if state is None:
+        return {"status": "deleted"}
+    file_path, preview_status = state
+    if preview_status == READY:
+        return {"status": READY, "skipped": True}
+    if not supported(kind):
+        await run_in_threadpool(_set_status, sha256, UNSUPPORTED)
+        return {"status": UNSUPPORTED}
+
+    storage = get_storage_service()
+    source = storage.local_path(file_path)
+    downloaded = None
+    if source is None:
+        try:
+            downloaded = source = await run_in_threadpool(blob_store.download_to_temp, file_path)
+        except FileNotFoundError:
+            return {"status": "missing"}
+
+    output_prefix = os.path.join(blob_store.TMP_DIR, f"{sha256}.{uuid.uuid4().hex}.thumb")
+    os.makedirs(blob_store.TMP_DIR, exist_ok=True)
+    try:
+        outputs = await document_pool.run(
+            render_thumbnail, source, kind, settings.THUMBNAIL_MAX_SIZE, output_prefix
+        )
+    except Exception as e:
+        logger.warning(f"Thumbnail rendering failed for {sha256[:12]}: {type(e).__name__}: {e}")
+        await run_in_threadpool(_set_status, sha256, FAILED)
+        return {"status": FAILED}
+    finally:
+        if downloaded:
+            _discard(downloaded)
+
+    try:
+        for fmt, path in outputs.items():
+            await run_in_threadpool(
+                storage.store_file, blob_store.thumbnail_path(sha256, fmt), path, media_type(fmt)
+            )
+    finally:
+        _discard(*outputs.values())
+
+    await run_in_threadpool(_set_status, sha256, READY)
+    return {"status": READY, "formats": sorted(outputs)}
+
+
+def media_type(fmt: str) -> str:
+    return f"image/{fmt}"
+
+
+def negotiate_format(accept: Optional[str]) -> str:
+    """Tarayıcı WebP kabul ediyorsa webp, değilse png"""
+    return "webp" if accept and "image/webp" in accept else "png"
+
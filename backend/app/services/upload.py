@@ -0,0 +1,91 @@
+"""
+Upload Service - Yüklenen dosyaların parça parça diske yazılması
+
+Dosya belleğe tamamen okunmaz: sabit boyutlu parçalar geçici bir dosyaya
+yazılırken SHA-256 ve boyut artımlı hesaplanır. Limit aşıldığı anda okuma
+durdurulur ve geçici dosya silinir. Tamamlanan geçici dosya blob_store
+tarafından içerik adresine (SHA-256) taşınır.
+"""
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+import hashlib
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+class UploadTooLarge(ValueError):
+    """Dosya boyutu limiti aşıldı"""
+    def __init__(self, max_size: int):
+        super().__init__(f"Upload exceeds {max_size} bytes")
+        self.max_size = max_size
+
+
+def _write_chunk(f, chunk: bytes) -> None:
+    f.write(chunk)
+
+
+def _finalize(f) -> None:
+    f.flush()
+    os.fsync(f.fileno())
+    f.close()
+
+
+def _discard(f, tmp_path: str) -> None:
+    f.close()
+    try:
+        os.remove(tmp_path)
+    except FileNotFoundError:
+        pass
+
+
+async def stream_upload_to_temp(
+    upload: UploadFile,
+    tmp_dir: str,
+    max_size: int
+) -> dict:
+    """
+    UploadFile'ı parça parça tmp_dir altında geçici bir dosyaya yaz
+
+    Args:
+        upload: FastAPI UploadFile
+        tmp_dir: Geçici dosya dizini (hedefle aynı dosya sisteminde olmalı)
+        max_size: İzin verilen en büyük boyut (byte)
+
+    Returns:
+        dict: {tmp_path, size, sha256}
+
+    Raises:
+        UploadTooLarge: Boyut limiti aşıldığında (geçici dosya silinir)
+    """
+    os.makedirs(tmp_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, suffix=".part")
+    f = os.fdopen(fd, "wb")
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while True:
+            chunk = await upload.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                raise UploadTooLarge(max_size)
+            digest.update(chunk)
+            await run_in_threadpool(_write_chunk, f, chunk)
+
+        await run_in_threadpool(_finalize, f)
+    except BaseException:
+        await run_in_threadpool(_discard, f, tmp_path)
+        raise
+
+    return {
+        "tmp_path": tmp_path,
+        "size": size,
+        "sha256": digest.hexdigest()
+    }
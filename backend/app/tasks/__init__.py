@@ -0,0 +1,3 @@
+# Tasks package
+# Görev modülleri burada import edilir; python -m app.worker kayıtları buradan alır
+from app.tasks import documents, notifications, payments, storage
@@ -0,0 +1,45 @@
+"""
+Evrak görevleri
+"""
+import logging
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services import search_index
+from app.services.jobs import task
+from app.services.thumbnails import THUMBNAIL_QUEUE, THUMBNAIL_TASK, generate_thumbnails
+
+logger = logging.getLogger(__name__)
+
+
+@task(THUMBNAIL_TASK, queue=THUMBNAIL_QUEUE, max_attempts=3)
+async def render_thumbnail(payload: dict) -> dict:
+    """Yüklenen evrağın önizleme görsellerini süreç havuzunda üret"""
+    result = await generate_thumbnails(payload["sha256"], payload["kind"])
+    logger.info(f"Thumbnail {payload['sha256'][:12]}: {result['status']}")
+    return result
+
+
+@task(search_index.EXTRACT_TASK, queue=search_index.SEARCH_QUEUE, max_attempts=3)
+async def extract_text(payload: dict) -> dict:
+    """Yüklenen evrağın metnini süreç havuzunda çıkar ve arama indeksine yaz"""
+    result = await search_index.index_blob_text(payload["sha256"], payload["kind"])
+    logger.info(f"Text index {payload['sha256'][:12]}: {result['status']}")
+    return result
+
+
+@task(
+    "search.backfill",
+    queue="maintenance",
+    every_seconds=settings.SEARCH_BACKFILL_INTERVAL_SECONDS
+)
+def backfill_search_index(payload: dict) -> dict:
+    """Metni çıkarılmamış evrakları (ör. arama öncesi yüklenenler) kuyruğa al"""
+    db = SessionLocal()
+    try:
+        result = search_index.backfill(db, batch_size=max(settings.SEARCH_BACKFILL_BATCH_SIZE, 1))
+    finally:
+        db.close()
+    if any(result.values()):
+        logger.info(f"Search backfill: {result}")
+    return result
@@ -0,0 +1,69 @@
+"""
+Bildirim görevleri
+"""
+import logging
+import time
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.notification import NotificationType
+from app.services.delivery import CHANNEL_TASKS, DELIVERY_QUEUE, deliver_pending
+from app.services.email import email_channel
+from app.services.sms import sms_channel
+from app.services.jobs import task
+from app.services.notification_counters import reconcile_unread_counters
+
+logger = logging.getLogger(__name__)
+
+
+@task(
+    "notifications.reconcile_unread_counters",
+    queue="maintenance",
+    every_seconds=settings.NOTIFICATION_COUNTER_RECONCILE_SECONDS
+)
+def reconcile_counters(payload: dict) -> dict:
+    """Okunmamış sayaçlarını gerçek değerlerle karşılaştır ve sapmaları düzelt"""
+    db = SessionLocal()
+    try:
+        result = reconcile_unread_counters(db)
+    finally:
+        db.close()
+    logger.info(f"Unread counter reconciliation: {result}")
+    return result
+
+
+@task(
+    CHANNEL_TASKS[NotificationType.EMAIL],
+    queue=DELIVERY_QUEUE,
+    every_seconds=settings.NOTIFICATION_DELIVERY_INTERVAL_SECONDS
+)
+def deliver_email(payload: dict) -> dict:
+    """Bekleyen email bildirimlerini SMTP havuzu üzerinden gönder"""
+    # Senkron görev iptal edilemez: zaman aşımından önce kendiliğinden dur
+    deadline = time.monotonic() + deliver_email.task_spec.timeout_seconds * 0.8
+    db = SessionLocal()
+    try:
+        result = deliver_pending(db, email_channel, deadline=deadline)
+    finally:
+        db.close()
+    if result["batches"]:
+        logger.info(f"Email delivery: {result}")
+    return result
+
+
+@task(
+    CHANNEL_TASKS[NotificationType.SMS],
+    queue=DELIVERY_QUEUE,
+    every_seconds=settings.NOTIFICATION_DELIVERY_INTERVAL_SECONDS
+)
+def deliver_sms(payload: dict) -> dict:
+    """Bekleyen SMS bildirimlerini sağlayıcının bulk API'si üzerinden gönder"""
+    deadline = time.monotonic() + deliver_sms.task_spec.timeout_seconds * 0.8
+    db = SessionLocal()
+    try:
+        result = deliver_pending(db, sms_channel, deadline=deadline)
+    finally:
+        db.close()
+    if result["batches"]:
+        logger.info(f"SMS delivery: {result}")
+    return result
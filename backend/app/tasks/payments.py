@@ -0,0 +1,29 @@
+"""
+Ödeme görevleri
+"""
+import logging
+import time
+
+from app.core.config import settings
+from app.services.jobs import task
+from app.services.payment_reconciliation import reconcile_payments
+
+logger = logging.getLogger(__name__)
+
+
+@task(
+    "payments.reconcile",
+    queue="maintenance",
+    every_seconds=settings.PAYMENT_RECONCILE_INTERVAL_SECONDS
+)
+async def reconcile(payload: dict) -> dict:
+    """Bekleyen ödemeleri İyzico ile karşılaştır, sonuçlanmış olanları güncelle"""
+    # Zaman aşımında iptal edilmeden önce kaldığı yeri kaydedip dur
+    deadline = time.monotonic() + reconcile.task_spec.timeout_seconds * 0.8
+    report = await reconcile_payments(deadline=deadline)
+    counters = {key: report[key] for key in ("checked", "completed", "failed", "refunded", "unchanged", "errors")}
+    logger.info(
+        f"Payment reconciliation #{report['id']}: {counters} "
+        f"next_cursor={report['next_cursor']} aborted={report['aborted']}"
+    )
+    return counters
@@ -0,0 +1,38 @@
+"""
+Depolama görevleri
+"""
+import logging
+import time
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.jobs import task
+from app.services.storage import get_storage_service
+from app.services.storage_usage import reconcile_storage
+
+logger = logging.getLogger(__name__)
+
+
+@task(
+    "storage.reconcile",
+    queue="maintenance",
+    every_seconds=settings.STORAGE_RECONCILE_INTERVAL_SECONDS
+)
+def reconcile(payload: dict) -> dict:
+    """Kullanım sayaçlarını ve depodaki blob nesnelerini kayıtlarla karşılaştır"""
+    # Senkron görev iptal edilemez: zaman aşımından önce kendiliğinden dur
+    deadline = time.monotonic() + reconcile.task_spec.timeout_seconds * 0.8
+    db = SessionLocal()
+    try:
+        report = reconcile_storage(db, get_storage_service(), deadline=deadline)
+    finally:
+        db.close()
+    objects = report["objects"]
+    logger.info(
+        f"Storage reconciliation: counters={report['counters']} "
+        f"objects={objects['objects']} orphans={objects['orphans']} removed={objects['removed']} "
+        f"missing={objects['missing']} complete={objects['complete']}"
+    )
+    return {"counters": report["counters"], **{
+        key: objects[key] for key in ("objects", "bytes", "orphans", "removed", "missing", "size_mismatches", "complete")
+    }}
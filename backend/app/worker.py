@@ -0,0 +1,256 @@
+"""
+Arka plan iş çalıştırıcısı
+
+    python -m app.worker                              # JOB_QUEUES ayarındaki kuyruklar
+    python -m app.worker --queues default=8,maintenance=1
+    python -m app.worker --check                      # periyodik görev planlama kontrolü
+
+Her kuyruk için ayrı bir döngü, o kuyruğun eşzamanlılık limiti kadar işi
+kiralar (claim_jobs) ve çalıştırır. Boş kuyruk JOB_POLL_INTERVAL_SECONDS
+aralıklarla yoklanır. Periyodik görevler (every_seconds) aynı süreçteki
+zamanlayıcı tarafından kuyruğa alınır.
+
+SIGTERM/SIGINT: yeni iş alınmaz, çalışan işlerin bitmesi beklenir.
+Birden fazla worker süreci (veya makine) aynı veritabanıyla güvenle
+çalışabilir (bkz. app.services.jobs).
+"""
+from typing import Dict, Optional, Set
+import argparse
+import asyncio
+import inspect
+import logging
+import os
+import signal
+import socket
+import sys
+import traceback
+
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import parse_job_queues, settings
+from app.core.database import SessionLocal
+from app.models.job import Job
+from app.services.jobs import (
+    TASKS,
+    claim_jobs,
+    complete_job,
+    fail_job,
+    schedule_periodic,
+)
+from app.services.process_pool import document_pool
+import app.tasks  # noqa: F401  (görev kayıtları)
+
+logger = logging.getLogger("app.worker")
+
+SCHEDULER_INTERVAL_SECONDS = 30.0
+
+
+def _with_session(func, *args):
+    db = SessionLocal()
+    try:
+        return func(db, *args)
+    finally:
+        db.close()
+
+
+class Worker:
+    """Kuyruk başına sınırlı eşzamanlılıkla iş çalıştıran süreç"""
+
+    def __init__(self, queues: Dict[str, int], worker_id: Optional[str] = None):
+        self.queues = queues
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._stopping = asyncio.Event()
+        self._running: Set[asyncio.Task] = set()
+        self.completed = 0
+        self.retried = 0
+        self.dead = 0
+
+    def stop(self) -> None:
+        if not self._stopping.is_set():
+            logger.info("Worker stopping; waiting for running jobs")
+            self._stopping.set()
+
+    async def run(self) -> None:
+        logger.info(f"Worker {self.worker_id} started: {self.queues}")
+        loops = [
+            asyncio.create_task(self._queue_loop(queue, concurrency), name=f"queue-{queue}")
+            for queue, concurrency in self.queues.items()
+        ]
+        loops.append(asyncio.create_task(self._scheduler_loop(), name="scheduler"))
+        await asyncio.gather(*loops)
+
+        if self._running:
+            await asyncio.wait(self._running)
+        logger.info(
+            f"Worker {self.worker_id} stopped: completed={self.completed} "
+            f"retried={self.retried} dead={self.dead}"
+        )
+
+    async def _sleep(self, seconds: float) -> None:
+        """Durdurma sinyaline kadar veya süre dolana kadar bekle"""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _queue_loop(self, queue: str, concurrency: int) -> None:
+        running: Set[asyncio.Task] = set()
+
+        while not self._stopping.is_set():
+            free = concurrency - len(running)
+            if free <= 0:
+                await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                continue
+
+            try:
+                jobs = await run_in_threadpool(
+                    _with_session, claim_jobs, queue, free, self.worker_id
+                )
+            except Exception as e:
+                logger.error(f"Claim failed on queue {queue}: {str(e)}")
+                await self._sleep(settings.JOB_POLL_INTERVAL_SECONDS * 5)
+                continue
+
+            if not jobs:
+                await self._sleep(settings.JOB_POLL_INTERVAL_SECONDS)
+                continue
+
+            for job in jobs:
+                job_task = asyncio.create_task(self._execute(queue, job))
+                running.add(job_task)
+                self._running.add(job_task)
+                job_task.add_done_callback(running.discard)
+                job_task.add_done_callback(self._running.discard)
+
+    async def _scheduler_loop(self) -> None:
+        while not self._stopping.is_set():
+            for spec in TASKS.values():
+                if spec.every_seconds and spec.queue in self.queues:
+                    try:
+                        await run_in_threadpool(_with_session, schedule_periodic, spec)
+                    except Exception as e:
+                        logger.error(f"Scheduling {spec.name} failed: {str(e)}")
+            await self._sleep(SCHEDULER_INTERVAL_SECONDS)
+
+    async def _execute(self, queue: str, job: dict) -> None:
+        spec = TASKS.get(job["task"])
+        if spec is None:
+            await self._fail(job, f"Unknown task: {job['task']}", permanent=True)
+            return
+
+        try:
+            if inspect.iscoroutinefunction(spec.func):
+                result = spec.func(job["payload"])
+            else:
+                result = run_in_threadpool(spec.func, job["payload"])
+            await asyncio.wait_for(result, spec.timeout_seconds)
+        except asyncio.TimeoutError:
+            await self._fail(job, f"Timed out after {spec.timeout_seconds}s")
+            return
+        except Exception:
+            await self._fail(job, traceback.format_exc())
+            return
+
+        try:
+            await run_in_threadpool(_with_session, complete_job, job["id"], self.worker_id)
+            self.completed += 1
+        except Exception as e:
+            # Kira dolunca iş tekrar çalışır; görevler idempotent yazılmalı
+            logger.error(f"Could not mark job {job['id']} complete: {str(e)}")
+
+    async def _fail(self, job: dict, error: str, permanent: bool = False) -> None:
+        try:
+            dead = await run_in_threadpool(
+                _with_session, fail_job, job, self.worker_id, error, permanent
+            )
+        except Exception as e:
+            logger.error(f"Could not record failure of job {job['id']}: {str(e)}")
+            return
+
+        if dead:
+            self.dead += 1
+            logger.error(
+                f"Job {job['id']} ({job['task']}) moved to dead_jobs after "
+                f"{job['attempts']} attempt(s): {error.strip().splitlines()[-1]}"
+            )
+        else:
+            self.retried += 1
+            logger.warning(
+                f"Job {job['id']} ({job['task']}) failed, attempt "
+                f"{job['attempts']}/{job['max_attempts']}: {error.strip().splitlines()[-1]}"
+            )
+
+
+def check_schedules(queues: Dict[str, int]) -> bool:
+    """
+    Kuyruklardaki periyodik görevleri bir kez planla ve kayıtları doğrula
+
+    Dağıtım sonrası duman testi: her periyodik görev için kuyrukta doğru
+    görev adı, kuyruk ve deneme hakkıyla tek bir iş bulunmalı.
+
+    Returns:
+        bool: Tüm görevler sorunsuz planlandıysa True
+    """
+    ok = True
+    db = SessionLocal()
+    try:
+        for spec in TASKS.values():
+            if not spec.every_seconds or spec.queue not in queues:
+                continue
+            try:
+                schedule_periodic(db, spec)
+                job = db.scalar(select(Job).where(Job.unique_key == f"periodic:{spec.name}"))
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Scheduling {spec.name} failed: {str(e)}")
+                ok = False
+                continue
+            if job is None or (job.task, job.queue, job.max_attempts) != (spec.name, spec.queue, spec.max_attempts):
+                logger.error(f"Periodic job for {spec.name} is wrong: {job and (job.task, job.queue, job.max_attempts)}")
+                ok = False
+            else:
+                logger.info(f"Scheduled {spec.name} on {spec.queue} (every {spec.every_seconds}s)")
+    finally:
+        db.close()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Background job worker")
+    parser.add_argument(
+        "--queues",
+        default=settings.JOB_QUEUES,
+        help='Kuyruk=eşzamanlılık çiftleri, ör. "default=4,maintenance=1"'
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Periyodik görevleri planla, kayıtları doğrula ve çık"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+
+    if args.check:
+        sys.exit(0 if check_schedules(parse_job_queues(args.queues)) else 1)
+
+    async def run():
+        worker = Worker(parse_job_queues(args.queues))
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, worker.stop)
+        try:
+            await worker.run()
+        finally:
+            # Evrak işleme süreç havuzu (kullanıldıysa)
+            document_pool.shutdown()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# Senkron / Async Veritabanı Modu Karşılaştırması
+# Aynı worker sayısıyla API'yi DATABASE_ASYNC=false ve true olarak iki kez
+# başlatır, sıcak endpoint'lere eşzamanlı istek atar ve istek/sn ile
+# p50/p99 gecikmelerini raporlar.
+#
+# Kullanım:
+#   python benchmark_db_modes.py --username admin@koptay.av.tr --password ... \
+#       --workers 2 --concurrency 32 --requests 2000
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+ENDPOINTS = [
+    "/api/cases/",
+    "/api/documents/",
+    "/api/notifications/",
+    "/api/notifications/unread-count",
+    "/api/payments/my-payments",
+]
+
+
+def wait_for_server(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"Server did not start at {base_url}")
+
+
+def login(base_url: str, username: str, password: str) -> str:
+    response = requests.post(
+        f"{base_url}/api/auth/login",
+        data={"username": username, "password": password},
+        timeout=10
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def run_load(base_url: str, token: str, total_requests: int, concurrency: int) -> dict:
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def one(i: int):
+        url = base_url + ENDPOINTS[i % len(ENDPOINTS)]
+        started = time.perf_counter()
+        response = session.get(url, headers=headers, timeout=30)
+        return time.perf_counter() - started, response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(total_requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for latency, _ in results]
+    errors = sum(1 for _, code in results if code >= 400)
+    return {
+        "rps": total_requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "errors": errors,
+    }
+
+
+def benchmark_mode(async_mode: bool, args) -> dict:
+    port = args.port + (1 if async_mode else 0)
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, DATABASE_ASYNC="true" if async_mode else "false")
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(args.workers), "--log-level", "warning",
+        ],
+        env=env,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    try:
+        wait_for_server(base_url)
+        token = login(base_url, args.username, args.password)
+        # Isınma turu (bağlantı havuzları, principal cache)
+        run_load(base_url, token, min(200, args.requests), args.concurrency)
+        return run_load(base_url, token, args.requests, args.concurrency)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync vs async DB mode benchmark")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    print(f"⚙️  workers={args.workers} concurrency={args.concurrency} requests={args.requests}")
+    print(f"{'mode':<8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for async_mode in (False, True):
+        result = benchmark_mode(async_mode, args)
+        label = "async" if async_mode else "sync"
+        print(
+            f"{label:<8}{result['rps']:>10.1f}{result['p50_ms']:>10.1f}"
+            f"{result['p99_ms']:>10.1f}{result['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
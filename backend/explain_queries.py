@@ -0,0 +1,274 @@
+# Liste Sorguları İçin EXPLAIN Kontrolü
+# Endpoint'lerin kullandığı sorgu biçimlerini (filtre + keyset sayfalama)
+# DATABASE_URL veritabanında EXPLAIN ile çalıştırır ve hedef tabloda
+# sıralı tarama (Seq Scan) görülürse hata koduyla çıkar.
+#
+# Karar Postgres planına göre verilir. SQLite'ta (geliştirme) keyset
+# sıralaması julianday() ifadesi üzerinden yapıldığından filtresiz listeler
+# her zaman SCAN gösterir; SQLite sonuçları yalnızca bilgi amaçlıdır.
+#
+# --rows > 0 ise tek bir transaction içinde sentetik veri eklenir,
+# istatistikler güncellenir (ANALYZE) ve sonunda ROLLBACK yapılır;
+# mevcut veriye dokunulmaz.
+#
+# Kullanım:
+#   python explain_queries.py --rows 20000
+#   python explain_queries.py --rows 0 --verbose   # mevcut veriyle
+
+import argparse
+import json
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, insert, select, text
+
+from app.core.database import SessionLocal
+from app.core.pagination import PageParams, encode_cursor, keyset_query
+from app.models.audit_log import AuditLog
+from app.models.case import Case, CaseStatus, CaseType
+from app.models.document import Document, DocumentType
+from app.models.notification import Notification, NotificationType
+from app.models.payment import Payment, PaymentStatus
+from app.models.timeline import TimelineEvent
+from app.models.user import User, UserType
+
+BATCH_SIZE = 1000
+PAGE_LIMIT = 50
+
+
+def _insert_batches(db, model, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.execute(insert(model).values(rows[start:start + BATCH_SIZE]))
+
+
+def seed(db, rows: int) -> None:
+    """Sentetik veri (commit edilmez)"""
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+
+    def past():
+        return now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+
+    tag = rng.randint(0, 10 ** 9)
+    client_count = max(rows // 100, 10)
+    _insert_batches(db, User, [
+        {
+            "email": f"explain-{tag}-{i}@example.com",
+            "hashed_password": "x",
+            "full_name": f"Explain {i}",
+            "user_type": UserType.INDIVIDUAL,
+            "created_at": past(),
+        }
+        for i in range(client_count)
+    ])
+    user_ids = db.scalars(
+        select(User.id).where(User.email.like(f"explain-{tag}-%"))
+    ).all()
+
+    _insert_batches(db, Case, [
+        {
+            "case_number": f"EXPLAIN-{tag}-{i}",
+            "title": "Explain",
+            "case_type": rng.choice(list(CaseType)),
+            "status": rng.choice(list(CaseStatus)),
+            "client_id": rng.choice(user_ids),
+            "created_at": past(),
+        }
+        for i in range(max(rows // 10, 10))
+    ])
+    case_ids = db.scalars(
+        select(Case.id).where(Case.case_number.like(f"EXPLAIN-{tag}-%"))
+    ).all()
+
+    _insert_batches(db, Notification, [
+        {
+            "title": "Explain",
+            "message": "Explain",
+            "notification_type": NotificationType.IN_APP,
+            "is_read": rng.random() < 0.8,
+            "is_sent": True,
+            "user_id": rng.choice(user_ids),
+            "created_at": past(),
+        }
+        for _ in range(rows)
+    ])
+    _insert_batches(db, TimelineEvent, [
+        {"title": "Explain", "event_date": past(), "case_id": rng.choice(case_ids)}
+        for _ in range(rows // 2)
+    ])
+    _insert_batches(db, Payment, [
+        {
+            "amount": 100.0,
+            "status": rng.choice(list(PaymentStatus)),
+            "user_id": rng.choice(user_ids),
+            "created_at": past(),
+        }
+        for _ in range(rows // 4)
+    ])
+    _insert_batches(db, Document, [
+        {
+            "filename": "explain.pdf",
+            "original_filename": "explain.pdf",
+            "file_path": "documents/explain.pdf",
+            "document_type": DocumentType.OTHER,
+            "is_visible_to_client": rng.random() < 0.7,
+            "user_id": rng.choice(user_ids),
+            "case_id": rng.choice(case_ids),
+            "uploaded_at": past(),
+        }
+        for _ in range(rows // 4)
+    ])
+    _insert_batches(db, AuditLog, [
+        {
+            "user_id": rng.choice(user_ids),
+            "action": "VIEW",
+            "resource_type": "CASE",
+            "created_at": past(),
+        }
+        for _ in range(rows)
+    ])
+
+    db.execute(text("ANALYZE"))
+
+
+def _sample(db, column):
+    """Sorgu parametresi olarak kullanılacak gerçek bir değer"""
+    value = db.scalar(select(column).where(column.isnot(None)).order_by(func.random()).limit(1))
+    if value is None:
+        raise SystemExit(f"No rows in {column.table.name}; run with --rows > 0")
+    return value
+
+
+def _page(db, model, keys, where) -> PageParams:
+    """İkinci sayfa imleci (keyset koşulu da planlansın)"""
+    row = db.scalars(
+        select(model).where(*where).order_by(*(key.desc() for key in keys)).limit(1)
+    ).first()
+    cursor = encode_cursor([getattr(row, key.key) for key in keys]) if row else None
+    return PageParams(cursor=cursor, limit=PAGE_LIMIT)
+
+
+def _listing(db, model, keys, *where):
+    return keyset_query(db, select(model).where(*where), _page(db, model, keys, where), keys)
+
+
+def build_queries(db) -> list:
+    """(ad, hedef tablo, select()) - endpoint'lerdeki sorgu biçimleri"""
+    user_id = _sample(db, Notification.user_id)
+    payment_user_id = _sample(db, Payment.user_id)
+    client_id = _sample(db, Case.client_id)
+    case_id = _sample(db, Document.case_id)
+    timeline_case_id = _sample(db, TimelineEvent.case_id)
+    audit_user_id = _sample(db, AuditLog.user_id)
+
+    notification_keys = (Notification.created_at, Notification.id)
+    payment_keys = (Payment.created_at, Payment.id)
+    document_keys = (Document.uploaded_at, Document.id)
+    case_keys = (Case.created_at, Case.id)
+
+    return [
+        ("notifications.get_notifications", "notifications",
+         _listing(db, Notification, notification_keys, Notification.user_id == user_id)),
+        ("notifications.get_notifications?unread_only", "notifications",
+         _listing(db, Notification, notification_keys,
+                  Notification.user_id == user_id, Notification.is_read == False)),
+        ("notifications.get_unread_count", "notifications",
+         select(func.count(Notification.id)).where(
+             Notification.user_id == user_id, Notification.is_read == False
+         )),
+        ("cases.get_case_timeline", "timeline_events",
+         _listing(db, TimelineEvent, (TimelineEvent.event_date, TimelineEvent.id),
+                  TimelineEvent.case_id == timeline_case_id)),
+        ("payments.get_my_payments", "payments",
+         _listing(db, Payment, payment_keys, Payment.user_id == payment_user_id)),
+        ("payments.get_my_payments?status", "payments",
+         _listing(db, Payment, payment_keys,
+                  Payment.user_id == payment_user_id, Payment.status == PaymentStatus.COMPLETED)),
+        ("payments.get_all_payments", "payments",
+         _listing(db, Payment, payment_keys)),
+        ("documents.get_documents?case_id", "documents",
+         _listing(db, Document, document_keys, Document.case_id == case_id)),
+        ("documents.get_documents?case_id (client)", "documents",
+         _listing(db, Document, document_keys,
+                  Document.case_id == case_id, Document.is_visible_to_client == True)),
+        ("cases.get_cases (client)", "cases",
+         _listing(db, Case, case_keys, Case.client_id == client_id)),
+        ("admin.get_all_cases?client_id&status", "cases",
+         _listing(db, Case, case_keys,
+                  Case.client_id == client_id, Case.status == CaseStatus.IN_PROGRESS)),
+        ("admin.get_all_cases", "cases",
+         _listing(db, Case, case_keys)),
+        ("audit_logs by user", "audit_logs",
+         select(AuditLog).where(AuditLog.user_id == audit_user_id)
+         .order_by(AuditLog.created_at.desc()).limit(PAGE_LIMIT)),
+    ]
+
+
+def _compile(db, stmt) -> str:
+    return str(stmt.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def _postgres_seq_scans(node: dict, table: str) -> list:
+    found = []
+    if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") == table:
+        found.append(node)
+    for child in node.get("Plans", []):
+        found.extend(_postgres_seq_scans(child, table))
+    return found
+
+
+def explain(db, stmt, table: str):
+    """(tam tarama var mı, plan metni)"""
+    sql = _compile(db, stmt)
+
+    if db.bind.dialect.name == "postgresql":
+        raw = db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        plan = (raw if isinstance(raw, list) else json.loads(raw))[0]["Plan"]
+        plan_text = "\n".join(db.execute(text(f"EXPLAIN {sql}")).scalars())
+        return bool(_postgres_seq_scans(plan, table)), plan_text
+
+    if db.bind.dialect.name == "sqlite":
+        details = [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+        full_scan = any(
+            detail.startswith(f"SCAN {table}") and "INDEX" not in detail
+            for detail in details
+        )
+        return full_scan, "\n".join(details)
+
+    raise SystemExit(f"Unsupported dialect: {db.bind.dialect.name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN list endpoint queries")
+    parser.add_argument("--rows", type=int, default=20000, help="Sentetik satır sayısı (0: ekleme yok)")
+    parser.add_argument("--verbose", action="store_true", help="Planları yazdır")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    failures = 0
+    try:
+        if args.rows > 0:
+            print(f"⚙️  Seeding ~{args.rows} rows per table (rolled back at exit)")
+            seed(db, args.rows)
+
+        informational = db.bind.dialect.name != "postgresql"
+        for name, table, stmt in build_queries(db):
+            full_scan, plan = explain(db, stmt, table)
+            if full_scan and not informational:
+                failures += 1
+            print(f"{('⚠️ ' if informational else '❌') if full_scan else '✅'} {name}")
+            if args.verbose or full_scan:
+                print("    " + plan.replace("\n", "\n    "))
+    finally:
+        db.rollback()
+        db.close()
+
+    if failures:
+        print(f"\n{failures} query shape(s) fall back to a sequential scan")
+        sys.exit(1)
+    print("\nAll query shapes use an index")
+
+
+if __name__ == "__main__":
+    main()
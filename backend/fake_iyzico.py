@@ -0,0 +1,447 @@
+# Sahte İyzico Sunucusu (test / yük testi)
+# İyzico REST API'sinin ödeme hattında kullanılan kısmını taklit eder:
+# /payment/auth, /payment/detail, /payment/refund. IYZWSv2 imzasını
+# doğrular, ödemeleri bellekte tutar; test kartları gerçek sandbox ile aynı
+# sonuçları verir (bkz. PaymentService.get_test_cards). HTTP/1.1 keep-alive
+# desteklenir. İstek başına gecikme, askıda kalma (zaman aşımı) ve 502
+# hatası eklenebilir.
+#
+# Kullanım:
+#   python fake_iyzico.py --port 8091 --latency-ms 300
+#   (.env: IYZICO_BASE_URL=http://127.0.0.1:8091 IYZICO_API_KEY=test IYZICO_SECRET_KEY=test)
+#
+#   # Ödeme hattı ölçümü: N ödeme C eşzamanlılıkla; gecikme, breaker ve
+#   # event loop gecikmesi raporlanır (veritabanı kullanılmaz)
+#   python fake_iyzico.py --port 0 --benchmark 2000 --concurrency 100 --latency-ms 200
+#   python fake_iyzico.py --port 0 --benchmark 500 --hang-rate 0.5 --timeout 1
+#
+#   # Mutabakat ölçümü: DATABASE_URL'deki veritabanına N bekleyen ödeme
+#   # ekler, sağlayıcı tarafında sonuçlarını oluşturur, payments.reconcile
+#   # ile eşler, siler
+#   python fake_iyzico.py --port 0 --reconcile 20000 --concurrency 20 --latency-ms 50
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import random
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+API_KEY = "test"
+SECRET_KEY = "test"
+HANG_SECONDS = 60.0
+
+# Kart numarası -> (errorCode, errorMessage, errorGroup)
+DECLINED_CARDS = {
+    "5406670000000009": ("10051", "Kart limiti yetersiz, yetersiz bakiye", "NOT_SUFFICIENT_FUNDS"),
+    "4111111111111129": ("10005", "İşlem onaylanmadı", "DO_NOT_HONOUR"),
+}
+
+
+class FakeStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.payments = 0
+        self.declined = 0
+        self.refunds = 0
+        self.errors = 0
+        self.hung = 0
+
+
+class FakeIyzicoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.stats.lock:
+            self.server.stats.connections += 1
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def respond(self, status: int, body: dict) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def authorized(self, body: str) -> bool:
+        header = self.headers.get("Authorization", "")
+        if not header.startswith("IYZWSv2 "):
+            return False
+        try:
+            fields = dict(
+                part.split(":", 1)
+                for part in base64.b64decode(header[8:]).decode("utf-8").split("&")
+            )
+        except (ValueError, UnicodeDecodeError):
+            return False
+        expected = hmac.new(
+            self.server.secret_key.encode("utf-8"),
+            (fields.get("randomKey", "") + self.path + body).encode("utf-8"),
+            hashlib.sha256
+        ).hexdigest()
+        return fields.get("apiKey") == self.server.api_key and hmac.compare_digest(
+            fields.get("signature", ""), expected
+        )
+
+    def do_POST(self) -> None:
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+        with server.stats.lock:
+            server.stats.requests += 1
+
+        if not self.authorized(body):
+            self.respond(401, {"status": "failure", "errorCode": "1001", "errorMessage": "api bilgileri bulunamadı"})
+            return
+
+        roll = random.random()
+        if roll < server.hang_rate:
+            with server.stats.lock:
+                server.stats.hung += 1
+            time.sleep(HANG_SECONDS)
+        elif roll < server.hang_rate + server.error_rate:
+            with server.stats.lock:
+                server.stats.errors += 1
+            self.respond(502, {"status": "failure", "errorMessage": "Bad gateway (injected)"})
+            return
+        if server.latency:
+            time.sleep(server.latency)
+
+        try:
+            request = json.loads(body)
+        except ValueError:
+            self.respond(200, {"status": "failure", "errorCode": "11", "errorMessage": "Geçersiz istek"})
+            return
+
+        handler = {
+            "/payment/auth": self.payment_auth,
+            "/payment/detail": self.payment_detail,
+            "/payment/refund": self.payment_refund,
+        }.get(self.path)
+        if handler is None:
+            self.respond(404, {"status": "failure", "errorMessage": "Not found"})
+            return
+        self.respond(200, {"locale": request.get("locale", "tr"), "systemTime": int(time.time() * 1000),
+                           "conversationId": request.get("conversationId"), **handler(request)})
+
+    def payment_auth(self, request: dict) -> dict:
+        server = self.server
+        card = request.get("paymentCard", {}).get("cardNumber", "")
+        if card in DECLINED_CARDS:
+            code, message, group = DECLINED_CARDS[card]
+            with server.stats.lock:
+                server.stats.declined += 1
+            # Reddedilen ödeme de sorgulanabilir (paymentStatus=FAILURE)
+            server.record(request.get("conversationId"), "FAILURE", float(request.get("price", 0)),
+                          request.get("currency", "TRY"))
+            return {"status": "failure", "errorCode": code, "errorMessage": message, "errorGroup": group}
+
+        payment_id = str(random.randint(10 ** 7, 10 ** 8 - 1))
+        payment = {
+            "status": "success",
+            "paymentId": payment_id,
+            "paymentStatus": "SUCCESS",
+            "fraudStatus": 1,
+            "price": float(request.get("price", 0)),
+            "paidPrice": float(request.get("paidPrice", 0)),
+            "currency": request.get("currency", "TRY"),
+            "basketId": request.get("basketId"),
+            "paymentConversationId": request.get("conversationId"),
+            "itemTransactions": [
+                {"itemId": item.get("id"), "paymentTransactionId": str(random.randint(10 ** 7, 10 ** 8 - 1)),
+                 "price": float(item.get("price", 0))}
+                for item in request.get("basketItems", [])
+            ],
+        }
+        with server.lock:
+            server.payments[payment_id] = payment
+            server.by_conversation[request.get("conversationId")] = payment_id
+            for item in payment["itemTransactions"]:
+                server.transactions[item["paymentTransactionId"]] = payment_id
+        with server.stats.lock:
+            server.stats.payments += 1
+        return payment
+
+    def payment_detail(self, request: dict) -> dict:
+        server = self.server
+        with server.lock:
+            payment_id = request.get("paymentId") or server.by_conversation.get(request.get("paymentConversationId"))
+            payment = server.payments.get(payment_id)
+        if payment is None:
+            return {"status": "failure", "errorCode": "5083", "errorMessage": "Ödeme bulunamadı"}
+        return payment
+
+    def payment_refund(self, request: dict) -> dict:
+        server = self.server
+        with server.lock:
+            payment_id = server.transactions.get(request.get("paymentTransactionId"))
+            payment = server.payments.get(payment_id)
+            if payment is not None:
+                payment["paymentStatus"] = "REFUNDED"
+        if payment is None:
+            return {"status": "failure", "errorCode": "5086", "errorMessage": "İşlem bulunamadı"}
+        with server.stats.lock:
+            server.stats.refunds += 1
+        return {"status": "success", "paymentId": payment_id,
+                "paymentTransactionId": request.get("paymentTransactionId"),
+                "price": float(request.get("price", 0)), "currency": request.get("currency", "TRY")}
+
+
+class FakeIyzico(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 512
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8091, latency_ms: float = 0,
+                 hang_rate: float = 0.0, error_rate: float = 0.0,
+                 api_key: str = API_KEY, secret_key: str = SECRET_KEY):
+        super().__init__((host, port), FakeIyzicoHandler)
+        self.latency = latency_ms / 1000.0
+        self.hang_rate = hang_rate
+        self.error_rate = error_rate
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.lock = threading.Lock()
+        self.payments = {}
+        self.by_conversation = {}
+        self.transactions = {}
+        self.stats = FakeStats()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self, conversation_id: str, payment_status: str, price: float, currency: str = "TRY") -> str:
+        """Ödemeyi doğrudan belleğe ekle (reddedilen ödemeler ve mutabakat ölçümü için)"""
+        with self.lock:
+            payment_id = str(random.randint(10 ** 7, 10 ** 8 - 1))
+            while payment_id in self.payments:
+                payment_id = str(random.randint(10 ** 7, 10 ** 8 - 1))
+            self.payments[payment_id] = {
+                "status": "success",
+                "paymentId": payment_id,
+                "paymentStatus": payment_status,
+                "price": price,
+                "paidPrice": price,
+                "currency": currency,
+                "paymentConversationId": conversation_id,
+                "itemTransactions": [],
+            }
+            self.by_conversation[conversation_id] = payment_id
+        return payment_id
+
+    def start(self) -> "FakeIyzico":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+async def run_benchmark(server: FakeIyzico, count: int, concurrency: int, timeout: float,
+                        max_connections: int) -> None:
+    from app.core.circuit_breaker import CircuitBreaker
+    from app.core.config import settings
+    from app.services.payment import PaymentService
+    from app.services.payment_gateway import IyzicoGateway
+
+    gateway = IyzicoGateway(
+        base_url=server.url,
+        api_key=server.api_key,
+        secret_key=server.secret_key,
+        timeout=timeout,
+        connect_timeout=settings.IYZICO_CONNECT_TIMEOUT_SECONDS,
+        max_connections=max_connections,
+        breaker=CircuitBreaker(
+            "iyzico",
+            failure_threshold=settings.IYZICO_BREAKER_FAILURE_THRESHOLD,
+            reset_seconds=settings.IYZICO_BREAKER_RESET_SECONDS
+        )
+    )
+    service = PaymentService(gateway=gateway)
+    card = PaymentService.get_test_cards()["success_card"]
+    user = {"user_id": 1, "email": "benchmark@example.com", "first_name": "Test", "last_name": "User"}
+
+    # Event loop'un bloklanmadığını göstermek için tick gecikmesi ölçülür
+    lag = {"max": 0.0}
+    stop = asyncio.Event()
+
+    async def ticker():
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lag["max"] = max(lag["max"], time.perf_counter() - started - 0.01)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, outcomes = [], {}
+
+    async def one(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            result = await service.create_payment(100.0, str(i), user, card)
+            latencies.append(time.perf_counter() - started)
+            key = "success" if result["success"] else (
+                "unknown" if result.get("status") == "unknown" else
+                "unavailable" if result.get("retryable") else "declined"
+            )
+            outcomes[key] = outcomes.get(key, 0) + 1
+
+    tick = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await tick
+    await gateway.close()
+
+    latencies.sort()
+    print(f"{count} payments in {elapsed:.2f}s ({count / elapsed:.0f}/s, concurrency {concurrency})")
+    print(f"  outcomes: {outcomes}")
+    print(f"  latency p50={statistics.median(latencies) * 1000:.0f}ms "
+          f"p99={latencies[int(len(latencies) * 0.99) - 1] * 1000:.0f}ms "
+          f"max={latencies[-1] * 1000:.0f}ms")
+    print(f"  gateway: {gateway.stats()}")
+    print(f"  server: requests={server.stats.requests} connections={server.stats.connections} "
+          f"hung={server.stats.hung} errors={server.stats.errors}")
+    print(f"  event loop max lag: {lag['max'] * 1000:.1f}ms")
+
+
+async def run_reconcile_benchmark(server: FakeIyzico, count: int, concurrency: int, batch_size: int,
+                                  timeout: float, max_connections: int) -> None:
+    from app.core.circuit_breaker import CircuitBreaker
+    from app.core.config import settings
+
+    settings.PAYMENT_RECONCILE_CONCURRENCY = concurrency
+    settings.PAYMENT_RECONCILE_BATCH_SIZE = batch_size
+    settings.PAYMENT_RECONCILE_MIN_AGE_SECONDS = 0
+
+    import resource
+
+    from sqlalchemy import delete, insert
+
+    from app.core.database import SessionLocal
+    from app.models.payment import Payment, PaymentMethod, PaymentReconciliation, PaymentStatus
+    from app.models.user import User
+    from app.services.payment import PaymentService
+    from app.services.payment_gateway import IyzicoGateway
+    from app.services.payment_reconciliation import reconcile_payments
+
+    gateway = IyzicoGateway(
+        base_url=server.url,
+        api_key=server.api_key,
+        secret_key=server.secret_key,
+        timeout=timeout,
+        connect_timeout=settings.IYZICO_CONNECT_TIMEOUT_SECONDS,
+        max_connections=max_connections,
+        breaker=CircuitBreaker(
+            "iyzico",
+            failure_threshold=settings.IYZICO_BREAKER_FAILURE_THRESHOLD,
+            reset_seconds=settings.IYZICO_BREAKER_RESET_SECONDS
+        )
+    )
+
+    db = SessionLocal()
+    prefix = f"PAY-RECON-{int(time.time())}"
+    user = User(email=f"{prefix.lower()}@example.com", hashed_password="-", full_name="Reconcile Benchmark")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    run_id = None
+    try:
+        # Sağlayıcı tarafı: %60 başarılı, %15 reddedildi, %5 iade, %20 hiç ödenmemiş
+        outcomes = ["SUCCESS"] * 12 + ["FAILURE"] * 3 + ["REFUNDED"] + [None] * 4
+        for start in range(0, count, 5000):
+            db.execute(insert(Payment), [
+                {
+                    "payment_id": f"{prefix}-{i}",
+                    "amount": 100.0,
+                    "currency": "TRY",
+                    "status": PaymentStatus.PENDING,
+                    "method": PaymentMethod.CREDIT_CARD,
+                    "user_id": user_id,
+                }
+                for i in range(start, min(start + 5000, count))
+            ])
+            db.commit()
+        for i in range(count):
+            outcome = outcomes[i % len(outcomes)]
+            if outcome:
+                server.record(f"{prefix}-{i}", outcome, 100.0)
+
+        # Bellek partiyle sınırlı kalmalı: süreç tepe RSS artışı raporlanır
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        started = time.perf_counter()
+        report = await reconcile_payments(service=PaymentService(gateway=gateway))
+        elapsed = time.perf_counter() - started
+        rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+        run_id = report["id"]
+
+        counters = {key: report[key] for key in ("checked", "completed", "failed", "refunded", "unchanged", "errors")}
+        print(f"{count} pending payments reconciled in {elapsed:.2f}s "
+              f"({report['checked'] / elapsed:.0f}/s, concurrency {concurrency}, batch {batch_size})")
+        print(f"  {counters}")
+        print(f"  batches={report['report']['batches']} next_cursor={report['next_cursor']} "
+              f"aborted={report['aborted']}")
+        print(f"  peak RSS growth: {rss_growth / 1024:.1f} MiB")
+        print(f"  gateway: {gateway.stats()}")
+        print(f"  server: requests={server.stats.requests} connections={server.stats.connections}")
+    finally:
+        await gateway.close()
+        db.execute(delete(Payment).where(Payment.user_id == user_id))
+        if run_id:
+            db.execute(delete(PaymentReconciliation).where(PaymentReconciliation.id == run_id))
+        db.execute(delete(User).where(User.id == user_id))
+        db.commit()
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake İyzico payment API for tests and benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8091, help="0: boş bir port seç")
+    parser.add_argument("--latency-ms", type=float, default=0, help="İstek başına yapay gecikme")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help=f"{HANG_SECONDS:.0f}s askıda kalma oranı")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="HTTP 502 oranı")
+    parser.add_argument("--api-key", default=API_KEY)
+    parser.add_argument("--secret-key", default=SECRET_KEY)
+    parser.add_argument("--benchmark", type=int, default=0, metavar="N", help="N ödeme gönder ve raporla")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--max-connections", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=10.0, help="İstemci toplam zaman aşımı (s)")
+    parser.add_argument("--reconcile", type=int, default=0, metavar="N",
+                        help="N bekleyen ödeme ekle, mutabakat yap ve raporla (DATABASE_URL)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Mutabakat partisi")
+    args = parser.parse_args()
+
+    server = FakeIyzico(args.host, args.port, args.latency_ms, args.hang_rate, args.error_rate,
+                        args.api_key, args.secret_key).start()
+
+    if args.benchmark:
+        asyncio.run(run_benchmark(server, args.benchmark, args.concurrency, args.timeout, args.max_connections))
+        server.shutdown()
+        return
+
+    if args.reconcile:
+        asyncio.run(run_reconcile_benchmark(server, args.reconcile, args.concurrency, args.batch_size,
+                                            args.timeout, args.max_connections))
+        server.shutdown()
+        return
+
+    print(f"Fake İyzico listening on {server.url} (api key={args.api_key})")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+# Sahte NetGSM Sunucusu (test / yük testi)
+# NetGSM REST v2 toplu gönderim endpoint'ini (/sms/rest/v2/send) taklit
+# eder: Basic auth ve gövdeyi doğrular, mesajları sayar ve atar. HTTP/1.1
+# keep-alive desteklenir. İstek başına gecikme, geçici hata (kod 80) ve
+# sunucu hatası (HTTP 503) eklenebilir.
+#
+# Kullanım:
+#   python fake_netgsm.py --port 8090 --latency-ms 150 --fail-rate 0.05
+#   (.env: NETGSM_API_URL=http://127.0.0.1:8090 NETGSM_USERNAME=test
+#          NETGSM_PASSWORD=test NETGSM_HEADER=TEST)
+#
+#   # Gönderim hattı ölçümü: DATABASE_URL'deki veritabanına geçici kullanıcı
+#   # ve SMS bildirimleri ekler, deliver_sms ile gönderir, siler
+#   python fake_netgsm.py --port 0 --benchmark 5000 --latency-ms 150
+
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+USERNAME = "test"
+PASSWORD = "test"
+
+
+class FakeStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.messages = 0
+        self.failed_requests = 0
+
+
+class FakeNetGSMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.stats.lock:
+            self.server.stats.connections += 1
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def respond(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self) -> None:
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        if self.path != "/sms/rest/v2/send":
+            self.respond(404, {"code": "70", "description": "not found"})
+            return
+
+        expected = "Basic " + base64.b64encode(f"{server.username}:{server.password}".encode()).decode()
+        if self.headers.get("Authorization") != expected:
+            self.respond(200, {"code": "30", "description": "invalid credentials"})
+            return
+
+        try:
+            payload = json.loads(body)
+            messages = payload["messages"]
+            assert payload.get("msgheader") and messages
+            assert all(message.get("no") and message.get("msg") for message in messages)
+        except (ValueError, KeyError, TypeError, AssertionError):
+            self.respond(200, {"code": "70", "description": "invalid parameters"})
+            return
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        with server.stats.lock:
+            server.stats.requests += 1
+        roll = random.random()
+        if roll < server.error_rate:
+            with server.stats.lock:
+                server.stats.failed_requests += 1
+            self.respond(503, {"description": "unavailable (injected)"})
+        elif roll < server.error_rate + server.fail_rate:
+            with server.stats.lock:
+                server.stats.failed_requests += 1
+            self.respond(200, {"code": "80", "description": "limit exceeded (injected)"})
+        else:
+            with server.stats.lock:
+                server.stats.messages += len(messages)
+            self.respond(200, {"code": "00", "jobid": uuid.uuid4().hex[:12], "description": "queued"})
+
+
+class FakeNetGSM(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8090, latency_ms: float = 0,
+                 fail_rate: float = 0.0, error_rate: float = 0.0,
+                 username: str = USERNAME, password: str = PASSWORD):
+        super().__init__((host, port), FakeNetGSMHandler)
+        self.latency = latency_ms / 1000.0
+        self.fail_rate = fail_rate
+        self.error_rate = error_rate
+        self.username = username
+        self.password = password
+        self.stats = FakeStats()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeNetGSM":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def run_benchmark(server: FakeNetGSM, count: int, bulk_size: int, concurrency: int, rate: float) -> None:
+    from app.core.config import settings
+
+    settings.SMS_PROVIDER = "netgsm"
+    settings.NETGSM_API_URL = server.url
+    settings.NETGSM_USERNAME = server.username
+    settings.NETGSM_PASSWORD = server.password
+    settings.NETGSM_HEADER = settings.NETGSM_HEADER or "TEST"
+    settings.SMS_BULK_SIZE = bulk_size
+    settings.SMS_CONCURRENCY = concurrency
+    settings.SMS_RATE_LIMIT_PER_SECOND = rate
+
+    from sqlalchemy import delete, insert
+
+    from app.core.database import SessionLocal
+    from app.models.notification import Notification, NotificationPriority, NotificationType
+    from app.models.user import User
+    from app.services.delivery import deliver_pending
+    from app.services.sms import sms_channel
+
+    db = SessionLocal()
+    user = User(
+        email=f"fake-netgsm-{int(time.time())}@example.com",
+        hashed_password="-",
+        full_name="NetGSM Benchmark",
+        phone="0555 000 00 00"
+    )
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    try:
+        db.execute(insert(Notification), [
+            {
+                "user_id": user_id,
+                "title": "Duruşma hatırlatması",
+                "message": f"Yarın saat 10:00 duruşmanız var ({i}).",
+                "notification_type": NotificationType.SMS,
+                "priority": NotificationPriority.HIGH,
+                "is_read": True,
+                "is_sent": False,
+            }
+            for i in range(count)
+        ])
+        db.commit()
+
+        started = time.perf_counter()
+        report = deliver_pending(db, sms_channel)
+        elapsed = time.perf_counter() - started
+
+        print(f"{count} SMS in {elapsed:.2f}s ({report['sent'] / elapsed:.0f} sent/s)")
+        print(f"  report: {report}")
+        print(f"  bulk requests: {server.stats.requests} "
+              f"(failed {server.stats.failed_requests}), connections: {server.stats.connections}")
+    finally:
+        sms_channel.close()
+        db.execute(delete(Notification).where(Notification.user_id == user_id))
+        db.execute(delete(User).where(User.id == user_id))
+        db.commit()
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake NetGSM bulk SMS API for tests and benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090, help="0: boş bir port seç")
+    parser.add_argument("--latency-ms", type=float, default=0, help="İstek başına yapay gecikme")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Limit hatası (kod 80) oranı")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="HTTP 503 oranı")
+    parser.add_argument("--username", default=USERNAME)
+    parser.add_argument("--password", default=PASSWORD)
+    parser.add_argument("--benchmark", type=int, default=0, metavar="N",
+                        help="N SMS bildirimi ekle, gönder ve raporla (DATABASE_URL)")
+    parser.add_argument("--bulk-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=0, help="Saniyede bulk istek sınırı (0: sınırsız)")
+    args = parser.parse_args()
+
+    server = FakeNetGSM(args.host, args.port, args.latency_ms, args.fail_rate, args.error_rate,
+                        args.username, args.password).start()
+
+    if args.benchmark:
+        run_benchmark(server, args.benchmark, args.bulk_size, args.concurrency, args.rate)
+        server.shutdown()
+        return
+
+    print(f"Fake NetGSM listening on {server.url} (user={args.username})")
+    last = 0
+    try:
+        while True:
+            time.sleep(1)
+            messages = server.stats.messages
+            if messages != last:
+                print(f"messages={messages} (+{messages - last}/s) requests={server.stats.requests} "
+                      f"connections={server.stats.connections}")
+                last = messages
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,533 @@
+# Sahte S3 Sunucusu (test / yük testi)
+# MinIO/S3 API'sinin evrak deposunda kullanılan kısmını bellekte taklit
+# eder: bucket oluşturma/sorgulama, PUT/GET (Range)/HEAD/DELETE, sunucu
+# tarafı kopya, multipart upload ve ListObjectsV2. Path-style istekler
+# (MinIO SDK'nın özel endpoint'lerle kullandığı biçim); imza doğrulanmaz,
+# yalnızca Authorization başlığında erişim anahtarı aranır. İmzalı
+# (presigned) URL'ler kabul edilir: X-Amz-Credential anahtarı ve
+# X-Amz-Date + X-Amz-Expires süresi kontrol edilir, response-content-*
+# parametreleri yanıt başlıklarına yansır. HTTP/1.1 keep-alive
+# desteklenir. İstek başına gecikme ve parça yüklemelerinde HTTP 503
+# eklenebilir.
+#
+# Kullanım:
+#   python fake_s3.py --port 9100 --latency-ms 20
+#   (.env: STORAGE_PROVIDER=minio MINIO_ENDPOINT=127.0.0.1:9100
+#          MINIO_ACCESS_KEY=test MINIO_SECRET_KEY=test MINIO_SECURE=False)
+#
+#   # Depolama hattı ölçümü: S3Storage ile N dosya yükler (paralel
+#   # multipart), akışla geri okur ve doğrular (veritabanı kullanılmaz)
+#   python fake_s3.py --port 0 --benchmark 20 --size-mb 24 --latency-ms 50
+
+import argparse
+import hashlib
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+ACCESS_KEY = "test"
+SECRET_KEY = "test"
+S3_NS = "http://s3.amazonaws.com/doc/2006-03-01/"
+
+
+class FakeStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.objects_put = 0
+        self.parts = 0
+        self.multipart_uploads = 0
+        self.active_parts = 0
+        self.max_active_parts = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.ranged_gets = 0
+        self.presigned_gets = 0
+        self.errors = 0
+
+
+class StoredObject:
+    __slots__ = ("data", "etag", "content_type", "last_modified")
+
+    def __init__(self, data: bytes, content_type: str, etag: str = None):
+        self.data = data
+        self.etag = etag or hashlib.md5(data).hexdigest()
+        self.content_type = content_type
+        self.last_modified = time.time()
+
+
+class FakeS3Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.stats.lock:
+            self.server.stats.connections += 1
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    # ---- yardımcılar ----
+
+    def parse(self):
+        parts = urlsplit(self.path)
+        segments = unquote(parts.path).lstrip("/").split("/", 1)
+        bucket = segments[0]
+        key = segments[1] if len(segments) > 1 and segments[1] else None
+        query = parse_qs(parts.query, keep_blank_values=True)
+        return bucket, key, query
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        with self.server.stats.lock:
+            self.server.stats.bytes_in += len(body)
+        return body
+
+    def respond(self, status: int, body: bytes = b"", headers: dict = None, head: bool = False) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if "Content-Length" not in (headers or {}):
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and not head:
+            self.wfile.write(body)
+            with self.server.stats.lock:
+                self.server.stats.bytes_out += len(body)
+
+    def xml(self, status: int, root: ET.Element) -> None:
+        body = b'<?xml version="1.0" encoding="UTF-8"?>' + ET.tostring(root)
+        self.respond(status, body, {"Content-Type": "application/xml"})
+
+    def error(self, status: int, code: str, message: str, head: bool = False) -> None:
+        with self.server.stats.lock:
+            self.server.stats.errors += 1
+        if head:
+            self.respond(status, head=True)
+            return
+        root = ET.Element("Error")
+        for tag, text in (("Code", code), ("Message", message), ("Resource", self.path),
+                          ("RequestId", uuid.uuid4().hex[:16]), ("HostId", "fake-s3")):
+            ET.SubElement(root, tag).text = text
+        self.xml(status, root)
+
+    def authorized(self, query: dict) -> bool:
+        if "X-Amz-Credential" in query:
+            return self.presigned_valid(query)
+        return f"Credential={self.server.access_key}/" in self.headers.get("Authorization", "")
+
+    def presigned_valid(self, query: dict) -> bool:
+        if not query["X-Amz-Credential"][0].startswith(f"{self.server.access_key}/"):
+            return False
+        try:
+            signed_at = datetime.strptime(query["X-Amz-Date"][0], "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+            expires = int(query["X-Amz-Expires"][0])
+        except (KeyError, ValueError):
+            return False
+        if signed_at.timestamp() + expires < time.time():
+            return False
+        with self.server.stats.lock:
+            self.server.stats.presigned_gets += 1
+        return True
+
+    def begin(self, head: bool = False):
+        """Ortak ön kontroller; (bucket, key, query) veya None"""
+        with self.server.stats.lock:
+            self.server.stats.requests += 1
+        bucket, key, query = self.parse()
+        if not self.authorized(query):
+            self.read_body()
+            self.error(403, "AccessDenied", "Access Denied", head=head)
+            return None
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        return bucket, key, query
+
+    def bucket_or_error(self, bucket: str, head: bool = False):
+        objects = self.server.buckets.get(bucket)
+        if objects is None:
+            self.error(404, "NoSuchBucket", "The specified bucket does not exist", head=head)
+        return objects
+
+    # ---- HTTP metotları ----
+
+    def do_HEAD(self) -> None:
+        request = self.begin(head=True)
+        if request is None:
+            return
+        bucket, key, _ = request
+        objects = self.bucket_or_error(bucket, head=True)
+        if objects is None:
+            return
+        if key is None:
+            self.respond(200, head=True)
+            return
+        obj = objects.get(key)
+        if obj is None:
+            self.error(404, "NoSuchKey", "The specified key does not exist.", head=True)
+            return
+        self.respond(200, headers=self.object_headers(obj, len(obj.data)), head=True)
+
+    @staticmethod
+    def object_headers(obj: StoredObject, length: int) -> dict:
+        return {
+            "Content-Length": str(length),
+            "Content-Type": obj.content_type,
+            "ETag": f'"{obj.etag}"',
+            "Last-Modified": formatdate(obj.last_modified, usegmt=True),
+            "Accept-Ranges": "bytes",
+        }
+
+    def do_GET(self) -> None:
+        request = self.begin()
+        if request is None:
+            return
+        bucket, key, query = request
+        objects = self.bucket_or_error(bucket)
+        if objects is None:
+            return
+        if key is None:
+            if "location" in query:
+                root = ET.Element("LocationConstraint", xmlns=S3_NS)
+                root.text = self.server.region
+                self.xml(200, root)
+            elif query.get("list-type") == ["2"]:
+                self.list_objects(bucket, objects, query)
+            else:
+                self.error(501, "NotImplemented", "Only ListObjectsV2 is supported")
+            return
+
+        obj = objects.get(key)
+        if obj is None:
+            self.error(404, "NoSuchKey", "The specified key does not exist.")
+            return
+
+        size = len(obj.data)
+        overrides = {
+            header: query[param][0]
+            for param, header in (("response-content-disposition", "Content-Disposition"),
+                                  ("response-content-type", "Content-Type"))
+            if param in query
+        }
+        range_header = self.headers.get("Range")
+        if not range_header:
+            self.respond(200, obj.data, {**self.object_headers(obj, size), **overrides})
+            return
+
+        first, _, last = range_header.replace("bytes=", "").partition("-")
+        start = int(first) if first else size - int(last)
+        end = min(int(last), size - 1) if first and last else size - 1
+        if start >= size or start > end:
+            self.error(416, "InvalidRange", "The requested range is not satisfiable")
+            return
+        with self.server.stats.lock:
+            self.server.stats.ranged_gets += 1
+        headers = {**self.object_headers(obj, end - start + 1), **overrides}
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        self.respond(206, obj.data[start:end + 1], headers)
+
+    def list_objects(self, bucket: str, objects: dict, query: dict) -> None:
+        prefix = query.get("prefix", [""])[0]
+        max_keys = min(int(query.get("max-keys", ["1000"])[0]), 1000)
+        # Devam belirteci bu sahte sunucuda son anahtarın kendisidir
+        after = query.get("continuation-token", query.get("start-after", [""]))[0]
+        with self.server.lock:
+            keys = sorted(key for key in objects if key.startswith(prefix) and key > after)
+        page, truncated = keys[:max_keys], len(keys) > max_keys
+
+        root = ET.Element("ListBucketResult", xmlns=S3_NS)
+        for tag, text in (("Name", bucket), ("Prefix", prefix), ("KeyCount", str(len(page))),
+                          ("MaxKeys", str(max_keys)), ("IsTruncated", "true" if truncated else "false")):
+            ET.SubElement(root, tag).text = text
+        if truncated:
+            ET.SubElement(root, "NextContinuationToken").text = page[-1]
+        for key in page:
+            obj = objects[key]
+            contents = ET.SubElement(root, "Contents")
+            ET.SubElement(contents, "Key").text = key
+            ET.SubElement(contents, "LastModified").text = time.strftime(
+                "%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(obj.last_modified)
+            )
+            ET.SubElement(contents, "ETag").text = f'"{obj.etag}"'
+            ET.SubElement(contents, "Size").text = str(len(obj.data))
+            ET.SubElement(contents, "StorageClass").text = "STANDARD"
+        self.xml(200, root)
+
+    def do_PUT(self) -> None:
+        request = self.begin()
+        if request is None:
+            return
+        bucket, key, query = request
+        body = self.read_body()
+        server = self.server
+
+        if key is None:
+            with server.lock:
+                server.buckets.setdefault(bucket, {})
+            self.respond(200, headers={"Location": f"/{bucket}"})
+            return
+
+        objects = self.bucket_or_error(bucket)
+        if objects is None:
+            return
+
+        if "uploadId" in query:
+            self.upload_part(key, query, body)
+            return
+
+        copy_source = self.headers.get("x-amz-copy-source")
+        if copy_source:
+            source_bucket, _, source_key = unquote(copy_source).lstrip("/").partition("/")
+            source = server.buckets.get(source_bucket, {}).get(source_key)
+            if source is None:
+                self.error(404, "NoSuchKey", "The specified key does not exist.")
+                return
+            with server.lock:
+                objects[key] = StoredObject(source.data, source.content_type, source.etag)
+            root = ET.Element("CopyObjectResult", xmlns=S3_NS)
+            ET.SubElement(root, "ETag").text = f'"{source.etag}"'
+            ET.SubElement(root, "LastModified").text = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
+            self.xml(200, root)
+            return
+
+        obj = StoredObject(body, self.headers.get("Content-Type", "application/octet-stream"))
+        with server.lock:
+            objects[key] = obj
+        with server.stats.lock:
+            server.stats.objects_put += 1
+        self.respond(200, headers={"ETag": f'"{obj.etag}"'})
+
+    def upload_part(self, key: str, query: dict, body: bytes) -> None:
+        server = self.server
+        upload = server.uploads.get(query["uploadId"][0])
+        if upload is None:
+            self.error(404, "NoSuchUpload", "The specified upload does not exist.")
+            return
+
+        with server.stats.lock:
+            server.stats.active_parts += 1
+            server.stats.max_active_parts = max(server.stats.max_active_parts, server.stats.active_parts)
+        try:
+            if random.random() < server.error_rate:
+                self.error(503, "SlowDown", "Please reduce your request rate (injected)")
+                return
+            # Parça aktarımı: yükleme bant genişliği ile orantılı gecikme
+            if server.part_latency:
+                time.sleep(server.part_latency)
+            etag = hashlib.md5(body).hexdigest()
+            with server.lock:
+                upload["parts"][int(query["partNumber"][0])] = (body, etag)
+            with server.stats.lock:
+                server.stats.parts += 1
+            self.respond(200, headers={"ETag": f'"{etag}"'})
+        finally:
+            with server.stats.lock:
+                server.stats.active_parts -= 1
+
+    def do_POST(self) -> None:
+        request = self.begin()
+        if request is None:
+            return
+        bucket, key, query = request
+        body = self.read_body()
+        server = self.server
+        objects = self.bucket_or_error(bucket)
+        if objects is None:
+            return
+
+        if "uploads" in query:
+            upload_id = uuid.uuid4().hex
+            with server.lock:
+                server.uploads[upload_id] = {
+                    "key": key,
+                    "content_type": self.headers.get("Content-Type", "application/octet-stream"),
+                    "parts": {},
+                }
+            with server.stats.lock:
+                server.stats.multipart_uploads += 1
+            root = ET.Element("InitiateMultipartUploadResult", xmlns=S3_NS)
+            ET.SubElement(root, "Bucket").text = bucket
+            ET.SubElement(root, "Key").text = key
+            ET.SubElement(root, "UploadId").text = upload_id
+            self.xml(200, root)
+            return
+
+        if "uploadId" in query:
+            upload = server.uploads.pop(query["uploadId"][0], None)
+            if upload is None:
+                self.error(404, "NoSuchUpload", "The specified upload does not exist.")
+                return
+            requested = [
+                int(element.text)
+                for element in ET.fromstring(body).iter()
+                if element.tag.endswith("PartNumber")
+            ]
+            if any(number not in upload["parts"] for number in requested):
+                self.error(400, "InvalidPart", "One or more of the specified parts could not be found.")
+                return
+            data = b"".join(upload["parts"][number][0] for number in requested)
+            digest = hashlib.md5(b"".join(
+                bytes.fromhex(upload["parts"][number][1]) for number in requested
+            )).hexdigest()
+            obj = StoredObject(data, upload["content_type"], f"{digest}-{len(requested)}")
+            with server.lock:
+                objects[key] = obj
+            root = ET.Element("CompleteMultipartUploadResult", xmlns=S3_NS)
+            ET.SubElement(root, "Location").text = f"{server.url}/{bucket}/{key}"
+            ET.SubElement(root, "Bucket").text = bucket
+            ET.SubElement(root, "Key").text = key
+            ET.SubElement(root, "ETag").text = f'"{obj.etag}"'
+            self.xml(200, root)
+            return
+
+        self.error(501, "NotImplemented", "Unsupported POST")
+
+    def do_DELETE(self) -> None:
+        request = self.begin()
+        if request is None:
+            return
+        bucket, key, query = request
+        self.read_body()
+        objects = self.bucket_or_error(bucket)
+        if objects is None:
+            return
+        with self.server.lock:
+            if "uploadId" in query:
+                self.server.uploads.pop(query["uploadId"][0], None)
+            elif key is not None:
+                objects.pop(key, None)
+        self.respond(204)
+
+
+class FakeS3(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 256
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9100, latency_ms: float = 0,
+                 part_latency_ms: float = 0, error_rate: float = 0.0,
+                 access_key: str = ACCESS_KEY, region: str = "us-east-1"):
+        super().__init__((host, port), FakeS3Handler)
+        self.latency = latency_ms / 1000.0
+        self.part_latency = part_latency_ms / 1000.0
+        self.error_rate = error_rate
+        self.access_key = access_key
+        self.region = region
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.uploads = {}
+        self.stats = FakeStats()
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.endpoint}"
+
+    def start(self) -> "FakeS3":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def run_benchmark(server: FakeS3, count: int, size_mb: float, part_size_mb: int, concurrency: int) -> None:
+    from app.services.storage import S3Storage
+
+    def storage(parallel: int) -> S3Storage:
+        return S3Storage(
+            endpoint=server.endpoint,
+            access_key=server.access_key,
+            secret_key=SECRET_KEY,
+            bucket="benchmark",
+            secure=False,
+            region=server.region,
+            part_size=part_size_mb * 1024 * 1024,
+            upload_concurrency=parallel
+        )
+
+    size = int(size_mb * 1024 * 1024)
+    payload = os.urandom(size)
+    expected = hashlib.sha256(payload).hexdigest()
+    tmp_dir = tempfile.mkdtemp(prefix="fake-s3-")
+
+    def upload_all(backend: S3Storage, prefix: str) -> float:
+        started = time.perf_counter()
+        for i in range(count):
+            path = os.path.join(tmp_dir, f"{prefix}-{i}")
+            with open(path, "wb") as f:
+                f.write(payload)
+            backend.store_file(f"{prefix}/{i}", path)
+        return time.perf_counter() - started
+
+    total_mb = count * size / 1024 / 1024
+    for label, parallel in (("sequential", 1), ("parallel", concurrency)):
+        server.stats.max_active_parts = 0
+        elapsed = upload_all(storage(parallel), label)
+        print(f"{label:>10} upload: {count} x {size_mb:g} MB in {elapsed:.2f}s "
+              f"({total_mb / elapsed:.1f} MB/s, max concurrent parts {server.stats.max_active_parts})")
+
+    backend = storage(concurrency)
+    started = time.perf_counter()
+    for i in range(count):
+        digest = hashlib.sha256()
+        for chunk in backend.open_range(f"parallel/{i}"):
+            digest.update(chunk)
+        assert digest.hexdigest() == expected, "downloaded content mismatch"
+    elapsed = time.perf_counter() - started
+    print(f"  streaming GET: {total_mb:.0f} MB in {elapsed:.2f}s ({total_mb / elapsed:.1f} MB/s), content verified")
+
+    tail = b"".join(backend.open_range("parallel/0", size - 1000, 1000))
+    assert tail == payload[-1000:], "ranged GET mismatch"
+    backend.move("parallel/0", "parallel/0.moved")
+    assert not backend.exists("parallel/0") and backend.stat("parallel/0.moved").size == size
+    backend.delete("parallel/0.moved")
+    print(f"  server: requests={server.stats.requests} multipart={server.stats.multipart_uploads} "
+          f"parts={server.stats.parts} connections={server.stats.connections} errors={server.stats.errors}")
+    os.rmdir(tmp_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake S3/MinIO object store for tests and benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100, help="0: boş bir port seç")
+    parser.add_argument("--latency-ms", type=float, default=0, help="İstek başına yapay gecikme")
+    parser.add_argument("--part-latency-ms", type=float, default=100,
+                        help="Parça yükleme başına ek gecikme (aktarım süresi)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Parça yüklemede HTTP 503 oranı")
+    parser.add_argument("--access-key", default=ACCESS_KEY)
+    parser.add_argument("--benchmark", type=int, default=0, metavar="N", help="N dosya yükle, indir ve raporla")
+    parser.add_argument("--size-mb", type=float, default=24)
+    parser.add_argument("--part-size-mb", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=4, help="Paralel parça yükleme sayısı")
+    args = parser.parse_args()
+
+    server = FakeS3(args.host, args.port, args.latency_ms, args.part_latency_ms, args.error_rate,
+                    args.access_key).start()
+
+    if args.benchmark:
+        run_benchmark(server, args.benchmark, args.size_mb, args.part_size_mb, args.concurrency)
+        server.shutdown()
+        return
+
+    print(f"Fake S3 listening on {server.url} (access key={args.access_key})")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
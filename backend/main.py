@@ -3,6 +3,14 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.routes import api_router
 from app.core.database import engine
+from app.core.security import password_executor
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.body_limit import MULTIPART_OVERHEAD, BodySizeLimitMiddleware
+from app.api.endpoints.documents import MAX_FILE_SIZE
+from app.services.audit import audit_sink
+from app.services.notification_hub import notification_hub
+from app.services.payment_gateway import iyzico_gateway
+from app.services.storage import close_storage_service
 from app.models import user, case, document, notification, payment, task, timeline
 
 # Database tablolarını oluştur
@@ -20,6 +28,13 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Yükleme gövdesi, Starlette multipart'ı ayrıştırmadan önce sınırlanır
+# (CORS bu middleware'i sarar: 413 yanıtı tarayıcıda okunabilir)
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    limits={"/api/documents/upload": MAX_FILE_SIZE + MULTIPART_OVERHEAD},
+)
+
 # CORS middleware - Allow frontend domain
 app.add_middleware(
     CORSMiddleware,
@@ -31,11 +46,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing"],
 )
 
+# İstek başına SQL ifade sayısı / süresi (Server-Timing)
+if settings.QUERY_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+
 # Include API routes
 app.include_router(api_router, prefix="/api")
 
+@app.on_event("startup")
+async def start_background_writers():
+    await audit_sink.start()
+    await notification_hub.start()
+
+@app.on_event("shutdown")
+async def shutdown_executors():
+    await notification_hub.stop()
+    await iyzico_gateway.close()
+    close_storage_service()
+    await audit_sink.stop()
+    password_executor.shutdown()
+
 @app.get("/")
 async def root():
     return {
@@ -0,0 +1,220 @@
+# Yerel SMTP Sink (yük testi)
+# Ağ veya gerçek sağlayıcı olmadan email kanalını denemek için mesajları
+# kabul edip atan minimal bir SMTP sunucusu. Mesaj başına gecikme ve
+# rastgele geçici (451) / kalıcı (550) hata eklenebilir.
+#
+# Kullanım:
+#   python smtp_sink.py --port 1025 --latency-ms 20 --fail-rate 0.02
+#   (.env: SMTP_HOST=127.0.0.1 SMTP_PORT=1025 SMTP_SECURITY=none SMTP_USER=)
+#
+#   # Gönderim hattı ölçümü: DATABASE_URL'deki veritabanına geçici kullanıcı
+#   # ve email bildirimleri ekler, deliver_email ile gönderir, siler
+#   python smtp_sink.py --benchmark 2000 --pool-size 4 --rate 500
+
+import argparse
+import random
+import socketserver
+import threading
+import time
+
+
+class SinkStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = 0
+        self.rejected = 0
+        self.bytes = 0
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """RFC 5321'in gönderim için gereken alt kümesi (EHLO/MAIL/RCPT/DATA/RSET/NOOP/QUIT)"""
+
+    def reply(self, line: str) -> None:
+        self.wfile.write((line + "\r\n").encode("ascii"))
+
+    def handle(self) -> None:
+        server = self.server
+        with server.stats.lock:
+            server.stats.connections += 1
+        self.reply("220 smtp-sink ESMTP ready")
+
+        recipients = []
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode("utf-8", "replace").rstrip("\r\n")
+            verb = line[:4].upper()
+
+            if verb in ("EHLO", "HELO"):
+                if verb == "EHLO":
+                    self.reply("250-smtp-sink")
+                    self.reply("250-8BITMIME")
+                    self.reply("250-SMTPUTF8")
+                    self.reply("250 SIZE 10485760")
+                else:
+                    self.reply("250 smtp-sink")
+            elif verb == "MAIL":
+                recipients = []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(line[8:].strip())
+                self.reply("250 OK")
+            elif verb == "DATA":
+                if not recipients:
+                    self.reply("503 RCPT first")
+                    continue
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                size = 0
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b".\r\n", b".\n"):
+                        break
+                    size += len(data)
+                if server.latency:
+                    time.sleep(server.latency)
+                roll = random.random()
+                if roll < server.fail_rate:
+                    with server.stats.lock:
+                        server.stats.rejected += 1
+                    self.reply("451 4.3.0 Temporary failure (injected)")
+                elif roll < server.fail_rate + server.reject_rate:
+                    with server.stats.lock:
+                        server.stats.rejected += 1
+                    self.reply("550 5.1.1 Mailbox unavailable (injected)")
+                else:
+                    with server.stats.lock:
+                        server.stats.messages += 1
+                        server.stats.bytes += size
+                    self.reply("250 OK queued")
+                recipients = []
+            elif verb == "RSET":
+                recipients = []
+                self.reply("250 OK")
+            elif verb == "NOOP":
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 1025, latency_ms: float = 0,
+                 fail_rate: float = 0.0, reject_rate: float = 0.0):
+        super().__init__((host, port), SMTPSinkHandler)
+        self.latency = latency_ms / 1000.0
+        self.fail_rate = fail_rate
+        self.reject_rate = reject_rate
+        self.stats = SinkStats()
+
+    def start(self) -> "SMTPSink":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def run_benchmark(sink: SMTPSink, count: int, pool_size: int, rate: float, batch_size: int) -> None:
+    from app.core.config import settings
+
+    host, port = sink.server_address
+    settings.SMTP_HOST = host
+    settings.SMTP_PORT = port
+    settings.SMTP_SECURITY = "none"
+    settings.SMTP_USER = ""
+    settings.SMTP_FROM = settings.SMTP_FROM or "bildirim@koptay.av.tr"
+    settings.SMTP_POOL_SIZE = pool_size
+    settings.EMAIL_RATE_LIMIT_PER_SECOND = rate
+    settings.EMAIL_BATCH_SIZE = batch_size
+
+    from sqlalchemy import delete, insert
+
+    from app.core.database import SessionLocal
+    from app.models.notification import Notification, NotificationPriority, NotificationType
+    from app.models.user import User
+    from app.services.delivery import deliver_pending
+    from app.services.email import email_channel
+
+    db = SessionLocal()
+    user = User(
+        email=f"smtp-sink-{int(time.time())}@example.com",
+        hashed_password="-",
+        full_name="SMTP Sink Benchmark"
+    )
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    try:
+        db.execute(insert(Notification), [
+            {
+                "user_id": user_id,
+                "title": f"Benchmark {i}",
+                "message": "Duruşma hatırlatması: yarın saat 10:00.",
+                "notification_type": NotificationType.EMAIL,
+                "priority": NotificationPriority.MEDIUM,
+                "is_read": True,
+                "is_sent": False,
+            }
+            for i in range(count)
+        ])
+        db.commit()
+
+        started = time.perf_counter()
+        report = deliver_pending(db, email_channel)
+        elapsed = time.perf_counter() - started
+
+        pool = email_channel.pool
+        print(f"{count} notifications in {elapsed:.2f}s ({report['sent'] / elapsed:.0f} sent/s)")
+        print(f"  report: {report}")
+        print(f"  smtp connections opened: {pool.opened} (sink saw {sink.stats.connections}), "
+              f"discarded: {pool.discarded}")
+        print(f"  sink accepted: {sink.stats.messages}, rejected: {sink.stats.rejected}")
+    finally:
+        email_channel.close()
+        db.execute(delete(Notification).where(Notification.user_id == user_id))
+        db.execute(delete(User).where(User.id == user_id))
+        db.commit()
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local SMTP sink for email delivery load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025, help="0: boş bir port seç")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Mesaj başına yapay gecikme")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Geçici hata (451) oranı")
+    parser.add_argument("--reject-rate", type=float, default=0.0, help="Kalıcı hata (550) oranı")
+    parser.add_argument("--benchmark", type=int, default=0, metavar="N",
+                        help="N email bildirimi ekle, gönder ve raporla (DATABASE_URL)")
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=0, help="Saniyede mesaj sınırı (0: sınırsız)")
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+
+    sink = SMTPSink(args.host, args.port, args.latency_ms, args.fail_rate, args.reject_rate).start()
+
+    if args.benchmark:
+        run_benchmark(sink, args.benchmark, args.pool_size, args.rate, args.batch_size)
+        sink.shutdown()
+        return
+
+    print(f"SMTP sink listening on {sink.server_address[0]}:{sink.server_address[1]}")
+    last = 0
+    try:
+        while True:
+            time.sleep(1)
+            messages = sink.stats.messages
+            if messages != last:
+                print(f"messages={messages} (+{messages - last}/s) rejected={sink.stats.rejected} "
+                      f"connections={sink.stats.connections}")
+                last = messages
+    except KeyboardInterrupt:
+        sink.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ import { Fragment, useState, useEffect } from 'react';
 import { Popover, Transition } from '@headlessui/react';
 import { Bell, FileText, Gavel, CreditCard, Info } from 'lucide-react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
-import { notificationService, Notification } from '../services/notification';
+import { notificationService, Notification, NotificationStreamEvent } from '../services/notification';
 import { format } from 'date-fns';
 import { tr } from 'date-fns/locale';
 import { useNavigate } from 'react-router-dom';
@@ -11,19 +11,53 @@ export default function NotificationBell() {
   const queryClient = useQueryClient();
   const navigate = useNavigate();
   const [, setIsOpen] = useState(false);
+  const [streamConnected, setStreamConnected] = useState(false);
+
+  // Anlık bildirim akışı (SSE); bağlıyken polling kapalıdır
+  useEffect(() => {
+    const handleEvent = (event: NotificationStreamEvent) => {
+      switch (event.type) {
+        case 'ready':
+          queryClient.setQueryData(['unreadCount'], event.unread_count);
+          break;
+        case 'notification':
+          queryClient.setQueryData<Notification[]>(['notifications'], (current = []) =>
+            [event.notification, ...current].slice(0, 10)
+          );
+          queryClient.setQueryData<number>(['unreadCount'], (count = 0) =>
+            event.unread_count ?? count + event.unread_delta
+          );
+          break;
+        case 'unread':
+          queryClient.setQueryData<number>(['unreadCount'], (count = 0) =>
+            event.unread_count ?? Math.max(count + event.unread_delta, 0)
+          );
+          break;
+        case 'resync':
+          queryClient.invalidateQueries({ queryKey: ['notifications'] });
+          queryClient.invalidateQueries({ queryKey: ['unreadCount'] });
+          break;
+      }
+    };
+
+    return notificationService.subscribe(handleEvent, setStreamConnected);
+  }, [queryClient]);
+
+  // Akış bağlı değilse 30 saniyede bir yenile
+  const refetchInterval = streamConnected ? false : 30000;
 
   // Bildirimleri getir
   const { data: notifications = [] } = useQuery({
     queryKey: ['notifications'],
-    queryFn: () => notificationService.getAll(0, 10),
-    refetchInterval: 30000, // 30 saniyede bir yenile
+    queryFn: () => notificationService.getAll(10),
+    refetchInterval,
   });
 
   // Okunmamış sayısını getir
   const { data: unreadCount = 0 } = useQuery({
     queryKey: ['unreadCount'],
     queryFn: notificationService.getUnreadCount,
-    refetchInterval: 30000,
+    refetchInterval,
   });
 
   // Okundu olarak işaretle
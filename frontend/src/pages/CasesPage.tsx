@@ -1,6 +1,6 @@
 import { useQuery } from '@tanstack/react-query'
 import { useNavigate } from 'react-router-dom'
-import api from '../services/api'
+import { getAllPages } from '../services/api'
 import { FileText, Calendar, Scale } from 'lucide-react'
 import type { Case } from '../types'
 
@@ -9,8 +9,9 @@ export default function CasesPage() {
   const { data: casesData, isLoading } = useQuery({
     queryKey: ['cases'],
     queryFn: async () => {
-      const response = await api.get<{ cases: Case[]; total: number }>('/cases')
-      return response.data
+      // total yalnızca ilk sayfada hesaplanır; tüm sayfalar toplanır
+      const cases = await getAllPages<Case>('/cases', {}, (data) => data.cases)
+      return { cases, total: cases.length }
     },
   })
 
@@ -11,7 +11,7 @@ import {
   Filter,
   Gavel
 } from 'lucide-react'
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
+import { useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { notificationService } from '../services/notification'
 import { format } from 'date-fns'
 import { tr } from 'date-fns/locale'
@@ -22,11 +22,20 @@ export default function NotificationsPage() {
   const queryClient = useQueryClient()
   const [selectedType, setSelectedType] = useState<NotificationFilterType>('all')
 
-  // Bildirimleri getir
-  const { data: notifications = [], isLoading } = useQuery({
+  // Bildirimleri getir (imleçli sayfalar, "Daha fazla yükle" ile devam eder)
+  const {
+    data,
+    isLoading,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage,
+  } = useInfiniteQuery({
     queryKey: ['notifications', 'all'],
-    queryFn: () => notificationService.getAll(0, 100), // Daha fazla getir
+    queryFn: ({ pageParam }) => notificationService.getPage(pageParam, 100),
+    initialPageParam: undefined as string | undefined,
+    getNextPageParam: (lastPage) => lastPage.nextCursor,
   })
+  const notifications = data?.pages.flatMap((page) => page.items) ?? []
 
   // Okundu olarak işaretle
   const markAsReadMutation = useMutation({
@@ -216,6 +225,18 @@ export default function NotificationsPage() {
         )}
       </div>
 
+      {hasNextPage && (
+        <div className="mt-6 text-center">
+          <button
+            onClick={() => fetchNextPage()}
+            disabled={isFetchingNextPage}
+            className="px-4 py-2 text-sm font-medium text-blue-600 bg-white border border-blue-200 rounded-lg hover:bg-blue-50 disabled:opacity-50"
+          >
+            {isFetchingNextPage ? 'Yükleniyor...' : 'Daha fazla yükle'}
+          </button>
+        </div>
+      )}
+
       {/* Info Box */}
       {filteredNotifications.length > 0 && (
         <div className="mt-8 bg-gray-50 border border-gray-200 rounded-xl p-6">
@@ -1,7 +1,7 @@
 import { useState } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
-import api from '../../services/api'
+import api, { getAllPages } from '../../services/api'
 import { Save, ArrowLeft } from 'lucide-react'
 import { Link } from 'react-router-dom'
 
@@ -24,10 +24,7 @@ export default function AdminCaseCreatePage() {
   const { data: clientsData, isLoading: isLoadingClients } = useQuery({
     queryKey: ['admin-clients-list'],
     queryFn: async () => {
-      // Tüm müvekkilleri getirmek için limit artırılabilir veya pagination yönetilebilir
-      // Şimdilik basitçe listeliyoruz
-      const response = await api.get('/admin/clients?limit=100')
-      return response.data
+      return { items: await getAllPages('/admin/clients') }
     },
   })
 
@@ -1,6 +1,6 @@
 import { useState } from 'react'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
-import api from '../../services/api'
+import api, { getAllPages } from '../../services/api'
 import { Search, Briefcase, Plus, Edit2, Trash2, Eye } from 'lucide-react'
 import { Link } from 'react-router-dom'
 
@@ -13,12 +13,11 @@ export default function AdminCasesPage() {
   const { data: cases, isLoading } = useQuery({
     queryKey: ['admin-cases', search, status, caseType],
     queryFn: async () => {
-      const params = new URLSearchParams()
-      if (status) params.append('status', status)
-      if (caseType) params.append('case_type', caseType)
-      
-      const response = await api.get(`/admin/cases?${params}`)
-      return response.data
+      const items = await getAllPages('/admin/cases', {
+        status: status || undefined,
+        case_type: caseType || undefined,
+      })
+      return { items }
     },
   })
 
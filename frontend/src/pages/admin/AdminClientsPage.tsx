@@ -1,6 +1,6 @@
 import { useState } from 'react'
 import { useQuery } from '@tanstack/react-query'
-import api from '../../services/api'
+import { getAllPages } from '../../services/api'
 import { Search, Users, Building2, User, Eye, Plus } from 'lucide-react'
 import { Link, useNavigate } from 'react-router-dom'
 
@@ -12,13 +12,10 @@ export default function AdminClientsPage() {
   const { data: clients, isLoading } = useQuery({
     queryKey: ['admin-clients', search, userType],
     queryFn: async () => {
-      const params = new URLSearchParams()
-      if (search) params.append('search', search)
-      if (userType) params.append('user_type', userType)
-      
-      const response = await api.get(`/admin/clients?${params}`)
-      // Backend returns list directly, not paginated object with items
-      return Array.isArray(response.data) ? response.data : response.data.items || []
+      return getAllPages('/admin/clients', {
+        search: search || undefined,
+        user_type: userType || undefined,
+      })
     },
   })
 
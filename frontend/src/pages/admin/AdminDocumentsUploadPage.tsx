@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react'
 import { useMutation, useQueryClient, useQuery } from '@tanstack/react-query'
 import { useSearchParams } from 'react-router-dom'
-import api from '../../services/api'
+import api, { getAllPages } from '../../services/api'
 import { Upload, FileText, AlertCircle, CheckCircle } from 'lucide-react'
 
 export default function AdminDocumentsUploadPage() {
@@ -26,8 +26,7 @@ export default function AdminDocumentsUploadPage() {
   const { data: cases } = useQuery({
     queryKey: ['admin-cases-for-upload'],
     queryFn: async () => {
-      const response = await api.get('/admin/cases')
-      return response.data
+      return { items: await getAllPages('/admin/cases') }
     },
   })
 
@@ -1,6 +1,6 @@
 import { useState } from 'react'
 import { useMutation, useQueryClient, useQuery } from '@tanstack/react-query'
-import api from '../../services/api'
+import api, { getAllPages } from '../../services/api'
 import { CreditCard, AlertCircle, DollarSign } from 'lucide-react'
 
 export default function AdminPaymentsCreatePage() {
@@ -15,8 +15,7 @@ export default function AdminPaymentsCreatePage() {
   const { data: clients } = useQuery({
     queryKey: ['admin-clients-for-payment'],
     queryFn: async () => {
-      const response = await api.get('/admin/clients')
-      return response.data
+      return { items: await getAllPages('/admin/clients') }
     },
   })
 
@@ -24,8 +23,7 @@ export default function AdminPaymentsCreatePage() {
     queryKey: ['admin-cases-for-payment', clientId],
     queryFn: async () => {
       if (!clientId) return { items: [] }
-      const response = await api.get(`/admin/cases?client_id=${clientId}`)
-      return response.data
+      return { items: await getAllPages('/admin/cases', { client_id: clientId }) }
     },
     enabled: !!clientId,
   })
@@ -36,6 +36,29 @@ api.interceptors.request.use(
   (error) => Promise.reject(error)
 )
 
+// Sayfalı listeler: sonraki sayfanın imleci X-Next-Cursor header'ında döner,
+// son sayfada header yoktur
+export const PAGE_LIMIT = 200 // backend PAGINATION_MAX_LIMIT
+
+export const nextCursor = (headers: Record<string, any>): string | undefined =>
+  headers['x-next-cursor'] || undefined
+
+// İmleci izleyerek listenin tüm sayfalarını getir (seçim listeleri gibi tam liste gereken yerler için)
+export async function getAllPages<T = any>(
+  url: string,
+  params: Record<string, unknown> = {},
+  select: (data: any) => T[] = (data) => data
+): Promise<T[]> {
+  const items: T[] = []
+  let cursor: string | undefined
+  do {
+    const response = await api.get(url, { params: { ...params, limit: PAGE_LIMIT, cursor } })
+    items.push(...select(response.data))
+    cursor = nextCursor(response.headers)
+  } while (cursor)
+  return items
+}
+
 // Auth API
 export const authApi = {
   login: async (data: LoginRequest & { otp_code?: string }): Promise<LoginResponse> => {
@@ -130,8 +153,7 @@ export const casesApi = {
   },
 
   getCaseTimeline: async (id: number) => {
-    const response = await api.get<TimelineEvent[]>(`/cases/${id}/timeline`)
-    return response.data
+    return getAllPages<TimelineEvent>(`/cases/${id}/timeline`)
   },
 
   createCase: async (data: CaseCreate) => {
@@ -1,4 +1,4 @@
-import api from './api';
+import api, { nextCursor } from './api';
 
 export interface Notification {
   id: number;
@@ -12,12 +12,32 @@ export interface Notification {
   case_id?: number;
 }
 
+export type NotificationStreamEvent =
+  | { type: 'ready'; unread_count: number }
+  | { type: 'notification'; unread_delta: number; unread_count?: number; notification: Notification }
+  | { type: 'unread'; unread_delta: number; unread_count?: number }
+  | { type: 'resync' };
+
+const STREAM_RECONNECT_MS = 5000;
+
+const getToken = (): string | null => {
+  const authData = localStorage.getItem('auth-storage');
+  if (!authData) return null;
+  return JSON.parse(authData).state?.token ?? null;
+};
+
 export const notificationService = {
-  getAll: async (skip = 0, limit = 20, unreadOnly = false) => {
+  // İlk sayfa (en yeniler)
+  getAll: async (limit = 20, unreadOnly = false) => {
+    return (await notificationService.getPage(undefined, limit, unreadOnly)).items;
+  },
+
+  // İmleçli sayfa; sonraki sayfanın imleci X-Next-Cursor header'ında döner
+  getPage: async (cursor?: string, limit = 20, unreadOnly = false) => {
     const response = await api.get<Notification[]>('/notifications/', {
-      params: { skip, limit, unread_only: unreadOnly }
+      params: { cursor, limit, unread_only: unreadOnly }
     });
-    return response.data;
+    return { items: response.data, nextCursor: nextCursor(response.headers) };
   },
 
   getUnreadCount: async () => {
@@ -33,5 +53,70 @@ export const notificationService = {
   markAllAsRead: async () => {
     const response = await api.put<{ message: string }>('/notifications/read-all');
     return response.data;
+  },
+
+  // Akış için tek kullanımlık kısa ömürlü bilet (JWT URL'e konmaz)
+  getStreamTicket: async () => {
+    const response = await api.post<{ ticket: string; expires_in: number }>('/notifications/stream-ticket');
+    return response.data.ticket;
+  },
+
+  // Server-Sent Events akışı; EventSource header gönderemediği için her
+  // bağlantı yeni bir bilet alır. Bilet tek kullanımlık olduğundan
+  // tarayıcının kendi yeniden bağlanması yerine (token süresi dolduğunda
+  // sunucunun kapattığı bağlantılar dahil) yeni biletle yeniden bağlanılır.
+  subscribe: (
+    onEvent: (event: NotificationStreamEvent) => void,
+    onConnectionChange: (connected: boolean) => void
+  ) => {
+    if (!getToken() || typeof EventSource === 'undefined') {
+      onConnectionChange(false);
+      return () => {};
+    }
+
+    let source: EventSource | null = null;
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+    let closed = false;
+    const handle = (message: MessageEvent) => onEvent(JSON.parse(message.data));
+
+    const reconnect = () => {
+      if (!closed && getToken()) {
+        retryTimer = setTimeout(connect, STREAM_RECONNECT_MS);
+      }
+    };
+
+    const connect = async () => {
+      let ticket: string;
+      try {
+        ticket = await notificationService.getStreamTicket();
+      } catch {
+        onConnectionChange(false);
+        reconnect();
+        return;
+      }
+      if (closed) return;
+
+      source = new EventSource(
+        `${api.defaults.baseURL}/notifications/stream?ticket=${encodeURIComponent(ticket)}`
+      );
+      ['ready', 'notification', 'unread', 'resync'].forEach((type) =>
+        source!.addEventListener(type, handle as EventListener)
+      );
+      source.onopen = () => onConnectionChange(true);
+      source.onerror = () => {
+        source?.close();
+        source = null;
+        onConnectionChange(false);
+        reconnect();
+      };
+    };
+
+    connect();
+
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      source?.close();
+    };
   }
 };